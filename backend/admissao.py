@@ -0,0 +1,199 @@
+"""
+Controle de admissão com fila limitada e prioridades para os serviços upstream.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+# Prioridades (menor valor = atendido primeiro)
+PRIORIDADE_INTERATIVA = 0
+PRIORIDADE_LOTE = 1
+
+PRIORIDADES = {"interativa": PRIORIDADE_INTERATIVA, "lote": PRIORIDADE_LOTE}
+
+
+class ErroAdmissao(Exception):
+    """Requisição rejeitada pelo controle de admissão (fila cheia ou espera esgotada)."""
+
+    def __init__(self, mensagem: str, status_code: int, retry_after: int):
+        super().__init__(mensagem)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class ControleAdmissao:
+    """
+    Limita as chamadas simultâneas a um serviço upstream.
+
+    Até limite_concorrencia chamadas são executadas ao mesmo tempo; as demais
+    aguardam em uma fila de tamanho limitado, ordenada por prioridade e, em
+    cada prioridade, por ordem de chegada. Com a fila cheia a requisição é
+    rejeitada na hora (429); se a espera passar de espera_maxima_segundos,
+    ela desiste (503). Nos dois casos é sugerido um Retry-After calculado a
+    partir do tempo médio de atendimento.
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        limite_concorrencia: int = 1,
+        limite_fila: int = 32,
+        espera_maxima_segundos: Optional[float] = 30.0
+    ):
+        """
+        Inicializa o controle de admissão.
+
+        Args:
+            nome: Nome do serviço (usado nas mensagens de erro)
+            limite_concorrencia: Máximo de chamadas simultâneas ao serviço
+            limite_fila: Máximo de requisições aguardando vaga
+            espera_maxima_segundos: Tempo máximo na fila (None = sem limite)
+        """
+        self.nome = nome
+        self.limite_concorrencia = max(1, limite_concorrencia)
+        self.limite_fila = max(0, limite_fila)
+        self.espera_maxima_segundos = espera_maxima_segundos
+
+        self._ativas = 0
+        self._sequencia = itertools.count()
+        # (prioridade, ordem de chegada, futuro que recebe a vaga)
+        self._fila: List[Tuple[int, int, asyncio.Future]] = []
+        self._duracao_media = 1.0
+        self._metricas = {
+            "admitidas": 0,
+            "enfileiradas": 0,
+            "rejeitadas_fila_cheia": 0,
+            "rejeitadas_espera": 0,
+            "fila_maxima": 0,
+        }
+        self._espera_total = 0.0
+        self._espera_maxima_observada = 0.0
+
+    def _retry_after(self) -> int:
+        """Estima em segundos quando uma nova vaga deve estar disponível."""
+        atendimentos_a_frente = len(self._fila) + 1
+        return max(1, math.ceil(self._duracao_media * atendimentos_a_frente / self.limite_concorrencia))
+
+    def _registrar_espera(self, espera: float) -> None:
+        self._espera_total += espera
+        self._espera_maxima_observada = max(self._espera_maxima_observada, espera)
+
+    async def adquirir(self, prioridade: int = PRIORIDADE_INTERATIVA) -> float:
+        """
+        Aguarda uma vaga para chamar o serviço.
+
+        Args:
+            prioridade: PRIORIDADE_INTERATIVA ou PRIORIDADE_LOTE
+
+        Returns:
+            Instante (time.monotonic) da admissão, a ser repassado a liberar
+
+        Raises:
+            ErroAdmissao: Se a fila estiver cheia ou a espera máxima for excedida
+        """
+        inicio = time.monotonic()
+        if self._ativas < self.limite_concorrencia and not self._fila:
+            self._ativas += 1
+            self._metricas["admitidas"] += 1
+            self._registrar_espera(0.0)
+            return inicio
+
+        if len(self._fila) >= self.limite_fila:
+            self._metricas["rejeitadas_fila_cheia"] += 1
+            raise ErroAdmissao(
+                f"Fila do serviço {self.nome} cheia. Tente novamente em instantes.",
+                status_code=429,
+                retry_after=self._retry_after()
+            )
+
+        futuro = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._fila, (prioridade, next(self._sequencia), futuro))
+        self._metricas["enfileiradas"] += 1
+        self._metricas["fila_maxima"] = max(self._metricas["fila_maxima"], len(self._fila))
+
+        try:
+            await asyncio.wait_for(asyncio.shield(futuro), timeout=self.espera_maxima_segundos)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if futuro.done() and not futuro.cancelled():
+                # A vaga foi concedida no mesmo instante da desistência: devolvê-la
+                self.liberar(time.monotonic())
+            else:
+                futuro.cancel()
+                self._remover_da_fila(futuro)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._metricas["rejeitadas_espera"] += 1
+            raise ErroAdmissao(
+                f"Serviço {self.nome} sobrecarregado: espera máxima de "
+                f"{self.espera_maxima_segundos:.0f}s excedida.",
+                status_code=503,
+                retry_after=self._retry_after()
+            )
+
+        admitido_em = time.monotonic()
+        self._metricas["admitidas"] += 1
+        self._registrar_espera(admitido_em - inicio)
+        return admitido_em
+
+    def liberar(self, admitido_em: float) -> None:
+        """
+        Devolve a vaga e a repassa à próxima requisição da fila.
+
+        Args:
+            admitido_em: Valor retornado por adquirir
+        """
+        duracao = time.monotonic() - admitido_em
+        # Média móvel exponencial do tempo de atendimento (base do Retry-After)
+        self._duracao_media = 0.8 * self._duracao_media + 0.2 * duracao
+
+        while self._fila:
+            _, _, futuro = heapq.heappop(self._fila)
+            if not futuro.done():
+                # A vaga passa direto para o próximo, sem decrementar _ativas
+                futuro.set_result(None)
+                return
+        self._ativas -= 1
+
+    def _remover_da_fila(self, futuro: asyncio.Future) -> None:
+        self._fila = [item for item in self._fila if item[2] is not futuro]
+        heapq.heapify(self._fila)
+
+    @asynccontextmanager
+    async def admitir(self, prioridade: int = PRIORIDADE_INTERATIVA) -> AsyncIterator[None]:
+        """
+        Context manager que ocupa uma vaga durante a chamada ao serviço.
+
+        Args:
+            prioridade: PRIORIDADE_INTERATIVA ou PRIORIDADE_LOTE
+
+        Raises:
+            ErroAdmissao: Se a requisição não for admitida
+        """
+        admitido_em = await self.adquirir(prioridade)
+        try:
+            yield
+        finally:
+            self.liberar(admitido_em)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Retorna as métricas do controle de admissão.
+
+        Returns:
+            Dicionário com ocupação, profundidade da fila, rejeições e tempos de espera
+        """
+        admitidas = self._metricas["admitidas"]
+        return {
+            **self._metricas,
+            "ativas": self._ativas,
+            "limite_concorrencia": self.limite_concorrencia,
+            "fila": len(self._fila),
+            "limite_fila": self.limite_fila,
+            "espera_media_ms": round(1000 * self._espera_total / admitidas, 1) if admitidas else 0.0,
+            "espera_maxima_ms": round(1000 * self._espera_maxima_observada, 1),
+            "duracao_media_ms": round(1000 * self._duracao_media, 1),
+        }
@@ -0,0 +1,112 @@
+"""
+Execução especulativa (antecipada) de chamadas ao upstream com concorrência limitada.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class Antecipacao:
+    """Uma chamada especulativa agendada por AntecipadorChamadas."""
+
+    def __init__(self, semaforo: asyncio.Semaphore, fabrica: Callable[[], Awaitable[Any]]):
+        self.iniciada = False
+        self._semaforo = semaforo
+        self.tarefa = asyncio.ensure_future(self._executar(fabrica))
+        self.tarefa.add_done_callback(self._finalizar)
+
+    async def _executar(self, fabrica: Callable[[], Awaitable[Any]]) -> Any:
+        async with self._semaforo:
+            self.iniciada = True
+            return await fabrica()
+
+    @staticmethod
+    def _finalizar(tarefa: asyncio.Task) -> None:
+        # Evita o aviso de exceção não recuperada quando o resultado não é usado
+        if not tarefa.cancelled():
+            tarefa.exception()
+
+
+class AntecipadorChamadas:
+    """
+    Executa chamadas cujo resultado provavelmente será pedido em breve.
+
+    No máximo limite_concorrencia chamadas especulativas rodam ao mesmo
+    tempo; as demais aguardam a vez sem ocupar o upstream. Quando o resultado
+    é de fato pedido (ver obter), a chamada antecipada é aproveitada se já
+    tiver começado; se ainda estiver aguardando a vez, é cancelada e a
+    chamada é feita na hora, sem herdar a espera da fila especulativa.
+    """
+
+    def __init__(self, limite_concorrencia: int = 1):
+        """
+        Inicializa o antecipador.
+
+        Args:
+            limite_concorrencia: Máximo de chamadas especulativas simultâneas
+        """
+        self.limite_concorrencia = max(1, limite_concorrencia)
+        self._semaforo = asyncio.Semaphore(self.limite_concorrencia)
+        self._metricas = {
+            "agendadas": 0,
+            "aproveitadas": 0,
+            "canceladas": 0,
+            "descartadas": 0,
+        }
+
+    def agendar(self, fabrica: Callable[[], Awaitable[Any]]) -> Antecipacao:
+        """
+        Agenda uma chamada especulativa.
+
+        Args:
+            fabrica: Função sem argumentos que cria a corrotina da chamada
+
+        Returns:
+            Antecipação agendada (passar a obter ou a cancelar)
+        """
+        self._metricas["agendadas"] += 1
+        return Antecipacao(self._semaforo, fabrica)
+
+    async def obter(self, antecipacao: Optional[Antecipacao], fabrica: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Obtém o resultado de uma chamada, aproveitando a antecipação quando possível.
+
+        Se a antecipação falhar, a chamada é repetida com fabrica.
+
+        Args:
+            antecipacao: Antecipação agendada para a mesma chamada, ou None
+            fabrica: Função que cria a corrotina da chamada feita na hora
+
+        Returns:
+            Resultado da chamada
+        """
+        if antecipacao is not None:
+            if antecipacao.iniciada:
+                try:
+                    resultado = await asyncio.shield(antecipacao.tarefa)
+                except asyncio.CancelledError:
+                    if not antecipacao.tarefa.cancelled():
+                        raise
+                except Exception:
+                    self._metricas["descartadas"] += 1
+                else:
+                    self._metricas["aproveitadas"] += 1
+                    return resultado
+            else:
+                self.cancelar(antecipacao)
+        return await fabrica()
+
+    def cancelar(self, antecipacao: Antecipacao) -> None:
+        """Cancela uma antecipação que ainda não terminou."""
+        if not antecipacao.tarefa.done():
+            self._metricas["canceladas"] += 1
+            antecipacao.tarefa.cancel()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores das chamadas especulativas.
+
+        Returns:
+            Dicionário com agendadas, aproveitadas, canceladas, descartadas
+            (falharam) e o limite de concorrência
+        """
+        return {**self._metricas, "limite_concorrencia": self.limite_concorrencia}
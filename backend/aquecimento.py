@@ -0,0 +1,160 @@
+"""
+Pré-carregamento do modelo do Ollama e manutenção dele aquecido em memória.
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+# Tempo de carga acima do qual a resposta é contada como partida a frio
+LIMIAR_CARGA_FRIA_MS = 500.0
+
+
+def interpretar_horario_ativo(horario: str) -> Optional[Tuple[int, int]]:
+    """
+    Interpreta o horário ativo no formato "HH-HH".
+
+    Args:
+        horario: Ex.: "07-23" (das 7h às 23h) ou "22-06" (atravessa a meia-noite);
+            vazio desativa os pings periódicos
+
+    Returns:
+        Tupla (hora inicial inclusiva, hora final exclusiva) ou None
+
+    Raises:
+        ValueError: Se o formato for inválido
+    """
+    if not horario.strip():
+        return None
+    inicio, fim = (int(parte) for parte in horario.split("-", 1))
+    if not (0 <= inicio <= 24 and 0 <= fim <= 24):
+        raise ValueError(f"Horário ativo inválido: '{horario}'")
+    return inicio, fim
+
+
+class AquecedorModelo:
+    """
+    Mantém o modelo do Ollama carregado para evitar partidas a frio.
+
+    Na inicialização do backend o modelo é pré-carregado (requisição a
+    /api/generate sem prompt); durante o horário ativo, pings periódicos
+    renovam o keep_alive para que o Ollama não descarregue o modelo. O tempo
+    de carga (load_duration) informado pelo Ollama em cada resposta é
+    registrado para que as partidas a frio fiquem visíveis nas métricas.
+    """
+
+    def __init__(
+        self,
+        url_ollama: str,
+        modelo: str,
+        keep_alive: str = "30m",
+        intervalo_segundos: float = 240.0,
+        horario_ativo: Optional[Tuple[int, int]] = None
+    ):
+        """
+        Inicializa o aquecedor.
+
+        Args:
+            url_ollama: URL base do Ollama
+            modelo: Modelo a manter carregado
+            keep_alive: Tempo que o Ollama mantém o modelo após cada requisição
+            intervalo_segundos: Intervalo entre os pings no horário ativo
+            horario_ativo: (hora inicial, hora final) dos pings; None desativa os pings
+        """
+        self.url_ollama = url_ollama
+        self.modelo = modelo
+        self.keep_alive = keep_alive
+        self.intervalo_segundos = intervalo_segundos
+        self.horario_ativo = horario_ativo
+
+        self._metricas = {
+            "aquecimentos": 0,
+            "falhas_aquecimento": 0,
+            "respostas_medidas": 0,
+            "cargas_frias": 0,
+        }
+        self._carga_ms_total = 0.0
+        self._carga_ms_maxima = 0.0
+        self.ultima_carga_ms: Optional[float] = None
+        self.ultimo_aquecimento: Optional[float] = None
+
+    def no_horario_ativo(self, agora: Optional[datetime] = None) -> bool:
+        """Indica se a hora atual está no horário ativo dos pings."""
+        if self.horario_ativo is None:
+            return False
+        hora = (agora or datetime.now()).hour
+        inicio, fim = self.horario_ativo
+        if inicio <= fim:
+            return inicio <= hora < fim
+        return hora >= inicio or hora < fim
+
+    def registrar_resposta(self, resposta: Dict[str, Any]) -> None:
+        """
+        Registra o tempo de carga do modelo informado em uma resposta do Ollama.
+
+        Args:
+            resposta: JSON da resposta (ou da última linha do streaming) do Ollama
+        """
+        load_duration = resposta.get("load_duration")
+        if not isinstance(load_duration, (int, float)):
+            return
+        carga_ms = load_duration / 1e6  # O Ollama informa nanossegundos
+        self.ultima_carga_ms = round(carga_ms, 1)
+        self._metricas["respostas_medidas"] += 1
+        self._carga_ms_total += carga_ms
+        self._carga_ms_maxima = max(self._carga_ms_maxima, carga_ms)
+        if carga_ms >= LIMIAR_CARGA_FRIA_MS:
+            self._metricas["cargas_frias"] += 1
+
+    async def aquecer(self) -> bool:
+        """
+        Carrega o modelo no Ollama (ou renova o keep_alive se já estiver carregado).
+
+        Returns:
+            True se o Ollama respondeu com sucesso
+        """
+        try:
+            async with httpx.AsyncClient(timeout=120.0) as client:
+                response = await client.post(
+                    f"{self.url_ollama}/api/generate",
+                    json={"model": self.modelo, "keep_alive": self.keep_alive}
+                )
+            if response.status_code != 200:
+                raise ValueError(f"HTTP {response.status_code}: {response.text}")
+            self.registrar_resposta(response.json())
+        except (httpx.HTTPError, ValueError) as e:
+            self._metricas["falhas_aquecimento"] += 1
+            print(f"⚠️ Falha ao aquecer o modelo {self.modelo}: {e}")
+            return False
+
+        self._metricas["aquecimentos"] += 1
+        self.ultimo_aquecimento = time.time()
+        return True
+
+    async def executar(self) -> None:
+        """Pré-carrega o modelo e mantém os pings no horário ativo (encerrado por cancelamento)."""
+        await self.aquecer()
+        while True:
+            await asyncio.sleep(self.intervalo_segundos)
+            if self.no_horario_ativo():
+                await self.aquecer()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Retorna as métricas de carga do modelo.
+
+        Returns:
+            Dicionário com aquecimentos, partidas a frio e tempos de carga
+        """
+        medidas = self._metricas["respostas_medidas"]
+        return {
+            "modelo": self.modelo,
+            "keep_alive": self.keep_alive,
+            **self._metricas,
+            "carga_ms_ultima": self.ultima_carga_ms,
+            "carga_ms_media": round(self._carga_ms_total / medidas, 1) if medidas else 0.0,
+            "carga_ms_maxima": round(self._carga_ms_maxima, 1),
+            "ultimo_aquecimento": self.ultimo_aquecimento,
+        }
@@ -0,0 +1,192 @@
+"""
+Correção aproximada dos exercícios de audição.
+
+Compara a transcrição do usuário com o texto original após normalizar
+maiúsculas, pontuação, trema e ß, e calcula a distância de edição por
+palavras e por caracteres. A nota (similaridade de caracteres) permite
+distinguir quase-acertos ("achtundsiebsich" × "achtundsiebzig") de erros.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from models import CorretoEnum
+from numeros_alemao import normalizar_texto
+
+# Nota mínima para uma transcrição inexata ser considerada parcialmente correta
+LIMIAR_PARCIAL = 0.8
+
+OPERACAO_IGUAL = "igual"
+OPERACAO_SUBSTITUICAO = "substituicao"
+OPERACAO_OMISSAO = "omissao"  # Palavra do original ausente na transcrição
+OPERACAO_INSERCAO = "insercao"  # Palavra da transcrição que não está no original
+
+_PALAVRA = re.compile(r"\w+(?:['’-]\w+)*")
+
+
+def tokenizar(texto: str) -> List[str]:
+    """Separa o texto em palavras, descartando a pontuação."""
+    return _PALAVRA.findall(unicodedata.normalize("NFC", texto))
+
+
+def distancia_edicao(a: Sequence, b: Sequence) -> int:
+    """
+    Distância de Levenshtein entre duas sequências (caracteres ou palavras).
+
+    O prefixo e o sufixo em comum são descartados antes da programação
+    dinâmica, que guarda apenas duas linhas da matriz.
+    """
+    if a == b:
+        return 0
+    inicio = 0
+    while inicio < len(a) and inicio < len(b) and a[inicio] == b[inicio]:
+        inicio += 1
+    fim = 0
+    while fim < len(a) - inicio and fim < len(b) - inicio and a[-1 - fim] == b[-1 - fim]:
+        fim += 1
+    a, b = a[inicio:len(a) - fim], b[inicio:len(b) - fim]
+    if len(a) < len(b):
+        a, b = b, a
+    if not b:
+        return len(a)
+
+    anterior = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        atual = [i]
+        for j, y in enumerate(b, 1):
+            atual.append(min(anterior[j] + 1, atual[j - 1] + 1, anterior[j - 1] + (x != y)))
+        anterior = atual
+    return anterior[-1]
+
+
+def similaridade(a: str, b: str) -> float:
+    """Similaridade entre 0 e 1 (1 - distância de edição / maior comprimento)."""
+    maior = max(len(a), len(b))
+    return 1.0 if maior == 0 else 1 - distancia_edicao(a, b) / maior
+
+
+def alinhar_palavras(esperado: List[str], obtido: List[str]) -> List[Tuple[str, Optional[int], Optional[int]]]:
+    """
+    Alinha duas listas de palavras pelo caminho de menor custo de edição.
+
+    Omissões e inserções custam 1; a substituição custa 1 - similaridade
+    entre as palavras, de modo que uma palavra escrita com um erro de
+    digitação é pareada com a palavra esperada em vez de virar inserção.
+
+    Returns:
+        Lista de (operação, índice em esperado, índice em obtido); o índice é
+        None na palavra ausente de omissões e inserções
+    """
+    linhas, colunas = len(esperado) + 1, len(obtido) + 1
+    custo = [[0.0] * colunas for _ in range(linhas)]
+    origem = [[""] * colunas for _ in range(linhas)]
+    for i in range(1, linhas):
+        custo[i][0], origem[i][0] = float(i), OPERACAO_OMISSAO
+    for j in range(1, colunas):
+        custo[0][j], origem[0][j] = float(j), OPERACAO_INSERCAO
+    for i in range(1, linhas):
+        for j in range(1, colunas):
+            if esperado[i - 1] == obtido[j - 1]:
+                opcoes = [(custo[i - 1][j - 1], OPERACAO_IGUAL)]
+            else:
+                opcoes = [(custo[i - 1][j - 1] + 1 - similaridade(esperado[i - 1], obtido[j - 1]), OPERACAO_SUBSTITUICAO)]
+            opcoes.append((custo[i - 1][j] + 1, OPERACAO_OMISSAO))
+            opcoes.append((custo[i][j - 1] + 1, OPERACAO_INSERCAO))
+            custo[i][j], origem[i][j] = min(opcoes, key=lambda opcao: opcao[0])
+
+    caminho = []
+    i, j = len(esperado), len(obtido)
+    while i or j:
+        operacao = origem[i][j]
+        if operacao == OPERACAO_OMISSAO:
+            caminho.append((operacao, i - 1, None))
+            i -= 1
+        elif operacao == OPERACAO_INSERCAO:
+            caminho.append((operacao, None, j - 1))
+            j -= 1
+        else:
+            caminho.append((operacao, i - 1, j - 1))
+            i, j = i - 1, j - 1
+    caminho.reverse()
+    return caminho
+
+
+@lru_cache(maxsize=4096)
+def _avaliar(texto_original: str, transcricao: str, limiar_parcial: float) -> Dict[str, Any]:
+    palavras_originais = tokenizar(texto_original)
+    palavras_transcritas = tokenizar(transcricao)
+    esperado = [normalizar_texto(p) for p in palavras_originais]
+    obtido = [normalizar_texto(p) for p in palavras_transcritas]
+
+    texto_esperado, texto_obtido = " ".join(esperado), " ".join(obtido)
+    distancia_caracteres = distancia_edicao(texto_esperado, texto_obtido)
+    maior = max(len(texto_esperado), len(texto_obtido))
+    nota = 1.0 if maior == 0 else 1 - distancia_caracteres / maior
+    distancia_palavras = distancia_edicao(esperado, obtido)
+
+    alinhamento = []
+    for operacao, i, j in alinhar_palavras(esperado, obtido):
+        par = {
+            "operacao": operacao,
+            "esperado": palavras_originais[i] if i is not None else None,
+            "obtido": palavras_transcritas[j] if j is not None else None,
+        }
+        if operacao == OPERACAO_SUBSTITUICAO:
+            par["similaridade"] = round(similaridade(esperado[i], obtido[j]), 3)
+        alinhamento.append(par)
+
+    if distancia_caracteres == 0:
+        classificacao = CorretoEnum.sim
+    elif nota >= limiar_parcial:
+        classificacao = CorretoEnum.parcial
+    else:
+        classificacao = CorretoEnum.nao
+
+    return {
+        "correto": distancia_caracteres == 0,
+        "classificacao": classificacao.value,
+        "nota": round(nota, 3),
+        "distancia_caracteres": distancia_caracteres,
+        "distancia_palavras": distancia_palavras,
+        "taxa_erro_palavras": round(distancia_palavras / max(len(esperado), 1), 3),
+        "alinhamento": alinhamento,
+    }
+
+
+def avaliar_transcricao(texto_original: str, transcricao: str, limiar_parcial: float = LIMIAR_PARCIAL) -> Dict[str, Any]:
+    """
+    Corrige a transcrição de um exercício de audição.
+
+    Resultados de pares já avaliados vêm de um cache em memória, o que torna
+    barata a reavaliação de sessões e do histórico com frases repetidas.
+
+    Args:
+        texto_original: Texto que foi reproduzido em áudio
+        transcricao: O que o usuário escreveu
+        limiar_parcial: Nota mínima para a classificação "Parcial"
+
+    Returns:
+        Dicionário com correto (igual após a normalização), classificacao
+        (Sim/Parcial/Não), nota (0 a 1, por caracteres), distâncias de edição,
+        taxa de erro por palavras e alinhamento palavra a palavra
+    """
+    resultado = _avaliar(texto_original, transcricao, limiar_parcial)
+    return {**resultado, "alinhamento": [dict(par) for par in resultado["alinhamento"]]}
+
+
+def avaliar_lote(
+    pares: Iterable[Tuple[str, str]],
+    limiar_parcial: float = LIMIAR_PARCIAL
+) -> List[Dict[str, Any]]:
+    """
+    Corrige vários exercícios de audição.
+
+    Args:
+        pares: Pares (texto original, transcrição)
+        limiar_parcial: Nota mínima para a classificação "Parcial"
+
+    Returns:
+        Resultados de avaliar_transcricao, na ordem dos pares
+    """
+    return [avaliar_transcricao(original, transcricao, limiar_parcial) for original, transcricao in pares]
@@ -0,0 +1,357 @@
+"""
+Cache endereçado por conteúdo com duas camadas (memória e disco) e descarte LRU.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from uuid import uuid4
+
+
+def gerar_chave(*partes: Any) -> str:
+    """
+    Gera uma chave estável (SHA-256) a partir das partes informadas.
+
+    Args:
+        partes: Valores serializáveis em JSON que identificam o conteúdo
+
+    Returns:
+        Hash hexadecimal que identifica o conteúdo
+    """
+    serializado = json.dumps(
+        partes, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(serializado.encode("utf-8")).hexdigest()
+
+
+class CacheLRU:
+    """
+    Cache de bytes com uma camada em memória e outra em disco.
+
+    Cada camada tem seu próprio orçamento em bytes; quando o orçamento é
+    excedido, as entradas usadas há mais tempo são descartadas. Uma entrada
+    descartada da memória continua disponível no disco enquanto couber no
+    orçamento do disco. Opcionalmente, as entradas expiram após um tempo
+    de vida (TTL) contado a partir do armazenamento.
+
+    A leitura e a gravação dos arquivos acontecem fora da trava (que protege
+    só os índices), de modo que obter e gravar_no_disco podem rodar em uma
+    thread (asyncio.to_thread) sem bloquear quem usa a camada em memória
+    (obter_da_memoria e armazenar com disco=False) no event loop.
+    """
+
+    def __init__(
+        self,
+        diretorio: Optional[str] = None,
+        limite_bytes_memoria: int = 64 * 1024 * 1024,
+        limite_bytes_disco: int = 512 * 1024 * 1024,
+        extensao: str = ".bin",
+        ttl_segundos: Optional[float] = None
+    ):
+        """
+        Inicializa o cache.
+
+        Args:
+            diretorio: Pasta da camada em disco (None ou vazio desativa o disco)
+            limite_bytes_memoria: Orçamento em bytes da camada em memória
+            limite_bytes_disco: Orçamento em bytes da camada em disco
+            extensao: Extensão dos arquivos de dados gravados no disco
+            ttl_segundos: Tempo de vida das entradas (None = sem expiração)
+        """
+        self.diretorio = Path(diretorio) if diretorio else None
+        self.limite_bytes_memoria = limite_bytes_memoria
+        self.limite_bytes_disco = limite_bytes_disco
+        self.extensao = extensao
+        self.ttl_segundos = ttl_segundos
+
+        self._lock = threading.RLock()
+        # chave -> (dados, metadados, instante do armazenamento)
+        self._memoria: "OrderedDict[str, Tuple[bytes, Dict[str, Any], float]]" = OrderedDict()
+        self._bytes_memoria = 0
+        self._disco: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes_disco = 0
+        self._metricas = {
+            "hits_memoria": 0,
+            "hits_disco": 0,
+            "misses": 0,
+            "expiradas": 0,
+            "escritas": 0,
+            "descartes_memoria": 0,
+            "descartes_disco": 0,
+        }
+
+        if self.diretorio is not None:
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+            self._indexar_disco()
+
+    # ---------- Caminhos e índice do disco ----------
+
+    def _caminho_dados(self, chave: str) -> Path:
+        return self.diretorio / f"{chave}{self.extensao}"
+
+    def _caminho_metadados(self, chave: str) -> Path:
+        return self.diretorio / f"{chave}.meta.json"
+
+    def _expirada(self, armazenado_em: float) -> bool:
+        return self.ttl_segundos is not None and time.time() - armazenado_em > self.ttl_segundos
+
+    def _indexar_disco(self) -> None:
+        """Reconstrói o índice LRU do disco a partir dos arquivos existentes."""
+        arquivos = []
+        for caminho in self.diretorio.glob(f"*{self.extensao}"):
+            try:
+                estado = caminho.stat()
+            except OSError:
+                continue
+            arquivos.append((estado.st_mtime, caminho.name[:-len(self.extensao)], estado.st_size))
+
+        for _, chave, tamanho in sorted(arquivos):
+            self._disco[chave] = tamanho
+            self._bytes_disco += tamanho
+
+        self._descartar_disco()
+
+    # ---------- API pública ----------
+
+    def obter(self, chave: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        """
+        Busca uma entrada no cache, primeiro na memória e depois no disco.
+
+        Args:
+            chave: Chave gerada por gerar_chave
+
+        Returns:
+            Tupla (dados, metadados) ou None se a entrada não existir
+        """
+        with self._lock:
+            entrada = self._memoria.get(chave)
+            if entrada is not None and self._expirada(entrada[2]):
+                self._metricas["expiradas"] += 1
+                self.remover(chave)
+                self._metricas["misses"] += 1
+                return None
+            if entrada is not None:
+                self._memoria.move_to_end(chave)
+                self._metricas["hits_memoria"] += 1
+                return entrada[0], entrada[1]
+
+        entrada = self._ler_disco(chave)
+        with self._lock:
+            if entrada is None:
+                self._metricas["misses"] += 1
+                return None
+
+            self._metricas["hits_disco"] += 1
+            self._guardar_memoria(chave, *entrada)
+            return entrada[0], entrada[1]
+
+    def obter_da_memoria(self, chave: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        """
+        Busca uma entrada só na camada em memória, sem acessar o disco.
+
+        Um acerto é contado em hits_memoria; uma ausência não é contada, pois
+        a busca deve continuar com obter (fora do event loop).
+
+        Args:
+            chave: Chave gerada por gerar_chave
+
+        Returns:
+            Tupla (dados, metadados) ou None se a entrada não estiver na memória
+        """
+        with self._lock:
+            entrada = self._memoria.get(chave)
+            if entrada is None or self._expirada(entrada[2]):
+                return None
+            self._memoria.move_to_end(chave)
+            self._metricas["hits_memoria"] += 1
+            return entrada[0], entrada[1]
+
+    def contem(self, chave: str) -> bool:
+        """Indica se a chave está no cache, sem alterar a ordem LRU nem as métricas."""
+        with self._lock:
+            if chave in self._memoria or chave in self._disco:
+                return True
+            return self.diretorio is not None and self._caminho_dados(chave).exists()
+
+    def armazenar(
+        self,
+        chave: str,
+        dados: bytes,
+        metadados: Optional[Dict[str, Any]] = None,
+        disco: bool = True
+    ) -> None:
+        """
+        Armazena uma entrada nas duas camadas do cache.
+
+        Args:
+            chave: Chave gerada por gerar_chave
+            dados: Conteúdo binário da entrada
+            metadados: Dicionário serializável em JSON associado à entrada
+            disco: False grava só na memória (o disco fica para gravar_no_disco)
+        """
+        metadados = metadados or {}
+        armazenado_em = time.time()
+        with self._lock:
+            self._metricas["escritas"] += 1
+            self._guardar_memoria(chave, dados, metadados, armazenado_em)
+        if disco:
+            self._gravar_disco(chave, dados, metadados, armazenado_em)
+
+    def gravar_no_disco(self, chave: str, dados: bytes, metadados: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Grava uma entrada só na camada em disco (complemento de armazenar com disco=False).
+
+        Args:
+            chave: Chave gerada por gerar_chave
+            dados: Conteúdo binário da entrada
+            metadados: Dicionário serializável em JSON associado à entrada
+        """
+        self._gravar_disco(chave, dados, metadados or {}, time.time())
+
+    def remover(self, chave: str) -> None:
+        """Remove uma entrada das duas camadas do cache."""
+        with self._lock:
+            entrada = self._memoria.pop(chave, None)
+            if entrada is not None:
+                self._bytes_memoria -= len(entrada[0])
+            self._remover_disco(chave)
+
+    def limpar(self) -> None:
+        """Remove todas as entradas do cache e zera as métricas."""
+        with self._lock:
+            for chave in list(self._disco):
+                self._remover_disco(chave)
+            self._memoria.clear()
+            self._bytes_memoria = 0
+            for nome in self._metricas:
+                self._metricas[nome] = 0
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Retorna as métricas de uso do cache.
+
+        Returns:
+            Dicionário com contadores, ocupação das camadas e taxa de acerto
+        """
+        with self._lock:
+            hits = self._metricas["hits_memoria"] + self._metricas["hits_disco"]
+            consultas = hits + self._metricas["misses"]
+            return {
+                **self._metricas,
+                "taxa_de_acerto": round(hits / consultas, 4) if consultas else 0.0,
+                "entradas_memoria": len(self._memoria),
+                "bytes_memoria": self._bytes_memoria,
+                "limite_bytes_memoria": self.limite_bytes_memoria,
+                "entradas_disco": len(self._disco),
+                "bytes_disco": self._bytes_disco,
+                "limite_bytes_disco": self.limite_bytes_disco,
+            }
+
+    # ---------- Camada em memória ----------
+
+    def _guardar_memoria(self, chave: str, dados: bytes, metadados: Dict[str, Any], armazenado_em: float) -> None:
+        if len(dados) > self.limite_bytes_memoria:
+            return
+
+        anterior = self._memoria.pop(chave, None)
+        if anterior is not None:
+            self._bytes_memoria -= len(anterior[0])
+
+        self._memoria[chave] = (dados, metadados, armazenado_em)
+        self._bytes_memoria += len(dados)
+
+        while self._bytes_memoria > self.limite_bytes_memoria:
+            _, (descartado, _, _) = self._memoria.popitem(last=False)
+            self._bytes_memoria -= len(descartado)
+            self._metricas["descartes_memoria"] += 1
+
+    # ---------- Camada em disco ----------
+
+    def _ler_disco(self, chave: str) -> Optional[Tuple[bytes, Dict[str, Any], float]]:
+        if self.diretorio is None:
+            return None
+
+        # Leitura fora da trava; só a atualização do índice a ocupa
+        caminho = self._caminho_dados(chave)
+        try:
+            dados = caminho.read_bytes()
+        except OSError:
+            # Arquivo descartado por outro processo
+            with self._lock:
+                if chave in self._disco:
+                    self._bytes_disco -= self._disco.pop(chave)
+            return None
+
+        try:
+            sidecar = json.loads(self._caminho_metadados(chave).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            sidecar = {}
+        metadados = sidecar.get("metadados", {})
+        armazenado_em = sidecar.get("armazenado_em", time.time())
+
+        with self._lock:
+            if self._expirada(armazenado_em):
+                self._metricas["expiradas"] += 1
+                self._remover_disco(chave)
+                return None
+
+            # Entradas gravadas por outro processo (ex.: pré-renderização) são adotadas no índice
+            if chave not in self._disco:
+                self._disco[chave] = len(dados)
+                self._bytes_disco += len(dados)
+            self._disco.move_to_end(chave)
+            self._descartar_disco()
+
+        try:
+            os.utime(caminho)
+        except OSError:
+            pass
+
+        return dados, metadados, armazenado_em
+
+    def _gravar_disco(self, chave: str, dados: bytes, metadados: Dict[str, Any], armazenado_em: float) -> None:
+        if self.diretorio is None or len(dados) > self.limite_bytes_disco:
+            return
+
+        # Gravação fora da trava; temporários únicos porque duas threads podem gravar a mesma chave
+        sufixo = f".{uuid4().hex}.tmp"
+        caminho = self._caminho_dados(chave)
+        temporario = caminho.with_name(caminho.name + sufixo)
+        temporario.write_bytes(dados)
+        os.replace(temporario, caminho)
+
+        caminho_meta = self._caminho_metadados(chave)
+        temporario_meta = caminho_meta.with_name(caminho_meta.name + sufixo)
+        temporario_meta.write_text(
+            json.dumps({"metadados": metadados, "armazenado_em": armazenado_em}, ensure_ascii=False),
+            encoding="utf-8"
+        )
+        os.replace(temporario_meta, caminho_meta)
+
+        with self._lock:
+            if chave in self._disco:
+                self._bytes_disco -= self._disco.pop(chave)
+            self._disco[chave] = len(dados)
+            self._bytes_disco += len(dados)
+            self._descartar_disco()
+
+    def _remover_disco(self, chave: str) -> None:
+        if self.diretorio is None:
+            return
+        if chave in self._disco:
+            self._bytes_disco -= self._disco.pop(chave)
+        for caminho in (self._caminho_dados(chave), self._caminho_metadados(chave)):
+            try:
+                caminho.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _descartar_disco(self) -> None:
+        while self._bytes_disco > self.limite_bytes_disco and self._disco:
+            chave = next(iter(self._disco))
+            self._remover_disco(chave)
+            self._metricas["descartes_disco"] += 1
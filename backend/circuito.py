@@ -0,0 +1,166 @@
+"""
+Disjuntor (circuit breaker) com sondas de saúde em segundo plano para os serviços upstream.
+"""
+import asyncio
+import math
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+ESTADO_FECHADO = "fechado"
+ESTADO_ABERTO = "aberto"
+ESTADO_MEIO_ABERTO = "meio_aberto"
+
+
+class CircuitoAberto(Exception):
+    """Chamada recusada sem contato com o serviço porque o disjuntor está aberto."""
+
+    def __init__(self, mensagem: str, retry_after: int):
+        super().__init__(mensagem)
+        self.status_code = 503
+        self.retry_after = retry_after
+
+
+class DisjuntorCircuito:
+    """
+    Disjuntor de um serviço upstream.
+
+    Após limite_falhas falhas consecutivas (conexão recusada, timeout ou
+    serviço indisponível) o disjuntor abre e as chamadas falham na hora, sem
+    tentar conectar. Uma sonda em segundo plano consulta a rota de saúde do
+    serviço a cada intervalo_sonda_segundos e fecha o disjuntor assim que o
+    serviço responde. Sem a sonda (ex.: fora do lifespan da aplicação), uma
+    única chamada de teste é liberada após tempo_reabertura_segundos
+    (estado meio-aberto).
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        url_saude: str,
+        limite_falhas: int = 3,
+        intervalo_sonda_segundos: float = 5.0,
+        tempo_reabertura_segundos: float = 15.0,
+        timeout_sonda_segundos: float = 2.0
+    ):
+        """
+        Inicializa o disjuntor fechado.
+
+        Args:
+            nome: Nome do serviço (usado nas mensagens de erro)
+            url_saude: URL consultada pela sonda de saúde
+            limite_falhas: Falhas consecutivas que abrem o disjuntor
+            intervalo_sonda_segundos: Intervalo entre as sondas em segundo plano
+            tempo_reabertura_segundos: Tempo aberto até liberar uma chamada de teste
+            timeout_sonda_segundos: Timeout de cada sonda
+        """
+        self.nome = nome
+        self.url_saude = url_saude
+        self.limite_falhas = max(1, limite_falhas)
+        self.intervalo_sonda_segundos = intervalo_sonda_segundos
+        self.tempo_reabertura_segundos = tempo_reabertura_segundos
+        self.timeout_sonda_segundos = timeout_sonda_segundos
+
+        self.estado = ESTADO_FECHADO
+        self.falhas_consecutivas = 0
+        self._aberto_em: Optional[float] = None
+        self._metricas = {"aberturas": 0, "recusadas": 0}
+        self.ultima_sonda: Optional[Dict[str, Any]] = None
+
+    # ---------- Chamadas ao serviço ----------
+
+    def verificar(self) -> None:
+        """
+        Autoriza uma chamada ao serviço.
+
+        Raises:
+            CircuitoAberto: Se o disjuntor estiver aberto
+        """
+        if self.estado == ESTADO_FECHADO:
+            return
+
+        agora = time.monotonic()
+        if agora - self._aberto_em >= self.tempo_reabertura_segundos:
+            # Libera uma chamada de teste; as demais seguem recusadas até o resultado dela
+            self.estado = ESTADO_MEIO_ABERTO
+            self._aberto_em = agora
+            return
+
+        self._metricas["recusadas"] += 1
+        raise CircuitoAberto(
+            f"Serviço {self.nome} indisponível (disjuntor aberto após "
+            f"{self.falhas_consecutivas} falhas consecutivas).",
+            retry_after=self._retry_after()
+        )
+
+    def registrar_sucesso(self) -> None:
+        """Registra uma resposta do serviço e fecha o disjuntor."""
+        self.estado = ESTADO_FECHADO
+        self.falhas_consecutivas = 0
+        self._aberto_em = None
+
+    def registrar_falha(self) -> None:
+        """Registra uma falha de comunicação e abre o disjuntor se atingir o limite."""
+        self.falhas_consecutivas += 1
+        if self.estado == ESTADO_MEIO_ABERTO or (
+            self.estado == ESTADO_FECHADO and self.falhas_consecutivas >= self.limite_falhas
+        ):
+            self.estado = ESTADO_ABERTO
+            self._aberto_em = time.monotonic()
+            self._metricas["aberturas"] += 1
+
+    def _retry_after(self) -> int:
+        return max(1, math.ceil(self.intervalo_sonda_segundos))
+
+    # ---------- Sonda de saúde ----------
+
+    async def sondar(self) -> bool:
+        """
+        Consulta a rota de saúde do serviço e atualiza o disjuntor.
+
+        Returns:
+            True se o serviço respondeu com sucesso
+        """
+        inicio = time.perf_counter()
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout_sonda_segundos) as client:
+                response = await client.get(self.url_saude)
+            saudavel = response.status_code == 200
+            detalhe = None if saudavel else f"HTTP {response.status_code}"
+        except httpx.HTTPError as e:
+            saudavel = False
+            detalhe = f"{type(e).__name__}: {e}"
+
+        self.ultima_sonda = {
+            "saudavel": saudavel,
+            "latencia_ms": round(1000 * (time.perf_counter() - inicio), 1),
+            "instante": time.time(),
+            "detalhe": detalhe,
+        }
+        if saudavel:
+            self.registrar_sucesso()
+        elif self.estado == ESTADO_FECHADO:
+            self.registrar_falha()
+        return saudavel
+
+    async def executar_sondas(self) -> None:
+        """Laço de sondas em segundo plano (encerrado por cancelamento)."""
+        while True:
+            await self.sondar()
+            await asyncio.sleep(self.intervalo_sonda_segundos)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Retorna o estado do disjuntor e o resultado da última sonda.
+
+        Returns:
+            Dicionário com estado, falhas consecutivas, contadores e última sonda
+        """
+        return {
+            "estado": self.estado,
+            "falhas_consecutivas": self.falhas_consecutivas,
+            "limite_falhas": self.limite_falhas,
+            **self._metricas,
+            "ultima_sonda": self.ultima_sonda,
+        }
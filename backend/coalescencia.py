@@ -0,0 +1,85 @@
+"""
+Coalescência de requisições idênticas em andamento (single-flight).
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class CoalescedorRequisicoes:
+    """
+    Compartilha uma única chamada ao upstream entre requisições idênticas.
+
+    Enquanto a chamada de uma chave está em andamento, novas requisições com
+    a mesma chave aguardam o mesmo resultado (ou a mesma exceção) em vez de
+    disparar outra chamada. A chamada roda em uma tarefa própria, de modo que
+    o cancelamento de quem a iniciou não afeta os demais interessados; quando
+    o último interessado desiste, a chamada é cancelada (inclusive a espera
+    por admissão), para não ocupar o upstream com um resultado que ninguém usa.
+    """
+
+    def __init__(self):
+        """Inicializa o coalescedor sem chamadas em andamento."""
+        self._em_andamento: Dict[str, asyncio.Task] = {}
+        self._interessados: Dict[asyncio.Task, int] = {}
+        self._metricas = {
+            "chamadas_upstream": 0,
+            "chamadas_economizadas": 0,
+            "chamadas_canceladas": 0,
+        }
+
+    async def executar(self, chave: str, fabrica: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Executa a chamada da chave ou aguarda a que já está em andamento.
+
+        Args:
+            chave: Identificador da requisição (mesma chave usada nos caches)
+            fabrica: Função sem argumentos que cria a corrotina da chamada
+
+        Returns:
+            Resultado da chamada compartilhada
+
+        Raises:
+            Exception: A mesma exceção levantada pela chamada compartilhada
+        """
+        tarefa = self._em_andamento.get(chave)
+        if tarefa is not None and not tarefa.done():
+            self._metricas["chamadas_economizadas"] += 1
+        else:
+            self._metricas["chamadas_upstream"] += 1
+            tarefa = asyncio.ensure_future(fabrica())
+            self._em_andamento[chave] = tarefa
+            tarefa.add_done_callback(lambda _: self._finalizar(chave, tarefa))
+
+        self._interessados[tarefa] = self._interessados.get(tarefa, 0) + 1
+        try:
+            return await asyncio.shield(tarefa)
+        finally:
+            restantes = self._interessados.get(tarefa, 0) - 1
+            if restantes > 0:
+                self._interessados[tarefa] = restantes
+            else:
+                self._interessados.pop(tarefa, None)
+                if not tarefa.done():
+                    # O último interessado desistiu (cancelado). A chave sai antes do
+                    # cancelamento: um novo pedido não pode aguardar a tarefa moribunda
+                    if self._em_andamento.get(chave) is tarefa:
+                        del self._em_andamento[chave]
+                    self._metricas["chamadas_canceladas"] += 1
+                    tarefa.cancel()
+
+    def _finalizar(self, chave: str, tarefa: asyncio.Task) -> None:
+        if self._em_andamento.get(chave) is tarefa:
+            del self._em_andamento[chave]
+        # Evita o aviso de exceção não recuperada quando ninguém mais aguarda
+        if not tarefa.cancelled():
+            tarefa.exception()
+
+    def estatisticas(self) -> Dict[str, int]:
+        """
+        Retorna os contadores de coalescência.
+
+        Returns:
+            Dicionário com chamadas feitas, economizadas, canceladas (sem
+            interessados) e em andamento
+        """
+        return {**self._metricas, "em_andamento": len(self._em_andamento)}
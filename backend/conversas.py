@@ -0,0 +1,156 @@
+"""
+Conversas com o LLM mantidas no servidor, com o contexto do Ollama reaproveitado entre turnos.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+
+class Conversa:
+    """
+    Estado de uma conversa com o Ollama.
+
+    O contexto é o vetor de tokens devolvido pelo Ollama em /api/generate;
+    reenviado no turno seguinte, dispensa o reenvio (e o reprocessamento)
+    de todo o histórico: só o novo turno é enviado.
+    """
+
+    def __init__(self, modelo: str, sistema: Optional[str] = None, opcoes: Optional[Dict[str, Any]] = None):
+        self.conversa_id = uuid4().hex
+        self.modelo = modelo
+        self.sistema = sistema
+        self.opcoes = opcoes
+        self.contexto: List[int] = []
+        self.turnos = 0
+        self.usada_em = time.monotonic()
+        # Turnos da mesma conversa são sequenciais: cada um depende do contexto do anterior
+        self.trava = asyncio.Lock()
+
+
+class GerenciadorConversas:
+    """
+    Conversas ativas, com expiração por inatividade e descarte LRU.
+
+    A memória é limitada pelo número de conversas e pelo total de tokens de
+    contexto guardados; ao exceder um dos limites, as conversas usadas há
+    mais tempo são descartadas. Uma conversa descartada ou expirada deixa de
+    ser encontrada, e o cliente deve iniciar outra.
+    """
+
+    def __init__(self, limite_conversas: int = 100, limite_tokens: int = 500_000, ttl_segundos: float = 1800):
+        """
+        Inicializa o gerenciador.
+
+        Args:
+            limite_conversas: Máximo de conversas ativas
+            limite_tokens: Máximo de tokens de contexto somadas todas as conversas
+            ttl_segundos: Tempo sem uso após o qual a conversa expira
+        """
+        self.limite_conversas = max(1, limite_conversas)
+        self.limite_tokens = limite_tokens
+        self.ttl_segundos = ttl_segundos
+        self._conversas: "OrderedDict[str, Conversa]" = OrderedDict()
+        self._tokens = 0
+        self._metricas = {
+            "criadas": 0,
+            "turnos": 0,
+            "tokens_reaproveitados": 0,
+            "expiradas": 0,
+            "descartadas": 0,
+        }
+
+    def criar(self, modelo: str, sistema: Optional[str] = None, opcoes: Optional[Dict[str, Any]] = None) -> Conversa:
+        """
+        Inicia uma conversa.
+
+        Args:
+            modelo: Modelo do Ollama usado em todos os turnos
+            sistema: Mensagem de sistema (enviada só no primeiro turno)
+            opcoes: Opções de geração padrão dos turnos
+
+        Returns:
+            Conversa criada
+        """
+        self._expirar()
+        conversa = Conversa(modelo, sistema, opcoes)
+        self._conversas[conversa.conversa_id] = conversa
+        self._metricas["criadas"] += 1
+        self._descartar_excedentes()
+        return conversa
+
+    def obter(self, conversa_id: str) -> Optional[Conversa]:
+        """
+        Obtém uma conversa ativa e renova o seu prazo de expiração.
+
+        Returns:
+            Conversa, ou None se não existir, tiver expirado ou sido descartada
+        """
+        self._expirar()
+        conversa = self._conversas.get(conversa_id)
+        if conversa is not None:
+            conversa.usada_em = time.monotonic()
+            self._conversas.move_to_end(conversa_id)
+        return conversa
+
+    def registrar_turno(self, conversa: Conversa, contexto: Optional[List[int]]) -> None:
+        """
+        Guarda o contexto devolvido pelo Ollama ao final de um turno.
+
+        Args:
+            conversa: Conversa do turno
+            contexto: Campo "context" da resposta (None mantém o anterior)
+        """
+        self._metricas["turnos"] += 1
+        self._metricas["tokens_reaproveitados"] += len(conversa.contexto)
+        conversa.turnos += 1
+        conversa.usada_em = time.monotonic()
+        if contexto is None:
+            return
+        if conversa.conversa_id in self._conversas:
+            self._tokens += len(contexto) - len(conversa.contexto)
+            self._conversas.move_to_end(conversa.conversa_id)
+        conversa.contexto = list(contexto)
+        self._descartar_excedentes()
+
+    def _remover(self, conversa_id: str) -> None:
+        conversa = self._conversas.pop(conversa_id)
+        self._tokens -= len(conversa.contexto)
+
+    def _expirar(self) -> None:
+        # As conversas estão em ordem de uso: basta percorrer as mais antigas
+        limite = time.monotonic() - self.ttl_segundos
+        while self._conversas:
+            conversa_id, conversa = next(iter(self._conversas.items()))
+            if conversa.usada_em > limite:
+                break
+            self._remover(conversa_id)
+            self._metricas["expiradas"] += 1
+
+    def _descartar_excedentes(self) -> None:
+        # A conversa usada por último nunca é descartada, mesmo que sozinha exceda limite_tokens
+        while len(self._conversas) > 1 and (
+            len(self._conversas) > self.limite_conversas or self._tokens > self.limite_tokens
+        ):
+            self._remover(next(iter(self._conversas)))
+            self._metricas["descartadas"] += 1
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Retorna as métricas das conversas.
+
+        Returns:
+            Dicionário com conversas ativas, tokens de contexto guardados,
+            contadores (criadas, turnos, tokens reaproveitados, expiradas,
+            descartadas) e os limites configurados
+        """
+        self._expirar()
+        return {
+            "ativas": len(self._conversas),
+            "tokens_contexto": self._tokens,
+            **self._metricas,
+            "limite_conversas": self.limite_conversas,
+            "limite_tokens": self.limite_tokens,
+            "ttl_segundos": self.ttl_segundos,
+        }
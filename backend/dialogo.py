@@ -0,0 +1,121 @@
+"""
+Estado de uma sessão da prática de diálogo conduzida pelo servidor (ver /ws/dialogo).
+"""
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+from models import BaseFrasesDialogo, CorretoEnum
+
+ETAPA_SAUDACAO = "saudacao"
+ETAPA_INTERMEDIARIA = "intermediaria"
+ETAPA_DESPEDIDA = "despedida"
+
+# Dados que o LLM deve extrair das respostas do usuário
+CAMPOS_INTERLOCUTOR = ("nome", "idade", "altura", "peso")
+
+NOMES_IDIOMAS = {"alemao": "Alemão", "ingles": "Inglês"}
+
+
+class SessaoDialogo:
+    """
+    Roteiro e respostas de um diálogo.
+
+    O roteiro segue a ordem de BaseFrasesDialogo: a saudação, as frases
+    intermediárias (em ordem aleatória, como no cliente) e a despedida. Cada
+    resposta gravada avança o roteiro imediatamente; a transcrição da
+    resposta é registrada depois, quando o STT terminar, o que permite
+    sintetizar e enviar a próxima frase enquanto a anterior é transcrita.
+    """
+
+    def __init__(self, frases: BaseFrasesDialogo, idioma: str, embaralhar: bool = True):
+        """
+        Inicializa a sessão.
+
+        Args:
+            frases: Frases do diálogo
+            idioma: Idioma praticado (valor de IdiomaEnum)
+            embaralhar: Se False, mantém as intermediárias na ordem do arquivo
+        """
+        self.idioma = idioma
+        intermediarias = list(frases.intermediarias)
+        if embaralhar:
+            random.shuffle(intermediarias)
+        self.roteiro: List[Tuple[str, str]] = [
+            (ETAPA_SAUDACAO, frases.saudacao),
+            *((ETAPA_INTERMEDIARIA, frase) for frase in intermediarias),
+            (ETAPA_DESPEDIDA, frases.despedida),
+        ]
+        self.indice = 0
+        self.transcricoes: Dict[int, str] = {}
+        self.interlocutor: Optional[Dict[str, Any]] = None
+
+    @property
+    def indice_despedida(self) -> int:
+        """Índice da despedida, a última frase do roteiro."""
+        return len(self.roteiro) - 1
+
+    @property
+    def concluida(self) -> bool:
+        """Indica se todas as frases do roteiro já foram respondidas."""
+        return self.indice >= len(self.roteiro)
+
+    def frase(self, indice: int) -> Optional[Tuple[str, str]]:
+        """Retorna (etapa, texto) da frase do roteiro, ou None fora do roteiro."""
+        return self.roteiro[indice] if 0 <= indice < len(self.roteiro) else None
+
+    def avancar(self) -> int:
+        """
+        Registra que a frase atual foi respondida.
+
+        Returns:
+            Índice da frase respondida
+
+        Raises:
+            ValueError: Se o diálogo já estiver concluído
+        """
+        if self.concluida:
+            raise ValueError("O diálogo já foi concluído")
+        self.indice += 1
+        return self.indice - 1
+
+    def registrar_transcricao(self, indice: int, texto: str) -> None:
+        """Registra a transcrição da resposta à frase de índice informado."""
+        self.transcricoes[indice] = texto
+
+    def respostas_transcritas(self) -> bool:
+        """Indica se as respostas a todas as frases anteriores à despedida já foram transcritas."""
+        return all(indice in self.transcricoes for indice in range(self.indice_despedida))
+
+    def texto_dialogo(self, ate: Optional[int] = None) -> str:
+        """
+        Monta o diálogo no formato "App: ... / Usuário: ...", uma fala por linha.
+
+        Args:
+            ate: Índice da primeira frase excluída; None inclui todas as já respondidas
+        """
+        limite = self.indice if ate is None else min(ate, self.indice)
+        linhas = []
+        for indice, (_, texto) in enumerate(self.roteiro[:limite]):
+            linhas.append(f"App: {texto}")
+            linhas.append(f"Usuário: {self.transcricoes.get(indice) or '[sem transcrição]'}")
+        return "\n".join(linhas)
+
+    def avaliar(self, dados: Optional[Dict[str, Any]]) -> CorretoEnum:
+        """
+        Avalia o diálogo pelos dados do interlocutor extraídos pelo LLM.
+
+        Args:
+            dados: JSON extraído das respostas (campos de CAMPOS_INTERLOCUTOR)
+
+        Returns:
+            Sim se todos os campos foram preenchidos, Parcial se algum foi e
+            Não se nenhum foi
+        """
+        self.interlocutor = dados
+        preenchidos = sum(
+            1 for campo in CAMPOS_INTERLOCUTOR
+            if str((dados or {}).get(campo) or "").strip()
+        )
+        if preenchidos == len(CAMPOS_INTERLOCUTOR):
+            return CorretoEnum.sim
+        return CorretoEnum.parcial if preenchidos else CorretoEnum.nao
@@ -0,0 +1,206 @@
+"""
+Esquemas JSON das respostas estruturadas e validadores pré-compilados.
+
+Suporta o subconjunto de JSON Schema usado pela base de prompts: type (ou
+lista de tipos), properties, required, additionalProperties (booleano),
+items, enum, minimum/maximum, minLength/maxLength e minItems/maxItems.
+A forma abreviada {"campo": "tipo"} também é aceita e convertida para um
+objeto com todos os campos obrigatórios.
+"""
+from typing import Any, Callable, Dict, List, Optional
+
+# Validador compilado: recebe o valor e o caminho, devolve a lista de erros
+Validador = Callable[[Any, str], List[str]]
+
+TIPOS_ESQUEMA = {
+    "string": lambda v: isinstance(v, str),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "null": lambda v: v is None,
+}
+
+
+class ErroEsquema(ValueError):
+    """Esquema de resposta inválido ou fora do subconjunto suportado."""
+    pass
+
+
+def normalizar_esquema(estrutura: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Converte estrutura_esperada em JSON Schema.
+
+    Args:
+        estrutura: JSON Schema (com "type") ou forma abreviada {"campo": "tipo"}
+
+    Returns:
+        JSON Schema equivalente
+
+    Raises:
+        ErroEsquema: Se a forma abreviada usar um tipo desconhecido
+    """
+    if "type" in estrutura or "properties" in estrutura:
+        return estrutura
+
+    propriedades = {}
+    for campo, tipo in estrutura.items():
+        if isinstance(tipo, dict):
+            propriedades[campo] = normalizar_esquema(tipo)
+        elif tipo in TIPOS_ESQUEMA:
+            propriedades[campo] = {"type": tipo}
+        else:
+            raise ErroEsquema(f"Tipo desconhecido para o campo '{campo}': {tipo!r}")
+    return {"type": "object", "properties": propriedades, "required": list(estrutura)}
+
+
+def compilar_validador(esquema: Dict[str, Any]) -> Validador:
+    """
+    Compila um JSON Schema em uma função de validação.
+
+    O esquema é percorrido uma única vez; a validação de cada resposta só
+    executa as verificações já montadas, sem reinterpretar o esquema.
+
+    Args:
+        esquema: JSON Schema (ver subconjunto suportado no módulo)
+
+    Returns:
+        Função (valor, caminho) -> lista de mensagens de erro (vazia se válido)
+
+    Raises:
+        ErroEsquema: Se o esquema usar um tipo desconhecido
+    """
+    verificacoes: List[Validador] = []
+
+    tipos = esquema.get("type")
+    if tipos is not None:
+        tipos = [tipos] if isinstance(tipos, str) else list(tipos)
+        desconhecidos = [t for t in tipos if t not in TIPOS_ESQUEMA]
+        if desconhecidos:
+            raise ErroEsquema(f"Tipo(s) desconhecido(s) no esquema: {', '.join(map(str, desconhecidos))}")
+        testes = [TIPOS_ESQUEMA[t] for t in tipos]
+
+        def verificar_tipo(valor, caminho, descricao=" ou ".join(tipos)):
+            if any(teste(valor) for teste in testes):
+                return []
+            return [f"{caminho}: esperado {descricao}, recebido {type(valor).__name__}"]
+        verificacoes.append(verificar_tipo)
+
+    if "enum" in esquema:
+        permitidos = list(esquema["enum"])
+
+        def verificar_enum(valor, caminho):
+            return [] if valor in permitidos else [f"{caminho}: valor {valor!r} fora de {permitidos}"]
+        verificacoes.append(verificar_enum)
+
+    for chave, comparar, descricao in (
+        ("minimum", lambda v, limite: v >= limite, "menor que"),
+        ("maximum", lambda v, limite: v <= limite, "maior que"),
+    ):
+        if chave in esquema:
+            def verificar_limite(valor, caminho, limite=esquema[chave], comparar=comparar, descricao=descricao):
+                if TIPOS_ESQUEMA["number"](valor) and not comparar(valor, limite):
+                    return [f"{caminho}: {valor} {descricao} {limite}"]
+                return []
+            verificacoes.append(verificar_limite)
+
+    for chave, tipo, comparar, descricao in (
+        ("minLength", str, lambda n, limite: n >= limite, "menos de"),
+        ("maxLength", str, lambda n, limite: n <= limite, "mais de"),
+        ("minItems", list, lambda n, limite: n >= limite, "menos de"),
+        ("maxItems", list, lambda n, limite: n <= limite, "mais de"),
+    ):
+        if chave in esquema:
+            def verificar_tamanho(valor, caminho, limite=esquema[chave], tipo=tipo, comparar=comparar, descricao=descricao):
+                if isinstance(valor, tipo) and not comparar(len(valor), limite):
+                    return [f"{caminho}: tamanho {len(valor)}, {descricao} {limite}"]
+                return []
+            verificacoes.append(verificar_tamanho)
+
+    propriedades = {
+        nome: compilar_validador(subesquema)
+        for nome, subesquema in (esquema.get("properties") or {}).items()
+    }
+    obrigatorios = list(esquema.get("required") or [])
+    extras_proibidos = esquema.get("additionalProperties") is False
+    if propriedades or obrigatorios or extras_proibidos:
+        def verificar_objeto(valor, caminho):
+            if not isinstance(valor, dict):
+                return []
+            erros = [f"{caminho}.{nome}: campo obrigatório ausente" for nome in obrigatorios if nome not in valor]
+            for nome, validar in propriedades.items():
+                if nome in valor:
+                    erros.extend(validar(valor[nome], f"{caminho}.{nome}"))
+            if extras_proibidos:
+                erros.extend(f"{caminho}.{nome}: campo não permitido" for nome in valor if nome not in propriedades)
+            return erros
+        verificacoes.append(verificar_objeto)
+
+    if isinstance(esquema.get("items"), dict):
+        validar_item = compilar_validador(esquema["items"])
+
+        def verificar_itens(valor, caminho):
+            if not isinstance(valor, list):
+                return []
+            erros = []
+            for indice, item in enumerate(valor):
+                erros.extend(validar_item(item, f"{caminho}[{indice}]"))
+            return erros
+        verificacoes.append(verificar_itens)
+
+    def validar(valor: Any, caminho: str = "$") -> List[str]:
+        erros = []
+        for verificacao in verificacoes:
+            erros.extend(verificacao(valor, caminho))
+        return erros
+
+    return validar
+
+
+class DetectorFimJSON:
+    """
+    Detecta o fim do primeiro objeto (ou lista) JSON em um texto recebido aos pedaços.
+
+    Acompanha apenas a profundidade de chaves e colchetes fora de strings;
+    o que vem antes da abertura (espaços, cercas de Markdown) é ignorado.
+    Serve para encerrar o streaming de uma resposta estruturada assim que o
+    JSON fecha, sem esperar o modelo parar sozinho.
+    """
+
+    def __init__(self):
+        self.fim: Optional[int] = None  # Posição logo após o JSON no texto acumulado
+        self._lidos = 0
+        self._profundidade = 0
+        self._em_string = False
+        self._escape = False
+
+    def alimentar(self, trecho: str) -> Optional[int]:
+        """
+        Processa o próximo pedaço do texto.
+
+        Returns:
+            Posição, no texto acumulado, logo após o fechamento do JSON, ou
+            None se ele ainda não fechou
+        """
+        if self.fim is not None:
+            return self.fim
+        for indice, caractere in enumerate(trecho):
+            if self._em_string:
+                if self._escape:
+                    self._escape = False
+                elif caractere == "\\":
+                    self._escape = True
+                elif caractere == '"':
+                    self._em_string = False
+            elif caractere == '"' and self._profundidade:
+                self._em_string = True
+            elif caractere in "{[":
+                self._profundidade += 1
+            elif caractere in "}]" and self._profundidade:
+                self._profundidade -= 1
+                if not self._profundidade:
+                    self.fim = self._lidos + indice + 1
+                    return self.fim
+        self._lidos += len(trecho)
+        return None
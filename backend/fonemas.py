@@ -0,0 +1,338 @@
+"""
+Avaliação local da pronúncia por comparação de fonemas.
+
+A transcrição do Whisper é convertida em uma sequência aproximada de
+fonemas por regras de grafema → fonema do alemão e alinhada com a
+transcricao_ipa do registro da base de conhecimento. A comparação usa
+classes de fonemas (sem duração e sem distinção entre vogais tensas e
+frouxas), que é a resolução que uma transcrição em texto permite.
+"""
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+from avaliacao_audicao import OPERACAO_IGUAL, alinhar_palavras, avaliar_transcricao, distancia_edicao, tokenizar
+from models import ConhecimentoIdioma, CorretoEnum, IdiomaEnum
+from numeros_alemao import normalizar_texto
+
+# Nota mínima (1 - distância / fonemas esperados) para a classificação "Parcial"
+LIMIAR_PARCIAL = 0.75
+
+VOGAIS = set("aeiouyäöü")
+
+# ---------- IPA → fonemas ----------
+
+SILABICO = "̩"  # n̩: consoante silábica (equivale a ə + consoante)
+NAO_SILABICO = "̯"  # ɐ̯: semivogal
+IGNORADOS_IPA = set("ˈˌ'.‿-ʔ\u0361")  # Acentos, sílabas, oclusiva glotal e barra de ligação (t͡s)
+
+# Unidades com mais de um símbolo, das mais longas para as mais curtas
+UNIDADES_IPA = ("tʃ", "dʒ", "ts", "pf", "aɪ", "aʊ", "ɔʏ", "ɔɪ", "ai", "au")
+
+# Classes de comparação (duração é removida antes)
+CLASSES = {
+    "ɪ": "i", "ʏ": "y", "ʊ": "u", "ɛ": "e", "ə": "e", "ɔ": "o", "œ": "ø", "ɑ": "a",
+    "ʁ": "r", "ʀ": "r", "ɾ": "r", "ɡ": "g",
+    "ɔɪ": "ɔʏ", "ai": "aɪ", "au": "aʊ",
+}
+
+
+def ipa_para_fonemas(ipa: str) -> List[str]:
+    """
+    Separa uma transcrição IPA em fonemas.
+
+    Acentos e separadores de sílaba são descartados; africadas e ditongos
+    formam um único fonema; consoantes silábicas viram ə + consoante e o ɐ
+    vocálico vira ə + r (como em "Meter" → m eː t ə ʁ).
+
+    Args:
+        ipa: Transcrição IPA (ex.: "ˌɡuːtən ˈtaːk")
+
+    Returns:
+        Lista de fonemas (ex.: ["ɡ", "uː", "t", "ə", "n", "t", "aː", "k"])
+    """
+    texto = unicodedata.normalize("NFC", ipa)
+    texto = "".join(c for c in texto if c not in IGNORADOS_IPA and not c.isspace())
+
+    fonemas: List[str] = []
+    i = 0
+    while i < len(texto):
+        unidade = next((u for u in UNIDADES_IPA if texto.startswith(u, i)), texto[i])
+        i += len(unidade)
+        sufixos = ""
+        while i < len(texto) and texto[i] in ("ː", SILABICO, NAO_SILABICO):
+            sufixos += texto[i]
+            i += 1
+
+        if SILABICO in sufixos:
+            fonemas.extend(["ə", unidade])
+        elif unidade == "ɐ":
+            fonemas.extend(["ʁ"] if NAO_SILABICO in sufixos else ["ə", "ʁ"])
+        else:
+            fonemas.append(unidade + ("ː" if "ː" in sufixos else ""))
+    return fonemas
+
+
+# ---------- Texto alemão → fonemas ----------
+
+def _palavra_para_fonemas(palavra: str) -> List[str]:
+    """Regras de grafema → fonema para uma palavra em minúsculas."""
+    fonemas: List[str] = []
+    n = len(palavra)
+    i = 0
+
+    def letra(k: int) -> str:
+        return palavra[k] if 0 <= k < n else ""
+
+    while i < n:
+        resto = palavra[i:]
+        anterior = letra(i - 1)
+
+        # Finais de palavra átonos
+        if resto == "er" and i > 0:
+            fonemas.extend(["ə", "ʁ"])
+            break
+        if resto in ("en", "el", "e") and i > 0:
+            fonemas.extend(["ə"] + ([resto[1]] if len(resto) > 1 else []))
+            break
+        if resto == "ig" and i > 0:
+            fonemas.extend(["ɪ", "ç"])
+            break
+
+        if i == 0 and resto[:2] in ("sp", "st"):
+            fonemas.extend(["ʃ", resto[1]])
+            i += 2
+            continue
+
+        for grafema, producao in (
+            ("tsch", ["tʃ"]), ("sch", ["ʃ"]), ("chs", ["k", "s"]), ("ck", ["k"]), ("ph", ["f"]),
+            ("pf", ["pf"]), ("qu", ["k", "v"]), ("th", ["t"]), ("dt", ["t"]), ("tz", ["ts"]),
+            ("ng", ["ŋ"]), ("nk", ["ŋ", "k"]), ("ie", ["iː"]), ("ei", ["aɪ"]), ("ai", ["aɪ"]),
+            ("ey", ["aɪ"]), ("ay", ["aɪ"]), ("eu", ["ɔʏ"]), ("äu", ["ɔʏ"]), ("au", ["aʊ"]),
+            ("aa", ["aː"]), ("ee", ["eː"]), ("oo", ["oː"]), ("ss", ["s"]),
+        ):
+            if resto.startswith(grafema):
+                fonemas.extend(producao)
+                i += len(grafema)
+                break
+        else:
+            atual, seguinte = letra(i), letra(i + 1)
+
+            if atual == "c" and seguinte == "h":
+                fonemas.append("x" if anterior in ("a", "o", "u") else "ç")
+                i += 2
+                continue
+            if atual in VOGAIS and seguinte == "h" and letra(i + 2) not in VOGAIS:
+                fonemas.append(_vogal(atual) + "ː")  # h como marca de duração
+                i += 2
+                continue
+
+            if atual == seguinte and atual not in VOGAIS:
+                i += 1  # Consoante dobrada: um só fonema
+                continue
+
+            if atual in VOGAIS:
+                fonemas.append(_vogal(atual))
+            elif atual in ("b", "d", "g"):
+                # Ensurdecimento final (antes de consoante ou no fim da palavra)
+                surda = seguinte == "" or (seguinte not in VOGAIS and seguinte not in "lrnj")
+                fonemas.append({"b": "p", "d": "t", "g": "k"}[atual] if surda else {"g": "ɡ"}.get(atual, atual))
+            elif atual == "s":
+                fonemas.append("z" if seguinte in VOGAIS else "s")
+            elif atual == "ß":
+                fonemas.append("s")
+            elif atual == "z":
+                fonemas.append("ts")
+            elif atual == "c":
+                fonemas.append("ts" if seguinte in ("e", "i", "ä") else "k")
+            elif atual == "v":
+                fonemas.append("f")
+            elif atual == "w":
+                fonemas.append("v")
+            elif atual == "x":
+                fonemas.extend(["k", "s"])
+            elif atual == "r":
+                fonemas.append("ʁ")
+            elif atual == "h":
+                if seguinte in VOGAIS:
+                    fonemas.append("h")
+            elif atual.isalpha():
+                fonemas.append(atual)
+            i += 1
+    return fonemas
+
+
+def _vogal(letra: str) -> str:
+    return {"ä": "ɛ", "ö": "ø", "ü": "y", "y": "y"}.get(letra, letra)
+
+
+def texto_para_fonemas(texto: str) -> List[str]:
+    """
+    Converte um texto em alemão em uma sequência aproximada de fonemas.
+
+    Aplica regras de grafema → fonema (sch, ch, ei, eu, ie, ensurdecimento
+    final, -er/-en/-e átonos, s sonoro antes de vogal etc.). O resultado é
+    uma aproximação adequada para comparação por classes de fonemas, não
+    uma transcrição fonética exata.
+
+    Args:
+        texto: Texto em alemão (ex.: transcrição do Whisper)
+
+    Returns:
+        Lista de fonemas
+    """
+    fonemas: List[str] = []
+    for palavra in tokenizar(texto):
+        fonemas.extend(_palavra_para_fonemas(unicodedata.normalize("NFC", palavra).lower()))
+    return fonemas
+
+
+def classe_fonema(fonema: str) -> str:
+    """Classe de comparação do fonema (sem duração; tensas e frouxas juntas)."""
+    base = fonema.replace("ː", "")
+    return CLASSES.get(base, base)
+
+
+# ---------- Avaliação ----------
+
+class AvaliadorPronuncia:
+    """
+    Avalia a pronúncia comparando a transcrição do STT com a transcricao_ipa.
+
+    As sequências de fonemas de referência são pré-calculadas por registro
+    da base de conhecimento (conhecimento_id) e mantidas em cache enquanto
+    texto_original e transcricao_ipa não mudarem.
+    """
+
+    def __init__(self, limiar_parcial: float = LIMIAR_PARCIAL):
+        """
+        Inicializa o avaliador.
+
+        Args:
+            limiar_parcial: Nota mínima para a classificação "Parcial"
+        """
+        self.limiar_parcial = limiar_parcial
+        self._referencias: Dict[str, Tuple[Tuple[str, Optional[str]], List[str], str]] = {}
+        self._metricas = {"acertos_cache": 0, "falhas_cache": 0, "avaliacoes": 0}
+
+    def fonemas_referencia(self, conhecimento: ConhecimentoIdioma) -> Tuple[List[str], str]:
+        """
+        Retorna os fonemas de referência de um registro (do cache, se possível).
+
+        Args:
+            conhecimento: Registro da base de conhecimento
+
+        Returns:
+            Tupla (fonemas, origem): origem é "ipa" quando há transcricao_ipa e
+            "texto" quando os fonemas vêm das regras aplicadas a texto_original
+        """
+        chave = str(conhecimento.conhecimento_id)
+        assinatura = (conhecimento.texto_original, conhecimento.transcricao_ipa)
+        em_cache = self._referencias.get(chave)
+        if em_cache is not None and em_cache[0] == assinatura:
+            self._metricas["acertos_cache"] += 1
+            return em_cache[1], em_cache[2]
+
+        self._metricas["falhas_cache"] += 1
+        if conhecimento.transcricao_ipa:
+            fonemas, origem = ipa_para_fonemas(conhecimento.transcricao_ipa), "ipa"
+        else:
+            fonemas, origem = texto_para_fonemas(conhecimento.texto_original), "texto"
+        self._referencias[chave] = (assinatura, fonemas, origem)
+        return fonemas, origem
+
+    def avaliar(self, conhecimento: ConhecimentoIdioma, transcricao: str) -> Dict[str, Any]:
+        """
+        Avalia a pronúncia de um registro a partir da transcrição do STT.
+
+        Se a transcrição coincide com texto_original (após normalizar
+        maiúsculas, pontuação, trema e ß), a pronúncia é considerada correta
+        sem comparar fonemas. Registros que não são em alemão são comparados
+        por texto (ver avaliacao_audicao).
+
+        Args:
+            conhecimento: Registro praticado
+            transcricao: Texto reconhecido pelo STT
+
+        Returns:
+            Dicionário com correto (Sim/Parcial/Não), nota, comentario,
+            fonemas esperados e reconhecidos e divergências
+        """
+        self._metricas["avaliacoes"] += 1
+        texto_original = conhecimento.texto_original
+
+        if conhecimento.idioma != IdiomaEnum.alemao:
+            avaliacao = avaliar_transcricao(texto_original, transcricao, self.limiar_parcial)
+            return {
+                "correto": avaliacao["classificacao"],
+                "nota": avaliacao["nota"],
+                "comentario": self._comentario(avaliacao["classificacao"], texto_original, transcricao, []),
+                "referencia": "texto",
+                "fonemas_esperados": [],
+                "fonemas_reconhecidos": [],
+                "divergencias": [],
+            }
+
+        esperados, origem = self.fonemas_referencia(conhecimento)
+        reconhecidos = texto_para_fonemas(transcricao)
+
+        mesmo_texto = (
+            [normalizar_texto(p) for p in tokenizar(texto_original)]
+            == [normalizar_texto(p) for p in tokenizar(transcricao)]
+        )
+        if mesmo_texto:
+            distancia, divergencias = 0, []
+        else:
+            classes_esperadas = [classe_fonema(f) for f in esperados]
+            classes_reconhecidas = [classe_fonema(f) for f in reconhecidos]
+            distancia = distancia_edicao(classes_esperadas, classes_reconhecidas)
+            divergencias = [
+                {
+                    "operacao": operacao,
+                    "esperado": esperados[i] if i is not None else None,
+                    "reconhecido": reconhecidos[j] if j is not None else None,
+                }
+                for operacao, i, j in alinhar_palavras(classes_esperadas, classes_reconhecidas)
+                if operacao != OPERACAO_IGUAL
+            ]
+
+        nota = max(0.0, 1 - distancia / max(len(esperados), 1))
+        if distancia == 0:
+            classificacao = CorretoEnum.sim.value
+        elif nota >= self.limiar_parcial:
+            classificacao = CorretoEnum.parcial.value
+        else:
+            classificacao = CorretoEnum.nao.value
+
+        return {
+            "correto": classificacao,
+            "nota": round(nota, 3),
+            "comentario": self._comentario(classificacao, texto_original, transcricao, divergencias),
+            "referencia": origem,
+            "fonemas_esperados": esperados,
+            "fonemas_reconhecidos": reconhecidos,
+            "divergencias": divergencias,
+        }
+
+    @staticmethod
+    def _comentario(classificacao: str, texto_original: str, transcricao: str, divergencias: List[Dict[str, Any]]) -> str:
+        if classificacao == CorretoEnum.sim.value:
+            return "Perfeito! Sua pronúncia está correta."
+
+        comentario = f"Transcrição da sua pronúncia: \"{transcricao}\". Esperado: \"{texto_original}\"."
+        if divergencias:
+            sons = ", ".join(
+                f"/{d['esperado'] or '∅'}/ → /{d['reconhecido'] or '∅'}/" for d in divergencias[:5]
+            )
+            comentario += f" Sons divergentes: {sons}."
+        if classificacao == CorretoEnum.parcial.value:
+            comentario = f"Quase! {comentario}"
+        return comentario
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Retorna as métricas do cache de fonemas de referência.
+
+        Returns:
+            Dicionário com registros em cache, acertos, falhas e avaliações
+        """
+        return {"registros": len(self._referencias), **self._metricas}
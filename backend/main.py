@@ -2,11 +2,21 @@
 Servidor FastAPI para a aplicação de estudo de idiomas.
 """
 import os
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Dict, Any
-from fastapi import FastAPI, HTTPException, File, UploadFile
+from typing import List, Optional, Dict, Any, Tuple, Union
+from uuid import uuid4
+import base64
+import io
+import json
+from fastapi import FastAPI, HTTPException, File, Form, UploadFile, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import ValidationError, BaseModel, Field
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import ValidationError, BaseModel, Field, model_validator
 from dotenv import load_dotenv
 import httpx
 
@@ -15,9 +25,32 @@ from models import (
     BasePrompts,
     BaseHistoricoPratica,
     BaseFrasesDialogo,
-    Exercicio
+    Exercicio,
+    CorretoEnum,
+    IdiomaEnum,
+    ResultadoAudicao,
+    ResultadoDialogo,
+    ResultadoPronuncia,
+    ResultadoPronunciaNumeros,
+    TipoPraticaEnum
 )
 from validator import ValidadorJSON
+from cache import CacheLRU, gerar_chave
+from coalescencia import CoalescedorRequisicoes
+from admissao import ControleAdmissao, ErroAdmissao, PRIORIDADES, PRIORIDADE_INTERATIVA, PRIORIDADE_LOTE
+from circuito import CircuitoAberto, DisjuntorCircuito
+from upload import LeitorComHash, LimiteTamanhoCorpo
+from normalizacao_audio import ErroNormalizacao, normalizar_audio
+from aquecimento import AquecedorModelo, interpretar_horario_ativo
+from templates import ErroTemplate, TemplateCompilado
+from esquemas import DetectorFimJSON
+from numeros_alemao import avaliar_resposta, forma_por_extenso
+from avaliacao_audicao import avaliar_lote, avaliar_transcricao
+from fonemas import AvaliadorPronuncia
+from dialogo import NOMES_IDIOMAS, SessaoDialogo
+from antecipacao import Antecipacao, AntecipadorChamadas
+from conversas import Conversa, GerenciadorConversas
+from roteamento import OrcamentoEsgotado, RoteadorModelos, registrar_admissao
 
 # Carregar variáveis de ambiente
 load_dotenv()
@@ -25,11 +58,42 @@ load_dotenv()
 # Obter caminho dos dados da variável de ambiente
 DADOS_PATH = os.getenv("DADOS_PATH", "../public")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Inicia as tarefas de fundo (sondas de saúde e aquecimento do modelo) e as encerra no desligamento."""
+    sondas = [
+        asyncio.create_task(disjuntor_tts.executar_sondas()),
+        asyncio.create_task(disjuntor_ollama.executar_sondas())
+    ]
+    if OLLAMA_AQUECER:
+        sondas.append(asyncio.create_task(aquecedor_ollama.executar()))
+    try:
+        yield
+    finally:
+        for sonda in sondas:
+            sonda.cancel()
+        await asyncio.gather(*sondas, return_exceptions=True)
+
+
 # Criar aplicação FastAPI
 app = FastAPI(
     title="API de Estudo de Idiomas",
     description="API para carregar e validar dados da aplicação de estudo de idiomas",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
+)
+
+# Limite de tamanho dos uploads de áudio (413 antes de ler o corpo quando possível)
+UPLOAD_AUDIO_LIMITE_MB = float(os.getenv("UPLOAD_AUDIO_LIMITE_MB", 25))
+UPLOAD_AUDIO_CALCULAR_HASH = os.getenv("UPLOAD_AUDIO_CALCULAR_HASH", "true").lower() in ("1", "true", "sim")
+# Normalização (16 kHz mono, sem silêncio nas pontas) antes da transcrição; pode ser sobrescrita por requisição
+NORMALIZAR_AUDIO_STT = os.getenv("NORMALIZAR_AUDIO_STT", "false").lower() in ("1", "true", "sim")
+
+app.add_middleware(
+    LimiteTamanhoCorpo,
+    limite_bytes=int(UPLOAD_AUDIO_LIMITE_MB * 1024 * 1024),
+    caminhos=["/api/transcrever-audio", "/api/pratica/pronuncia", "/api/pratica/numeros"]
 )
 
 # Configurar CORS para permitir acesso do frontend
@@ -39,10 +103,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Audio-Metadata", "X-Audio-SHA256", "X-Cache", "Retry-After", "Server-Timing"],
 )
 
 # Inicializar validador com caminho configurável
 validador = ValidadorJSON(base_path=DADOS_PATH)
+# Serializa as gravações do histórico feitas fora do loop (leitura, inclusão e escrita do arquivo)
+trava_historico = asyncio.Lock()
 
 # Configuração do serviço TTS/STT
 TTS_SERVICE_PORT = int(os.getenv("SERVICO_TTS_E_STT", 3015))
@@ -53,6 +120,214 @@ OLLAMA_SERVICE_PORT = int(os.getenv("SERVICO_OLLAMA", 11434))
 OLLAMA_SERVICE_URL = f"http://localhost:{OLLAMA_SERVICE_PORT}"
 OLLAMA_MODEL = os.getenv("MODELO_OLLAMA", "gemma3:1b")
 
+# Aquecimento do modelo: pré-carga na inicialização, keep_alive e pings no horário ativo
+OLLAMA_AQUECER = os.getenv("OLLAMA_AQUECER", "true").lower() in ("1", "true", "sim")
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_INTERVALO_AQUECIMENTO_SEGUNDOS = float(os.getenv("OLLAMA_INTERVALO_AQUECIMENTO_SEGUNDOS", 240))
+OLLAMA_HORARIO_ATIVO = os.getenv("OLLAMA_HORARIO_ATIVO", "07-23")
+
+aquecedor_ollama = AquecedorModelo(
+    OLLAMA_SERVICE_URL,
+    OLLAMA_MODEL,
+    keep_alive=OLLAMA_KEEP_ALIVE,
+    intervalo_segundos=OLLAMA_INTERVALO_AQUECIMENTO_SEGUNDOS,
+    horario_ativo=interpretar_horario_ativo(OLLAMA_HORARIO_ATIVO)
+)
+
+# Configuração do cache de áudio (TTS)
+MODELO_TTS = os.getenv("MODELO_TTS", "de_DE-thorsten-medium")
+CACHE_AUDIO_DIR = os.getenv("CACHE_AUDIO_DIR", ".cache/audio")
+CACHE_AUDIO_LIMITE_MEMORIA_MB = float(os.getenv("CACHE_AUDIO_LIMITE_MEMORIA_MB", 64))
+CACHE_AUDIO_LIMITE_DISCO_MB = float(os.getenv("CACHE_AUDIO_LIMITE_DISCO_MB", 512))
+
+cache_audio = CacheLRU(
+    diretorio=CACHE_AUDIO_DIR,
+    limite_bytes_memoria=int(CACHE_AUDIO_LIMITE_MEMORIA_MB * 1024 * 1024),
+    limite_bytes_disco=int(CACHE_AUDIO_LIMITE_DISCO_MB * 1024 * 1024),
+    extensao=".wav"
+)
+
+# Configuração do cache de respostas do LLM (opt-in por prompt_id ou por requisição)
+CACHE_LLM_DIR = os.getenv("CACHE_LLM_DIR", ".cache/llm")
+CACHE_LLM_TTL_SEGUNDOS = float(os.getenv("CACHE_LLM_TTL_SEGUNDOS", 7 * 24 * 3600))
+CACHE_LLM_LIMITE_MEMORIA_MB = float(os.getenv("CACHE_LLM_LIMITE_MEMORIA_MB", 16))
+CACHE_LLM_LIMITE_DISCO_MB = float(os.getenv("CACHE_LLM_LIMITE_DISCO_MB", 128))
+CACHE_LLM_PROMPTS = {
+    prompt_id.strip()
+    for prompt_id in os.getenv("CACHE_LLM_PROMPTS", "numeros_verificar_texto").split(",")
+    if prompt_id.strip()
+}
+
+cache_llm = CacheLRU(
+    diretorio=CACHE_LLM_DIR,
+    limite_bytes_memoria=int(CACHE_LLM_LIMITE_MEMORIA_MB * 1024 * 1024),
+    limite_bytes_disco=int(CACHE_LLM_LIMITE_DISCO_MB * 1024 * 1024),
+    extensao=".llm.json",
+    ttl_segundos=CACHE_LLM_TTL_SEGUNDOS
+)
+
+# Requisições idênticas em andamento compartilham uma única chamada ao upstream
+coalescedor_tts = CoalescedorRequisicoes()
+coalescedor_llm = CoalescedorRequisicoes()
+
+# Conversas com o LLM mantidas no servidor (ver /api/chat/conversas)
+CONVERSAS_LIMITE = int(os.getenv("CONVERSAS_LIMITE", 100))
+CONVERSAS_LIMITE_TOKENS = int(os.getenv("CONVERSAS_LIMITE_TOKENS", 500_000))
+CONVERSAS_TTL_SEGUNDOS = float(os.getenv("CONVERSAS_TTL_SEGUNDOS", 1800))
+
+gerenciador_conversas = GerenciadorConversas(
+    limite_conversas=CONVERSAS_LIMITE,
+    limite_tokens=CONVERSAS_LIMITE_TOKENS,
+    ttl_segundos=CONVERSAS_TTL_SEGUNDOS
+)
+
+# Respostas estruturadas: tentativas até obter um JSON válido para estrutura_esperada
+RESPOSTA_ESTRUTURADA_TENTATIVAS = int(os.getenv("RESPOSTA_ESTRUTURADA_TENTATIVAS", 2))
+
+# Prática de números: prompt opcional usado para comentar respostas incorretas
+NUMEROS_PROMPT_COMENTARIO = os.getenv("NUMEROS_PROMPT_COMENTARIO", "numeros_comentar_erro")
+# Prática de números em outros idiomas: prompt que verifica se a resposta equivale ao número
+NUMEROS_PROMPT_VERIFICACAO = os.getenv("NUMEROS_PROMPT_VERIFICACAO", "numeros_verificar_texto")
+
+# Prática de diálogo: prompt que extrai os dados do interlocutor ao final da sessão
+DIALOGO_PROMPT_INTERLOCUTOR = os.getenv("DIALOGO_PROMPT_INTERLOCUTOR", "dialogo_dados_interlocutor")
+# Frases seguintes sintetizadas por antecipação a cada avanço da sessão de diálogo
+DIALOGO_ANTECIPAR_FRASES = int(os.getenv("DIALOGO_ANTECIPAR_FRASES", 2))
+# Sínteses especulativas simultâneas (somadas todas as sessões); com prioridade de lote na
+# admissão do TTS, deixam sempre vagas livres para as requisições interativas
+ANTECIPACAO_TTS_CONCORRENCIA = int(os.getenv("ANTECIPACAO_TTS_CONCORRENCIA", 1))
+
+antecipador_tts = AntecipadorChamadas(limite_concorrencia=ANTECIPACAO_TTS_CONCORRENCIA)
+
+# Prática de audição: nota mínima (similaridade de caracteres) para "Parcial"
+AUDICAO_LIMIAR_PARCIAL = float(os.getenv("AUDICAO_LIMIAR_PARCIAL", 0.8))
+
+# Prática de pronúncia: avaliação local por fonemas (referências em cache por conhecimento_id)
+PRONUNCIA_LIMIAR_PARCIAL = float(os.getenv("PRONUNCIA_LIMIAR_PARCIAL", 0.75))
+
+avaliador_pronuncia = AvaliadorPronuncia(limiar_parcial=PRONUNCIA_LIMIAR_PARCIAL)
+
+# Chat em lote: itens consultados ao mesmo tempo por requisição /api/chat/lote
+CHAT_LOTE_CONCORRENCIA = int(os.getenv("CHAT_LOTE_CONCORRENCIA", 2))
+CHAT_LOTE_MAX_ITENS = int(os.getenv("CHAT_LOTE_MAX_ITENS", 100))
+
+# Controle de admissão: vagas simultâneas e fila limitada por serviço upstream
+ADMISSAO_ESPERA_MAXIMA_SEGUNDOS = float(os.getenv("ADMISSAO_ESPERA_MAXIMA_SEGUNDOS", 30))
+
+admissao_tts = ControleAdmissao(
+    "TTS/STT",
+    limite_concorrencia=int(os.getenv("ADMISSAO_TTS_CONCORRENCIA", 2)),
+    limite_fila=int(os.getenv("ADMISSAO_TTS_FILA", 32)),
+    espera_maxima_segundos=ADMISSAO_ESPERA_MAXIMA_SEGUNDOS
+)
+admissao_ollama = ControleAdmissao(
+    "Ollama",
+    limite_concorrencia=int(os.getenv("ADMISSAO_OLLAMA_CONCORRENCIA", 1)),
+    limite_fila=int(os.getenv("ADMISSAO_OLLAMA_FILA", 16)),
+    espera_maxima_segundos=ADMISSAO_ESPERA_MAXIMA_SEGUNDOS
+)
+
+# Roteamento por prompt (campo roteamento da base): latências recentes para o p95 da redundância.
+# A cópia ao reserva passa pela mesma admissão do Ollama: só roda junto do principal com 2+ vagas
+ROTEAMENTO_JANELA = int(os.getenv("ROTEAMENTO_JANELA", 100))
+ROTEAMENTO_AMOSTRAS_MINIMAS = int(os.getenv("ROTEAMENTO_AMOSTRAS_MINIMAS", 20))
+
+roteador_modelos = RoteadorModelos(
+    janela=ROTEAMENTO_JANELA,
+    amostras_minimas=ROTEAMENTO_AMOSTRAS_MINIMAS,
+    redundancia_permitida=admissao_ollama.limite_concorrencia >= 2
+)
+
+# Disjuntores: falham na hora quando o serviço upstream está fora do ar
+DISJUNTOR_LIMITE_FALHAS = int(os.getenv("DISJUNTOR_LIMITE_FALHAS", 3))
+DISJUNTOR_INTERVALO_SONDA_SEGUNDOS = float(os.getenv("DISJUNTOR_INTERVALO_SONDA_SEGUNDOS", 5))
+
+disjuntor_tts = DisjuntorCircuito(
+    "TTS/STT",
+    f"{TTS_SERVICE_URL}/health",
+    limite_falhas=DISJUNTOR_LIMITE_FALHAS,
+    intervalo_sonda_segundos=DISJUNTOR_INTERVALO_SONDA_SEGUNDOS
+)
+disjuntor_ollama = DisjuntorCircuito(
+    "Ollama",
+    f"{OLLAMA_SERVICE_URL}/api/tags",
+    limite_falhas=DISJUNTOR_LIMITE_FALHAS,
+    intervalo_sonda_segundos=DISJUNTOR_INTERVALO_SONDA_SEGUNDOS
+)
+
+# Métricas das transcrições (efeito da normalização no tamanho enviado e nos tempos)
+metricas_transcricao = {
+    "transcricoes": 0,
+    "normalizadas": 0,
+    "normalizacoes_ignoradas": 0,
+    "bytes_recebidos": 0,
+    "bytes_enviados": 0,
+    "normalizacao_ms_total": 0.0,
+    "stt_ms_total": 0.0,
+    "stt_ms_total_normalizadas": 0.0,
+}
+
+
+def registrar_transcricao(bytes_recebidos: int, normalizado: Optional[bytes], tempos: Dict[str, float]) -> None:
+    """Acumula nas métricas uma transcrição concluída."""
+    metricas_transcricao["transcricoes"] += 1
+    metricas_transcricao["bytes_recebidos"] += bytes_recebidos
+    metricas_transcricao["bytes_enviados"] += len(normalizado) if normalizado is not None else bytes_recebidos
+    metricas_transcricao["stt_ms_total"] += tempos.get("stt", 0.0)
+    if normalizado is not None:
+        metricas_transcricao["normalizadas"] += 1
+        metricas_transcricao["normalizacao_ms_total"] += tempos.get("normalizacao", 0.0)
+        metricas_transcricao["stt_ms_total_normalizadas"] += tempos.get("stt", 0.0)
+
+
+def estatisticas_transcricao() -> Dict[str, Any]:
+    """Retorna os contadores de transcrição com as médias de tempo por etapa."""
+    m = metricas_transcricao
+    originais = m["transcricoes"] - m["normalizadas"]
+    return {
+        **m,
+        "normalizacao_ms_media": round(m["normalizacao_ms_total"] / m["normalizadas"], 1) if m["normalizadas"] else 0.0,
+        "stt_ms_media_normalizadas": (
+            round(m["stt_ms_total_normalizadas"] / m["normalizadas"], 1) if m["normalizadas"] else 0.0
+        ),
+        "stt_ms_media_originais": (
+            round((m["stt_ms_total"] - m["stt_ms_total_normalizadas"]) / originais, 1) if originais else 0.0
+        ),
+    }
+
+
+@app.exception_handler(ErroAdmissao)
+@app.exception_handler(CircuitoAberto)
+async def tratar_rejeicao_upstream(request: Request, erro: Union[ErroAdmissao, CircuitoAberto]):
+    """Converte rejeições da admissão ou do disjuntor em 429/503 com Retry-After."""
+    return JSONResponse(
+        status_code=erro.status_code,
+        content={"detail": str(erro)},
+        headers={"Retry-After": str(erro.retry_after)}
+    )
+
+
+def registrar_resposta(disjuntor: DisjuntorCircuito, response: httpx.Response) -> None:
+    """Registra no disjuntor o resultado de uma resposta do serviço (503 conta como falha)."""
+    if response.status_code == 503:
+        disjuntor.registrar_falha()
+    else:
+        disjuntor.registrar_sucesso()
+
+
+def prioridade_da_requisicao(http_request: Request) -> int:
+    """
+    Lê a prioridade da requisição no cabeçalho X-Prioridade.
+
+    Args:
+        http_request: Requisição HTTP original
+
+    Returns:
+        PRIORIDADE_LOTE para "X-Prioridade: lote"; PRIORIDADE_INTERATIVA caso contrário
+    """
+    valor = http_request.headers.get("x-prioridade", "").strip().lower()
+    return PRIORIDADES.get(valor, PRIORIDADE_INTERATIVA)
+
 
 # Modelos de dados para TTS
 class GenerateAudioRequest(BaseModel):
@@ -71,6 +346,317 @@ class OllamaChatRequest(BaseModel):
     model: Optional[str] = None  # Se None, usa OLLAMA_MODEL do .env
     messages: List[OllamaMessage]
     stream: bool = False
+    options: Optional[Dict[str, Any]] = None  # Opções de geração repassadas ao Ollama
+    prompt_id: Optional[str] = None  # Prompt de origem (habilita o cache se listado em CACHE_LLM_PROMPTS)
+    cache: Optional[bool] = None  # Força (True) ou desativa (False) o cache de respostas
+
+
+class CriarConversaRequest(BaseModel):
+    model: Optional[str] = None  # Se None, usa OLLAMA_MODEL do .env
+    system: Optional[str] = None  # Mensagem de sistema da conversa
+    options: Optional[Dict[str, Any]] = None  # Opções de geração padrão dos turnos
+
+
+class TurnoConversaRequest(BaseModel):
+    content: str = Field(min_length=1)  # Mensagem do usuário (apenas o novo turno)
+    options: Optional[Dict[str, Any]] = None  # Substitui as opções padrão da conversa
+
+
+class ExecutarPromptRequest(BaseModel):
+    parametros: Dict[str, Any] = Field(default_factory=dict)  # Valores dos parâmetros do template
+    model: Optional[str] = None  # Se None, usa OLLAMA_MODEL do .env
+    cache: Optional[bool] = None  # Mesmo significado de OllamaChatRequest.cache
+    estruturada: Optional[bool] = None  # Se None, segue resposta_estruturada do prompt
+
+
+class ItemChatLote(BaseModel):
+    prompt_id: Optional[str] = None  # Prompt da base (renderizado com parametros se messages for omitido)
+    parametros: Dict[str, Any] = Field(default_factory=dict)
+    messages: Optional[List[OllamaMessage]] = None  # Mensagens prontas (dispensam o template)
+    options: Optional[Dict[str, Any]] = None
+    cache: Optional[bool] = None
+    estruturada: Optional[bool] = None  # Mesmo significado de ExecutarPromptRequest.estruturada
+
+    @model_validator(mode="after")
+    def validar_origem(self):
+        if self.prompt_id is None and not self.messages:
+            raise ValueError("Cada item precisa de 'prompt_id' ou de 'messages'")
+        return self
+
+
+class ChatLoteRequest(BaseModel):
+    itens: List[ItemChatLote] = Field(min_length=1)
+    model: Optional[str] = None  # Se None, usa OLLAMA_MODEL do .env
+
+
+class AvaliarNumeroRequest(BaseModel):
+    numero_referencia: str  # Ex.: "78", "3,5" ou "3." (ordinal)
+    texto_usuario: Optional[str] = None
+    audio_transcricao: Optional[str] = None
+    comentar_com_llm: bool = False  # Comenta respostas incorretas com o prompt NUMEROS_PROMPT_COMENTARIO
+    model: Optional[str] = None  # Se None, usa OLLAMA_MODEL do .env
+
+    @model_validator(mode="after")
+    def exigir_resposta(self):
+        if self.texto_usuario is None and self.audio_transcricao is None:
+            raise ValueError("Informe texto_usuario e/ou audio_transcricao")
+        return self
+
+
+class AvaliacaoNumeroResponse(ResultadoPronunciaNumeros):
+    forma_esperada: Optional[str] = None  # Número de referência por extenso (só no alemão)
+
+
+class AvaliarAudicaoRequest(BaseModel):
+    texto_original: str
+    transcricao_usuario: str
+
+
+class AvaliarAudicaoLoteRequest(BaseModel):
+    itens: List[AvaliarAudicaoRequest] = Field(min_length=1)
+
+
+class AvaliarPronunciaRequest(BaseModel):
+    conhecimento_id: str
+    transcricao_stt: str
+
+
+def usar_cache_llm(request: OllamaChatRequest) -> bool:
+    """
+    Decide se a resposta do LLM pode ser servida/armazenada no cache.
+
+    O cache é opt-in: vale quando a requisição pede cache=true ou quando o
+    prompt_id está em CACHE_LLM_PROMPTS (salvo se a requisição pedir
+    cache=false). Respostas em streaming nunca usam o cache.
+
+    Args:
+        request: Requisição de chat
+
+    Returns:
+        True se o cache deve ser usado
+    """
+    if request.stream:
+        return False
+    if request.cache is not None:
+        return request.cache
+    return request.prompt_id is not None and request.prompt_id in CACHE_LLM_PROMPTS
+
+
+def chave_chat(
+    modelo: str,
+    mensagens: List[Dict[str, Any]],
+    opcoes: Optional[Dict[str, Any]],
+    formato: Optional[Any] = None
+) -> str:
+    """
+    Gera a chave do cache de respostas do LLM.
+
+    Args:
+        modelo: Modelo do Ollama
+        mensagens: Mensagens enviadas
+        opcoes: Opções de geração
+        formato: Esquema JSON enviado como "format" (respostas estruturadas)
+
+    Returns:
+        Hash que identifica a resposta no cache
+    """
+    if formato:
+        return gerar_chave("chat", modelo, mensagens, opcoes or {}, formato)
+    return gerar_chave("chat", modelo, mensagens, opcoes or {})
+
+
+def chave_audio(texto: str, voz: Optional[str], velocidade: Optional[float], modelo: str = MODELO_TTS) -> str:
+    """
+    Gera a chave do cache de áudio para uma síntese TTS.
+
+    Args:
+        texto: Texto sintetizado
+        voz: Voz utilizada
+        velocidade: Velocidade da fala
+        modelo: Modelo de voz do serviço TTS
+
+    Returns:
+        Hash que identifica o áudio no cache
+    """
+    return gerar_chave(texto, voz, float(velocidade if velocidade is not None else 1.0), modelo)
+
+
+def extrair_audio_tts(response: httpx.Response) -> Tuple[bytes, str, Optional[Dict[str, Any]]]:
+    """
+    Extrai o áudio de uma resposta do serviço TTS.
+
+    Aceita tanto a resposta binária (áudio no corpo e metadata no cabeçalho
+    X-Audio-Metadata) quanto a resposta JSON legada com áudio em base64.
+
+    Args:
+        response: Resposta HTTP do serviço TTS
+
+    Returns:
+        Tupla (bytes do áudio, mimeType, metadata)
+    """
+    tipo_conteudo = str(response.headers.get("content-type", ""))
+    if tipo_conteudo.startswith("audio/"):
+        metadata = response.headers.get("x-audio-metadata")
+        return response.content, tipo_conteudo.split(";")[0].strip(), json.loads(metadata) if metadata else None
+
+    dados = response.json()
+    return base64.b64decode(dados.get("audio") or ""), dados.get("mimeType", "audio/wav"), dados.get("metadata")
+
+
+async def armazenar_audio_em_cache(
+    chave: str,
+    audio_bytes: bytes,
+    mime_type: str = "audio/wav",
+    metadata: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Armazena no cache de áudio o resultado de uma síntese TTS.
+
+    A camada em memória é atualizada na hora; a gravação do arquivo no disco
+    roda em uma thread, fora do event loop.
+
+    Args:
+        chave: Chave gerada por chave_audio
+        audio_bytes: Conteúdo binário do áudio
+        mime_type: Tipo MIME do áudio
+        metadata: Metadata retornada pelo serviço TTS
+    """
+    if not audio_bytes:
+        return
+    metadados = {"mimeType": mime_type, "metadata": metadata}
+    cache_audio.armazenar(chave, audio_bytes, metadados, disco=False)
+    await asyncio.to_thread(cache_audio.gravar_no_disco, chave, audio_bytes, metadados)
+
+
+def aceita_audio_binario(http_request: Request) -> bool:
+    """Indica se o cliente negociou a resposta binária (Accept: audio/wav)."""
+    aceita = http_request.headers.get("accept", "").lower()
+    return "audio/wav" in aceita or "audio/*" in aceita
+
+
+def resposta_audio(
+    audio_bytes: bytes,
+    mime_type: str,
+    metadata: Optional[Dict[str, Any]],
+    binario: bool,
+    do_cache: bool
+) -> Union[Response, Dict[str, Any]]:
+    """
+    Monta a resposta de áudio no formato negociado com o cliente.
+
+    Args:
+        audio_bytes: Conteúdo binário do áudio
+        mime_type: Tipo MIME do áudio
+        metadata: Metadata da síntese
+        binario: Se True, retorna o áudio bruto; senão, JSON com base64
+        do_cache: Indica se o áudio foi servido do cache
+
+    Returns:
+        Response binária ou dicionário JSON compatível com a API original
+    """
+    if binario:
+        return Response(
+            content=audio_bytes,
+            media_type=mime_type,
+            headers={
+                "X-Audio-Metadata": json.dumps(metadata or {}),
+                "X-Cache": "HIT" if do_cache else "MISS"
+            }
+        )
+    return {
+        "audio": base64.b64encode(audio_bytes).decode("utf-8"),
+        "mimeType": mime_type,
+        "metadata": metadata
+    }
+
+
+async def obter_audio_tts(
+    texto: str,
+    voz: Optional[str],
+    velocidade: Optional[float],
+    prioridade: int = PRIORIDADE_INTERATIVA
+) -> Tuple[bytes, str, Optional[Dict[str, Any]], bool]:
+    """
+    Obtém o áudio de uma síntese TTS, do cache ou do serviço TTS.
+
+    Sínteses idênticas em andamento ao mesmo tempo compartilham uma única
+    chamada ao serviço TTS (ver coalescedor_tts), que passa pelo controle
+    de admissão do serviço (ver admissao_tts).
+
+    Args:
+        texto: Texto a sintetizar
+        voz: Voz utilizada
+        velocidade: Velocidade da fala
+        prioridade: Prioridade na fila de admissão
+
+    Returns:
+        Tupla (bytes do áudio, mimeType, metadata, servido do cache)
+
+    Raises:
+        HTTPException: Se houver erro na geração do áudio ou serviço indisponível
+        ErroAdmissao: Se a fila do serviço TTS estiver cheia ou a espera esgotar
+        CircuitoAberto: Se o disjuntor do serviço TTS estiver aberto
+    """
+    chave = chave_audio(texto, voz, velocidade)
+    # Só a camada em memória é consultada no event loop; o disco, em uma thread
+    em_cache = cache_audio.obter_da_memoria(chave) or await asyncio.to_thread(cache_audio.obter, chave)
+    if em_cache is not None:
+        audio_bytes, metadados = em_cache
+        return audio_bytes, metadados.get("mimeType", "audio/wav"), metadados.get("metadata"), True
+
+    disjuntor_tts.verificar()
+
+    async def sintetizar() -> Tuple[bytes, str, Optional[Dict[str, Any]]]:
+        async with admissao_tts.admitir(prioridade):
+            try:
+                # Fazer requisição para o serviço TTS (formato binário, sem base64)
+                async with httpx.AsyncClient(timeout=30.0) as client:
+                    response = await client.post(
+                        f"{TTS_SERVICE_URL}/api/generate-audio",
+                        json={
+                            "text": texto,
+                            "voice": voz,
+                            "speed": velocidade
+                        },
+                        headers={"Accept": "audio/wav, application/json"}
+                    )
+                    registrar_resposta(disjuntor_tts, response)
+
+                    if response.status_code == 200:
+                        audio_bytes, mime_type, metadata = extrair_audio_tts(response)
+                        await armazenar_audio_em_cache(chave, audio_bytes, mime_type, metadata)
+                        return audio_bytes, mime_type, metadata
+                    elif response.status_code == 503:
+                        raise HTTPException(
+                            status_code=503,
+                            detail="Serviço TTS não disponível. Certifique-se de que o serviço está rodando."
+                        )
+                    else:
+                        raise HTTPException(
+                            status_code=response.status_code,
+                            detail=f"Erro ao gerar áudio: {response.text}"
+                        )
+
+            except httpx.ConnectError:
+                disjuntor_tts.registrar_falha()
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"Não foi possível conectar ao serviço TTS em {TTS_SERVICE_URL}. Verifique se o serviço está rodando."
+                )
+            except httpx.TimeoutException:
+                disjuntor_tts.registrar_falha()
+                raise HTTPException(
+                    status_code=504,
+                    detail="Timeout ao gerar áudio. O serviço TTS demorou muito para responder."
+                )
+            except Exception as e:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Erro interno ao gerar áudio: {str(e)}"
+                )
+
+    audio_bytes, mime_type, metadata = await coalescedor_tts.executar(chave, sintetizar)
+    return audio_bytes, mime_type, metadata, False
 
 
 @app.get("/")
@@ -84,13 +670,27 @@ async def root():
                 "/api/base_de_conhecimento",
                 "/api/prompts",
                 "/api/historico_de_pratica",
-                "/api/frases_do_dialogo"
+                "/api/frases_do_dialogo",
+                "/api/metricas",
+                "/api/saude",
+                "/api/historico_de_pratica/audicao/reavaliacao",
+                "/ws/dialogo - Sessão da prática de diálogo (WebSocket)"
             ],
             "POST": [
                 "/api/historico_de_pratica - Inserir novo exercício",
                 "/api/generate-audio - Gerar áudio a partir de texto (TTS)",
                 "/api/transcrever-audio - Transcrever áudio em texto (STT)",
-                "/api/chat - Consultar LLM via Ollama"
+                "/api/chat - Consultar LLM via Ollama",
+                "/api/chat/lote - Consultar vários prompts com concorrência limitada",
+                "/api/chat/conversas - Iniciar conversa com o LLM mantida no servidor",
+                "/api/chat/conversas/{conversa_id} - Enviar um turno da conversa",
+                "/api/prompts/{prompt_id}/executar - Executar prompt da base com parâmetros",
+                "/api/pratica/numeros/avaliar - Corrigir resposta da prática de números (sem LLM)",
+                "/api/pratica/numeros - Transcrever e verificar texto e pronúncia de um número",
+                "/api/pratica/audicao/avaliar - Corrigir transcrição de exercício de audição",
+                "/api/pratica/audicao/avaliar/lote - Corrigir vários exercícios de audição",
+                "/api/pratica/pronuncia/avaliar - Avaliar pronúncia por fonemas (sem LLM)",
+                "/api/pratica/pronuncia - Transcrever, avaliar e registrar uma pronúncia"
             ],
             "PUT": [
                 "/api/prompts - Atualizar e salvar prompts"
@@ -121,6 +721,33 @@ async def obter_base_conhecimento():
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
 
+def obter_conhecimento(conhecimento_id: str) -> ConhecimentoIdioma:
+    """
+    Busca um registro da base de conhecimento.
+
+    Args:
+        conhecimento_id: Identificador do registro
+
+    Returns:
+        Registro de conhecimento
+
+    Raises:
+        HTTPException: 404 se o registro ou o arquivo não existir, 422 se a
+            base for inválida
+    """
+    try:
+        conhecimentos = validador.validar_conhecimento_idiomas()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=f"Arquivo não encontrado: {str(e)}")
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=f"Erro de validação: {str(e)}")
+
+    for conhecimento in conhecimentos:
+        if str(conhecimento.conhecimento_id) == conhecimento_id:
+            return conhecimento
+    raise HTTPException(status_code=404, detail=f"Conhecimento '{conhecimento_id}' não encontrado")
+
+
 @app.get("/api/prompts", response_model=BasePrompts)
 async def obter_prompts():
     """
@@ -163,6 +790,8 @@ async def atualizar_prompts(prompts: BasePrompts):
         return prompts_salvos
     except ValidationError as e:
         raise HTTPException(status_code=422, detail=f"Erro de validação: {str(e)}")
+    except ErroTemplate as e:
+        raise HTTPException(status_code=422, detail=f"Erro no template: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao salvar prompts: {str(e)}")
 
@@ -205,7 +834,8 @@ async def inserir_exercicio(exercicio: Exercicio):
         HTTPException: Se houver erro na validação ou salvamento do exercício
     """
     try:
-        historico_atualizado = validador.adicionar_exercicio(exercicio)
+        async with trava_historico:
+            historico_atualizado = await asyncio.to_thread(validador.adicionar_exercicio, exercicio)
         return historico_atualizado
     except ValidationError as e:
         raise HTTPException(status_code=422, detail=f"Erro de validação: {str(e)}")
@@ -215,6 +845,49 @@ async def inserir_exercicio(exercicio: Exercicio):
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
 
+@app.get("/api/historico_de_pratica/audicao/reavaliacao")
+async def reavaliar_historico_audicao():
+    """
+    Endpoint para reavaliar todos os exercícios de audição do histórico.
+
+    Aplica a correção aproximada (ver /api/pratica/audicao/avaliar) ao
+    histórico inteiro, sem alterá-lo, para comparar com o resultado
+    registrado na época do exercício.
+
+    Returns:
+        JSON com total, contagem por classificação e resultados por exercício
+
+    Raises:
+        HTTPException: Se houver erro na validação ou leitura do arquivo
+    """
+    historico = await obter_historico_pratica()
+    exercicios = [
+        (exercicio, ResultadoAudicao.model_validate(exercicio.resultado_exercicio))
+        for exercicio in historico.exercicios
+        if exercicio.tipo_pratica == TipoPraticaEnum.audicao
+    ]
+    avaliacoes = await asyncio.to_thread(
+        avaliar_lote,
+        [(resultado.texto_original, resultado.transcricao_usuario) for _, resultado in exercicios],
+        AUDICAO_LIMIAR_PARCIAL
+    )
+
+    classificacoes = {classificacao.value: 0 for classificacao in CorretoEnum}
+    resultados = []
+    for (exercicio, resultado), avaliacao in zip(exercicios, avaliacoes):
+        classificacoes[avaliacao["classificacao"]] += 1
+        resultados.append({
+            "exercicio_id": str(exercicio.exercicio_id),
+            "data_hora": exercicio.data_hora.isoformat(),
+            "texto_original": resultado.texto_original,
+            "transcricao_usuario": resultado.transcricao_usuario,
+            "correto_registrado": resultado.correto,
+            **avaliacao,
+        })
+
+    return {"total": len(resultados), "classificacoes": classificacoes, "resultados": resultados}
+
+
 @app.get("/api/frases_do_dialogo", response_model=BaseFrasesDialogo)
 async def obter_frases_dialogo():
     """
@@ -237,73 +910,204 @@ async def obter_frases_dialogo():
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
 
+@app.get("/api/metricas")
+async def obter_metricas():
+    """
+    Endpoint com as métricas de desempenho do backend.
+
+    Returns:
+        JSON com as estatísticas dos caches, da coalescência de requisições
+        e do controle de admissão (fila e tempo de espera por serviço)
+    """
+    return {
+        "cache_audio": cache_audio.estatisticas(),
+        "cache_llm": cache_llm.estatisticas(),
+        "coalescencia_tts": coalescedor_tts.estatisticas(),
+        "coalescencia_llm": coalescedor_llm.estatisticas(),
+        "admissao_tts": admissao_tts.estatisticas(),
+        "admissao_ollama": admissao_ollama.estatisticas(),
+        "transcricao": estatisticas_transcricao(),
+        "modelo_ollama": aquecedor_ollama.estatisticas(),
+        "fonemas_pronuncia": avaliador_pronuncia.estatisticas(),
+        "antecipacao_tts": antecipador_tts.estatisticas(),
+        "conversas_llm": gerenciador_conversas.estatisticas(),
+        "roteamento_llm": roteador_modelos.estatisticas()
+    }
+
+
+@app.get("/api/saude")
+async def obter_saude():
+    """
+    Endpoint com a saúde dos serviços upstream.
+
+    O estado vem dos disjuntores e da última sonda em segundo plano; a
+    consulta não faz nenhuma chamada aos serviços.
+
+    Returns:
+        JSON com o status geral ("ok" ou "degradado") e o estado de cada serviço
+    """
+    servicos = {
+        "tts": disjuntor_tts.estatisticas(),
+        "ollama": disjuntor_ollama.estatisticas()
+    }
+    degradado = any(servico["estado"] != "fechado" for servico in servicos.values())
+    return {"status": "degradado" if degradado else "ok", "servicos": servicos}
+
+
 @app.post("/api/generate-audio")
-async def generate_audio(request: GenerateAudioRequest):
+async def generate_audio(request: GenerateAudioRequest, http_request: Request):
     """
     Endpoint para gerar áudio a partir de texto (TTS).
 
-    Faz proxy para o serviço TTS/STT local.
+    Faz proxy para o serviço TTS/STT local. Áudios já sintetizados com o
+    mesmo texto, voz, velocidade e modelo são servidos do cache sem
+    consultar o serviço TTS, e requisições idênticas simultâneas
+    compartilham uma única síntese.
+
+    Com o cabeçalho "Accept: audio/wav" o áudio é devolvido bruto no corpo
+    da resposta e a metadata vai no cabeçalho X-Audio-Metadata; sem ele, a
+    resposta continua sendo o JSON com áudio em base64.
 
     Args:
         request: Requisição contendo texto, voz opcional e velocidade
+        http_request: Requisição HTTP original (negociação do formato)
 
     Returns:
-        JSON com áudio em base64, mimeType e metadata
+        Áudio binário ou JSON com áudio em base64, mimeType e metadata
 
     Raises:
         HTTPException: Se houver erro na geração do áudio ou serviço indisponível
     """
-    try:
-        # Fazer requisição para o serviço TTS
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{TTS_SERVICE_URL}/api/generate-audio",
-                json={
-                    "text": request.text,
-                    "voice": request.voice,
-                    "speed": request.speed
-                }
-            )
+    binario = aceita_audio_binario(http_request)
+    audio_bytes, mime_type, metadata, do_cache = await obter_audio_tts(
+        request.text, request.voice, request.speed, prioridade_da_requisicao(http_request)
+    )
+    return resposta_audio(audio_bytes, mime_type, metadata, binario, do_cache)
+
+
+async def transcrever_upload(
+    file: UploadFile,
+    prioridade: int = PRIORIDADE_INTERATIVA,
+    normalizar: bool = False
+) -> Tuple[Dict[str, Any], Optional[str], Dict[str, float]]:
+    """
+    Envia um upload de áudio ao serviço STT em streaming.
 
-            if response.status_code == 200:
-                return response.json()
-            elif response.status_code == 503:
-                raise HTTPException(
-                    status_code=503,
-                    detail="Serviço TTS não disponível. Certifique-se de que o serviço está rodando."
-                )
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Erro ao gerar áudio: {response.text}"
-                )
+    O arquivo recebido (já em arquivo temporário do Starlette) é lido em
+    blocos diretamente para o corpo multipart da requisição ao serviço STT,
+    sem ser carregado inteiro na memória. Com UPLOAD_AUDIO_CALCULAR_HASH, o
+    SHA-256 do áudio original é calculado durante a leitura.
 
-    except httpx.ConnectError:
-        raise HTTPException(
-            status_code=503,
-            detail=f"Não foi possível conectar ao serviço TTS em {TTS_SERVICE_URL}. Verifique se o serviço está rodando."
-        )
-    except httpx.TimeoutException:
-        raise HTTPException(
-            status_code=504,
-            detail="Timeout ao gerar áudio. O serviço TTS demorou muito para responder."
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Erro interno ao gerar áudio: {str(e)}"
-        )
+    Com normalizar, o áudio é antes convertido para 16 kHz mono PCM sem
+    silêncio nas pontas (ver normalizacao_audio), fora da vaga de admissão
+    do serviço STT. Se o formato não puder ser normalizado, o original é
+    enviado.
+
+    Args:
+        file: Arquivo de áudio recebido
+        prioridade: Prioridade na fila de admissão
+        normalizar: Se True, normaliza o áudio antes do envio
+
+    Returns:
+        Tupla (JSON da transcrição, SHA-256 do áudio ou None, tempos em ms
+        por etapa: "normalizacao" e "stt")
+
+    Raises:
+        HTTPException: Se houver erro na transcrição ou serviço indisponível
+        ErroAdmissao: Se a fila do serviço STT estiver cheia ou a espera esgotar
+        CircuitoAberto: Se o disjuntor do serviço STT estiver aberto
+    """
+    disjuntor_tts.verificar()
+    tempos: Dict[str, float] = {}
+
+    await file.seek(0)
+    leitor = LeitorComHash(file.file, calcular_hash=UPLOAD_AUDIO_CALCULAR_HASH)
+    arquivo_enviado = (file.filename or "audio.wav", leitor, file.content_type or "audio/wav")
+    normalizado = None
+
+    if normalizar:
+        inicio = time.perf_counter()
+        try:
+            normalizado, metodo = await normalizar_audio(leitor)
+            nome_base = (file.filename or "audio").rsplit(".", 1)[0]
+            arquivo_enviado = (f"{nome_base}.wav", normalizado, "audio/wav")
+            print(f"🎚️ Áudio normalizado ({metodo}): {leitor.bytes_lidos} -> {len(normalizado)} bytes")
+        except ErroNormalizacao as e:
+            print(f"⚠️ Normalização ignorada: {e}")
+            metricas_transcricao["normalizacoes_ignoradas"] += 1
+            await file.seek(0)
+            leitor = LeitorComHash(file.file, calcular_hash=UPLOAD_AUDIO_CALCULAR_HASH)
+            arquivo_enviado = (file.filename or "audio.wav", leitor, file.content_type or "audio/wav")
+        tempos["normalizacao"] = 1000 * (time.perf_counter() - inicio)
+
+    async with admissao_tts.admitir(prioridade):
+        try:
+            # Fazer requisição para o serviço STT usando multipart form data (enviado em blocos)
+            async with httpx.AsyncClient(timeout=120.0) as client:
+                files = {"file": arquivo_enviado}
+
+                inicio = time.perf_counter()
+                response = await client.post(
+                    f"{TTS_SERVICE_URL}/api/transcribe-audio",
+                    files=files
+                )
+                tempos["stt"] = 1000 * (time.perf_counter() - inicio)
+                registrar_resposta(disjuntor_tts, response)
+
+                if response.status_code == 200:
+                    registrar_transcricao(leitor.bytes_lidos, normalizado, tempos)
+                    return response.json(), leitor.sha256, tempos
+                elif response.status_code == 503:
+                    raise HTTPException(
+                        status_code=503,
+                        detail="Serviço STT não disponível. Certifique-se de que o serviço está rodando."
+                    )
+                else:
+                    raise HTTPException(
+                        status_code=response.status_code,
+                        detail=f"Erro ao transcrever áudio: {response.text}"
+                    )
+
+        except httpx.ConnectError:
+            disjuntor_tts.registrar_falha()
+            raise HTTPException(
+                status_code=503,
+                detail=f"Não foi possível conectar ao serviço STT em {TTS_SERVICE_URL}. Verifique se o serviço está rodando."
+            )
+        except httpx.TimeoutException:
+            disjuntor_tts.registrar_falha()
+            raise HTTPException(
+                status_code=504,
+                detail="Timeout ao transcrever áudio. O serviço STT demorou muito para responder."
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Erro interno ao transcrever áudio: {str(e)}"
+            )
 
 
 @app.post("/api/transcrever-audio")
-async def transcrever_audio(file: UploadFile = File(...)):
+async def transcrever_audio(
+    http_request: Request,
+    resposta_http: Response,
+    file: UploadFile = File(...),
+    normalizar: Optional[bool] = None
+):
     """
     Endpoint para transcrever áudio em texto (STT).
 
-    Faz proxy para o serviço TTS/STT local.
+    Faz proxy para o serviço TTS/STT local, respeitando o controle de
+    admissão do serviço (ver admissao_tts). O upload é limitado a
+    UPLOAD_AUDIO_LIMITE_MB (413 se maior) e repassado ao serviço STT em
+    streaming; o SHA-256 do áudio, quando calculado, vai no cabeçalho
+    X-Audio-SHA256. Os tempos de cada etapa vão no cabeçalho Server-Timing.
 
     Args:
+        http_request: Requisição HTTP original (prioridade)
+        resposta_http: Resposta HTTP (cabeçalhos X-Audio-SHA256 e Server-Timing)
         file: Arquivo de áudio para transcrição
+        normalizar: Normaliza o áudio antes do envio (padrão: NORMALIZAR_AUDIO_STT)
 
     Returns:
         JSON com texto transcrito, idioma detectado e segmentos
@@ -311,112 +1115,1394 @@ async def transcrever_audio(file: UploadFile = File(...)):
     Raises:
         HTTPException: Se houver erro na transcrição ou serviço indisponível
     """
-    try:
-        # Ler arquivo de áudio
-        audio_bytes = await file.read()
+    transcricao, sha256, tempos = await transcrever_upload(
+        file,
+        prioridade_da_requisicao(http_request),
+        normalizar=NORMALIZAR_AUDIO_STT if normalizar is None else normalizar
+    )
+    if sha256:
+        resposta_http.headers["X-Audio-SHA256"] = sha256
+    resposta_http.headers["Server-Timing"] = ", ".join(
+        f"{etapa};dur={duracao:.1f}" for etapa, duracao in tempos.items()
+    )
+    return transcricao
+
+
+async def transmitir_chat_ollama(payload: Dict[str, Any], http_request: Request) -> StreamingResponse:
+    """
+    Repassa ao cliente, em streaming, a resposta do Ollama.
 
-        # Fazer requisição para o serviço STT usando multipart form data
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            files = {
-                "file": (file.filename or "audio.wav", audio_bytes, file.content_type or "audio/wav")
-            }
+    Cada linha NDJSON emitida pelo Ollama é encaminhada assim que chega. Se o
+    cliente pedir "Accept: text/event-stream", as linhas são enviadas como
+    eventos SSE. Quando o cliente desconecta, o gerador é cancelado e a
+    conexão com o Ollama é fechada, o que interrompe a geração no upstream.
+
+    Args:
+        payload: Corpo da requisição para /api/chat do Ollama
+        http_request: Requisição HTTP original (negociação do formato)
+
+    Returns:
+        StreamingResponse com NDJSON ou SSE
+
+    Raises:
+        HTTPException: Se o Ollama estiver indisponível ou responder com erro
+        ErroAdmissao: Se a fila do Ollama estiver cheia ou a espera esgotar
+        CircuitoAberto: Se o disjuntor do Ollama estiver aberto
+    """
+    disjuntor_ollama.verificar()
+    # A vaga no Ollama fica ocupada até o fim do streaming
+    admitido_em = await admissao_ollama.adquirir(prioridade_da_requisicao(http_request))
+    client: Optional[httpx.AsyncClient] = None
+    upstream: Optional[httpx.Response] = None
+    encerrado = False
+
+    async def encerrar():
+        # Idempotente: chamado pelo gerador, pela tarefa de fundo e em qualquer erro
+        nonlocal encerrado
+        if encerrado:
+            return
+        encerrado = True
+        try:
+            if upstream is not None:
+                await upstream.aclose()
+            if client is not None:
+                await client.aclose()
+        finally:
+            admissao_ollama.liberar(admitido_em)
 
-            response = await client.post(
-                f"{TTS_SERVICE_URL}/api/transcribe-audio",
-                files=files
+    try:
+        client = httpx.AsyncClient(timeout=60.0)
+        try:
+            upstream = await client.send(
+                client.build_request("POST", f"{OLLAMA_SERVICE_URL}/api/chat", json=payload),
+                stream=True
+            )
+        except httpx.ConnectError:
+            disjuntor_ollama.registrar_falha()
+            raise HTTPException(
+                status_code=503,
+                detail=f"Não foi possível conectar ao serviço Ollama em {OLLAMA_SERVICE_URL}. Verifique se o Ollama está rodando."
+            )
+        except httpx.TimeoutException:
+            disjuntor_ollama.registrar_falha()
+            raise HTTPException(
+                status_code=504,
+                detail="Timeout ao consultar Ollama. O serviço demorou muito para responder."
             )
 
-            if response.status_code == 200:
-                return response.json()
-            elif response.status_code == 503:
-                raise HTTPException(
-                    status_code=503,
-                    detail="Serviço STT não disponível. Certifique-se de que o serviço está rodando."
-                )
-            else:
+        registrar_resposta(disjuntor_ollama, upstream)
+        if upstream.status_code != 200:
+            corpo = (await upstream.aread()).decode("utf-8", errors="replace")
+            if upstream.status_code == 404:
                 raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Erro ao transcrever áudio: {response.text}"
+                    status_code=404,
+                    detail=f"Modelo '{payload['model']}' não encontrado no Ollama. Verifique se o modelo está instalado."
                 )
+            raise HTTPException(
+                status_code=upstream.status_code,
+                detail=f"Erro ao consultar Ollama: {corpo}"
+            )
+    except BaseException:
+        # Qualquer falha (inclusive cancelamento) antes do streaming devolve a vaga
+        await encerrar()
+        raise
+
+    sse = "text/event-stream" in http_request.headers.get("accept", "")
+
+    async def gerar():
+        try:
+            async for linha in upstream.aiter_lines():
+                if not linha.strip():
+                    continue
+                if '"load_duration"' in linha:
+                    # Última linha do streaming: traz os tempos da geração
+                    try:
+                        aquecedor_ollama.registrar_resposta(json.loads(linha))
+                    except ValueError:
+                        pass
+                yield f"data: {linha}\n\n" if sse else f"{linha}\n"
+        finally:
+            # Executado também quando o cliente desconecta (gerador cancelado)
+            await encerrar()
+
+    # Se o gerador nunca for iterado (cliente desconectado antes do início),
+    # o seu finally não roda: a tarefa de fundo devolve a vaga nesse caso
+    return StreamingResponse(
+        gerar(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(encerrar)
+    )
+
+
+async def receber_ate_json(client: httpx.AsyncClient, url: str, payload: Dict[str, Any]) -> httpx.Response:
+    """
+    Consulta o /api/chat do Ollama em streaming e encerra a geração quando o JSON fecha.
 
-    except httpx.ConnectError:
-        raise HTTPException(
-            status_code=503,
-            detail=f"Não foi possível conectar ao serviço STT em {TTS_SERVICE_URL}. Verifique se o serviço está rodando."
-        )
-    except httpx.TimeoutException:
-        raise HTTPException(
-            status_code=504,
-            detail="Timeout ao transcrever áudio. O serviço STT demorou muito para responder."
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Erro interno ao transcrever áudio: {str(e)}"
+    O modelo costuma continuar gerando (espaços, quebras de linha) depois de
+    fechar o objeto pedido em "format"; ao fechar a conexão assim que o
+    objeto está completo, o Ollama interrompe a geração.
+
+    Returns:
+        Resposta HTTP com o mesmo corpo de uma chamada sem streaming; se a
+        geração foi interrompida, done_reason é "json_completo"
+    """
+    upstream = await client.send(
+        client.build_request("POST", url, json={**payload, "stream": True}),
+        stream=True
+    )
+    try:
+        if upstream.status_code != 200:
+            await upstream.aread()
+            return upstream
+
+        detector = DetectorFimJSON()
+        conteudo = ""
+        ultima: Dict[str, Any] = {}
+        async for linha in upstream.aiter_lines():
+            if not linha.strip():
+                continue
+            ultima = json.loads(linha)
+            trecho = (ultima.get("message") or {}).get("content", "")
+            conteudo += trecho
+            if ultima.get("done"):
+                break
+            fim = detector.alimentar(trecho)
+            if fim is not None:
+                conteudo = conteudo[:fim]
+                ultima = {**ultima, "done": True, "done_reason": "json_completo"}
+                break
+        return httpx.Response(
+            200,
+            json={**ultima, "message": {"role": "assistant", "content": conteudo}}
         )
+    finally:
+        await upstream.aclose()
 
 
-@app.post("/api/chat")
-async def chat_with_ollama(request: OllamaChatRequest):
+async def enviar_ao_ollama(
+    rota: str,
+    payload: Dict[str, Any],
+    modelo_pedido: Optional[str],
+    prioridade: int,
+    parar_no_json: bool = False
+) -> Dict[str, Any]:
     """
-    Endpoint para consultar LLM via Ollama.
-
-    Faz proxy para o serviço Ollama local.
+    Faz uma chamada sem streaming ao Ollama, passando pelo controle de admissão.
 
     Args:
-        request: Requisição contendo modelo, mensagens e opção de streaming
+        rota: Rota do Ollama ("/api/chat" ou "/api/generate")
+        payload: Corpo da requisição
+        modelo_pedido: Modelo informado pelo cliente (usado nas mensagens de erro)
+        prioridade: Prioridade na fila de admissão
+        parar_no_json: Recebe em streaming e encerra a geração assim que o
+            JSON da resposta fecha (ver receber_ate_json)
 
     Returns:
         JSON com resposta do LLM
 
     Raises:
         HTTPException: Se houver erro na consulta ou serviço indisponível
+        ErroAdmissao: Se a fila do Ollama estiver cheia ou a espera esgotar
     """
-    try:
-        # Usar modelo da variável de ambiente se não especificado
-        model_to_use = request.model if request.model else OLLAMA_MODEL
-
-        print(f"🤖 Usando modelo Ollama: {model_to_use}")
-
-        # Fazer requisição para o serviço Ollama
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{OLLAMA_SERVICE_URL}/api/chat",
-                json={
-                    "model": model_to_use,
-                    "messages": [msg.model_dump() for msg in request.messages],
-                    "stream": request.stream
-                }
+    async with admissao_ollama.admitir(prioridade):
+        registrar_admissao()
+        try:
+            print(f"🤖 Usando modelo Ollama: {payload['model']}")
+
+            # Fazer requisição para o serviço Ollama
+            async with httpx.AsyncClient(timeout=60.0) as client:
+                if parar_no_json:
+                    response = await receber_ate_json(client, f"{OLLAMA_SERVICE_URL}{rota}", payload)
+                else:
+                    response = await client.post(
+                        f"{OLLAMA_SERVICE_URL}{rota}",
+                        json=payload
+                    )
+                registrar_resposta(disjuntor_ollama, response)
+
+                if response.status_code == 200:
+                    resposta = response.json()
+                    aquecedor_ollama.registrar_resposta(resposta)
+                    return resposta
+                elif response.status_code == 404:
+                    raise HTTPException(
+                        status_code=404,
+                        detail=f"Modelo '{modelo_pedido}' não encontrado no Ollama. Verifique se o modelo está instalado."
+                    )
+                else:
+                    raise HTTPException(
+                        status_code=response.status_code,
+                        detail=f"Erro ao consultar Ollama: {response.text}"
+                    )
+
+        except httpx.ConnectError:
+            disjuntor_ollama.registrar_falha()
+            raise HTTPException(
+                status_code=503,
+                detail=f"Não foi possível conectar ao serviço Ollama em {OLLAMA_SERVICE_URL}. Verifique se o Ollama está rodando."
+            )
+        except httpx.TimeoutException:
+            disjuntor_ollama.registrar_falha()
+            raise HTTPException(
+                status_code=504,
+                detail="Timeout ao consultar Ollama. O serviço demorou muito para responder."
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Erro interno ao consultar Ollama: {str(e)}"
             )
 
-            if response.status_code == 200:
-                return response.json()
-            elif response.status_code == 404:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Modelo '{request.model}' não encontrado no Ollama. Verifique se o modelo está instalado."
-                )
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Erro ao consultar Ollama: {response.text}"
-                )
-
-    except httpx.ConnectError:
-        raise HTTPException(
-            status_code=503,
-            detail=f"Não foi possível conectar ao serviço Ollama em {OLLAMA_SERVICE_URL}. Verifique se o Ollama está rodando."
+
+async def consultar_ollama(
+    payload: Dict[str, Any],
+    usar_cache: bool = False,
+    prompt_id: Optional[str] = None,
+    modelo_pedido: Optional[str] = None,
+    prioridade: int = PRIORIDADE_INTERATIVA,
+    parar_no_json: bool = False
+) -> Dict[str, Any]:
+    """
+    Envia ao Ollama uma requisição de chat sem streaming.
+
+    Requisições idênticas em andamento ao mesmo tempo compartilham uma única
+    chamada ao Ollama (ver coalescedor_llm), que passa pelo controle de
+    admissão do serviço (ver admissao_ollama). Com usar_cache, a resposta é
+    servida do cache de respostas ou armazenada nele.
+
+    Args:
+        payload: Corpo da requisição para /api/chat do Ollama
+        usar_cache: Se True, consulta e alimenta o cache de respostas
+        prompt_id: Prompt de origem (registrado nos metadados do cache)
+        modelo_pedido: Modelo informado pelo cliente (usado nas mensagens de erro)
+        prioridade: Prioridade na fila de admissão
+        parar_no_json: Encerra a geração assim que o JSON da resposta fecha
+
+    Returns:
+        JSON com resposta do LLM
+
+    Raises:
+        HTTPException: Se houver erro na consulta ou serviço indisponível
+        ErroAdmissao: Se a fila do Ollama estiver cheia ou a espera esgotar
+        CircuitoAberto: Se o disjuntor do Ollama estiver aberto
+    """
+    model_to_use = payload["model"]
+    chave = chave_chat(model_to_use, payload["messages"], payload.get("options"), payload.get("format"))
+    if usar_cache:
+        em_cache = cache_llm.obter(chave)
+        if em_cache is not None:
+            return json.loads(em_cache[0])
+
+    disjuntor_ollama.verificar()
+
+    async def consultar() -> Dict[str, Any]:
+        return await enviar_ao_ollama("/api/chat", payload, modelo_pedido, prioridade, parar_no_json)
+
+    resposta = await coalescedor_llm.executar(chave, consultar)
+    if usar_cache and resposta.get("done", True):
+        cache_llm.armazenar(
+            chave,
+            json.dumps(resposta, ensure_ascii=False).encode("utf-8"),
+            {"modelo": model_to_use, "prompt_id": prompt_id}
         )
-    except httpx.TimeoutException:
+    return resposta
+
+
+def montar_payload_chat(request: OllamaChatRequest) -> Dict[str, Any]:
+    """
+    Monta o corpo da requisição para /api/chat do Ollama.
+
+    Args:
+        request: Requisição de chat
+
+    Returns:
+        Payload com modelo (OLLAMA_MODEL se não informado), mensagens,
+        streaming, opções de geração e keep_alive (OLLAMA_KEEP_ALIVE)
+    """
+    # Usar modelo da variável de ambiente se não especificado
+    model_to_use = request.model if request.model else OLLAMA_MODEL
+    payload = {
+        "model": model_to_use,
+        "messages": [msg.model_dump() for msg in request.messages],
+        "stream": request.stream
+    }
+    if request.options:
+        payload["options"] = request.options
+    if OLLAMA_KEEP_ALIVE:
+        payload["keep_alive"] = OLLAMA_KEEP_ALIVE
+    return payload
+
+
+@app.post("/api/chat")
+async def chat_with_ollama(request: OllamaChatRequest, http_request: Request):
+    """
+    Endpoint para consultar LLM via Ollama.
+
+    Faz proxy para o serviço Ollama local. Com stream=true, os tokens são
+    repassados ao cliente à medida que o Ollama os gera (NDJSON, ou SSE com
+    "Accept: text/event-stream"). Respostas de prompts com cache habilitado
+    (ver usar_cache_llm) são servidas do cache sem consultar o Ollama, e
+    requisições idênticas simultâneas compartilham uma única consulta.
+
+    Args:
+        request: Requisição contendo modelo, mensagens e opção de streaming
+        http_request: Requisição HTTP original
+
+    Returns:
+        JSON com resposta do LLM, ou streaming NDJSON/SSE se stream=true
+
+    Raises:
+        HTTPException: Se houver erro na consulta ou serviço indisponível
+    """
+    payload = montar_payload_chat(request)
+
+    if request.stream:
+        return await transmitir_chat_ollama(payload, http_request)
+
+    return await consultar_ollama(
+        payload,
+        usar_cache=usar_cache_llm(request),
+        prompt_id=request.prompt_id,
+        modelo_pedido=request.model,
+        prioridade=prioridade_da_requisicao(http_request)
+    )
+
+
+@app.post("/api/chat/conversas", status_code=201)
+async def criar_conversa(request: CriarConversaRequest):
+    """
+    Endpoint para iniciar uma conversa com o LLM mantida no servidor.
+
+    Em vez de reenviar todo o histórico a cada turno (como em /api/chat), o
+    cliente envia só a nova mensagem a /api/chat/conversas/{conversa_id}, e o
+    servidor reaproveita o contexto devolvido pelo Ollama no turno anterior.
+    Conversas sem uso por CONVERSAS_TTL_SEGUNDOS expiram; acima de
+    CONVERSAS_LIMITE conversas ou CONVERSAS_LIMITE_TOKENS tokens de contexto,
+    as usadas há mais tempo são descartadas.
+
+    Args:
+        request: Modelo, mensagem de sistema e opções de geração
+
+    Returns:
+        JSON com conversa_id, o modelo e o prazo de expiração por inatividade
+    """
+    conversa = gerenciador_conversas.criar(
+        request.model if request.model else OLLAMA_MODEL,
+        sistema=request.system,
+        opcoes=request.options
+    )
+    return {
+        "conversa_id": conversa.conversa_id,
+        "model": conversa.modelo,
+        "expira_apos_segundos": gerenciador_conversas.ttl_segundos
+    }
+
+
+def montar_payload_conversa(conversa: Conversa, request: TurnoConversaRequest) -> Dict[str, Any]:
+    """
+    Monta o corpo da requisição para /api/generate do Ollama com o novo turno.
+
+    A mensagem de sistema só vai no primeiro turno; nos seguintes ela já faz
+    parte do contexto.
+    """
+    payload = {
+        "model": conversa.modelo,
+        "prompt": request.content,
+        "stream": False
+    }
+    if conversa.contexto:
+        payload["context"] = conversa.contexto
+    elif conversa.sistema:
+        payload["system"] = conversa.sistema
+    opcoes = request.options if request.options is not None else conversa.opcoes
+    if opcoes:
+        payload["options"] = opcoes
+    if OLLAMA_KEEP_ALIVE:
+        payload["keep_alive"] = OLLAMA_KEEP_ALIVE
+    return payload
+
+
+@app.post("/api/chat/conversas/{conversa_id}")
+async def enviar_turno_conversa(conversa_id: str, request: TurnoConversaRequest, http_request: Request):
+    """
+    Endpoint para enviar um turno de uma conversa iniciada em /api/chat/conversas.
+
+    Turnos simultâneos da mesma conversa são processados um de cada vez.
+
+    Args:
+        conversa_id: Identificador da conversa
+        request: Mensagem do usuário e opções de geração
+        http_request: Requisição HTTP original
+
+    Returns:
+        JSON com a resposta do LLM no formato de /api/chat (message), o
+        número do turno e as contagens de tokens do Ollama
+
+    Raises:
+        HTTPException: 404 se a conversa não existir ou tiver expirado, e os
+            mesmos erros de /api/chat
+    """
+    conversa = gerenciador_conversas.obter(conversa_id)
+    if conversa is None:
+        raise HTTPException(status_code=404, detail=f"Conversa '{conversa_id}' não encontrada ou expirada")
+
+    disjuntor_ollama.verificar()
+    async with conversa.trava:
+        resposta = await enviar_ao_ollama(
+            "/api/generate",
+            montar_payload_conversa(conversa, request),
+            conversa.modelo,
+            prioridade_da_requisicao(http_request)
+        )
+        gerenciador_conversas.registrar_turno(conversa, resposta.get("context"))
+
+    return {
+        "conversa_id": conversa.conversa_id,
+        "model": conversa.modelo,
+        "turno": conversa.turnos,
+        "message": {"role": "assistant", "content": resposta.get("response", "")},
+        "done": resposta.get("done", True),
+        **{
+            campo: resposta[campo]
+            for campo in ("total_duration", "load_duration", "prompt_eval_count", "eval_count")
+            if campo in resposta
+        }
+    }
+
+
+def renderizar_prompt(prompt_id: str, parametros: Dict[str, Any]) -> Tuple[TemplateCompilado, str]:
+    """
+    Obtém o template pré-compilado do prompt e o renderiza.
+
+    Args:
+        prompt_id: Identificador do prompt na base
+        parametros: Valores dos parâmetros do template
+
+    Returns:
+        Tupla (template compilado, texto do prompt)
+
+    Raises:
+        HTTPException: 404 se o prompt ou o arquivo não existir, 422 se faltarem
+            parâmetros ou a base for inválida
+    """
+    try:
+        template = validador.obter_template(prompt_id)
+        return template, template.renderizar(parametros)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Prompt '{prompt_id}' não encontrado")
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=f"Arquivo não encontrado: {str(e)}")
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=f"Erro de validação: {str(e)}")
+    except ErroTemplate as e:
+        raise HTTPException(status_code=422, detail=f"Erro no template: {str(e)}")
+
+
+async def consultar_estruturado(
+    template: TemplateCompilado,
+    requisicao: OllamaChatRequest,
+    prioridade: int = PRIORIDADE_INTERATIVA
+) -> Dict[str, Any]:
+    """
+    Consulta o Ollama exigindo uma resposta no formato de estrutura_esperada.
+
+    O esquema do prompt vai no campo "format" do Ollama, que restringe a
+    geração a JSON compatível. A resposta é decodificada e conferida pelo
+    validador pré-compilado do prompt; se não passar, a consulta é repetida
+    (sem cache) até RESPOSTA_ESTRUTURADA_TENTATIVAS vezes. A resposta é
+    recebida em streaming e a geração é encerrada assim que o objeto JSON
+    fecha, sem esperar o modelo parar sozinho.
+
+    Args:
+        template: Template compilado do prompt (com esquema)
+        requisicao: Requisição de chat já renderizada
+        prioridade: Prioridade na fila de admissão
+
+    Returns:
+        JSON com resposta do LLM acrescido de "dados" (resposta decodificada)
+
+    Raises:
+        HTTPException: 502 se nenhuma tentativa produzir uma resposta válida,
+            e os mesmos erros de /api/chat na consulta ao Ollama
+    """
+    payload = montar_payload_chat(requisicao)
+    payload["format"] = template.esquema
+    usar_cache = usar_cache_llm(requisicao)
+
+    erros: List[str] = []
+    for _ in range(max(1, RESPOSTA_ESTRUTURADA_TENTATIVAS)):
+        resposta = await consultar_ollama(
+            payload,
+            usar_cache=usar_cache,
+            prompt_id=requisicao.prompt_id,
+            modelo_pedido=requisicao.model,
+            prioridade=prioridade,
+            parar_no_json=True
+        )
+        try:
+            dados = json.loads(resposta["message"]["content"])
+        except (KeyError, TypeError, ValueError):
+            erros = ["$: a resposta não é um JSON válido"]
+        else:
+            erros = template.validar_resposta(dados)
+            if not erros:
+                return {**resposta, "dados": dados}
+
+        print(f"⚠️ Resposta fora da estrutura esperada ({requisicao.prompt_id}): {erros}")
+        if usar_cache:
+            # Não reaproveitar a resposta inválida na próxima tentativa
+            cache_llm.remover(
+                chave_chat(payload["model"], payload["messages"], payload.get("options"), payload["format"])
+            )
+
+    raise HTTPException(
+        status_code=502,
+        detail=f"Resposta do LLM fora da estrutura esperada: {'; '.join(erros)}"
+    )
+
+
+async def executar_template(
+    template: TemplateCompilado,
+    requisicao: OllamaChatRequest,
+    estruturada: Optional[bool],
+    prioridade: int = PRIORIDADE_INTERATIVA
+) -> Dict[str, Any]:
+    """
+    Envia ao Ollama um prompt da base já renderizado.
+
+    As opções de geração do prompt (opcoes_geracao) vão no campo options do
+    Ollama; as informadas na requisição têm precedência. Se o prompt tiver
+    regra de roteamento e a requisição não fixar o modelo, a consulta é
+    feita pelo roteador_modelos (modelo principal, reserva, orçamento de
+    latência e redundância).
+
+    Args:
+        template: Template compilado do prompt
+        requisicao: Requisição de chat já renderizada
+        estruturada: Força (True) ou desativa (False) o modo estruturado; None
+            segue resposta_estruturada do prompt
+        prioridade: Prioridade na fila de admissão
+
+    Returns:
+        JSON com resposta do LLM (com "dados" no modo estruturado)
+
+    Raises:
+        HTTPException: 504 se o orçamento de latência esgotar sem modelo
+            reserva, e os mesmos erros de /api/chat
+    """
+    if estruturada is None:
+        estruturada = template.prompt.resposta_estruturada
+    if template.prompt.opcoes_geracao is not None:
+        requisicao = requisicao.model_copy(update={"options": {
+            **template.prompt.opcoes_geracao.model_dump(exclude_none=True),
+            **(requisicao.options or {})
+        }})
+    regra = template.prompt.roteamento
+    if regra is None or requisicao.model:
+        return await consultar_template(template, requisicao, estruturada, prioridade)
+
+    try:
+        return await roteador_modelos.executar(
+            template.prompt.prompt_id,
+            lambda modelo: consultar_template(
+                template, requisicao.model_copy(update={"model": modelo}), estruturada, prioridade
+            ),
+            regra.modelo_principal or OLLAMA_MODEL,
+            modelo_reserva=regra.modelo_reserva,
+            orcamento_ms=regra.orcamento_latencia_ms,
+            redundancia=regra.redundancia
+        )
+    except OrcamentoEsgotado as e:
         raise HTTPException(
             status_code=504,
-            detail="Timeout ao consultar Ollama. O serviço demorou muito para responder."
+            detail=f"Timeout ao consultar Ollama: orçamento de latência de {e.orcamento_ms:.0f} ms esgotado."
         )
-    except Exception as e:
+
+
+async def consultar_template(
+    template: TemplateCompilado,
+    requisicao: OllamaChatRequest,
+    estruturada: bool,
+    prioridade: int
+) -> Dict[str, Any]:
+    """Consulta o Ollama com o prompt renderizado, no modo estruturado se pedido e houver esquema."""
+    if estruturada and template.esquema is not None:
+        return await consultar_estruturado(template, requisicao, prioridade)
+
+    return await consultar_ollama(
+        montar_payload_chat(requisicao),
+        usar_cache=usar_cache_llm(requisicao),
+        prompt_id=requisicao.prompt_id,
+        modelo_pedido=requisicao.model,
+        prioridade=prioridade
+    )
+
+
+@app.post("/api/chat/lote")
+async def chat_em_lote(request: ChatLoteRequest):
+    """
+    Endpoint para avaliar vários prompts em uma única requisição.
+
+    Os itens são enviados ao Ollama com concorrência limitada
+    (CHAT_LOTE_CONCORRENCIA) e prioridade de lote na fila de admissão, de
+    modo que requisições interativas passem à frente. Cada item usa o mesmo
+    caminho de /api/chat (cache por prompt_id e coalescência). Os
+    resultados voltam na ordem dos itens; a falha de um item não interrompe
+    os demais e é reportada no próprio item.
+
+    Args:
+        request: Itens do lote (prompt_id + parametros ou messages) e modelo
+
+    Returns:
+        JSON com a lista de resultados e as contagens de sucessos e falhas
+
+    Raises:
+        HTTPException: 422 se o lote exceder CHAT_LOTE_MAX_ITENS
+    """
+    if len(request.itens) > CHAT_LOTE_MAX_ITENS:
         raise HTTPException(
-            status_code=500,
-            detail=f"Erro interno ao consultar Ollama: {str(e)}"
+            status_code=422,
+            detail=f"O lote excede o máximo de {CHAT_LOTE_MAX_ITENS} itens"
+        )
+
+    semaforo = asyncio.Semaphore(CHAT_LOTE_CONCORRENCIA)
+
+    async def avaliar(indice: int, item: ItemChatLote) -> Dict[str, Any]:
+        async with semaforo:
+            try:
+                requisicao = OllamaChatRequest(
+                    model=request.model,
+                    messages=item.messages or [],
+                    options=item.options,
+                    prompt_id=item.prompt_id,
+                    cache=item.cache
+                )
+                if item.messages:
+                    resposta = await consultar_ollama(
+                        montar_payload_chat(requisicao),
+                        usar_cache=usar_cache_llm(requisicao),
+                        prompt_id=requisicao.prompt_id,
+                        modelo_pedido=requisicao.model,
+                        prioridade=PRIORIDADE_LOTE
+                    )
+                else:
+                    template, conteudo = renderizar_prompt(item.prompt_id, item.parametros)
+                    requisicao.messages = [OllamaMessage(role="user", content=conteudo)]
+                    resposta = await executar_template(template, requisicao, item.estruturada, PRIORIDADE_LOTE)
+                return {"indice": indice, "sucesso": True, "resposta": resposta}
+            except HTTPException as e:
+                erro = {"status": e.status_code, "detalhe": e.detail}
+            except (ErroAdmissao, CircuitoAberto) as e:
+                erro = {"status": e.status_code, "detalhe": str(e)}
+            except Exception as e:
+                erro = {"status": 500, "detalhe": f"Erro interno: {str(e)}"}
+            return {"indice": indice, "sucesso": False, "erro": erro}
+
+    resultados = await asyncio.gather(*(avaliar(i, item) for i, item in enumerate(request.itens)))
+    sucessos = sum(1 for resultado in resultados if resultado["sucesso"])
+    return {
+        "resultados": resultados,
+        "sucessos": sucessos,
+        "falhas": len(resultados) - sucessos
+    }
+
+
+@app.post("/api/prompts/{prompt_id}/executar")
+async def executar_prompt(prompt_id: str, request: ExecutarPromptRequest, http_request: Request):
+    """
+    Endpoint para executar um prompt da base enviando apenas os parâmetros.
+
+    O template, pré-compilado quando os prompts são salvos, é renderizado no
+    servidor e enviado ao Ollama pelo mesmo caminho de /api/chat (incluindo o
+    cache de respostas por prompt_id). Prompts com resposta_estruturada são
+    executados no modo estruturado (ver consultar_estruturado), e a resposta
+    já decodificada e validada vem em "dados".
+
+    Args:
+        prompt_id: Identificador do prompt na base
+        request: Parâmetros do template e opções da execução
+        http_request: Requisição HTTP original
+
+    Returns:
+        JSON com resposta do LLM (com "dados" no modo estruturado)
+
+    Raises:
+        HTTPException: 404 se o prompt não existir, 422 se faltarem parâmetros,
+            502 se a resposta estruturada for inválida, e os mesmos erros de
+            /api/chat na consulta ao Ollama
+    """
+    template, conteudo = renderizar_prompt(prompt_id, request.parametros)
+
+    return await executar_template(
+        template,
+        OllamaChatRequest(
+            model=request.model,
+            messages=[OllamaMessage(role="user", content=conteudo)],
+            prompt_id=prompt_id,
+            cache=request.cache
+        ),
+        request.estruturada,
+        prioridade_da_requisicao(http_request)
+    )
+
+
+async def comentar_erro_numero(
+    numero: str,
+    forma_esperada: str,
+    resposta: str,
+    modelo: Optional[str],
+    prioridade: int
+) -> Optional[str]:
+    """
+    Pede ao LLM um comentário sobre uma resposta incorreta da prática de números.
+
+    Returns:
+        Texto do comentário, ou None se o prompt NUMEROS_PROMPT_COMENTARIO não
+        existir na base ou o Ollama não responder
+    """
+    try:
+        template, conteudo = renderizar_prompt(NUMEROS_PROMPT_COMENTARIO, {
+            "numero": numero,
+            "forma_esperada": forma_esperada,
+            "resposta": resposta,
+            "idioma": "Alemão",
+        })
+        resposta_llm = await executar_template(
+            template,
+            OllamaChatRequest(
+                model=modelo,
+                messages=[OllamaMessage(role="user", content=conteudo)],
+                prompt_id=NUMEROS_PROMPT_COMENTARIO
+            ),
+            estruturada=False,
+            prioridade=prioridade
+        )
+    except (HTTPException, ErroAdmissao, CircuitoAberto) as e:
+        print(f"⚠️ Comentário do LLM indisponível: {getattr(e, 'detail', e)}")
+        return None
+    return resposta_llm["message"]["content"].strip() or None
+
+
+# Comentários das respostas verificadas por NUMEROS_PROMPT_VERIFICACAO, por (campo, correto)
+COMENTARIOS_VERIFICACAO_NUMERO = {
+    ("texto", True): "Correto! Você escreveu o número corretamente.",
+    ("texto", False): "Incorreto. Revise como escrever este número.",
+    ("audio", True): "Correto! Sua pronúncia está correta.",
+    ("audio", False): "Incorreto. Revise a pronúncia deste número.",
+}
+
+
+async def verificar_numero_com_llm(
+    numero: str,
+    resposta: str,
+    idioma: str,
+    modelo: Optional[str],
+    prioridade: int
+) -> bool:
+    """
+    Pergunta ao LLM se uma resposta da prática de números equivale ao número.
+
+    Returns:
+        Campo "equivalente" da resposta do prompt NUMEROS_PROMPT_VERIFICACAO
+
+    Raises:
+        HTTPException: 404 se o prompt não existir, 502 se a resposta não
+            trouxer "equivalente", e os mesmos erros de /api/prompts/{prompt_id}/executar
+    """
+    template, conteudo = renderizar_prompt(NUMEROS_PROMPT_VERIFICACAO, {
+        "numero": numero,
+        "texto_usuario": resposta,
+        "idioma": NOMES_IDIOMAS.get(idioma, idioma),
+    })
+    resposta_llm = await executar_template(
+        template,
+        OllamaChatRequest(
+            model=modelo,
+            messages=[OllamaMessage(role="user", content=conteudo)],
+            prompt_id=NUMEROS_PROMPT_VERIFICACAO
+        ),
+        estruturada=None,
+        prioridade=prioridade
+    )
+    dados = resposta_llm.get("dados")
+    if dados is None:
+        conteudo = resposta_llm["message"]["content"].strip()
+        conteudo = conteudo.removeprefix("```json").removeprefix("```").removesuffix("```")
+        try:
+            dados = json.loads(conteudo)
+        except ValueError:
+            dados = None
+    if not isinstance(dados, dict) or not isinstance(dados.get("equivalente"), bool):
+        raise HTTPException(status_code=502, detail="Resposta do LLM sem o campo booleano 'equivalente'")
+    return dados["equivalente"]
+
+
+async def verificar_resposta_numero(
+    numero: str,
+    campo: str,
+    resposta: str,
+    idioma: str,
+    comentar_com_llm: bool,
+    modelo: Optional[str],
+    prioridade: int
+) -> Tuple[bool, str]:
+    """
+    Verifica uma resposta (texto digitado ou transcrição) da prática de números.
+
+    No alemão a correção é local (numeros_alemao) e o LLM só comenta
+    respostas incorretas, se comentar_com_llm for verdadeiro; nos demais
+    idiomas a correção é feita pelo prompt NUMEROS_PROMPT_VERIFICACAO.
+
+    Args:
+        numero: Número de referência
+        campo: "texto" (exige a forma por extenso no alemão) ou "audio"
+        resposta: Resposta do usuário
+        idioma: Idioma praticado (valor de IdiomaEnum)
+        comentar_com_llm: Comenta respostas incorretas em alemão com o LLM
+        modelo: Modelo do Ollama (None usa OLLAMA_MODEL)
+        prioridade: Prioridade na fila de admissão
+
+    Returns:
+        Tupla (correto, comentário)
+
+    Raises:
+        ValueError: Se o número de referência for inválido (alemão)
+    """
+    if idioma != IdiomaEnum.alemao.value:
+        correto = await verificar_numero_com_llm(numero, resposta, idioma, modelo, prioridade)
+        return correto, COMENTARIOS_VERIFICACAO_NUMERO[(campo, correto)]
+
+    avaliacao = avaliar_resposta(numero, resposta, exigir_extenso=campo == "texto")
+    comentario = avaliacao["comentario"]
+    if comentar_com_llm and not avaliacao["correto"]:
+        comentario = await comentar_erro_numero(
+            numero, avaliacao["forma_esperada"], resposta, modelo, prioridade
+        ) or comentario
+    return avaliacao["correto"], comentario
+
+
+@app.post("/api/pratica/numeros/avaliar", response_model=AvaliacaoNumeroResponse, response_model_exclude_none=True)
+async def avaliar_numero(request: AvaliarNumeroRequest, http_request: Request):
+    """
+    Endpoint para corrigir uma resposta da prática de números sem o LLM.
+
+    O texto digitado (que deve estar por extenso) e a transcrição da pronúncia
+    (que pode vir com algarismos) são comparados com numero_referencia pelo
+    conversor determinístico de numeros_alemao. O LLM só é consultado se
+    comentar_com_llm for verdadeiro, para comentar respostas incorretas.
+
+    Args:
+        request: Número de referência e respostas do usuário
+        http_request: Requisição HTTP original
+
+    Returns:
+        ResultadoPronunciaNumeros com a forma por extenso esperada
+
+    Raises:
+        HTTPException: 422 se numero_referencia não for um número
+    """
+    try:
+        _, _, forma_esperada = forma_por_extenso(request.numero_referencia)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    respostas = {
+        campo: resposta for campo, resposta in (
+            ("texto", request.texto_usuario), ("audio", request.audio_transcricao)
+        )
+        if resposta is not None
+    }
+    prioridade = prioridade_da_requisicao(http_request)
+    avaliacoes = await asyncio.gather(*(
+        verificar_resposta_numero(
+            request.numero_referencia, campo, resposta, IdiomaEnum.alemao.value,
+            request.comentar_com_llm, request.model, prioridade
+        )
+        for campo, resposta in respostas.items()
+    ))
+
+    resultado = {
+        "numero_referencia": request.numero_referencia,
+        "texto_usuario": request.texto_usuario,
+        "audio_transcricao": request.audio_transcricao,
+    }
+    for campo, (correto, comentario) in zip(respostas, avaliacoes):
+        resultado[f"{campo}_correto"] = correto
+        resultado[f"{campo}_comentario"] = comentario
+    return AvaliacaoNumeroResponse(**resultado, forma_esperada=forma_esperada)
+
+
+@app.post("/api/pratica/numeros", response_model=AvaliacaoNumeroResponse, response_model_exclude_none=True)
+async def praticar_numero(
+    http_request: Request,
+    resposta_http: Response,
+    numero_referencia: str = Form(...),
+    idioma: IdiomaEnum = Form(IdiomaEnum.alemao),
+    texto_usuario: Optional[str] = Form(None),
+    file: Optional[UploadFile] = File(None),
+    comentar_com_llm: bool = Form(False),
+    model: Optional[str] = Form(None)
+):
+    """
+    Endpoint que verifica o texto digitado e a pronúncia de um número de uma só vez.
+
+    Substitui as chamadas sequenciais do cliente (transcrição e uma
+    verificação por resposta). A verificação do texto corre em paralelo com
+    a transcrição do áudio, e a da transcrição começa assim que o STT
+    termina. Se uma das etapas falhar, as demais são canceladas.
+
+    Args:
+        http_request: Requisição HTTP original (prioridade)
+        resposta_http: Resposta HTTP (cabeçalho Server-Timing)
+        numero_referencia: Número praticado (ex.: "78")
+        idioma: Idioma praticado
+        texto_usuario: Número escrito por extenso pelo usuário
+        file: Áudio com a pronúncia do número
+        comentar_com_llm: Comenta respostas incorretas em alemão com o LLM
+        model: Modelo do Ollama (se None, usa OLLAMA_MODEL do .env)
+
+    Returns:
+        ResultadoPronunciaNumeros completo (com a transcrição do áudio)
+
+    Raises:
+        HTTPException: 422 se não houver texto nem áudio ou se
+            numero_referencia for inválido (alemão), erros do serviço STT e do LLM
+    """
+    texto_usuario = (texto_usuario or "").strip() or None
+    if texto_usuario is None and file is None:
+        raise HTTPException(status_code=422, detail="Informe texto_usuario e/ou o arquivo de áudio")
+
+    forma_esperada = None
+    if idioma == IdiomaEnum.alemao:
+        try:
+            _, _, forma_esperada = forma_por_extenso(numero_referencia)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+    prioridade = prioridade_da_requisicao(http_request)
+    resultado: Dict[str, Any] = {"numero_referencia": numero_referencia, "texto_usuario": texto_usuario}
+    tempos: Dict[str, float] = {}
+
+    async def verificar(campo: str, resposta: str) -> None:
+        inicio = time.perf_counter()
+        correto, comentario = await verificar_resposta_numero(
+            numero_referencia, campo, resposta, idioma.value, comentar_com_llm, model, prioridade
+        )
+        tempos[f"verificacao_{campo}"] = 1000 * (time.perf_counter() - inicio)
+        resultado[f"{campo}_correto"] = correto
+        resultado[f"{campo}_comentario"] = comentario
+
+    async def transcrever_e_verificar() -> None:
+        transcricao, _, tempos_stt = await transcrever_upload(
+            file, prioridade, normalizar=NORMALIZAR_AUDIO_STT
+        )
+        tempos.update(tempos_stt)
+        resultado["audio_transcricao"] = (transcricao.get("text") or "").strip()
+        await verificar("audio", resultado["audio_transcricao"])
+
+    etapas = []
+    if texto_usuario is not None:
+        etapas.append(asyncio.create_task(verificar("texto", texto_usuario)))
+    if file is not None:
+        etapas.append(asyncio.create_task(transcrever_e_verificar()))
+    try:
+        await asyncio.gather(*etapas)
+    except BaseException:
+        for etapa in etapas:
+            etapa.cancel()
+        raise
+
+    resposta_http.headers["Server-Timing"] = ", ".join(
+        f"{etapa};dur={duracao:.1f}" for etapa, duracao in tempos.items()
+    )
+    return AvaliacaoNumeroResponse(**resultado, forma_esperada=forma_esperada)
+
+
+@app.post("/api/pratica/audicao/avaliar")
+async def avaliar_audicao(request: AvaliarAudicaoRequest):
+    """
+    Endpoint para corrigir a transcrição de um exercício de audição.
+
+    A comparação ignora maiúsculas, pontuação, trema e ß; quase-acertos
+    recebem a classificação "Parcial" (nota a partir de AUDICAO_LIMIAR_PARCIAL).
+
+    Args:
+        request: Texto original e transcrição do usuário
+
+    Returns:
+        JSON com correto, classificacao, nota, distâncias de edição e
+        alinhamento palavra a palavra
+    """
+    return avaliar_transcricao(request.texto_original, request.transcricao_usuario, AUDICAO_LIMIAR_PARCIAL)
+
+
+@app.post("/api/pratica/audicao/avaliar/lote")
+async def avaliar_audicao_em_lote(request: AvaliarAudicaoLoteRequest):
+    """
+    Endpoint para corrigir vários exercícios de audição (ex.: uma sessão inteira).
+
+    Args:
+        request: Itens com texto original e transcrição do usuário
+
+    Returns:
+        JSON com os resultados na ordem dos itens
+    """
+    resultados = await asyncio.to_thread(
+        avaliar_lote,
+        [(item.texto_original, item.transcricao_usuario) for item in request.itens],
+        AUDICAO_LIMIAR_PARCIAL
+    )
+    return {"resultados": resultados}
+
+
+@app.post("/api/pratica/pronuncia/avaliar")
+async def avaliar_pronuncia(request: AvaliarPronunciaRequest):
+    """
+    Endpoint para avaliar uma pronúncia a partir da transcrição do STT, sem o LLM.
+
+    A transcrição é convertida em fonemas por regras do alemão e alinhada
+    com a transcricao_ipa do registro (ver fonemas.AvaliadorPronuncia).
+
+    Args:
+        request: conhecimento_id praticado e transcrição do STT
+
+    Returns:
+        JSON com correto (Sim/Parcial/Não), nota, comentario e os fonemas divergentes
+
+    Raises:
+        HTTPException: 404 se o registro não existir
+    """
+    conhecimento = await asyncio.to_thread(obter_conhecimento, request.conhecimento_id)
+    return {
+        "texto_original": conhecimento.texto_original,
+        "transcricao_stt": request.transcricao_stt,
+        **avaliador_pronuncia.avaliar(conhecimento, request.transcricao_stt)
+    }
+
+
+@app.post("/api/pratica/pronuncia", status_code=201)
+async def praticar_pronuncia(
+    http_request: Request,
+    resposta_http: Response,
+    file: UploadFile = File(...),
+    conhecimento_id: str = Form(...),
+    normalizar: Optional[bool] = None
+):
+    """
+    Endpoint que executa uma tentativa de pronúncia inteira no servidor.
+
+    Substitui as três chamadas do cliente (transcrição, avaliação e registro
+    no histórico). A transcrição do áudio corre em paralelo com a leitura
+    do registro e o cálculo dos seus fonemas de referência; se o registro
+    não existir, a transcrição é cancelada. O exercício é então avaliado
+    (ver /api/pratica/pronuncia/avaliar) e adicionado ao histórico.
+
+    Args:
+        http_request: Requisição HTTP original (prioridade)
+        resposta_http: Resposta HTTP (cabeçalho Server-Timing)
+        file: Áudio gravado pelo usuário
+        conhecimento_id: Registro da base de conhecimento praticado
+        normalizar: Normaliza o áudio antes do envio (padrão: NORMALIZAR_AUDIO_STT)
+
+    Returns:
+        JSON com o resultado da avaliação e o exercicio_id registrado
+
+    Raises:
+        HTTPException: 404 se o registro não existir, erros do serviço STT
+            ou 500 se o exercício não puder ser salvo
+    """
+    async def carregar_referencia() -> ConhecimentoIdioma:
+        conhecimento = await asyncio.to_thread(obter_conhecimento, conhecimento_id)
+        await asyncio.to_thread(avaliador_pronuncia.fonemas_referencia, conhecimento)
+        return conhecimento
+
+    transcrevendo = asyncio.create_task(transcrever_upload(
+        file,
+        prioridade_da_requisicao(http_request),
+        normalizar=NORMALIZAR_AUDIO_STT if normalizar is None else normalizar
+    ))
+    try:
+        conhecimento = await carregar_referencia()
+    except BaseException:
+        transcrevendo.cancel()
+        raise
+    transcricao, _, tempos = await transcrevendo
+
+    transcricao_stt = (transcricao.get("text") or "").strip()
+    inicio = time.perf_counter()
+    avaliacao = avaliador_pronuncia.avaliar(conhecimento, transcricao_stt)
+    tempos["avaliacao"] = 1000 * (time.perf_counter() - inicio)
+
+    exercicio = Exercicio(
+        data_hora=datetime.now(),
+        exercicio_id=uuid4(),
+        conhecimento_id=str(conhecimento.conhecimento_id),
+        idioma=conhecimento.idioma,
+        tipo_pratica=TipoPraticaEnum.pronuncia,
+        resultado_exercicio=ResultadoPronuncia(
+            texto_original=conhecimento.texto_original,
+            transcricao_stt=transcricao_stt,
+            correto=avaliacao["correto"],
+            comentario=avaliacao["comentario"]
+        ).model_dump(mode="json")
+    )
+    inicio = time.perf_counter()
+    try:
+        async with trava_historico:
+            await asyncio.to_thread(validador.adicionar_exercicio, exercicio)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=f"Erro de validação: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao salvar exercício: {str(e)}")
+    tempos["registro"] = 1000 * (time.perf_counter() - inicio)
+
+    resposta_http.headers["Server-Timing"] = ", ".join(
+        f"{etapa};dur={duracao:.1f}" for etapa, duracao in tempos.items()
+    )
+    return {
+        "exercicio_id": str(exercicio.exercicio_id),
+        "texto_original": conhecimento.texto_original,
+        "transcricao_stt": transcricao_stt,
+        **avaliacao
+    }
+
+
+async def extrair_dados_interlocutor(sessao: SessaoDialogo) -> Optional[Dict[str, Any]]:
+    """
+    Pede ao LLM os dados do interlocutor a partir das respostas do diálogo.
+
+    A resposta à despedida não entra no prompt: ela não traz dados do
+    interlocutor, e assim a extração pode começar antes de ser gravada.
+
+    Returns:
+        JSON extraído, ou None se a resposta não for um objeto JSON
+
+    Raises:
+        HTTPException: 404 se o prompt DIALOGO_PROMPT_INTERLOCUTOR não existir,
+            e os mesmos erros de /api/prompts/{prompt_id}/executar
+    """
+    template, conteudo = renderizar_prompt(DIALOGO_PROMPT_INTERLOCUTOR, {
+        "idioma": NOMES_IDIOMAS.get(sessao.idioma, sessao.idioma),
+        "dialogo": sessao.texto_dialogo(ate=sessao.indice_despedida),
+    })
+    resposta = await executar_template(
+        template,
+        OllamaChatRequest(
+            messages=[OllamaMessage(role="user", content=conteudo)],
+            prompt_id=DIALOGO_PROMPT_INTERLOCUTOR
+        ),
+        estruturada=None
+    )
+    dados = resposta.get("dados")
+    if dados is None:
+        try:
+            dados = json.loads(resposta["message"]["content"])
+        except (KeyError, TypeError, ValueError):
+            return None
+    return dados if isinstance(dados, dict) else None
+
+
+@app.websocket("/ws/dialogo")
+async def sessao_dialogo(websocket: WebSocket):
+    """
+    Sessão da prática de diálogo com o estado mantido no servidor.
+
+    Protocolo (mensagens JSON com o campo "tipo"; o áudio do usuário vai em
+    mensagens binárias):
+
+    - cliente → {"tipo": "iniciar", "idioma": "alemao"}
+    - servidor → {"tipo": "frase", "indice", "etapa", "texto", "audio" (base64 ou null), "mimeType"}
+    - cliente → áudio da resposta à frase atual (binário)
+    - servidor → {"tipo": "transcricao", "indice", "texto"}
+    - servidor → {"tipo": "resultado", "correto", "interlocutor", "exercicio_id"}
+    - servidor → {"tipo": "erro", "detalhe"[, "indice"]}
+
+    Cada resposta avança o roteiro na hora: a transcrição da resposta e a
+    síntese da próxima frase correm em paralelo, e cada resultado é enviado
+    assim que fica pronto. As DIALOGO_ANTECIPAR_FRASES frases seguintes são
+    sintetizadas por antecipação (ver antecipador_tts), com prioridade de
+    lote, e ficam no cache de áudio; as antecipações pendentes são
+    canceladas quando a sessão termina. Assim que as respostas anteriores à
+    despedida são transcritas, o LLM começa a extrair os dados do
+    interlocutor, enquanto o usuário ouve e responde à despedida; depois da
+    despedida, o exercício é registrado no histórico e a conexão é fechada.
+    Se uma frase não puder ser enviada (erro inesperado), o cliente ficaria
+    esperando por ela: a sessão é encerrada com um erro e o código 1011.
+    """
+    await websocket.accept()
+    antecipacoes: Dict[int, Antecipacao] = {}
+    transcricoes: List[asyncio.Task] = []
+    envios: List[asyncio.Task] = []
+    extracao: Optional[asyncio.Task] = None
+    encerramento: Optional[asyncio.Task] = None
+    encerrando = False
+
+    async def enviar_erro(detalhe: str, indice: Optional[int] = None) -> None:
+        mensagem: Dict[str, Any] = {"tipo": "erro", "detalhe": detalhe}
+        if indice is not None:
+            mensagem["indice"] = indice
+        await websocket.send_json(mensagem)
+
+    voz = GenerateAudioRequest.model_fields["voice"].default
+
+    def antecipar(a_partir_de: int) -> None:
+        for indice in range(a_partir_de, a_partir_de + DIALOGO_ANTECIPAR_FRASES):
+            frase = sessao.frase(indice)
+            if frase is not None and indice not in antecipacoes:
+                antecipacoes[indice] = antecipador_tts.agendar(
+                    lambda texto=frase[1]: obter_audio_tts(texto, voz, 1.0, PRIORIDADE_LOTE)
+                )
+
+    async def enviar_frase(indice: int) -> None:
+        etapa, texto = sessao.frase(indice)
+        antecipar(indice + 1)
+        audio, mime_type = None, None
+        try:
+            audio_bytes, mime_type, _, _ = await antecipador_tts.obter(
+                antecipacoes.get(indice), lambda: obter_audio_tts(texto, voz, 1.0)
+            )
+            audio = base64.b64encode(audio_bytes).decode("utf-8")
+        except HTTPException as e:
+            await enviar_erro(e.detail, indice)
+        except (ErroAdmissao, CircuitoAberto) as e:
+            await enviar_erro(str(e), indice)
+        # Sem áudio (falha no TTS), a frase ainda é enviada para o diálogo continuar
+        await websocket.send_json({
+            "tipo": "frase",
+            "indice": indice,
+            "etapa": etapa,
+            "texto": texto,
+            "audio": audio,
+            "mimeType": mime_type,
+        })
+
+    async def encerrar_com_erro(detalhe: str) -> None:
+        try:
+            await enviar_erro(detalhe)
+            await websocket.close(code=1011)
+        except Exception:
+            pass  # Conexão já encerrada
+
+    def verificar_envio(tarefa: asyncio.Task) -> None:
+        # Uma frase que não chega deixa o cliente esperando para sempre: a sessão é encerrada
+        nonlocal encerramento
+        if encerrando:
+            return
+        erro = asyncio.CancelledError() if tarefa.cancelled() else tarefa.exception()
+        if erro is not None and encerramento is None:
+            encerramento = asyncio.create_task(
+                encerrar_com_erro(f"Erro ao enviar a frase: {str(erro) or type(erro).__name__}")
+            )
+
+    def agendar_envio(indice: int) -> None:
+        tarefa = asyncio.create_task(enviar_frase(indice))
+        tarefa.add_done_callback(verificar_envio)
+        envios.append(tarefa)
+
+    def iniciar_extracao() -> None:
+        nonlocal extracao
+        if extracao is None and sessao.respostas_transcritas():
+            extracao = asyncio.create_task(extrair_dados_interlocutor(sessao))
+
+    async def transcrever_resposta(indice: int, audio: bytes) -> None:
+        arquivo = UploadFile(io.BytesIO(audio), size=len(audio), filename="audio.wav")
+        try:
+            transcricao, _, _ = await transcrever_upload(arquivo, normalizar=NORMALIZAR_AUDIO_STT)
+        except HTTPException as e:
+            sessao.registrar_transcricao(indice, "")
+            iniciar_extracao()
+            await enviar_erro(e.detail, indice)
+            return
+        except (ErroAdmissao, CircuitoAberto) as e:
+            sessao.registrar_transcricao(indice, "")
+            iniciar_extracao()
+            await enviar_erro(str(e), indice)
+            return
+        texto = (transcricao.get("text") or "").strip()
+        sessao.registrar_transcricao(indice, texto)
+        iniciar_extracao()
+        await websocket.send_json({"tipo": "transcricao", "indice": indice, "texto": texto})
+
+    try:
+        try:
+            inicio = await websocket.receive_json()
+            if not isinstance(inicio, dict) or inicio.get("tipo") != "iniciar":
+                raise ValueError
+            idioma = IdiomaEnum(inicio.get("idioma") or IdiomaEnum.alemao.value)
+        except (KeyError, ValueError):
+            await enviar_erro("A sessão deve começar com a mensagem 'iniciar' e um idioma válido")
+            await websocket.close(code=1008)
+            return
+        try:
+            frases = await asyncio.to_thread(validador.validar_frases_dialogo)
+        except (FileNotFoundError, ValidationError) as e:
+            await enviar_erro(f"Frases do diálogo indisponíveis: {str(e)}")
+            await websocket.close(code=1011)
+            return
+        sessao = SessaoDialogo(frases, idioma.value)
+        agendar_envio(0)
+
+        while not sessao.concluida:
+            mensagem = await websocket.receive()
+            if mensagem["type"] == "websocket.disconnect":
+                return
+            audio = mensagem.get("bytes")
+            if audio is None:
+                await enviar_erro("Envie o áudio da resposta como mensagem binária")
+                continue
+            if len(audio) > UPLOAD_AUDIO_LIMITE_MB * 1024 * 1024:
+                await enviar_erro(f"Áudio excede o limite de {UPLOAD_AUDIO_LIMITE_MB:g} MB", sessao.indice)
+                continue
+
+            indice = sessao.avancar()
+            transcricoes.append(asyncio.create_task(transcrever_resposta(indice, audio)))
+            if not sessao.concluida:
+                agendar_envio(sessao.indice)
+
+        await asyncio.gather(*transcricoes)
+        iniciar_extracao()
+        try:
+            dados = await extracao
+        except HTTPException as e:
+            await enviar_erro(f"Erro ao analisar diálogo: {e.detail}")
+            await websocket.close(code=1011)
+            return
+        except (ErroAdmissao, CircuitoAberto) as e:
+            await enviar_erro(f"Erro ao analisar diálogo: {str(e)}")
+            await websocket.close(code=1011)
+            return
+
+        correto = sessao.avaliar(dados)
+        exercicio = Exercicio(
+            data_hora=datetime.now(),
+            exercicio_id=uuid4(),
+            conhecimento_id="dialogo_practice",
+            idioma=sessao.idioma,
+            tipo_pratica=TipoPraticaEnum.dialogo,
+            resultado_exercicio=ResultadoDialogo(correto=correto).model_dump(mode="json")
         )
+        try:
+            async with trava_historico:
+                await asyncio.to_thread(validador.adicionar_exercicio, exercicio)
+        except Exception as e:
+            await enviar_erro(f"Erro ao salvar exercício: {str(e)}")
+
+        await websocket.send_json({
+            "tipo": "resultado",
+            "correto": correto.value,
+            "interlocutor": dados,
+            "exercicio_id": str(exercicio.exercicio_id),
+        })
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        encerrando = True
+        for tarefa in [*envios, *transcricoes, *([extracao] if extracao else [])]:
+            tarefa.cancel()
+        for antecipacao in antecipacoes.values():
+            antecipador_tts.cancelar(antecipacao)
 
 
 if __name__ == "__main__":
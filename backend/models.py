@@ -5,7 +5,7 @@ from datetime import datetime
 from typing import List, Optional, Any
 from enum import Enum
 from uuid import UUID
-from pydantic import BaseModel, Field, RootModel
+from pydantic import BaseModel, Field, RootModel, model_validator
 
 
 # ========== Conhecimento de Idiomas ==========
@@ -39,6 +39,28 @@ class BaseConhecimentoIdiomas(RootModel[List[ConhecimentoIdioma]]):
 
 # ========== Prompts ==========
 
+class RoteamentoModelo(BaseModel):
+    """Modelos do Ollama usados por um prompt e como alternar entre eles."""
+    modelo_principal: Optional[str] = Field(None, description="Modelo consultado primeiro (se ausente, usa MODELO_OLLAMA)")
+    modelo_reserva: Optional[str] = Field(None, description="Modelo consultado se o principal falhar ou estourar o orçamento de latência")
+    orcamento_latencia_ms: Optional[float] = Field(None, gt=0, description="Tempo máximo de espera pelo modelo principal, em milissegundos")
+    redundancia: bool = Field(False, description="Envia uma cópia da requisição ao modelo reserva quando o principal passa do seu p95 de latência")
+
+    @model_validator(mode="after")
+    def exigir_reserva(self):
+        if self.redundancia and not self.modelo_reserva:
+            raise ValueError("redundancia exige modelo_reserva")
+        return self
+
+
+class OpcoesGeracao(BaseModel):
+    """Opções de geração do Ollama aplicadas às execuções de um prompt."""
+    num_predict: Optional[int] = Field(None, gt=0, description="Máximo de tokens gerados na resposta")
+    temperature: Optional[float] = Field(None, ge=0, description="Temperatura da amostragem")
+    stop: Optional[List[str]] = Field(None, description="Sequências que encerram a geração")
+    num_ctx: Optional[int] = Field(None, gt=0, description="Tamanho da janela de contexto, em tokens")
+
+
 class PromptItem(BaseModel):
     """Modelo para um item de prompt."""
     prompt_id: str = Field(..., description="Um identificador único para cada prompt")
@@ -48,6 +70,8 @@ class PromptItem(BaseModel):
     resposta_estruturada: bool = Field(..., description="Indica se a resposta esperada deve ser um JSON estruturado")
     estrutura_esperada: Optional[dict] = Field(None, description="Define a estrutura do JSON de resposta quando resposta_estruturada é verdadeiro")
     ultima_edicao: datetime = Field(..., description="A data e hora da última modificação deste prompt específico")
+    roteamento: Optional[RoteamentoModelo] = Field(None, description="Modelo principal, modelo reserva, orçamento de latência e redundância do prompt")
+    opcoes_geracao: Optional[OpcoesGeracao] = Field(None, description="Opções de geração (num_predict, temperature, stop, num_ctx) enviadas ao Ollama")
 
 
 class BasePrompts(BaseModel):
@@ -0,0 +1,217 @@
+"""
+Normalização de gravações antes da transcrição (16 kHz, mono, PCM 16 bits, sem silêncio nas pontas).
+
+Usa o ffmpeg quando disponível no PATH (qualquer contêiner/codec que ele
+decodifique); sem ffmpeg, apenas arquivos WAV PCM de 16 bits são
+normalizados, em Python puro.
+"""
+import asyncio
+import io
+import shutil
+import struct
+import sys
+import wave
+from array import array
+from typing import BinaryIO, List, Tuple
+
+TAXA_AMOSTRAGEM_STT = 16000  # Taxa usada internamente pelo Whisper
+LIMIAR_SILENCIO_DB = -45.0
+MARGEM_SILENCIO_SEGUNDOS = 0.1
+TAMANHO_BLOCO = 64 * 1024
+
+FFMPEG = shutil.which("ffmpeg")
+
+
+class ErroNormalizacao(ValueError):
+    """O áudio não pôde ser normalizado (formato não suportado ou falha do ffmpeg)."""
+    pass
+
+
+# ---------- Implementação em Python puro (WAV PCM 16 bits) ----------
+
+def _para_mono(amostras: array, canais: int) -> List[int]:
+    if canais == 1:
+        return list(amostras)
+    return [sum(quadro) // canais for quadro in zip(*(amostras[c::canais] for c in range(canais)))]
+
+
+def _aparar_silencio(amostras: List[int], taxa: int, limiar_db: float, margem_segundos: float) -> List[int]:
+    limiar = int(32767 * 10 ** (limiar_db / 20))
+    inicio = next((i for i, v in enumerate(amostras) if abs(v) > limiar), None)
+    if inicio is None:
+        return []
+    fim = next(i for i in range(len(amostras) - 1, -1, -1) if abs(amostras[i]) > limiar)
+    margem = int(margem_segundos * taxa)
+    return amostras[max(0, inicio - margem):min(len(amostras), fim + 1 + margem)]
+
+
+def _reamostrar(amostras: List[int], taxa_origem: int, taxa_destino: int) -> List[int]:
+    if taxa_origem == taxa_destino or len(amostras) < 2:
+        return amostras
+    total = int(len(amostras) * taxa_destino / taxa_origem)
+    passo = taxa_origem / taxa_destino
+    ultimo = len(amostras) - 1
+    saida = []
+    for i in range(total):
+        posicao = i * passo
+        j = int(posicao)
+        if j >= ultimo:
+            saida.append(amostras[ultimo])
+            continue
+        fracao = posicao - j
+        saida.append(int(amostras[j] + (amostras[j + 1] - amostras[j]) * fracao))
+    return saida
+
+
+def normalizar_wav(
+    dados: bytes,
+    taxa_destino: int = TAXA_AMOSTRAGEM_STT,
+    limiar_db: float = LIMIAR_SILENCIO_DB,
+    margem_segundos: float = MARGEM_SILENCIO_SEGUNDOS
+) -> bytes:
+    """
+    Normaliza um WAV PCM de 16 bits em Python puro.
+
+    Converte para mono (média dos canais), apara o silêncio no início e no
+    fim (mantendo uma margem) e reamostra por interpolação linear.
+
+    Args:
+        dados: Conteúdo do arquivo WAV
+        taxa_destino: Taxa de amostragem de saída
+        limiar_db: Nível (dBFS) abaixo do qual a amostra é considerada silêncio
+        margem_segundos: Silêncio preservado antes e depois da fala
+
+    Returns:
+        Conteúdo do WAV normalizado
+
+    Raises:
+        ErroNormalizacao: Se o arquivo não for WAV PCM de 16 bits
+    """
+    try:
+        with wave.open(io.BytesIO(dados), "rb") as entrada:
+            canais = entrada.getnchannels()
+            largura = entrada.getsampwidth()
+            taxa = entrada.getframerate()
+            quadros = entrada.readframes(entrada.getnframes())
+    except (wave.Error, EOFError) as e:
+        raise ErroNormalizacao(f"Arquivo não é um WAV PCM: {e}")
+
+    if largura != 2:
+        raise ErroNormalizacao(f"WAV com {8 * largura} bits não suportado sem ffmpeg")
+
+    amostras = array("h")
+    amostras.frombytes(quadros[:len(quadros) - len(quadros) % 2])
+    if sys.byteorder == "big":
+        amostras.byteswap()
+
+    mono = _para_mono(amostras, canais)
+    mono = _aparar_silencio(mono, taxa, limiar_db, margem_segundos)
+    mono = _reamostrar(mono, taxa, taxa_destino)
+
+    saida_amostras = array("h", mono)
+    if sys.byteorder == "big":
+        saida_amostras.byteswap()
+
+    saida = io.BytesIO()
+    with wave.open(saida, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(taxa_destino)
+        wav.writeframes(saida_amostras.tobytes())
+    return saida.getvalue()
+
+
+# ---------- Implementação com ffmpeg ----------
+
+def _corrigir_cabecalho_wav(dados: bytes) -> bytes:
+    """Preenche os tamanhos RIFF/data que o ffmpeg deixa indefinidos ao escrever em pipe."""
+    posicao = dados.find(b"data", 12)
+    if not dados.startswith(b"RIFF") or posicao < 0:
+        return dados
+    corrigido = bytearray(dados)
+    struct.pack_into("<I", corrigido, 4, len(dados) - 8)
+    struct.pack_into("<I", corrigido, posicao + 4, len(dados) - posicao - 8)
+    return bytes(corrigido)
+
+
+async def normalizar_com_ffmpeg(
+    arquivo: BinaryIO,
+    taxa_destino: int = TAXA_AMOSTRAGEM_STT,
+    limiar_db: float = LIMIAR_SILENCIO_DB,
+    margem_segundos: float = MARGEM_SILENCIO_SEGUNDOS
+) -> bytes:
+    """
+    Normaliza qualquer áudio suportado pelo ffmpeg.
+
+    O arquivo é enviado ao stdin do ffmpeg em blocos enquanto a saída é lida,
+    sem carregar a gravação original inteira na memória.
+
+    Args:
+        arquivo: Objeto com read() (ex.: LeitorComHash sobre o upload)
+        taxa_destino: Taxa de amostragem de saída
+        limiar_db: Nível (dBFS) abaixo do qual o áudio é considerado silêncio
+        margem_segundos: Silêncio preservado antes e depois da fala
+
+    Returns:
+        Conteúdo do WAV normalizado
+
+    Raises:
+        ErroNormalizacao: Se o ffmpeg não estiver disponível ou falhar
+    """
+    if FFMPEG is None:
+        raise ErroNormalizacao("ffmpeg não encontrado no PATH")
+
+    aparar = (
+        f"silenceremove=start_periods=1:start_threshold={limiar_db}dB:start_silence={margem_segundos}"
+    )
+    processo = await asyncio.create_subprocess_exec(
+        FFMPEG, "-hide_banner", "-loglevel", "error",
+        "-i", "pipe:0",
+        "-ac", "1", "-ar", str(taxa_destino),
+        # Apara o início, inverte, apara o (novo) início e desinverte
+        "-af", f"{aparar},areverse,{aparar},areverse",
+        "-acodec", "pcm_s16le", "-f", "wav", "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+
+    async def alimentar():
+        try:
+            while True:
+                bloco = arquivo.read(TAMANHO_BLOCO)
+                if not bloco:
+                    break
+                processo.stdin.write(bloco)
+                await processo.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # ffmpeg encerrou antes (erro reportado pelo código de saída)
+        finally:
+            processo.stdin.close()
+
+    _, saida, erros = await asyncio.gather(alimentar(), processo.stdout.read(), processo.stderr.read())
+    await processo.wait()
+
+    if processo.returncode != 0:
+        raise ErroNormalizacao(f"ffmpeg falhou: {erros.decode('utf-8', errors='replace')[-500:]}")
+    return _corrigir_cabecalho_wav(saida)
+
+
+async def normalizar_audio(arquivo: BinaryIO) -> Tuple[bytes, str]:
+    """
+    Normaliza uma gravação para 16 kHz mono PCM sem silêncio nas pontas.
+
+    Args:
+        arquivo: Objeto com read() posicionado no início do áudio
+
+    Returns:
+        Tupla (WAV normalizado, método utilizado: "ffmpeg" ou "python")
+
+    Raises:
+        ErroNormalizacao: Se o formato não puder ser normalizado
+    """
+    if FFMPEG is not None:
+        return await normalizar_com_ffmpeg(arquivo), "ffmpeg"
+
+    dados = b"".join(iter(lambda: arquivo.read(TAMANHO_BLOCO), b""))
+    return await asyncio.to_thread(normalizar_wav, dados), "python"
@@ -0,0 +1,410 @@
+"""
+Conversão determinística entre números e sua forma por extenso em alemão.
+
+Cobre cardinais (inclusive compostos como "achtundsiebzig" e escalas até
+Milliarden), ordinais ("dritte", "einundzwanzigste") e decimais
+("drei Komma eins vier"), nos dois sentidos. Usada para corrigir a prática
+de números sem consultar o LLM.
+"""
+import re
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+Numero = Union[int, Decimal]
+
+UNIDADES = [
+    "null", "eins", "zwei", "drei", "vier", "fünf", "sechs", "sieben", "acht", "neun",
+    "zehn", "elf", "zwölf", "dreizehn", "vierzehn", "fünfzehn", "sechzehn", "siebzehn",
+    "achtzehn", "neunzehn",
+]
+DEZENAS = ["", "", "zwanzig", "dreißig", "vierzig", "fünfzig", "sechzig", "siebzig", "achtzig", "neunzig"]
+
+# Ordinais irregulares (o restante é o cardinal + "te" até 19 e + "ste" a partir de 20)
+ORDINAIS_IRREGULARES = {1: "erste", 3: "dritte", 7: "siebte", 8: "achte"}
+
+# Escalas separadas por espaço na escrita (eine Million, zwei Milliarden)
+ESCALAS_GRANDES = [(10 ** 9, "Milliarde", "Milliarden"), (10 ** 6, "Million", "Millionen")]
+
+LIMITE = 10 ** 12
+
+
+# ---------- Número → extenso ----------
+
+def _ate_cem(n: int, final: bool) -> str:
+    """Extenso de 0 a 99; final indica se "eins" encerra a palavra (e não "ein")."""
+    if n < 20:
+        return "eins" if n == 1 and final else ("ein" if n == 1 else UNIDADES[n])
+    unidade, dezena = n % 10, n // 10
+    if unidade == 0:
+        return DEZENAS[dezena]
+    return f"{'ein' if unidade == 1 else UNIDADES[unidade]}und{DEZENAS[dezena]}"
+
+
+def _ate_mil(n: int, final: bool = True) -> str:
+    """Extenso de 1 a 999 (em uma palavra)."""
+    centena, resto = divmod(n, 100)
+    partes = []
+    if centena:
+        partes.append(f"{_ate_cem(centena, final=False)}hundert")
+    if resto:
+        partes.append(_ate_cem(resto, final))
+    return "".join(partes)
+
+
+def _abaixo_de_um_milhao(n: int, final: bool = True) -> str:
+    """Extenso de 1 a 999.999 (em uma palavra)."""
+    milhar, resto = divmod(n, 1000)
+    partes = []
+    if milhar:
+        partes.append(f"{_ate_mil(milhar, final=False)}tausend")
+    if resto:
+        partes.append(_ate_mil(resto, final))
+    return "".join(partes)
+
+
+def numero_por_extenso(numero: int) -> str:
+    """
+    Escreve um número inteiro por extenso em alemão.
+
+    Args:
+        numero: Inteiro com valor absoluto menor que um trilhão (10^12)
+
+    Returns:
+        Forma por extenso (ex.: 78 → "achtundsiebzig", 1001 → "eintausendeins",
+        2_000_000 → "zwei Millionen")
+
+    Raises:
+        ValueError: Se o número estiver fora do intervalo suportado
+    """
+    if abs(numero) >= LIMITE:
+        raise ValueError(f"Número fora do intervalo suportado: {numero}")
+    if numero < 0:
+        return f"minus {numero_por_extenso(-numero)}"
+    if numero == 0:
+        return UNIDADES[0]
+
+    palavras = []
+    resto = numero
+    for escala, singular, plural in ESCALAS_GRANDES:
+        quantidade, resto = divmod(resto, escala)
+        if quantidade == 1:
+            palavras.append(f"eine {singular}")
+        elif quantidade:
+            palavras.append(f"{_abaixo_de_um_milhao(quantidade)} {plural}")
+    if resto:
+        palavras.append(_abaixo_de_um_milhao(resto))
+    return " ".join(palavras)
+
+
+def ordinal_por_extenso(numero: int) -> str:
+    """
+    Escreve um número ordinal por extenso em alemão (forma com "-e", ex.: "der dritte").
+
+    Args:
+        numero: Inteiro positivo menor que 10^12
+
+    Returns:
+        Ordinal por extenso (ex.: 3 → "dritte", 21 → "einundzwanzigste", 100 → "einhundertste")
+
+    Raises:
+        ValueError: Se o número não for positivo ou estiver fora do intervalo
+    """
+    if not 0 < numero < LIMITE:
+        raise ValueError(f"Ordinal fora do intervalo suportado: {numero}")
+
+    resto = numero % 100
+    if 0 < resto < 20:
+        prefixo = _em_uma_palavra(numero - resto) if numero > resto else ""
+        return prefixo + ORDINAIS_IRREGULARES.get(resto, f"{UNIDADES[resto]}te")
+
+    # "zwei Millionen" → "zweimillionste", "eine Milliarde" → "einmilliardste"
+    base = re.sub(r"(million|milliard)(en|e)$", r"\1", _em_uma_palavra(numero))
+    return f"{base}ste"
+
+
+def _em_uma_palavra(numero: int) -> str:
+    """Cardinal em uma só palavra, como usado nos ordinais ("eine Million" → "einmillion")."""
+    return numero_por_extenso(numero).lower().replace("eine milli", "einmilli").replace(" ", "")
+
+
+def decimal_por_extenso(valor: Union[str, Decimal]) -> str:
+    """
+    Escreve um número decimal por extenso, com as casas decimais lidas dígito a dígito.
+
+    Args:
+        valor: Número decimal (ex.: "3,14", "3.14" ou Decimal("3.14"))
+
+    Returns:
+        Forma por extenso (ex.: "drei Komma eins vier")
+
+    Raises:
+        ValueError: Se o valor não for um número válido
+    """
+    numero = interpretar_digitos(str(valor))
+    if numero is None:
+        raise ValueError(f"Número inválido: {valor!r}")
+    if isinstance(numero, int):
+        return numero_por_extenso(numero)
+
+    inteiro, _, fracao = f"{abs(numero):f}".partition(".")
+    palavras = numero_por_extenso(int(inteiro))
+    if numero < 0:
+        palavras = f"minus {palavras}"
+    if fracao:
+        palavras += " Komma " + " ".join(UNIDADES[int(digito)] for digito in fracao)
+    return palavras
+
+
+# ---------- Extenso → número ----------
+
+def normalizar_texto(texto: str) -> str:
+    """
+    Normaliza um texto em alemão para comparação.
+
+    Converte para minúsculas, troca ß por ss e as vogais com trema pela forma
+    com "e" (ü → ue), de modo que "fünf", "Fuenf" e "FÜNF" sejam equivalentes.
+    """
+    texto = texto.strip().lower()
+    for original, substituto in (("ß", "ss"), ("ä", "ae"), ("ö", "oe"), ("ü", "ue")):
+        texto = texto.replace(original, substituto)
+    return texto
+
+
+_UNIDADES_NORMALIZADAS = {normalizar_texto(palavra): valor for valor, palavra in enumerate(UNIDADES)}
+_UNIDADES_NORMALIZADAS.update({"ein": 1, "eine": 1, "zwo": 2})
+_DEZENAS_NORMALIZADAS = {normalizar_texto(palavra): 10 * valor for valor, palavra in enumerate(DEZENAS) if palavra}
+
+# Da maior para a menor; as formas mais longas primeiro para "millionen" não virar "million" + "en"
+_ESCALAS_NORMALIZADAS = [
+    (10 ** 9, ("milliarden", "milliarde", "milliard")),  # "milliard" só nos ordinais
+    (10 ** 6, ("millionen", "million")),
+    (1000, ("tausend",)),
+    (100, ("hundert",)),
+]
+
+
+def _interpretar_ate_cem(texto: str) -> int:
+    if texto in _UNIDADES_NORMALIZADAS:
+        return _UNIDADES_NORMALIZADAS[texto]
+    if texto in _DEZENAS_NORMALIZADAS:
+        return _DEZENAS_NORMALIZADAS[texto]
+    unidade, separador, dezena = texto.partition("und")
+    if separador and unidade in _UNIDADES_NORMALIZADAS and dezena in _DEZENAS_NORMALIZADAS:
+        valor_unidade = _UNIDADES_NORMALIZADAS[unidade]
+        if 0 < valor_unidade < 10:
+            return valor_unidade + _DEZENAS_NORMALIZADAS[dezena]
+    raise ValueError(f"Não reconhecido: {texto!r}")
+
+
+def _interpretar_cardinal(texto: str, indice_escala: int = 0) -> int:
+    """Interpreta um cardinal já normalizado e sem espaços, a partir da escala indicada."""
+    if texto.startswith("und"):
+        texto = texto[3:]  # "hundertundeins" (coloquial)
+    if not texto:
+        raise ValueError("Texto vazio")
+
+    for posicao in range(indice_escala, len(_ESCALAS_NORMALIZADAS)):
+        escala, palavras = _ESCALAS_NORMALIZADAS[posicao]
+        for palavra in palavras:
+            inicio = texto.find(palavra)
+            if inicio < 0:
+                continue
+            esquerda, direita = texto[:inicio], texto[inicio + len(palavra):]
+            multiplicador = _interpretar_cardinal(esquerda, posicao + 1) if esquerda else 1
+            if multiplicador >= (1000 if escala > 100 else 10):
+                raise ValueError(f"Multiplicador inválido para {palavra}: {multiplicador}")
+            resto = _interpretar_cardinal(direita, posicao + 1) if direita else 0
+            return multiplicador * escala + resto
+
+    return _interpretar_ate_cem(texto)
+
+
+def _sem_ordinal(palavra: str) -> List[str]:
+    """Candidatos a cardinal para uma palavra que pode ser ordinal (ex.: "dritten" → "drei")."""
+    for declinacao in ("en", "er", "es", "em", "e"):
+        if palavra.endswith(declinacao):
+            base = palavra[:-len(declinacao)]
+            break
+    else:
+        return []
+
+    candidatos = []
+    for irregular, cardinal in (("erst", "eins"), ("dritt", "drei"), ("siebt", "sieben"), ("acht", "acht")):
+        if base.endswith(irregular):
+            candidatos.append(base[:-len(irregular)] + cardinal)
+    if base.endswith("st"):
+        candidatos.append(base[:-2])
+    if base.endswith("t"):
+        candidatos.append(base[:-1])
+    return candidatos
+
+
+def interpretar_digitos(texto: str) -> Optional[Numero]:
+    """
+    Interpreta um número escrito com algarismos no formato alemão ou internacional.
+
+    Aceita separador de milhar com ponto ("1.000"), vírgula decimal ("3,14")
+    e ponto decimal quando não houver ambiguidade ("3.14").
+
+    Returns:
+        int, Decimal (se tiver casas decimais) ou None se não for um número
+    """
+    texto = texto.strip().replace(" ", "").replace("−", "-")
+    if not re.fullmatch(r"[-+]?[\d.,]*\d", texto):
+        return None
+    if "," in texto:
+        texto = texto.replace(".", "").replace(",", ".")
+    elif re.fullmatch(r"[-+]?\d{1,3}(\.\d{3})+", texto):
+        texto = texto.replace(".", "")
+    try:
+        valor = Decimal(texto)
+    except InvalidOperation:
+        return None
+    return int(valor) if valor == valor.to_integral_value() and "." not in texto else valor
+
+
+def interpretar_numero(texto: str) -> Optional[Dict[str, Any]]:
+    """
+    Reconhece um número escrito por extenso (ou com algarismos) em alemão.
+
+    Tolera maiúsculas, espaços e hífens entre as partes ("acht und siebzig",
+    "Acht-und-siebzig"), grafias sem trema ou ß ("fuenf", "dreissig"),
+    "hundert"/"tausend" sem "ein", ordinais ("achtundsiebzigste", "78.") e
+    decimais com "Komma" (dígitos lidos um a um ou como número).
+
+    Args:
+        texto: Resposta digitada ou transcrita
+
+    Returns:
+        Dicionário {valor, ordinal, por_extenso} ou None se não reconhecido
+    """
+    texto = texto.strip().rstrip("!?")
+    if not texto:
+        return None
+
+    ordinal_digitos = re.fullmatch(r"\s*(\d+)\.\s*", texto)
+    if ordinal_digitos:
+        return {"valor": int(ordinal_digitos.group(1)), "ordinal": True, "por_extenso": False}
+    valor = interpretar_digitos(texto.rstrip("."))
+    if valor is not None:
+        return {"valor": valor, "ordinal": False, "por_extenso": False}
+
+    normalizado = normalizar_texto(texto).rstrip(".")
+    negativo = normalizado.startswith("minus ")
+    if negativo:
+        normalizado = normalizado[len("minus "):]
+
+    partes = re.split(r"\s*\bkomma\b\s*", normalizado)
+    if len(partes) > 2:
+        return None
+    compacto = re.sub(r"[\s\-]+", "", partes[0])
+
+    ordinal = False
+    try:
+        inteiro = _interpretar_cardinal(compacto)
+    except ValueError:
+        if len(partes) > 1:
+            return None
+        for candidato in _sem_ordinal(compacto):
+            try:
+                inteiro = _interpretar_cardinal(candidato)
+                ordinal = True
+                break
+            except ValueError:
+                continue
+        else:
+            return None
+
+    resultado: Numero = inteiro
+    if len(partes) == 2:
+        fracao = _interpretar_fracao(partes[1])
+        if fracao is None:
+            return None
+        resultado = Decimal(f"{inteiro}.{fracao}")
+    if negativo:
+        resultado = -resultado
+    return {"valor": resultado, "ordinal": ordinal, "por_extenso": True}
+
+
+def _interpretar_fracao(texto: str) -> Optional[str]:
+    """Dígitos da parte decimal: "eins vier" → "14"; "vierzehn" → "14"."""
+    palavras = [p for p in re.split(r"[\s\-]+", texto) if p]
+    if not palavras:
+        return None
+    if all(_UNIDADES_NORMALIZADAS.get(p, 10) < 10 for p in palavras) and len(palavras) > 1:
+        return "".join(str(_UNIDADES_NORMALIZADAS[p]) for p in palavras)
+    try:
+        return str(_interpretar_cardinal("".join(palavras)))
+    except ValueError:
+        return None
+
+
+# ---------- Correção da prática ----------
+
+def forma_por_extenso(referencia: str) -> Tuple[Numero, bool, str]:
+    """
+    Interpreta o número de referência da prática e escreve sua forma por extenso.
+
+    Args:
+        referencia: Número com algarismos ("78", "3,5" ou "3." para ordinal)
+
+    Returns:
+        Tupla (valor, se é ordinal, forma por extenso)
+
+    Raises:
+        ValueError: Se a referência não for um número
+    """
+    interpretado = interpretar_numero(referencia)
+    if interpretado is None:
+        raise ValueError(f"Número de referência inválido: {referencia!r}")
+    valor, ordinal = interpretado["valor"], interpretado["ordinal"]
+    if ordinal:
+        return valor, True, ordinal_por_extenso(valor)
+    if isinstance(valor, Decimal):
+        return valor, False, decimal_por_extenso(valor)
+    return valor, False, numero_por_extenso(valor)
+
+
+def avaliar_resposta(referencia: str, resposta: str, exigir_extenso: bool = False) -> Dict[str, Any]:
+    """
+    Compara uma resposta com o número de referência.
+
+    Args:
+        referencia: Número esperado (ver forma_por_extenso)
+        resposta: Texto digitado ou transcrição da pronúncia
+        exigir_extenso: Se True, respostas com algarismos são consideradas incorretas
+
+    Returns:
+        Dicionário com correto, valor_reconhecido, forma_esperada e comentario
+
+    Raises:
+        ValueError: Se a referência não for um número
+    """
+    esperado, ordinal, forma_esperada = forma_por_extenso(referencia)
+    interpretado = interpretar_numero(resposta)
+
+    if interpretado is None:
+        correto, reconhecido = False, None
+        comentario = f"Incorreto. Não foi possível reconhecer um número. O correto é \"{forma_esperada}\"."
+    else:
+        reconhecido = interpretado["valor"]
+        # Com algarismos, "78." pode ser só o ponto final da transcrição: compara apenas o valor
+        mesmo_tipo = interpretado["ordinal"] == ordinal or not interpretado["por_extenso"]
+        correto = reconhecido == esperado and mesmo_tipo
+        if correto and exigir_extenso and not interpretado["por_extenso"]:
+            correto = False
+            comentario = f"Escreva o número por extenso: \"{forma_esperada}\"."
+        elif correto:
+            comentario = "Correto!"
+        elif reconhecido == esperado:
+            tipo = "ordinal" if ordinal else "cardinal"
+            comentario = f"Incorreto. Era esperado o {tipo}: \"{forma_esperada}\"."
+        else:
+            comentario = f"Incorreto. A resposta corresponde a {reconhecido}; o correto é \"{forma_esperada}\"."
+
+    return {
+        "correto": correto,
+        "valor_reconhecido": str(reconhecido) if reconhecido is not None else None,
+        "forma_esperada": forma_esperada,
+        "comentario": comentario,
+    }
@@ -0,0 +1,255 @@
+"""
+Pré-renderização do áudio TTS da base de conhecimento e das frases do diálogo.
+
+Percorre todos os registros de conhecimento e as frases do diálogo, sintetiza
+cada texto em todas as velocidades de VelocidadeEnum e grava o resultado no
+cache de áudio do backend. Áudios já presentes no cache são ignorados, de modo
+que o job pode ser interrompido e retomado a qualquer momento.
+
+Uso:
+    python prerenderizar_audio.py                 # execução única
+    python prerenderizar_audio.py --paralelismo 4
+    python prerenderizar_audio.py --observar 60   # re-renderiza quando os dados mudarem
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from main import (
+    GenerateAudioRequest,
+    TTS_SERVICE_URL,
+    armazenar_audio_em_cache,
+    cache_audio,
+    chave_audio,
+    extrair_audio_tts,
+    validador,
+)
+from models import VelocidadeEnum
+
+VOZ_PADRAO = GenerateAudioRequest.model_fields["voice"].default
+NOME_MANIFESTO = "manifesto_prerenderizacao.json"
+ARQUIVOS_OBSERVADOS = ["[BASE] Conhecimento de idiomas.json", "[BASE] Frases do Diálogo.json"]
+
+
+def listar_textos() -> Dict[str, Dict[str, str]]:
+    """
+    Lista os textos a pré-renderizar, indexados pela origem.
+
+    Returns:
+        Dicionário {origem: {"texto": ..., "versao": ...}}, onde origem é o
+        conhecimento_id ou a posição da frase do diálogo
+    """
+    textos = {}
+
+    for conhecimento in validador.validar_conhecimento_idiomas():
+        textos[str(conhecimento.conhecimento_id)] = {
+            "texto": conhecimento.texto_original,
+            "versao": conhecimento.data_hora.isoformat()
+        }
+
+    try:
+        frases = validador.validar_frases_dialogo()
+    except FileNotFoundError:
+        frases = None
+
+    if frases is not None:
+        textos["dialogo:saudacao"] = {"texto": frases.saudacao, "versao": ""}
+        textos["dialogo:despedida"] = {"texto": frases.despedida, "versao": ""}
+        for indice, frase in enumerate(frases.intermediarias):
+            textos[f"dialogo:intermediaria:{indice}"] = {"texto": frase, "versao": ""}
+
+    return textos
+
+
+def _caminho_manifesto() -> Optional[Path]:
+    if cache_audio.diretorio is None:
+        return None
+    return cache_audio.diretorio / NOME_MANIFESTO
+
+
+def carregar_manifesto() -> Dict[str, Dict]:
+    """Carrega o manifesto da última execução (origem -> texto, versão e chaves)."""
+    caminho = _caminho_manifesto()
+    if caminho is None or not caminho.exists():
+        return {}
+    try:
+        return json.loads(caminho.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def salvar_manifesto(manifesto: Dict[str, Dict]) -> None:
+    """Grava o manifesto de forma atômica."""
+    caminho = _caminho_manifesto()
+    if caminho is None:
+        return
+    temporario = caminho.with_name(caminho.name + ".tmp")
+    temporario.write_text(json.dumps(manifesto, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(temporario, caminho)
+
+
+def planejar(textos: Dict[str, Dict[str, str]], manifesto: Dict[str, Dict]) -> Tuple[List[Tuple[str, str, float]], List[str]]:
+    """
+    Calcula o trabalho pendente a partir dos textos atuais e do manifesto.
+
+    Args:
+        textos: Resultado de listar_textos
+        manifesto: Manifesto da última execução
+
+    Returns:
+        Tupla (tarefas, chaves_obsoletas). Cada tarefa é (chave, texto,
+        velocidade); as chaves obsoletas pertencem a registros alterados ou
+        removidos desde a última execução
+    """
+    tarefas = []
+    chaves_atuais = set()
+    vistas = set()
+
+    for origem, info in textos.items():
+        for velocidade in VelocidadeEnum:
+            valor = float(velocidade.value)
+            chave = chave_audio(info["texto"], VOZ_PADRAO, valor)
+            chaves_atuais.add(chave)
+            if chave in vistas or cache_audio.contem(chave):
+                continue
+            vistas.add(chave)
+            tarefas.append((chave, info["texto"], valor))
+
+    chaves_obsoletas = [
+        chave
+        for registro in manifesto.values()
+        for chave in registro.get("chaves", [])
+        if chave not in chaves_atuais
+    ]
+    return tarefas, chaves_obsoletas
+
+
+async def renderizar(tarefas: List[Tuple[str, str, float]], paralelismo: int) -> Dict[str, int]:
+    """
+    Sintetiza as tarefas pendentes com paralelismo limitado.
+
+    Args:
+        tarefas: Lista de (chave, texto, velocidade)
+        paralelismo: Número máximo de sínteses simultâneas
+
+    Returns:
+        Contadores de áudios renderizados e de falhas
+    """
+    semaforo = asyncio.Semaphore(paralelismo)
+    contadores = {"renderizados": 0, "falhas": 0}
+
+    async with httpx.AsyncClient(timeout=120.0) as client:
+        async def renderizar_um(chave: str, texto: str, velocidade: float) -> None:
+            async with semaforo:
+                # Outro processo (ex.: o backend) pode ter gerado o áudio enquanto esperávamos
+                if cache_audio.contem(chave):
+                    return
+                try:
+                    response = await client.post(
+                        f"{TTS_SERVICE_URL}/api/generate-audio",
+                        json={"text": texto, "voice": VOZ_PADRAO, "speed": velocidade},
+                        headers={"Accept": "audio/wav, application/json"}
+                    )
+                    response.raise_for_status()
+                    await armazenar_audio_em_cache(chave, *extrair_audio_tts(response))
+                    contadores["renderizados"] += 1
+                    print(f"[OK] {velocidade}x  {texto}")
+                except (httpx.HTTPError, ValueError) as e:
+                    contadores["falhas"] += 1
+                    print(f"[ERRO] {velocidade}x  {texto}: {e}")
+
+        await asyncio.gather(*(renderizar_um(*tarefa) for tarefa in tarefas))
+
+    return contadores
+
+
+def executar(paralelismo: int) -> Dict[str, int]:
+    """
+    Executa uma rodada incremental de pré-renderização.
+
+    Args:
+        paralelismo: Número máximo de sínteses simultâneas
+
+    Returns:
+        Resumo com pendentes, renderizados, falhas e obsoletos removidos
+    """
+    textos = listar_textos()
+    manifesto = carregar_manifesto()
+    tarefas, chaves_obsoletas = planejar(textos, manifesto)
+
+    for chave in chaves_obsoletas:
+        cache_audio.remover(chave)
+
+    print(f"Textos: {len(textos)} | Pendentes: {len(tarefas)} | Obsoletos removidos: {len(chaves_obsoletas)}")
+    contadores = asyncio.run(renderizar(tarefas, paralelismo)) if tarefas else {"renderizados": 0, "falhas": 0}
+
+    salvar_manifesto({
+        origem: {
+            "texto": info["texto"],
+            "versao": info["versao"],
+            "chaves": [chave_audio(info["texto"], VOZ_PADRAO, float(v.value)) for v in VelocidadeEnum]
+        }
+        for origem, info in textos.items()
+    })
+
+    return {"pendentes": len(tarefas), "obsoletos": len(chaves_obsoletas), **contadores}
+
+
+def _assinatura_dados() -> Tuple[float, ...]:
+    """Retorna o mtime dos arquivos de dados observados (0 se ausente)."""
+    assinatura = []
+    for nome in ARQUIVOS_OBSERVADOS:
+        caminho = validador.base_path / nome
+        assinatura.append(caminho.stat().st_mtime if caminho.exists() else 0.0)
+    return tuple(assinatura)
+
+
+def main():
+    """Função principal do job de pré-renderização."""
+    parser = argparse.ArgumentParser(description="Pré-renderiza o áudio TTS no cache do backend.")
+    parser.add_argument(
+        "--paralelismo", type=int, default=os.cpu_count() or 1,
+        help="Número máximo de sínteses simultâneas (padrão: número de núcleos)"
+    )
+    parser.add_argument(
+        "--observar", type=float, default=None, metavar="SEGUNDOS",
+        help="Permanece em execução e re-renderiza quando os arquivos de dados mudarem"
+    )
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("PRÉ-RENDERIZAÇÃO DE ÁUDIO - Estudo de Idiomas")
+    print("=" * 60)
+    print(f"Serviço TTS: {TTS_SERVICE_URL}")
+    print(f"Cache de áudio: {cache_audio.diretorio}")
+    print(f"Paralelismo: {args.paralelismo}")
+
+    inicio = time.perf_counter()
+    resumo = executar(args.paralelismo)
+    print(f"Resumo: {resumo} em {time.perf_counter() - inicio:.1f}s")
+
+    if args.observar is None:
+        return
+
+    assinatura = _assinatura_dados()
+    print(f"Observando alterações a cada {args.observar:.0f}s (Ctrl+C para sair)...")
+    try:
+        while True:
+            time.sleep(args.observar)
+            nova_assinatura = _assinatura_dados()
+            if nova_assinatura != assinatura:
+                assinatura = nova_assinatura
+                print("Dados alterados, re-renderizando...")
+                print(f"Resumo: {executar(args.paralelismo)}")
+    except KeyboardInterrupt:
+        print("Encerrado.")
+
+
+if __name__ == "__main__":
+    main()
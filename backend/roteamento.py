@@ -0,0 +1,203 @@
+"""
+Roteamento das consultas de um prompt entre um modelo principal e um modelo reserva.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+# Instante da admissão no upstream da consulta do modelo principal em andamento (ver registrar_admissao)
+_admissao_principal: ContextVar[Optional[List[float]]] = ContextVar("admissao_principal", default=None)
+
+
+def registrar_admissao() -> None:
+    """
+    Marca o instante em que a consulta em andamento foi admitida no upstream.
+
+    Chamado por quem faz a consulta logo após obter a vaga no controle de
+    admissão. Dentro da consulta do modelo principal de RoteadorModelos, a
+    latência registrada passa a ser contada a partir desse instante, sem a
+    espera na fila; fora dela, não faz nada.
+    """
+    registro = _admissao_principal.get()
+    if registro is not None and not registro:
+        registro.append(time.monotonic())
+
+
+class OrcamentoEsgotado(Exception):
+    """O modelo principal estourou o orçamento de latência e não há modelo reserva."""
+
+    def __init__(self, prompt_id: str, orcamento_ms: float):
+        self.prompt_id = prompt_id
+        self.orcamento_ms = orcamento_ms
+        super().__init__(f"Orçamento de latência de {orcamento_ms:.0f} ms esgotado ({prompt_id})")
+
+
+class RoteadorModelos:
+    """
+    Executa a consulta de um prompt no modelo principal, recorrendo ao reserva.
+
+    O modelo reserva é consultado quando o principal falha ou estoura o
+    orçamento de latência (o principal é então cancelado). Com redundância,
+    uma cópia da consulta é enviada ao reserva assim que o principal passa
+    do p95 das suas latências recentes, e vale a primeira resposta. Para
+    cada prompt são registradas as latências do principal (a partir da
+    admissão no upstream, ver registrar_admissao) e qual camada (principal
+    ou reserva) respondeu, para que as regras possam ser ajustadas.
+
+    A redundância só faz sentido se o upstream atende duas consultas ao
+    mesmo tempo; com redundancia_permitida=False ela é ignorada (com aviso),
+    pois a cópia apenas aguardaria na fila atrás do principal.
+    """
+
+    def __init__(self, janela: int = 100, amostras_minimas: int = 20, redundancia_permitida: bool = True):
+        """
+        Inicializa o roteador.
+
+        Args:
+            janela: Latências recentes do principal guardadas por prompt
+            amostras_minimas: Amostras necessárias antes de usar o p95 na redundância
+            redundancia_permitida: Se o upstream comporta a cópia em paralelo ao principal
+        """
+        self.janela = janela
+        self.amostras_minimas = amostras_minimas
+        self.redundancia_permitida = redundancia_permitida
+        self._redundancia_recusada: set = set()
+        self._latencias: Dict[str, Deque[float]] = {}
+        self._metricas: Dict[str, Dict[str, int]] = {}
+
+    def _metricas_do(self, prompt_id: str) -> Dict[str, int]:
+        return self._metricas.setdefault(prompt_id, {
+            "principal": 0,
+            "reserva": 0,
+            "falhas_principal": 0,
+            "orcamentos_esgotados": 0,
+            "redundancias": 0,
+        })
+
+    def _registrar_latencia(self, prompt_id: str, latencia_ms: float) -> None:
+        self._latencias.setdefault(prompt_id, deque(maxlen=self.janela)).append(latencia_ms)
+
+    def p95_ms(self, prompt_id: str) -> Optional[float]:
+        """
+        Retorna o p95 das latências recentes do modelo principal do prompt.
+
+        Returns:
+            p95 em milissegundos, ou None com menos de amostras_minimas amostras
+        """
+        latencias = self._latencias.get(prompt_id)
+        if not latencias or len(latencias) < self.amostras_minimas:
+            return None
+        ordenadas = sorted(latencias)
+        return ordenadas[math.ceil(0.95 * len(ordenadas)) - 1]
+
+    async def executar(
+        self,
+        prompt_id: str,
+        chamada: Callable[[str], Awaitable[Any]],
+        modelo_principal: str,
+        modelo_reserva: Optional[str] = None,
+        orcamento_ms: Optional[float] = None,
+        redundancia: bool = False
+    ) -> Any:
+        """
+        Executa a consulta segundo a regra de roteamento do prompt.
+
+        Args:
+            prompt_id: Prompt consultado (chave das métricas e latências)
+            chamada: Função que recebe o modelo e cria a corrotina da consulta
+            modelo_principal: Modelo consultado primeiro
+            modelo_reserva: Modelo alternativo (None desativa a alternância)
+            orcamento_ms: Tempo máximo de espera pelo principal (None = sem limite)
+            redundancia: Envia uma cópia ao reserva quando o principal passa do p95
+
+        Returns:
+            Resultado da primeira consulta bem-sucedida
+
+        Raises:
+            OrcamentoEsgotado: Se o principal estourar o orçamento sem modelo reserva
+            Exception: A exceção da última consulta, se todas falharem
+        """
+        metricas = self._metricas_do(prompt_id)
+        if modelo_reserva == modelo_principal:
+            modelo_reserva = None
+        if redundancia and not self.redundancia_permitida:
+            if prompt_id not in self._redundancia_recusada:
+                self._redundancia_recusada.add(prompt_id)
+                print(f"⚠️ Redundância ignorada ({prompt_id}): o upstream não atende duas consultas ao mesmo tempo")
+            redundancia = False
+        prazo_redundancia = self.p95_ms(prompt_id) if redundancia and modelo_reserva else None
+        if prazo_redundancia is not None and orcamento_ms is not None and prazo_redundancia >= orcamento_ms:
+            prazo_redundancia = None
+
+        inicio = time.monotonic()
+        admissao: List[float] = []
+        principal = asyncio.ensure_future(self._consultar_principal(chamada, modelo_principal, admissao))
+        reserva: Optional[asyncio.Future] = None
+        pendentes = {principal}
+        erro: Optional[BaseException] = None
+        try:
+            while pendentes:
+                prazo = None
+                if principal in pendentes:
+                    prazo = prazo_redundancia if reserva is None and prazo_redundancia is not None else orcamento_ms
+                espera = None if prazo is None else max(0.0, prazo / 1000 - (time.monotonic() - inicio))
+                prontas, pendentes = await asyncio.wait(
+                    pendentes, timeout=espera, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for tarefa in prontas:
+                    if tarefa.exception() is None:
+                        if tarefa is principal:
+                            self._registrar_latencia(prompt_id, self._latencia_ms(admissao, inicio))
+                        metricas["principal" if tarefa is principal else "reserva"] += 1
+                        return tarefa.result()
+                    erro = tarefa.exception()
+                    if tarefa is principal:
+                        metricas["falhas_principal"] += 1
+
+                if not prontas:
+                    if reserva is None and prazo == prazo_redundancia:
+                        metricas["redundancias"] += 1
+                    else:
+                        # O principal estourou o orçamento: a espera conta como amostra (limite inferior)
+                        metricas["orcamentos_esgotados"] += 1
+                        self._registrar_latencia(prompt_id, self._latencia_ms(admissao, inicio))
+                        principal.cancel()
+                        pendentes.discard(principal)
+                        erro = OrcamentoEsgotado(prompt_id, orcamento_ms)
+
+                if reserva is None and modelo_reserva:
+                    reserva = asyncio.ensure_future(chamada(modelo_reserva))
+                    pendentes.add(reserva)
+            raise erro
+        finally:
+            for tarefa in (principal, reserva):
+                if tarefa is not None and not tarefa.done():
+                    tarefa.cancel()
+
+    @staticmethod
+    async def _consultar_principal(chamada: Callable[[str], Awaitable[Any]], modelo: str, admissao: List[float]) -> Any:
+        # A variável de contexto vale só dentro desta tarefa (e das que ela criar)
+        _admissao_principal.set(admissao)
+        return await chamada(modelo)
+
+    @staticmethod
+    def _latencia_ms(admissao: List[float], inicio: float) -> float:
+        # Sem admissão registrada (ex.: resposta do cache), conta desde o início da consulta
+        return 1000 * (time.monotonic() - (admissao[0] if admissao else inicio))
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Retorna, por prompt, qual camada respondeu e o p95 do modelo principal.
+
+        Returns:
+            Dicionário prompt_id -> contadores (principal, reserva, falhas do
+            principal, orçamentos esgotados, redundâncias) e p95_principal_ms
+        """
+        return {
+            prompt_id: {**metricas, "p95_principal_ms": self.p95_ms(prompt_id)}
+            for prompt_id, metricas in self._metricas.items()
+        }
@@ -0,0 +1,156 @@
+"""
+Compilação e renderização dos templates da base de prompts.
+"""
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from models import PromptItem
+from esquemas import ErroEsquema, compilar_validador, normalizar_esquema
+
+
+class ErroTemplate(ValueError):
+    """Erro de definição ou de renderização de um template de prompt."""
+    pass
+
+
+def dividir_marcador(marcador: str) -> Tuple[str, str]:
+    """
+    Divide o marcador de parâmetros em prefixo e sufixo.
+
+    O marcador da base de prompts usa a palavra "param" como posição do nome
+    do parâmetro (ex.: "{{param}}"). Sem essa palavra, o marcador é dividido
+    ao meio (ex.: "{{}}" -> "{{" e "}}").
+
+    Args:
+        marcador: Valor de marcador_de_paramentros
+
+    Returns:
+        Tupla (prefixo, sufixo)
+
+    Raises:
+        ErroTemplate: Se o marcador não tiver prefixo nem sufixo
+    """
+    if "param" in marcador:
+        prefixo, sufixo = marcador.split("param", 1)
+    else:
+        meio = len(marcador) // 2
+        prefixo, sufixo = marcador[:meio], marcador[meio:]
+
+    if not prefixo or not sufixo:
+        raise ErroTemplate(f"Marcador de parâmetros inválido: '{marcador}'")
+    return prefixo, sufixo
+
+
+class TemplateCompilado:
+    """
+    Template de prompt pré-processado em segmentos literais e de parâmetro.
+
+    A renderização apenas concatena os segmentos, sem busca textual nem
+    expressões regulares a cada chamada. Para prompts com resposta
+    estruturada, estrutura_esperada também é compilada em um validador.
+    """
+
+    def __init__(self, prompt: PromptItem, marcador: str):
+        """
+        Compila o template do prompt.
+
+        Args:
+            prompt: Item da base de prompts
+            marcador: Marcador de parâmetros da base (ex.: "{{param}}")
+
+        Raises:
+            ErroTemplate: Se o template usar parâmetros não declarados em parametros
+                ou se estrutura_esperada for um esquema inválido
+        """
+        self.prompt = prompt
+        prefixo, sufixo = dividir_marcador(marcador)
+        padrao = re.compile(re.escape(prefixo) + r"\s*([A-Za-z_][A-Za-z0-9_]*)\s*" + re.escape(sufixo))
+
+        # Segmentos: str para texto literal, tupla (nome,) para parâmetro
+        self.segmentos: List[Union[str, Tuple[str]]] = []
+        posicao = 0
+        for ocorrencia in padrao.finditer(prompt.template):
+            if ocorrencia.start() > posicao:
+                self.segmentos.append(prompt.template[posicao:ocorrencia.start()])
+            self.segmentos.append((ocorrencia.group(1),))
+            posicao = ocorrencia.end()
+        if posicao < len(prompt.template):
+            self.segmentos.append(prompt.template[posicao:])
+
+        self.parametros_usados = {s[0] for s in self.segmentos if isinstance(s, tuple)}
+        nao_declarados = self.parametros_usados - set(prompt.parametros)
+        if nao_declarados:
+            raise ErroTemplate(
+                f"Prompt '{prompt.prompt_id}' usa parâmetros não declarados em 'parametros': "
+                f"{', '.join(sorted(nao_declarados))}"
+            )
+
+        # Esquema JSON da resposta (passado ao Ollama como "format") e seu validador
+        self.esquema: Optional[Dict[str, Any]] = None
+        self._validador: Optional[Callable[[Any, str], List[str]]] = None
+        if prompt.resposta_estruturada and prompt.estrutura_esperada:
+            try:
+                self.esquema = normalizar_esquema(prompt.estrutura_esperada)
+                self._validador = compilar_validador(self.esquema)
+            except ErroEsquema as e:
+                raise ErroTemplate(f"Prompt '{prompt.prompt_id}': estrutura_esperada inválida: {e}")
+
+    def renderizar(self, parametros: Dict[str, str]) -> str:
+        """
+        Substitui os parâmetros do template.
+
+        Args:
+            parametros: Valores dos parâmetros (nome -> valor)
+
+        Returns:
+            Texto final do prompt
+
+        Raises:
+            ErroTemplate: Se faltar algum parâmetro usado pelo template
+        """
+        faltando = self.parametros_usados - parametros.keys()
+        if faltando:
+            raise ErroTemplate(
+                f"Parâmetros ausentes para o prompt '{self.prompt.prompt_id}': {', '.join(sorted(faltando))}"
+            )
+
+        return "".join(
+            str(parametros[segmento[0]]) if isinstance(segmento, tuple) else segmento
+            for segmento in self.segmentos
+        )
+
+    def validar_resposta(self, dados: Any) -> List[str]:
+        """
+        Valida uma resposta estruturada contra estrutura_esperada.
+
+        Args:
+            dados: JSON já decodificado da resposta do LLM
+
+        Returns:
+            Lista de erros (vazia se válida ou se o prompt não tiver esquema)
+        """
+        if self._validador is None:
+            return []
+        return self._validador(dados, "$")
+
+
+def compilar_templates(prompts: List[PromptItem], marcador: str) -> Dict[str, TemplateCompilado]:
+    """
+    Compila todos os templates e os indexa por prompt_id.
+
+    Args:
+        prompts: Itens da base de prompts
+        marcador: Marcador de parâmetros da base
+
+    Returns:
+        Dicionário prompt_id -> TemplateCompilado
+
+    Raises:
+        ErroTemplate: Se algum template for inválido ou houver prompt_id repetido
+    """
+    compilados = {}
+    for prompt in prompts:
+        if prompt.prompt_id in compilados:
+            raise ErroTemplate(f"prompt_id repetido: '{prompt.prompt_id}'")
+        compilados[prompt.prompt_id] = TemplateCompilado(prompt, marcador)
+    return compilados
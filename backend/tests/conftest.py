@@ -2,11 +2,50 @@
 Configurações e fixtures compartilhadas para os testes.
 """
 import json
+import sys
 import pytest
 from pathlib import Path
 from datetime import datetime
 from uuid import uuid4
 
+from cache import CacheLRU
+from coalescencia import CoalescedorRequisicoes
+from admissao import ControleAdmissao
+from circuito import DisjuntorCircuito
+from aquecimento import AquecedorModelo
+from fonemas import AvaliadorPronuncia
+from antecipacao import AntecipadorChamadas
+from conversas import GerenciadorConversas
+from roteamento import RoteadorModelos
+
+
+@pytest.fixture(autouse=True)
+def caches_isolados(tmp_path, monkeypatch):
+    """Substitui caches, coalescedores, controles de admissão, disjuntores e métricas do backend por instâncias novas."""
+    main = sys.modules.get("main")
+    if main is None:
+        return
+    monkeypatch.setattr(
+        main, "cache_audio",
+        CacheLRU(diretorio=str(tmp_path / "cache_audio"), extensao=".wav")
+    )
+    monkeypatch.setattr(
+        main, "cache_llm",
+        CacheLRU(diretorio=str(tmp_path / "cache_llm"), extensao=".llm.json", ttl_segundos=3600)
+    )
+    monkeypatch.setattr(main, "coalescedor_tts", CoalescedorRequisicoes())
+    monkeypatch.setattr(main, "coalescedor_llm", CoalescedorRequisicoes())
+    monkeypatch.setattr(main, "admissao_tts", ControleAdmissao("TTS/STT", limite_concorrencia=2))
+    monkeypatch.setattr(main, "admissao_ollama", ControleAdmissao("Ollama", limite_concorrencia=1))
+    monkeypatch.setattr(main, "disjuntor_tts", DisjuntorCircuito("TTS/STT", f"{main.TTS_SERVICE_URL}/health"))
+    monkeypatch.setattr(main, "aquecedor_ollama", AquecedorModelo(main.OLLAMA_SERVICE_URL, main.OLLAMA_MODEL))
+    monkeypatch.setattr(main, "metricas_transcricao", dict.fromkeys(main.metricas_transcricao, 0))
+    monkeypatch.setattr(main, "disjuntor_ollama", DisjuntorCircuito("Ollama", f"{main.OLLAMA_SERVICE_URL}/api/tags"))
+    monkeypatch.setattr(main, "avaliador_pronuncia", AvaliadorPronuncia())
+    monkeypatch.setattr(main, "antecipador_tts", AntecipadorChamadas())
+    monkeypatch.setattr(main, "gerenciador_conversas", GerenciadorConversas())
+    monkeypatch.setattr(main, "roteador_modelos", RoteadorModelos())
+
 
 @pytest.fixture
 def conhecimento_valido():
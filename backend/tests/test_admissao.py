@@ -0,0 +1,118 @@
+"""
+Testes para o controle de admissão dos serviços upstream.
+"""
+import asyncio
+import pytest
+from admissao import ControleAdmissao, ErroAdmissao, PRIORIDADE_INTERATIVA, PRIORIDADE_LOTE
+
+
+class TestControleAdmissao:
+    """Testes para a classe ControleAdmissao."""
+
+    def test_limite_de_concorrencia(self):
+        """Testa que no máximo limite_concorrencia chamadas rodam ao mesmo tempo."""
+        controle = ControleAdmissao("teste", limite_concorrencia=2)
+        simultaneas = []
+        ativas = 0
+
+        async def chamada():
+            nonlocal ativas
+            async with controle.admitir():
+                ativas += 1
+                simultaneas.append(ativas)
+                await asyncio.sleep(0.01)
+                ativas -= 1
+
+        async def cenario():
+            await asyncio.gather(*(chamada() for _ in range(6)))
+
+        asyncio.run(cenario())
+
+        assert max(simultaneas) == 2
+        estatisticas = controle.estatisticas()
+        assert estatisticas["admitidas"] == 6
+        assert estatisticas["enfileiradas"] == 4
+        assert estatisticas["ativas"] == 0
+        assert estatisticas["fila"] == 0
+
+    def test_prioridade_interativa_antes_do_lote(self):
+        """Testa que requisições interativas passam à frente das de lote na fila."""
+        controle = ControleAdmissao("teste", limite_concorrencia=1)
+        ordem = []
+
+        async def chamada(nome, prioridade):
+            async with controle.admitir(prioridade):
+                ordem.append(nome)
+                await asyncio.sleep(0.005)
+
+        async def cenario():
+            primeira = asyncio.ensure_future(chamada("primeira", PRIORIDADE_LOTE))
+            await asyncio.sleep(0)
+            await asyncio.gather(
+                primeira,
+                chamada("lote", PRIORIDADE_LOTE),
+                chamada("interativa", PRIORIDADE_INTERATIVA),
+            )
+
+        asyncio.run(cenario())
+
+        assert ordem == ["primeira", "interativa", "lote"]
+
+    def test_fila_cheia_rejeita_com_429(self):
+        """Testa a rejeição imediata quando a fila está cheia."""
+        controle = ControleAdmissao("teste", limite_concorrencia=1, limite_fila=1)
+
+        async def ocupar():
+            async with controle.admitir():
+                await asyncio.sleep(0.02)
+
+        async def cenario():
+            tarefas = [asyncio.ensure_future(ocupar()) for _ in range(2)]
+            await asyncio.sleep(0)
+            with pytest.raises(ErroAdmissao) as erro:
+                await controle.adquirir()
+            await asyncio.gather(*tarefas)
+            return erro.value
+
+        erro = asyncio.run(cenario())
+
+        assert erro.status_code == 429
+        assert erro.retry_after >= 1
+        assert controle.estatisticas()["rejeitadas_fila_cheia"] == 1
+
+    def test_espera_maxima_rejeita_com_503(self):
+        """Testa que a requisição desiste da fila após a espera máxima."""
+        controle = ControleAdmissao("teste", limite_concorrencia=1, espera_maxima_segundos=0.01)
+
+        async def cenario():
+            admitido_em = await controle.adquirir()
+            with pytest.raises(ErroAdmissao) as erro:
+                await controle.adquirir()
+            controle.liberar(admitido_em)
+            return erro.value
+
+        erro = asyncio.run(cenario())
+
+        assert erro.status_code == 503
+        estatisticas = controle.estatisticas()
+        assert estatisticas["rejeitadas_espera"] == 1
+        assert estatisticas["fila"] == 0
+        assert estatisticas["ativas"] == 0
+
+    def test_cancelamento_na_fila_nao_vaza_vaga(self):
+        """Testa que cancelar uma requisição enfileirada a remove da fila."""
+        controle = ControleAdmissao("teste", limite_concorrencia=1)
+
+        async def cenario():
+            admitido_em = await controle.adquirir()
+            esperando = asyncio.ensure_future(controle.adquirir())
+            await asyncio.sleep(0)
+            esperando.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await esperando
+            controle.liberar(admitido_em)
+
+        asyncio.run(cenario())
+
+        assert controle.estatisticas()["ativas"] == 0
+        assert controle.estatisticas()["fila"] == 0
@@ -0,0 +1,132 @@
+"""
+Testes para a execução especulativa de chamadas ao upstream.
+"""
+import asyncio
+from antecipacao import AntecipadorChamadas
+from coalescencia import CoalescedorRequisicoes
+
+
+class TestAntecipadorChamadas:
+    """Testes para a classe AntecipadorChamadas."""
+
+    def test_limite_de_concorrencia(self):
+        """Testa que no máximo limite_concorrencia chamadas especulativas rodam ao mesmo tempo."""
+        async def cenario():
+            antecipador = AntecipadorChamadas(limite_concorrencia=2)
+            ativas, maximo = 0, 0
+
+            async def chamada():
+                nonlocal ativas, maximo
+                ativas += 1
+                maximo = max(maximo, ativas)
+                await asyncio.sleep(0.01)
+                ativas -= 1
+
+            antecipacoes = [antecipador.agendar(chamada) for _ in range(5)]
+            await asyncio.gather(*(a.tarefa for a in antecipacoes))
+            return maximo
+
+        assert asyncio.run(cenario()) == 2
+
+    def test_aproveita_antecipacao_iniciada(self):
+        """Testa que a chamada já iniciada é aproveitada, sem repetir o upstream."""
+        async def cenario():
+            antecipador = AntecipadorChamadas()
+            chamadas = []
+
+            async def chamada(origem):
+                chamadas.append(origem)
+                await asyncio.sleep(0.01)
+                return origem
+
+            antecipacao = antecipador.agendar(lambda: chamada("antecipada"))
+            await asyncio.sleep(0)
+            resultado = await antecipador.obter(antecipacao, lambda: chamada("direta"))
+            return resultado, chamadas, antecipador.estatisticas()
+
+        resultado, chamadas, estatisticas = asyncio.run(cenario())
+        assert resultado == "antecipada"
+        assert chamadas == ["antecipada"]
+        assert estatisticas["aproveitadas"] == 1
+
+    def test_cancela_antecipacao_na_fila(self):
+        """Testa que uma antecipação ainda aguardando a vez é cancelada e a chamada é feita na hora."""
+        async def cenario():
+            antecipador = AntecipadorChamadas(limite_concorrencia=1)
+            liberar = asyncio.Event()
+            chamadas = []
+
+            async def chamada(origem):
+                chamadas.append(origem)
+                if origem == "ocupante":
+                    await liberar.wait()
+                return origem
+
+            ocupante = antecipador.agendar(lambda: chamada("ocupante"))
+            na_fila = antecipador.agendar(lambda: chamada("na_fila"))
+            await asyncio.sleep(0)
+            resultado = await antecipador.obter(na_fila, lambda: chamada("direta"))
+            liberar.set()
+            await ocupante.tarefa
+            await asyncio.sleep(0)
+            return resultado, chamadas, na_fila.tarefa.cancelled(), antecipador.estatisticas()
+
+        resultado, chamadas, cancelada, estatisticas = asyncio.run(cenario())
+        assert resultado == "direta"
+        assert chamadas == ["ocupante", "direta"]
+        assert cancelada
+        assert estatisticas["canceladas"] == 1
+
+    def test_cancelar_interrompe_chamada_coalescida(self):
+        """Testa que cancelar uma antecipação iniciada interrompe a chamada compartilhada no upstream."""
+        async def cenario():
+            antecipador = AntecipadorChamadas()
+            coalescedor = CoalescedorRequisicoes()
+            canceladas = []
+
+            async def sintetizar():
+                try:
+                    await asyncio.sleep(1)
+                except asyncio.CancelledError:
+                    canceladas.append("upstream")
+                    raise
+
+            antecipacao = antecipador.agendar(lambda: coalescedor.executar("frase", sintetizar))
+            await asyncio.sleep(0)
+            antecipador.cancelar(antecipacao)
+            await asyncio.gather(antecipacao.tarefa, return_exceptions=True)
+            await asyncio.sleep(0)
+            return canceladas, coalescedor.estatisticas()
+
+        canceladas, estatisticas = asyncio.run(cenario())
+        assert canceladas == ["upstream"]
+        assert estatisticas["em_andamento"] == 0
+
+    def test_repete_antecipacao_com_falha(self):
+        """Testa que uma antecipação que falhou é descartada e a chamada é repetida."""
+        async def cenario():
+            antecipador = AntecipadorChamadas()
+
+            async def falha():
+                raise RuntimeError("upstream indisponível")
+
+            async def sucesso():
+                return "ok"
+
+            antecipacao = antecipador.agendar(falha)
+            await asyncio.sleep(0)
+            resultado = await antecipador.obter(antecipacao, sucesso)
+            return resultado, antecipador.estatisticas()
+
+        resultado, estatisticas = asyncio.run(cenario())
+        assert resultado == "ok"
+        assert estatisticas["descartadas"] == 1
+
+    def test_sem_antecipacao(self):
+        """Testa que, sem antecipação, a chamada é feita na hora."""
+        async def sucesso():
+            return "ok"
+
+        antecipador = AntecipadorChamadas()
+        assert asyncio.run(antecipador.obter(None, sucesso)) == "ok"
+        assert antecipador.estatisticas()["agendadas"] == 0
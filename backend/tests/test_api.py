@@ -271,3 +271,98 @@ class TestPostHistoricoPraticaEndpoint:
             response = client.post("/api/historico_de_pratica", json=exercicio_valido)
             assert response.status_code == 500
             assert "interno" in response.json()["detail"].lower()
+
+
+class TestPutPromptsEndpoint:
+    """Testes para o endpoint PUT /api/prompts."""
+
+    def test_put_prompts_template_invalido(self, client, base_prompts_valida):
+        """Testa erro 422 quando o template usa parâmetro não declarado."""
+        from templates import ErroTemplate
+
+        with patch('main.validador.salvar_prompts') as mock_salvar:
+            mock_salvar.side_effect = ErroTemplate("usa parâmetros não declarados")
+
+            response = client.put("/api/prompts", json=base_prompts_valida)
+            assert response.status_code == 422
+            assert "template" in response.json()["detail"].lower()
+
+
+class TestAvaliarAudicaoEndpoint:
+    """Testes para a correção dos exercícios de audição."""
+
+    def test_avaliar(self, client):
+        """Testa a correção de uma transcrição."""
+        response = client.post("/api/pratica/audicao/avaliar", json={
+            "texto_original": "Ich wiege achtundsiebzig Kilo.",
+            "transcricao_usuario": "Ich wiege achtundsiebsich Kilo"
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert data["classificacao"] == "Parcial"
+        assert len(data["alinhamento"]) == 4
+
+    def test_avaliar_lote(self, client):
+        """Testa a correção de vários exercícios na ordem enviada."""
+        response = client.post("/api/pratica/audicao/avaliar/lote", json={"itens": [
+            {"texto_original": "Danke.", "transcricao_usuario": "danke"},
+            {"texto_original": "Danke.", "transcricao_usuario": "Bitte"},
+        ]})
+        assert response.status_code == 200
+        assert [r["classificacao"] for r in response.json()["resultados"]] == ["Sim", "Não"]
+
+    def test_avaliar_lote_vazio(self, client):
+        """Testa erro 422 para lote sem itens."""
+        response = client.post("/api/pratica/audicao/avaliar/lote", json={"itens": []})
+        assert response.status_code == 422
+
+    def test_reavaliar_historico(self, client, exercicio_traducao_valido, exercicio_audicao_valido):
+        """Testa a reavaliação apenas dos exercícios de audição do histórico."""
+        exercicio_audicao_valido["resultado_exercicio"].update(
+            transcricao_usuario="hello!", correto=False
+        )
+        historico = BaseHistoricoPratica(exercicios=[exercicio_traducao_valido, exercicio_audicao_valido])
+
+        with patch('main.validador.validar_historico_pratica', return_value=historico):
+            response = client.get("/api/historico_de_pratica/audicao/reavaliacao")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 1
+        assert data["classificacoes"] == {"Sim": 1, "Parcial": 0, "Não": 0}
+        resultado = data["resultados"][0]
+        assert resultado["exercicio_id"] == exercicio_audicao_valido["exercicio_id"]
+        assert resultado["correto_registrado"] is False
+        assert resultado["correto"] is True
+
+
+class TestAvaliarPronunciaEndpoint:
+    """Testes para a avaliação de pronúncia por fonemas."""
+
+    def test_avaliar(self, client, conhecimento_lista_valida):
+        """Testa a avaliação de uma transcrição do STT contra a transcricao_ipa."""
+        conhecimentos = [ConhecimentoIdioma(**c) for c in conhecimento_lista_valida]
+
+        with patch('main.validador.validar_conhecimento_idiomas', return_value=conhecimentos):
+            response = client.post("/api/pratica/pronuncia/avaliar", json={
+                "conhecimento_id": conhecimento_lista_valida[0]["conhecimento_id"],
+                "transcricao_stt": "Hallo!"
+            })
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["texto_original"] == "Hallo"
+        assert data["correto"] == "Sim"
+        assert data["referencia"] == "ipa"
+
+    def test_conhecimento_inexistente(self, client, conhecimento_lista_valida):
+        """Testa erro 404 para conhecimento_id desconhecido."""
+        conhecimentos = [ConhecimentoIdioma(**c) for c in conhecimento_lista_valida]
+
+        with patch('main.validador.validar_conhecimento_idiomas', return_value=conhecimentos):
+            response = client.post("/api/pratica/pronuncia/avaliar", json={
+                "conhecimento_id": "inexistente",
+                "transcricao_stt": "Hallo"
+            })
+
+        assert response.status_code == 404
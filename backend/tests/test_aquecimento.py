@@ -0,0 +1,79 @@
+"""
+Testes para o aquecimento do modelo do Ollama.
+"""
+import asyncio
+from datetime import datetime
+from unittest.mock import patch, MagicMock, AsyncMock
+import httpx
+import pytest
+from aquecimento import AquecedorModelo, interpretar_horario_ativo
+
+
+class TestHorarioAtivo:
+    """Testes para o horário ativo dos pings."""
+
+    def test_interpretar(self):
+        """Testa a leitura do formato HH-HH."""
+        assert interpretar_horario_ativo("07-23") == (7, 23)
+        assert interpretar_horario_ativo("") is None
+        with pytest.raises(ValueError):
+            interpretar_horario_ativo("7h-23h")
+
+    def test_no_horario_ativo(self):
+        """Testa intervalos normais e que atravessam a meia-noite."""
+        diurno = AquecedorModelo("http://ollama", "modelo", horario_ativo=(7, 23))
+        assert diurno.no_horario_ativo(datetime(2024, 1, 1, 12))
+        assert not diurno.no_horario_ativo(datetime(2024, 1, 1, 23))
+
+        noturno = AquecedorModelo("http://ollama", "modelo", horario_ativo=(22, 6))
+        assert noturno.no_horario_ativo(datetime(2024, 1, 1, 2))
+        assert not noturno.no_horario_ativo(datetime(2024, 1, 1, 12))
+
+        assert not AquecedorModelo("http://ollama", "modelo").no_horario_ativo()
+
+
+class TestAquecedorModelo:
+    """Testes para a classe AquecedorModelo."""
+
+    def test_aquecer_envia_keep_alive_e_mede_carga(self):
+        """Testa a pré-carga do modelo e o registro do tempo de carga."""
+        aquecedor = AquecedorModelo("http://ollama", "gemma3:1b", keep_alive="1h")
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_response = MagicMock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = {"model": "gemma3:1b", "done": True, "load_duration": 3_200_000_000}
+            mock_post = AsyncMock(return_value=mock_response)
+            mock_client.return_value.__aenter__.return_value.post = mock_post
+
+            assert asyncio.run(aquecedor.aquecer()) is True
+
+        assert mock_post.call_args.args[0] == "http://ollama/api/generate"
+        assert mock_post.call_args.kwargs["json"] == {"model": "gemma3:1b", "keep_alive": "1h"}
+        estatisticas = aquecedor.estatisticas()
+        assert estatisticas["aquecimentos"] == 1
+        assert estatisticas["cargas_frias"] == 1
+        assert estatisticas["carga_ms_ultima"] == 3200.0
+
+    def test_falha_ao_aquecer(self):
+        """Testa que a falha de conexão é contada sem propagar a exceção."""
+        aquecedor = AquecedorModelo("http://ollama", "gemma3:1b")
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_client.return_value.__aenter__.return_value.post = AsyncMock(
+                side_effect=httpx.ConnectError("Connection refused")
+            )
+            assert asyncio.run(aquecedor.aquecer()) is False
+
+        assert aquecedor.estatisticas()["falhas_aquecimento"] == 1
+
+    def test_registrar_resposta_quente(self):
+        """Testa que cargas rápidas não contam como partida a frio."""
+        aquecedor = AquecedorModelo("http://ollama", "gemma3:1b")
+        aquecedor.registrar_resposta({"load_duration": 20_000_000})
+        aquecedor.registrar_resposta({"done": True})
+
+        estatisticas = aquecedor.estatisticas()
+        assert estatisticas["respostas_medidas"] == 1
+        assert estatisticas["cargas_frias"] == 0
+        assert estatisticas["carga_ms_media"] == 20.0
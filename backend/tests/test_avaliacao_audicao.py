@@ -0,0 +1,91 @@
+"""
+Testes para a correção aproximada dos exercícios de audição.
+"""
+import pytest
+from avaliacao_audicao import (
+    alinhar_palavras,
+    avaliar_lote,
+    avaliar_transcricao,
+    distancia_edicao,
+    tokenizar,
+)
+
+
+class TestDistanciaEdicao:
+    """Testes para a distância de Levenshtein."""
+
+    @pytest.mark.parametrize("a,b,esperado", [
+        ("", "", 0),
+        ("abc", "", 3),
+        ("kitten", "sitting", 3),
+        ("achtundsiebzig", "achtundsiebsich", 3),
+        (["ich", "bin"], ["ich", "war", "bin"], 1),
+    ])
+    def test_distancias(self, a, b, esperado):
+        """Testa a distância entre caracteres e entre listas de palavras."""
+        assert distancia_edicao(a, b) == esperado
+        assert distancia_edicao(b, a) == esperado
+
+
+class TestAlinharPalavras:
+    """Testes para o alinhamento palavra a palavra."""
+
+    def test_operacoes(self):
+        """Testa igualdade, substituição, omissão e inserção no alinhamento."""
+        caminho = alinhar_palavras(["ich", "heisse", "anna"], ["ich", "heise", "die", "anna"])
+        assert [operacao for operacao, _, _ in caminho] == ["igual", "substituicao", "insercao", "igual"]
+
+        caminho = alinhar_palavras(["guten", "tag"], ["tag"])
+        assert caminho == [("omissao", 0, None), ("igual", 1, 0)]
+
+
+class TestAvaliarTranscricao:
+    """Testes para a correção de uma transcrição."""
+
+    def test_normalizacao(self):
+        """Testa que maiúsculas, pontuação, trema e ß não contam como erro."""
+        resultado = avaliar_transcricao("Ich heiße Jürgen.", "ich heisse juergen")
+        assert resultado["correto"] is True
+        assert resultado["classificacao"] == "Sim"
+        assert resultado["nota"] == 1.0
+
+    def test_quase_acerto(self):
+        """Testa que um quase-acerto é parcial e aparece como substituição no alinhamento."""
+        resultado = avaliar_transcricao("Ich wiege achtundsiebzig Kilo.", "Ich wiege achtundsiebsich Kilo")
+
+        assert resultado["correto"] is False
+        assert resultado["classificacao"] == "Parcial"
+        assert resultado["distancia_caracteres"] == 3
+        assert resultado["distancia_palavras"] == 1
+        assert resultado["taxa_erro_palavras"] == 0.25
+        assert resultado["alinhamento"][2] == {
+            "operacao": "substituicao",
+            "esperado": "achtundsiebzig",
+            "obtido": "achtundsiebsich",
+            "similaridade": 0.8,
+        }
+
+    def test_erro(self):
+        """Testa que transcrições muito diferentes são classificadas como Não."""
+        resultado = avaliar_transcricao("Danke", "Bitte")
+        assert resultado["classificacao"] == "Não"
+        assert resultado["nota"] == 0.2
+
+    def test_limiar_parcial(self):
+        """Testa o limiar configurável da classificação parcial."""
+        assert avaliar_transcricao("Danke", "Dank", limiar_parcial=0.9)["classificacao"] == "Não"
+        assert avaliar_transcricao("Danke", "Dank", limiar_parcial=0.8)["classificacao"] == "Parcial"
+
+    def test_resultado_do_cache_nao_e_compartilhado(self):
+        """Testa que modificar um resultado não altera as próximas avaliações do mesmo par."""
+        avaliar_transcricao("Guten Tag", "Guten Tach")["alinhamento"][0]["operacao"] = "alterado"
+        assert avaliar_transcricao("Guten Tag", "Guten Tach")["alinhamento"][0]["operacao"] == "igual"
+
+    def test_tokenizar(self):
+        """Testa que a pontuação é descartada e palavras com hífen são mantidas."""
+        assert tokenizar("Na, wie geht's? Baden-Württemberg!") == ["Na", "wie", "geht's", "Baden-Württemberg"]
+
+    def test_lote(self):
+        """Testa que o lote preserva a ordem dos pares."""
+        resultados = avaliar_lote([("eins", "eins"), ("zwei", "drei")])
+        assert [r["correto"] for r in resultados] == [True, False]
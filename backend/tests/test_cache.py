@@ -0,0 +1,160 @@
+"""
+Testes para o cache LRU em duas camadas.
+"""
+import pytest
+from cache import CacheLRU, gerar_chave
+
+
+class TestGerarChave:
+    """Testes para a geração de chaves do cache."""
+
+    def test_chave_estavel(self):
+        """Testa que as mesmas partes geram a mesma chave."""
+        assert gerar_chave("Hallo", "Kore", 1.0, "modelo") == gerar_chave("Hallo", "Kore", 1.0, "modelo")
+
+    def test_chave_diferente_por_parte(self):
+        """Testa que qualquer parte diferente gera outra chave."""
+        base = gerar_chave("Hallo", "Kore", 1.0, "modelo")
+        assert gerar_chave("Hallo", "Kore", 0.5, "modelo") != base
+        assert gerar_chave("Hallo!", "Kore", 1.0, "modelo") != base
+        assert gerar_chave("Hallo", "Kore", 1.0, "outro") != base
+
+
+class TestCacheLRU:
+    """Testes para a classe CacheLRU."""
+
+    def test_armazenar_e_obter_da_memoria(self, tmp_path):
+        """Testa leitura de uma entrada recém armazenada."""
+        cache = CacheLRU(diretorio=str(tmp_path))
+        cache.armazenar("a", b"dados", {"mimeType": "audio/wav"})
+
+        dados, metadados = cache.obter("a")
+        assert dados == b"dados"
+        assert metadados["mimeType"] == "audio/wav"
+        assert cache.estatisticas()["hits_memoria"] == 1
+
+    def test_obter_da_memoria_nao_le_o_disco(self, tmp_path):
+        """Testa que obter_da_memoria ignora o disco e não conta a ausência como miss."""
+        cache = CacheLRU(diretorio=str(tmp_path), limite_bytes_memoria=5)
+        cache.armazenar("a", b"12345")
+        cache.armazenar("b", b"12345")
+
+        assert cache.obter_da_memoria("b") == (b"12345", {})
+        assert cache.obter_da_memoria("a") is None
+        assert cache.estatisticas()["misses"] == 0
+        assert cache.obter("a") == (b"12345", {})
+        assert cache.estatisticas()["hits_disco"] == 1
+
+    def test_armazenar_so_na_memoria_e_gravar_no_disco(self, tmp_path):
+        """Testa que disco=False adia a gravação do arquivo para gravar_no_disco."""
+        cache = CacheLRU(diretorio=str(tmp_path), extensao=".wav")
+        cache.armazenar("a", b"dados", {"mimeType": "audio/wav"}, disco=False)
+        assert not (tmp_path / "a.wav").exists()
+        assert cache.obter_da_memoria("a") is not None
+
+        cache.gravar_no_disco("a", b"dados", {"mimeType": "audio/wav"})
+        assert (tmp_path / "a.wav").read_bytes() == b"dados"
+        assert not list(tmp_path.glob("*.tmp"))
+        assert CacheLRU(diretorio=str(tmp_path), extensao=".wav").obter("a") == (b"dados", {"mimeType": "audio/wav"})
+        assert cache.estatisticas()["escritas"] == 1
+
+    def test_miss(self, tmp_path):
+        """Testa que chave inexistente retorna None e conta um miss."""
+        cache = CacheLRU(diretorio=str(tmp_path))
+        assert cache.obter("inexistente") is None
+        assert cache.estatisticas()["misses"] == 1
+
+    def test_descarte_lru_memoria(self):
+        """Testa que a entrada menos usada sai da memória ao exceder o orçamento."""
+        cache = CacheLRU(diretorio=None, limite_bytes_memoria=10)
+        cache.armazenar("a", b"12345")
+        cache.armazenar("b", b"12345")
+        cache.obter("a")  # "a" passa a ser a mais recente
+        cache.armazenar("c", b"12345")
+
+        assert cache.obter("b") is None
+        assert cache.obter("a") is not None
+        assert cache.obter("c") is not None
+        assert cache.estatisticas()["descartes_memoria"] == 1
+
+    def test_hit_no_disco_apos_descarte_da_memoria(self, tmp_path):
+        """Testa que entradas descartadas da memória são lidas do disco."""
+        cache = CacheLRU(diretorio=str(tmp_path), limite_bytes_memoria=5)
+        cache.armazenar("a", b"12345")
+        cache.armazenar("b", b"12345")
+
+        dados, _ = cache.obter("a")
+        assert dados == b"12345"
+        assert cache.estatisticas()["hits_disco"] == 1
+
+    def test_descarte_lru_disco(self, tmp_path):
+        """Testa que o disco respeita o orçamento em bytes."""
+        cache = CacheLRU(diretorio=str(tmp_path), limite_bytes_memoria=0, limite_bytes_disco=10)
+        cache.armazenar("a", b"12345")
+        cache.armazenar("b", b"12345")
+        cache.armazenar("c", b"12345")
+
+        assert not cache.contem("a")
+        assert cache.contem("b")
+        assert cache.contem("c")
+        assert cache.estatisticas()["bytes_disco"] == 10
+
+    def test_persistencia_entre_instancias(self, tmp_path):
+        """Testa que o disco é reaproveitado por uma nova instância."""
+        CacheLRU(diretorio=str(tmp_path), extensao=".wav").armazenar("a", b"audio", {"x": 1})
+
+        cache = CacheLRU(diretorio=str(tmp_path), extensao=".wav")
+        dados, metadados = cache.obter("a")
+        assert dados == b"audio"
+        assert metadados == {"x": 1}
+        assert cache.estatisticas()["entradas_disco"] == 1
+
+    def test_adota_entrada_gravada_por_outro_processo(self, tmp_path):
+        """Testa que entradas gravadas por outra instância são encontradas."""
+        cache = CacheLRU(diretorio=str(tmp_path))
+        CacheLRU(diretorio=str(tmp_path)).armazenar("a", b"dados")
+
+        assert cache.obter("a") is not None
+        assert cache.estatisticas()["entradas_disco"] == 1
+
+    def test_taxa_de_acerto(self):
+        """Testa o cálculo da taxa de acerto."""
+        cache = CacheLRU(diretorio=None)
+        cache.armazenar("a", b"x")
+        cache.obter("a")
+        cache.obter("b")
+
+        assert cache.estatisticas()["taxa_de_acerto"] == pytest.approx(0.5)
+
+    def test_limpar(self, tmp_path):
+        """Testa a remoção de todas as entradas."""
+        diretorio = tmp_path / "limpar"
+        cache = CacheLRU(diretorio=str(diretorio))
+        cache.armazenar("a", b"dados")
+        cache.limpar()
+
+        assert not cache.contem("a")
+        assert list(diretorio.iterdir()) == []
+
+    def test_ttl_expira_entrada(self, tmp_path, monkeypatch):
+        """Testa que entradas expiram após o TTL, na memória e no disco."""
+        import cache as modulo_cache
+
+        agora = [1000.0]
+        monkeypatch.setattr(modulo_cache.time, "time", lambda: agora[0])
+
+        diretorio = tmp_path / "ttl"
+        cache = CacheLRU(diretorio=str(diretorio), ttl_segundos=60)
+        cache.armazenar("a", b"resposta")
+        assert cache.obter("a") is not None
+
+        agora[0] += 61
+        assert cache.obter("a") is None
+        assert cache.estatisticas()["expiradas"] == 1
+        assert not cache.contem("a")
+
+        # Entrada persistida também expira ao ser lida por outra instância
+        CacheLRU(diretorio=str(diretorio), ttl_segundos=60).armazenar("b", b"resposta")
+        agora[0] += 61
+        nova = CacheLRU(diretorio=str(diretorio), ttl_segundos=60)
+        assert nova.obter("b") is None
@@ -0,0 +1,81 @@
+"""
+Testes para o disjuntor dos serviços upstream.
+"""
+import asyncio
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+import httpx
+from circuito import CircuitoAberto, DisjuntorCircuito, ESTADO_ABERTO, ESTADO_FECHADO, ESTADO_MEIO_ABERTO
+
+
+class TestDisjuntorCircuito:
+    """Testes para a classe DisjuntorCircuito."""
+
+    def test_abre_apos_falhas_consecutivas(self):
+        """Testa que o disjuntor abre após limite_falhas falhas e passa a recusar na hora."""
+        disjuntor = DisjuntorCircuito("teste", "http://localhost/health", limite_falhas=2)
+
+        disjuntor.registrar_falha()
+        disjuntor.verificar()
+        disjuntor.registrar_falha()
+
+        assert disjuntor.estado == ESTADO_ABERTO
+        with pytest.raises(CircuitoAberto) as erro:
+            disjuntor.verificar()
+        assert erro.value.status_code == 503
+        assert erro.value.retry_after >= 1
+        assert disjuntor.estatisticas()["recusadas"] == 1
+
+    def test_sucesso_zera_falhas(self):
+        """Testa que uma resposta do serviço zera a contagem de falhas."""
+        disjuntor = DisjuntorCircuito("teste", "http://localhost/health", limite_falhas=2)
+
+        disjuntor.registrar_falha()
+        disjuntor.registrar_sucesso()
+        disjuntor.registrar_falha()
+
+        assert disjuntor.estado == ESTADO_FECHADO
+
+    def test_meio_aberto_libera_uma_chamada_de_teste(self):
+        """Testa que, após o tempo de reabertura, apenas uma chamada de teste passa."""
+        disjuntor = DisjuntorCircuito(
+            "teste", "http://localhost/health", limite_falhas=1, tempo_reabertura_segundos=0
+        )
+        disjuntor.registrar_falha()
+        disjuntor.tempo_reabertura_segundos = 60
+        disjuntor._aberto_em -= 60
+
+        disjuntor.verificar()
+        assert disjuntor.estado == ESTADO_MEIO_ABERTO
+        with pytest.raises(CircuitoAberto):
+            disjuntor.verificar()
+
+        disjuntor.registrar_falha()
+        assert disjuntor.estado == ESTADO_ABERTO
+
+    def test_sonda_fecha_disjuntor(self):
+        """Testa que uma sonda bem-sucedida fecha o disjuntor."""
+        disjuntor = DisjuntorCircuito("teste", "http://localhost/health", limite_falhas=1)
+        disjuntor.registrar_falha()
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_response = MagicMock()
+            mock_response.status_code = 200
+            mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
+            assert asyncio.run(disjuntor.sondar()) is True
+
+        assert disjuntor.estado == ESTADO_FECHADO
+        assert disjuntor.estatisticas()["ultima_sonda"]["saudavel"] is True
+
+    def test_sonda_com_servico_fora_do_ar(self):
+        """Testa que a sonda registra a falha de conexão."""
+        disjuntor = DisjuntorCircuito("teste", "http://localhost/health", limite_falhas=1)
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+                side_effect=httpx.ConnectError("Connection refused")
+            )
+            assert asyncio.run(disjuntor.sondar()) is False
+
+        assert disjuntor.estado == ESTADO_ABERTO
+        assert "ConnectError" in disjuntor.estatisticas()["ultima_sonda"]["detalhe"]
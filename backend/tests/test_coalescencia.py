@@ -0,0 +1,146 @@
+"""
+Testes para a coalescência de requisições idênticas em andamento.
+"""
+import asyncio
+import pytest
+from coalescencia import CoalescedorRequisicoes
+
+
+class TestCoalescedorRequisicoes:
+    """Testes para a classe CoalescedorRequisicoes."""
+
+    def test_requisicoes_identicas_compartilham_chamada(self):
+        """Testa que chamadas simultâneas com a mesma chave executam a fábrica uma vez."""
+        coalescedor = CoalescedorRequisicoes()
+        chamadas = []
+
+        async def fabrica():
+            chamadas.append(1)
+            await asyncio.sleep(0.01)
+            return {"resultado": 42}
+
+        async def cenario():
+            return await asyncio.gather(*(coalescedor.executar("a", fabrica) for _ in range(5)))
+
+        resultados = asyncio.run(cenario())
+
+        assert len(chamadas) == 1
+        assert resultados == [{"resultado": 42}] * 5
+        assert coalescedor.estatisticas() == {
+            "chamadas_upstream": 1, "chamadas_economizadas": 4, "chamadas_canceladas": 0, "em_andamento": 0
+        }
+
+    def test_chaves_diferentes_nao_compartilham(self):
+        """Testa que chaves diferentes disparam chamadas independentes."""
+        coalescedor = CoalescedorRequisicoes()
+
+        async def cenario():
+            return await asyncio.gather(
+                coalescedor.executar("a", lambda: asyncio.sleep(0.01, result="a")),
+                coalescedor.executar("b", lambda: asyncio.sleep(0.01, result="b")),
+            )
+
+        assert asyncio.run(cenario()) == ["a", "b"]
+        assert coalescedor.estatisticas()["chamadas_economizadas"] == 0
+
+    def test_chamadas_sequenciais_nao_sao_coalescidas(self):
+        """Testa que uma chamada concluída não é reaproveitada (isso é papel do cache)."""
+        coalescedor = CoalescedorRequisicoes()
+
+        async def cenario():
+            await coalescedor.executar("a", lambda: asyncio.sleep(0, result=1))
+            await coalescedor.executar("a", lambda: asyncio.sleep(0, result=2))
+
+        asyncio.run(cenario())
+
+        assert coalescedor.estatisticas()["chamadas_upstream"] == 2
+
+    def test_excecao_propagada_para_todos(self):
+        """Testa que a exceção da chamada compartilhada chega a todos os interessados."""
+        coalescedor = CoalescedorRequisicoes()
+
+        async def fabrica():
+            await asyncio.sleep(0.01)
+            raise ValueError("falhou")
+
+        async def cenario():
+            return await asyncio.gather(
+                *(coalescedor.executar("a", fabrica) for _ in range(3)),
+                return_exceptions=True
+            )
+
+        resultados = asyncio.run(cenario())
+
+        assert all(isinstance(r, ValueError) for r in resultados)
+        assert coalescedor.estatisticas()["em_andamento"] == 0
+
+    def test_cancelamento_do_iniciador_nao_afeta_demais(self):
+        """Testa que cancelar quem iniciou a chamada não cancela os demais."""
+        coalescedor = CoalescedorRequisicoes()
+
+        async def fabrica():
+            await asyncio.sleep(0.02)
+            return "ok"
+
+        async def cenario():
+            iniciador = asyncio.ensure_future(coalescedor.executar("a", fabrica))
+            await asyncio.sleep(0)
+            seguidor = asyncio.ensure_future(coalescedor.executar("a", fabrica))
+            await asyncio.sleep(0)
+            iniciador.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await iniciador
+            return await seguidor
+
+        assert asyncio.run(cenario()) == "ok"
+
+    def test_cancelamento_do_ultimo_interessado_cancela_chamada(self):
+        """Testa que a chamada é cancelada quando todos os interessados desistem."""
+        coalescedor = CoalescedorRequisicoes()
+        canceladas = []
+
+        async def fabrica():
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                canceladas.append(1)
+                raise
+
+        async def cenario():
+            interessados = [asyncio.ensure_future(coalescedor.executar("a", fabrica)) for _ in range(2)]
+            await asyncio.sleep(0)
+            interessados[0].cancel()
+            await asyncio.sleep(0)
+            assert canceladas == []
+            interessados[1].cancel()
+            await asyncio.gather(*interessados, return_exceptions=True)
+            await asyncio.sleep(0)
+
+        asyncio.run(cenario())
+
+        assert canceladas == [1]
+        assert coalescedor.estatisticas()["chamadas_canceladas"] == 1
+        assert coalescedor.estatisticas()["em_andamento"] == 0
+
+    def test_nova_chamada_apos_cancelamento_do_ultimo_interessado(self):
+        """Testa que um pedido logo após a desistência do último interessado dispara nova chamada."""
+        coalescedor = CoalescedorRequisicoes()
+        chamadas = []
+
+        async def fabrica():
+            chamadas.append(1)
+            await asyncio.sleep(0.02)
+            return "ok"
+
+        async def cenario():
+            interessado = asyncio.ensure_future(coalescedor.executar("a", fabrica))
+            await asyncio.sleep(0.01)
+            interessado.cancel()
+            await asyncio.sleep(0)
+            # A chamada compartilhada foi cancelada, mas ainda não terminou
+            assert interessado.cancelled()
+            return await coalescedor.executar("a", fabrica)
+
+        assert asyncio.run(cenario()) == "ok"
+        assert len(chamadas) == 2
+        assert coalescedor.estatisticas()["chamadas_canceladas"] == 1
@@ -0,0 +1,85 @@
+"""
+Testes para as conversas com o LLM mantidas no servidor.
+"""
+import pytest
+import conversas as modulo_conversas
+from conversas import GerenciadorConversas
+
+
+@pytest.fixture
+def agora(monkeypatch):
+    """Relógio controlado pelo teste."""
+    instante = [1000.0]
+    monkeypatch.setattr(modulo_conversas.time, "monotonic", lambda: instante[0])
+    return instante
+
+
+class TestGerenciadorConversas:
+    """Testes para a classe GerenciadorConversas."""
+
+    def test_registra_contexto_dos_turnos(self):
+        """Testa que o contexto de cada turno substitui o anterior e é contado como reaproveitado."""
+        gerenciador = GerenciadorConversas()
+        conversa = gerenciador.criar("gemma3:1b", sistema="Responda em alemão")
+
+        gerenciador.registrar_turno(conversa, [1, 2, 3])
+        gerenciador.registrar_turno(conversa, [1, 2, 3, 4, 5])
+
+        assert gerenciador.obter(conversa.conversa_id) is conversa
+        assert conversa.contexto == [1, 2, 3, 4, 5]
+        assert conversa.turnos == 2
+        estatisticas = gerenciador.estatisticas()
+        assert estatisticas["tokens_contexto"] == 5
+        assert estatisticas["tokens_reaproveitados"] == 3
+
+    def test_resposta_sem_contexto_mantem_o_anterior(self):
+        """Testa que um turno sem "context" na resposta não apaga o contexto guardado."""
+        gerenciador = GerenciadorConversas()
+        conversa = gerenciador.criar("gemma3:1b")
+        gerenciador.registrar_turno(conversa, [1, 2])
+        gerenciador.registrar_turno(conversa, None)
+
+        assert conversa.contexto == [1, 2]
+        assert gerenciador.estatisticas()["tokens_contexto"] == 2
+
+    def test_expira_por_inatividade(self, agora):
+        """Testa que conversas sem uso por ttl_segundos deixam de ser encontradas."""
+        gerenciador = GerenciadorConversas(ttl_segundos=60)
+        antiga = gerenciador.criar("gemma3:1b")
+        agora[0] += 40
+        usada = gerenciador.criar("gemma3:1b")
+        agora[0] += 30
+
+        assert gerenciador.obter(antiga.conversa_id) is None
+        assert gerenciador.obter(usada.conversa_id) is usada
+        agora[0] += 59
+        assert gerenciador.obter(usada.conversa_id) is usada
+        assert gerenciador.estatisticas()["expiradas"] == 1
+
+    def test_descarta_a_usada_ha_mais_tempo(self):
+        """Testa o descarte LRU acima de limite_conversas."""
+        gerenciador = GerenciadorConversas(limite_conversas=2)
+        primeira = gerenciador.criar("gemma3:1b")
+        segunda = gerenciador.criar("gemma3:1b")
+        gerenciador.obter(primeira.conversa_id)
+        terceira = gerenciador.criar("gemma3:1b")
+
+        assert gerenciador.obter(segunda.conversa_id) is None
+        assert gerenciador.obter(primeira.conversa_id) is primeira
+        assert gerenciador.obter(terceira.conversa_id) is terceira
+        assert gerenciador.estatisticas()["descartadas"] == 1
+
+    def test_limite_de_tokens(self):
+        """Testa que o total de tokens de contexto é limitado sem descartar a conversa em uso."""
+        gerenciador = GerenciadorConversas(limite_tokens=5)
+        primeira = gerenciador.criar("gemma3:1b")
+        segunda = gerenciador.criar("gemma3:1b")
+        gerenciador.registrar_turno(primeira, [1, 2, 3])
+        gerenciador.registrar_turno(segunda, [1, 2, 3])
+
+        assert gerenciador.obter(primeira.conversa_id) is None
+        assert gerenciador.estatisticas()["tokens_contexto"] == 3
+
+        gerenciador.registrar_turno(segunda, list(range(10)))
+        assert gerenciador.obter(segunda.conversa_id) is segunda
+        assert gerenciador.estatisticas()["tokens_contexto"] == 10
@@ -0,0 +1,96 @@
+"""
+Testes para o estado da sessão da prática de diálogo.
+"""
+import pytest
+from dialogo import ETAPA_DESPEDIDA, ETAPA_INTERMEDIARIA, ETAPA_SAUDACAO, SessaoDialogo
+from models import BaseFrasesDialogo, CorretoEnum
+
+
+@pytest.fixture
+def frases():
+    return BaseFrasesDialogo(
+        saudacao="Hallo",
+        despedida="Tschüss",
+        intermediarias=["Wie heißen Sie?", "Wie alt sind Sie?"]
+    )
+
+
+class TestSessaoDialogo:
+    """Testes para a classe SessaoDialogo."""
+
+    def test_roteiro(self, frases):
+        """Testa a ordem saudação, intermediárias e despedida."""
+        sessao = SessaoDialogo(frases, "alemao", embaralhar=False)
+        assert sessao.roteiro == [
+            (ETAPA_SAUDACAO, "Hallo"),
+            (ETAPA_INTERMEDIARIA, "Wie heißen Sie?"),
+            (ETAPA_INTERMEDIARIA, "Wie alt sind Sie?"),
+            (ETAPA_DESPEDIDA, "Tschüss"),
+        ]
+
+    def test_embaralha_apenas_intermediarias(self, frases):
+        """Testa que o embaralhamento mantém saudação e despedida nas pontas."""
+        sessao = SessaoDialogo(frases, "alemao")
+        assert sessao.roteiro[0] == (ETAPA_SAUDACAO, "Hallo")
+        assert sessao.roteiro[-1] == (ETAPA_DESPEDIDA, "Tschüss")
+        assert sorted(texto for _, texto in sessao.roteiro[1:-1]) == sorted(frases.intermediarias)
+
+    def test_avancar_ate_concluir(self, frases):
+        """Testa o avanço do roteiro e o erro após a última frase."""
+        sessao = SessaoDialogo(frases, "alemao", embaralhar=False)
+        assert [sessao.avancar() for _ in range(4)] == [0, 1, 2, 3]
+        assert sessao.concluida
+        assert sessao.frase(sessao.indice) is None
+        with pytest.raises(ValueError):
+            sessao.avancar()
+
+    def test_texto_dialogo_com_transcricoes_fora_de_ordem(self, frases):
+        """Testa o texto do diálogo com transcrições registradas em qualquer ordem."""
+        sessao = SessaoDialogo(frases, "alemao", embaralhar=False)
+        sessao.avancar()
+        sessao.avancar()
+        sessao.registrar_transcricao(1, "Ich heiße Ana")
+        sessao.registrar_transcricao(0, "Hallo")
+
+        assert sessao.texto_dialogo() == (
+            "App: Hallo\nUsuário: Hallo\n"
+            "App: Wie heißen Sie?\nUsuário: Ich heiße Ana"
+        )
+
+    def test_texto_dialogo_sem_transcricao(self, frases):
+        """Testa a marcação de respostas sem transcrição."""
+        sessao = SessaoDialogo(frases, "alemao", embaralhar=False)
+        sessao.avancar()
+        assert sessao.texto_dialogo() == "App: Hallo\nUsuário: [sem transcrição]"
+
+    def test_texto_ate_despedida(self, frases):
+        """Testa que a resposta à despedida pode ser excluída do texto do diálogo."""
+        sessao = SessaoDialogo(frases, "alemao", embaralhar=False)
+        for indice in range(4):
+            sessao.avancar()
+            sessao.registrar_transcricao(indice, f"resposta {indice}")
+
+        texto = sessao.texto_dialogo(ate=sessao.indice_despedida)
+        assert texto.endswith("App: Wie alt sind Sie?\nUsuário: resposta 2")
+        assert "Tschüss" in sessao.texto_dialogo()
+
+    def test_respostas_transcritas(self, frases):
+        """Testa que só as respostas anteriores à despedida são exigidas."""
+        sessao = SessaoDialogo(frases, "alemao", embaralhar=False)
+        sessao.registrar_transcricao(0, "Hallo")
+        sessao.registrar_transcricao(2, "30")
+        assert not sessao.respostas_transcritas()
+        sessao.registrar_transcricao(1, "")
+        assert sessao.respostas_transcritas()
+
+    @pytest.mark.parametrize("dados,esperado", [
+        ({"nome": "Ana", "idade": "30", "altura": "1,70", "peso": "60"}, CorretoEnum.sim),
+        ({"nome": "Ana", "idade": "", "altura": None}, CorretoEnum.parcial),
+        ({}, CorretoEnum.nao),
+        (None, CorretoEnum.nao),
+    ])
+    def test_avaliar(self, frases, dados, esperado):
+        """Testa a avaliação pelos dados do interlocutor preenchidos."""
+        sessao = SessaoDialogo(frases, "alemao")
+        assert sessao.avaliar(dados) == esperado
+        assert sessao.interlocutor == dados
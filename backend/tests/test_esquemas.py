@@ -0,0 +1,111 @@
+"""
+Testes para os esquemas das respostas estruturadas.
+"""
+import json
+import pytest
+from esquemas import DetectorFimJSON, ErroEsquema, compilar_validador, normalizar_esquema
+
+
+class TestNormalizarEsquema:
+    """Testes para a conversão de estrutura_esperada em JSON Schema."""
+
+    def test_forma_abreviada(self):
+        """Testa a conversão de {"campo": "tipo"} em objeto com campos obrigatórios."""
+        assert normalizar_esquema({"traducao": "string", "acerto": "boolean"}) == {
+            "type": "object",
+            "properties": {"traducao": {"type": "string"}, "acerto": {"type": "boolean"}},
+            "required": ["traducao", "acerto"],
+        }
+
+    def test_json_schema_mantido(self):
+        """Testa que um JSON Schema completo é usado como está."""
+        esquema = {"type": "object", "properties": {"nome": {"type": "string"}}}
+        assert normalizar_esquema(esquema) is esquema
+
+    def test_tipo_desconhecido(self):
+        """Testa erro com tipo desconhecido na forma abreviada."""
+        with pytest.raises(ErroEsquema, match="campo"):
+            normalizar_esquema({"campo": "texto"})
+
+
+class TestCompilarValidador:
+    """Testes para a função compilar_validador."""
+
+    ESQUEMA = {
+        "type": "object",
+        "properties": {
+            "nome": {"type": "string", "minLength": 1},
+            "idade": {"type": "integer", "minimum": 0, "maximum": 120},
+            "genero": {"enum": ["m", "f", "d"]},
+            "hobbies": {"type": "array", "items": {"type": "string"}, "maxItems": 3},
+        },
+        "required": ["nome", "idade"],
+        "additionalProperties": False,
+    }
+
+    def test_resposta_valida(self):
+        """Testa que uma resposta compatível não gera erros."""
+        validar = compilar_validador(self.ESQUEMA)
+        assert validar({"nome": "Anna", "idade": 30, "genero": "f", "hobbies": ["Lesen"]}) == []
+
+    def test_erros_com_caminho(self):
+        """Testa que cada erro informa o caminho do valor inválido."""
+        validar = compilar_validador(self.ESQUEMA)
+        erros = validar({"nome": "", "idade": 130, "genero": "x", "hobbies": ["a", 2], "extra": 1})
+
+        assert "$.nome: tamanho 0, menos de 1" in erros
+        assert "$.idade: 130 maior que 120" in erros
+        assert any(erro.startswith("$.genero:") for erro in erros)
+        assert "$.hobbies[1]: esperado string, recebido int" in erros
+        assert "$.extra: campo não permitido" in erros
+
+    def test_campo_obrigatorio_ausente(self):
+        """Testa erro para campo obrigatório ausente."""
+        assert compilar_validador(self.ESQUEMA)({"nome": "Anna"}) == ["$.idade: campo obrigatório ausente"]
+
+    def test_lista_de_tipos(self):
+        """Testa type com mais de um tipo permitido e que booleanos não contam como número."""
+        validar = compilar_validador({"type": ["number", "null"]})
+        assert validar(1.5) == [] and validar(None) == []
+        assert validar(True) == ["$: esperado number ou null, recebido bool"]
+
+    def test_tipo_desconhecido(self):
+        """Testa erro ao compilar esquema com tipo desconhecido."""
+        with pytest.raises(ErroEsquema):
+            compilar_validador({"type": "texto"})
+
+
+class TestDetectorFimJSON:
+    """Testes para a detecção do fim do JSON em um texto recebido aos pedaços."""
+
+    def test_fim_do_objeto_em_pedacos(self):
+        """Testa que o fim é detectado no pedaço que fecha o objeto, com a posição no texto acumulado."""
+        detector = DetectorFimJSON()
+        pedacos = ['```json\n{"traducao": ', '"Olá"', ', "nota": [1, 2]}', '\n```']
+        texto = ""
+        posicoes = []
+        for pedaco in pedacos:
+            texto += pedaco
+            posicoes.append(detector.alimentar(pedaco))
+
+        assert posicoes[:2] == [None, None]
+        assert json.loads(texto[texto.index("{"):posicoes[2]]) == {"traducao": "Olá", "nota": [1, 2]}
+        assert posicoes[3] == posicoes[2]
+
+    def test_chaves_e_aspas_dentro_de_strings(self):
+        """Testa que chaves e aspas escapadas dentro de strings não fecham o objeto."""
+        texto = '{"a": "}{ \\" ]", "b": "\\\\"}  '
+        detector = DetectorFimJSON()
+        fim = None
+        for caractere in texto:
+            fim = detector.alimentar(caractere) or fim
+
+        assert json.loads(texto[:fim]) == {"a": '}{ " ]', "b": "\\"}
+        assert texto[fim:] == "  "
+
+    def test_objeto_incompleto(self):
+        """Testa que nenhum fim é informado enquanto o objeto não fecha."""
+        detector = DetectorFimJSON()
+        assert detector.alimentar('{"a": {"b": 1}') is None
+        assert detector.fim is None
+
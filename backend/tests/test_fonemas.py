@@ -0,0 +1,121 @@
+"""
+Testes para a avaliação local da pronúncia por fonemas.
+"""
+import pytest
+from datetime import datetime
+from uuid import uuid4
+from fonemas import AvaliadorPronuncia, classe_fonema, ipa_para_fonemas, texto_para_fonemas
+from models import ConhecimentoIdioma
+
+
+def criar_conhecimento(texto_original, transcricao_ipa=None, idioma="alemao"):
+    """Cria um registro mínimo da base de conhecimento."""
+    return ConhecimentoIdioma(
+        conhecimento_id=uuid4(),
+        data_hora=datetime.now(),
+        idioma=idioma,
+        tipo_conhecimento="frase",
+        texto_original=texto_original,
+        transcricao_ipa=transcricao_ipa,
+        traducao="tradução"
+    )
+
+
+def classes(fonemas):
+    return [classe_fonema(f) for f in fonemas]
+
+
+class TestIpaParaFonemas:
+    """Testes para a separação da transcrição IPA em fonemas."""
+
+    def test_acentos_duracao_e_ditongos(self):
+        """Testa que acentos são descartados e ditongos e durações formam um fonema."""
+        assert ipa_para_fonemas("ɪç ˈhaɪsə") == ["ɪ", "ç", "h", "aɪ", "s", "ə"]
+        assert ipa_para_fonemas("ˌɡuːtən ˈtaːk") == ["ɡ", "uː", "t", "ə", "n", "t", "aː", "k"]
+
+    def test_consoante_silabica_e_r_vocalizado(self):
+        """Testa n̩ → ə n, ɐ → ə ʁ e ɐ̯ → ʁ."""
+        assert ipa_para_fonemas("ˈmɔʁɡn̩") == ["m", "ɔ", "ʁ", "ɡ", "ə", "n"]
+        assert ipa_para_fonemas("ˈmeːtɐ") == ["m", "eː", "t", "ə", "ʁ"]
+        assert ipa_para_fonemas("fiːɐ̯") == ["f", "iː", "ʁ"]
+
+    def test_africada_com_ligacao(self):
+        """Testa que t͡s e ts resultam no mesmo fonema."""
+        assert ipa_para_fonemas("ˈfʏnft͡sɪç") == ipa_para_fonemas("ˈfʏnftsɪç")
+
+
+class TestTextoParaFonemas:
+    """Testes para as regras de grafema → fonema do alemão."""
+
+    @pytest.mark.parametrize("texto,ipa", [
+        ("Guten Morgen", "ˌɡuːtən ˈmɔʁɡn̩"),
+        ("Ich bin sechsundfünfzig Jahre alt", "ɪç bɪn ˌzɛksʊntˈfʏnftsɪç ˈjaːʁə alt"),
+        ("Ich wiege achtundsiebzig Kilo", "ɪç ˈviːɡə ˌaxtʊntˈziːptsɪç ˈkiːlo"),
+        ("Ich bin Programmierer", "ɪç bɪn pʁoɡʁaˈmiːʁɐ"),
+        ("Tschüss", "tʃʏs"),
+        ("Guten Abend", "ˌɡuːtən ˈaːbn̩t"),
+    ])
+    def test_coincide_com_ipa_por_classes(self, texto, ipa):
+        """Testa que as regras reproduzem a transcrição IPA no nível de classes de fonemas."""
+        assert classes(texto_para_fonemas(texto)) == classes(ipa_para_fonemas(ipa))
+
+
+class TestAvaliadorPronuncia:
+    """Testes para a classe AvaliadorPronuncia."""
+
+    def test_mesmo_texto(self):
+        """Testa que a transcrição igual ao texto (após normalização) é correta."""
+        conhecimento = criar_conhecimento("Ich heiße Jucieudes.", "ɪç ˈhaɪsə ʒusiˈewdis")
+        resultado = AvaliadorPronuncia().avaliar(conhecimento, "ich heisse Jucieudes")
+
+        assert resultado["correto"] == "Sim"
+        assert resultado["divergencias"] == []
+
+    def test_quase_acerto_com_fonemas_divergentes(self):
+        """Testa a classificação parcial e os fonemas divergentes."""
+        conhecimento = criar_conhecimento("Ich wiege achtundsiebzig Kilo.", "ɪç ˈviːɡə ˌaxtʊntˈziːptsɪç ˈkiːlo")
+        resultado = AvaliadorPronuncia().avaliar(conhecimento, "Ich wiege achtundsiebsich Kilo")
+
+        assert resultado["correto"] == "Parcial"
+        assert resultado["referencia"] == "ipa"
+        assert resultado["divergencias"] == [
+            {"operacao": "substituicao", "esperado": "ts", "reconhecido": "z"}
+        ]
+        assert "/ts/ → /z/" in resultado["comentario"]
+
+    def test_pronuncia_incorreta(self):
+        """Testa a classificação Não para uma transcrição muito diferente."""
+        conhecimento = criar_conhecimento("Guten Morgen", "ˌɡuːtən ˈmɔʁɡn̩")
+        assert AvaliadorPronuncia().avaliar(conhecimento, "Danke schön")["correto"] == "Não"
+
+    def test_sem_ipa_usa_texto_original(self):
+        """Testa que, sem transcricao_ipa, a referência vem das regras aplicadas ao texto."""
+        conhecimento = criar_conhecimento("Guten Tag")
+        resultado = AvaliadorPronuncia().avaliar(conhecimento, "Guten Tack")
+
+        assert resultado["referencia"] == "texto"
+        assert resultado["correto"] == "Sim"  # "Tag" e "Tack" soam iguais (ensurdecimento final)
+
+    def test_outro_idioma_compara_texto(self):
+        """Testa que registros em inglês são comparados por texto."""
+        conhecimento = criar_conhecimento("Good morning", idioma="ingles")
+        resultado = AvaliadorPronuncia().avaliar(conhecimento, "Good mornin")
+
+        assert resultado["correto"] == "Parcial"
+        assert resultado["referencia"] == "texto"
+
+    def test_cache_por_registro(self):
+        """Testa que os fonemas de referência são reaproveitados e recalculados se o registro mudar."""
+        avaliador = AvaliadorPronuncia()
+        conhecimento = criar_conhecimento("Hallo", "haˈloː")
+
+        avaliador.fonemas_referencia(conhecimento)
+        avaliador.fonemas_referencia(conhecimento)
+        alterado = conhecimento.model_copy(update={"transcricao_ipa": "haˈlo"})
+        fonemas, _ = avaliador.fonemas_referencia(alterado)
+
+        assert fonemas == ["h", "a", "l", "o"]
+        estatisticas = avaliador.estatisticas()
+        assert estatisticas["registros"] == 1
+        assert estatisticas["acertos_cache"] == 1
+        assert estatisticas["falhas_cache"] == 2
@@ -95,6 +95,33 @@ class TestBasePrompts:
         prompt = PromptItem(**prompt_valido)
         assert prompt.estrutura_esperada is None
 
+    def test_prompt_item_com_roteamento(self, prompt_valido):
+        """Testa prompt com regra de roteamento entre modelos."""
+        prompt_valido["roteamento"] = {
+            "modelo_principal": "gemma3:270m",
+            "modelo_reserva": "gemma3:1b",
+            "orcamento_latencia_ms": 1500,
+            "redundancia": True
+        }
+        prompt = PromptItem(**prompt_valido)
+        assert prompt.roteamento.modelo_reserva == "gemma3:1b"
+
+    def test_prompt_item_com_opcoes_geracao(self, prompt_valido):
+        """Testa prompt com opções de geração e rejeição de num_predict não positivo."""
+        prompt_valido["opcoes_geracao"] = {"num_predict": 8, "temperature": 0, "stop": ["}"], "num_ctx": 1024}
+        prompt = PromptItem(**prompt_valido)
+        assert prompt.opcoes_geracao.model_dump(exclude_none=True) == prompt_valido["opcoes_geracao"]
+
+        prompt_valido["opcoes_geracao"] = {"num_predict": 0}
+        with pytest.raises(ValidationError):
+            PromptItem(**prompt_valido)
+
+    def test_prompt_item_redundancia_sem_reserva(self, prompt_valido):
+        """Testa que redundância sem modelo reserva é rejeitada."""
+        prompt_valido["roteamento"] = {"modelo_principal": "gemma3:270m", "redundancia": True}
+        with pytest.raises(ValidationError):
+            PromptItem(**prompt_valido)
+
 
 class TestExercicio:
     """Testes para o modelo Exercicio."""
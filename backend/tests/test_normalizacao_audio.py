@@ -0,0 +1,102 @@
+"""
+Testes para a normalização de áudio antes da transcrição.
+"""
+import asyncio
+import io
+import math
+import struct
+import wave
+import pytest
+import normalizacao_audio
+from normalizacao_audio import ErroNormalizacao, normalizar_audio, normalizar_wav
+
+
+def gerar_wav(taxa=44100, canais=2, silencio=0.5, fala=0.5, largura=2):
+    """Gera um WAV com silêncio, um tom de 440 Hz e silêncio de novo."""
+    quadros = []
+    total_silencio = int(silencio * taxa)
+    for _ in range(total_silencio):
+        quadros.append([0] * canais)
+    for i in range(int(fala * taxa)):
+        valor = int(12000 * math.sin(2 * math.pi * 440 * i / taxa))
+        quadros.append([valor] * canais)
+    for _ in range(total_silencio):
+        quadros.append([0] * canais)
+
+    saida = io.BytesIO()
+    with wave.open(saida, "wb") as wav:
+        wav.setnchannels(canais)
+        wav.setsampwidth(largura)
+        wav.setframerate(taxa)
+        if largura == 2:
+            wav.writeframes(b"".join(struct.pack(f"<{canais}h", *q) for q in quadros))
+        else:
+            wav.writeframes(bytes(128 for _ in range(len(quadros) * canais)))
+    return saida.getvalue()
+
+
+def ler_wav(dados):
+    with wave.open(io.BytesIO(dados), "rb") as wav:
+        return wav.getnchannels(), wav.getframerate(), wav.getnframes()
+
+
+class TestNormalizarWav:
+    """Testes para a normalização em Python puro."""
+
+    def test_mono_16khz_sem_silencio(self):
+        """Testa downmix, reamostragem e remoção do silêncio nas pontas."""
+        original = gerar_wav()
+        normalizado = normalizar_wav(original)
+
+        canais, taxa, quadros = ler_wav(normalizado)
+        assert canais == 1
+        assert taxa == 16000
+        # 0,5 s de fala + 0,1 s de margem de cada lado
+        assert abs(quadros / taxa - 0.7) < 0.02
+        assert len(normalizado) < len(original) / 4
+
+    def test_audio_so_com_silencio(self):
+        """Testa que um áudio silencioso resulta em WAV vazio."""
+        normalizado = normalizar_wav(gerar_wav(fala=0))
+        assert ler_wav(normalizado)[2] == 0
+
+    def test_formato_nao_suportado(self):
+        """Testa a rejeição de arquivos que não são WAV."""
+        with pytest.raises(ErroNormalizacao):
+            normalizar_wav(b"\x1aE\xdf\xa3webm")
+
+    def test_wav_8_bits_nao_suportado(self):
+        """Testa a rejeição de WAV que não é PCM 16 bits."""
+        with pytest.raises(ErroNormalizacao):
+            normalizar_wav(gerar_wav(largura=1))
+
+
+class TestNormalizarAudio:
+    """Testes para a escolha da implementação de normalização."""
+
+    def test_sem_ffmpeg_usa_python(self, monkeypatch):
+        """Testa o uso da implementação em Python quando o ffmpeg não existe."""
+        monkeypatch.setattr(normalizacao_audio, "FFMPEG", None)
+
+        normalizado, metodo = asyncio.run(normalizar_audio(io.BytesIO(gerar_wav())))
+
+        assert metodo == "python"
+        assert ler_wav(normalizado)[:2] == (1, 16000)
+
+    @pytest.mark.skipif(normalizacao_audio.FFMPEG is None, reason="ffmpeg não instalado")
+    def test_com_ffmpeg(self):
+        """Testa a normalização pelo ffmpeg."""
+        normalizado, metodo = asyncio.run(normalizar_audio(io.BytesIO(gerar_wav())))
+
+        assert metodo == "ffmpeg"
+        canais, taxa, quadros = ler_wav(normalizado)
+        assert (canais, taxa) == (1, 16000)
+        assert quadros / taxa < 1.0
+
+    def test_corrigir_cabecalho_wav(self):
+        """Testa o preenchimento dos tamanhos de um WAV escrito em pipe."""
+        dados = bytearray(gerar_wav(fala=0.1, silencio=0))
+        struct.pack_into("<I", dados, 4, 0xFFFFFFFF)
+        corrigido = normalizacao_audio._corrigir_cabecalho_wav(bytes(dados))
+        assert struct.unpack_from("<I", corrigido, 4)[0] == len(dados) - 8
+        assert ler_wav(corrigido)[2] > 0
@@ -0,0 +1,129 @@
+"""
+Testes para a conversão entre números e sua forma por extenso em alemão.
+"""
+import pytest
+from decimal import Decimal
+from numeros_alemao import (
+    avaliar_resposta,
+    decimal_por_extenso,
+    interpretar_numero,
+    numero_por_extenso,
+    ordinal_por_extenso,
+)
+
+
+class TestNumeroPorExtenso:
+    """Testes para a escrita de cardinais, ordinais e decimais."""
+
+    @pytest.mark.parametrize("numero,esperado", [
+        (0, "null"),
+        (1, "eins"),
+        (17, "siebzehn"),
+        (21, "einundzwanzig"),
+        (30, "dreißig"),
+        (78, "achtundsiebzig"),
+        (101, "einhunderteins"),
+        (1001, "eintausendeins"),
+        (123456, "einhundertdreiundzwanzigtausendvierhundertsechsundfünfzig"),
+        (1000000, "eine Million"),
+        (2500000, "zwei Millionen fünfhunderttausend"),
+        (-3, "minus drei"),
+    ])
+    def test_cardinais(self, numero, esperado):
+        """Testa cardinais simples, compostos e com escalas."""
+        assert numero_por_extenso(numero) == esperado
+
+    @pytest.mark.parametrize("numero,esperado", [
+        (1, "erste"),
+        (3, "dritte"),
+        (7, "siebte"),
+        (8, "achte"),
+        (16, "sechzehnte"),
+        (21, "einundzwanzigste"),
+        (101, "einhunderterste"),
+        (2000000, "zweimillionste"),
+    ])
+    def test_ordinais(self, numero, esperado):
+        """Testa ordinais regulares e irregulares."""
+        assert ordinal_por_extenso(numero) == esperado
+
+    def test_decimais(self):
+        """Testa decimais com as casas lidas dígito a dígito."""
+        assert decimal_por_extenso("3,14") == "drei Komma eins vier"
+        assert decimal_por_extenso(Decimal("-0.05")) == "minus null Komma null fünf"
+
+    def test_fora_do_intervalo(self):
+        """Testa erro para números a partir de 10^12."""
+        with pytest.raises(ValueError):
+            numero_por_extenso(10 ** 12)
+
+
+class TestInterpretarNumero:
+    """Testes para o reconhecimento de números escritos ou transcritos."""
+
+    @pytest.mark.parametrize("numero", [0, 1, 21, 78, 99, 100, 111, 1999, 21000, 1000001, 3000000042])
+    def test_ida_e_volta_cardinais(self, numero):
+        """Testa que a forma por extenso é reconhecida como o mesmo número."""
+        assert interpretar_numero(numero_por_extenso(numero))["valor"] == numero
+
+    @pytest.mark.parametrize("numero", [1, 3, 7, 8, 19, 20, 21, 100, 103, 1000, 1000000000])
+    def test_ida_e_volta_ordinais(self, numero):
+        """Testa que ordinais por extenso são reconhecidos como ordinais."""
+        resultado = interpretar_numero(ordinal_por_extenso(numero))
+        assert resultado["valor"] == numero and resultado["ordinal"]
+
+    @pytest.mark.parametrize("texto,esperado", [
+        ("Acht und siebzig", 78),
+        ("acht-und-siebzig", 78),
+        ("Fuenfundneunzig", 95),
+        ("dreissig", 30),
+        ("hundertundeins", 101),
+        ("Achtundsiebzig.", 78),
+        ("1.000", 1000),
+        ("zwo", 2),
+    ])
+    def test_variacoes_de_escrita(self, texto, esperado):
+        """Testa a tolerância a maiúsculas, espaços, hífens, ß, trema e algarismos."""
+        assert interpretar_numero(texto)["valor"] == esperado
+
+    def test_decimal_com_komma(self):
+        """Testa decimais com Komma (dígitos separados ou como número)."""
+        assert interpretar_numero("drei Komma eins vier")["valor"] == Decimal("3.14")
+        assert interpretar_numero("drei Komma fünf")["valor"] == Decimal("3.5")
+
+    @pytest.mark.parametrize("texto", ["", "blabla", "sechs sieben", "zehnhundert"])
+    def test_nao_reconhecido(self, texto):
+        """Testa que textos que não são um número retornam None."""
+        assert interpretar_numero(texto) is None
+
+
+class TestAvaliarResposta:
+    """Testes para a correção de respostas da prática."""
+
+    def test_resposta_correta(self):
+        """Testa resposta correta por extenso."""
+        resultado = avaliar_resposta("78", "achtundsiebzig")
+        assert resultado["correto"] is True
+        assert resultado["forma_esperada"] == "achtundsiebzig"
+
+    def test_resposta_incorreta(self):
+        """Testa que o comentário informa o número reconhecido e a forma correta."""
+        resultado = avaliar_resposta("78", "siebenundachtzig")
+        assert resultado["correto"] is False
+        assert resultado["valor_reconhecido"] == "87"
+        assert "achtundsiebzig" in resultado["comentario"]
+
+    def test_algarismos(self):
+        """Testa que algarismos só são aceitos quando o extenso não é exigido."""
+        assert avaliar_resposta("78", "78.")["correto"] is True
+        assert avaliar_resposta("78", "78", exigir_extenso=True)["correto"] is False
+
+    def test_ordinal_e_cardinal(self):
+        """Testa que ordinal e cardinal do mesmo valor não se confundem."""
+        assert avaliar_resposta("3.", "dritte")["correto"] is True
+        assert avaliar_resposta("3", "dritte")["correto"] is False
+
+    def test_referencia_invalida(self):
+        """Testa erro quando a referência não é um número."""
+        with pytest.raises(ValueError):
+            avaliar_resposta("abc", "eins")
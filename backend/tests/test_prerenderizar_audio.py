@@ -0,0 +1,102 @@
+"""
+Testes para o job de pré-renderização de áudio.
+"""
+import base64
+import json
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+
+import prerenderizar_audio
+from cache import CacheLRU
+from validator import ValidadorJSON
+
+
+@pytest.fixture
+def job(tmp_path, temp_json_files, monkeypatch):
+    """Configura o job com dados e cache temporários."""
+    cache = CacheLRU(diretorio=str(tmp_path / "cache_job"), extensao=".wav")
+    monkeypatch.setattr(prerenderizar_audio, "cache_audio", cache)
+    monkeypatch.setattr(prerenderizar_audio, "validador", ValidadorJSON(base_path=str(temp_json_files)))
+    monkeypatch.setattr("main.cache_audio", cache)
+    return prerenderizar_audio
+
+
+def _mock_tts(mock_client):
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.raise_for_status = MagicMock()
+    mock_response.json.return_value = {
+        "audio": base64.b64encode(b"fake_audio_data").decode("utf-8"),
+        "mimeType": "audio/wav",
+        "metadata": {"speed": 1.0}
+    }
+    mock_post = AsyncMock(return_value=mock_response)
+    mock_client.return_value.__aenter__.return_value.post = mock_post
+    return mock_post
+
+
+class TestPrerenderizarAudio:
+    """Testes para o job de pré-renderização."""
+
+    def test_listar_textos(self, job):
+        """Testa que conhecimentos e frases do diálogo são listados."""
+        textos = job.listar_textos()
+        # 2 conhecimentos + saudação + despedida + 3 intermediárias
+        assert len(textos) == 7
+        assert "dialogo:saudacao" in textos
+
+    def test_renderiza_todas_as_velocidades(self, job):
+        """Testa que cada texto é renderizado em todas as velocidades."""
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_post = _mock_tts(mock_client)
+            resumo = job.executar(paralelismo=2)
+
+        assert resumo["renderizados"] == 7 * 3
+        assert mock_post.call_count == 7 * 3
+        velocidades = {chamada.kwargs["json"]["speed"] for chamada in mock_post.call_args_list}
+        assert velocidades == {1.0, 0.75, 0.5}
+
+    def test_retoma_sem_renderizar_novamente(self, job):
+        """Testa que uma segunda execução não refaz áudios já em cache."""
+        with patch('httpx.AsyncClient') as mock_client:
+            _mock_tts(mock_client)
+            job.executar(paralelismo=2)
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_post = _mock_tts(mock_client)
+            resumo = job.executar(paralelismo=2)
+
+        assert resumo["pendentes"] == 0
+        assert mock_post.call_count == 0
+
+    def test_rerenderiza_registro_alterado(self, job, temp_json_files):
+        """Testa que apenas o registro alterado é renderizado e o áudio antigo é removido."""
+        with patch('httpx.AsyncClient') as mock_client:
+            _mock_tts(mock_client)
+            job.executar(paralelismo=2)
+
+        arquivo = temp_json_files / "[BASE] Conhecimento de idiomas.json"
+        dados = json.loads(arquivo.read_text(encoding="utf-8"))
+        dados[0]["texto_original"] = "Hallo zusammen"
+        arquivo.write_text(json.dumps(dados, ensure_ascii=False), encoding="utf-8")
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_post = _mock_tts(mock_client)
+            resumo = job.executar(paralelismo=2)
+
+        assert resumo["pendentes"] == 3
+        assert resumo["obsoletos"] == 3
+        assert {c.kwargs["json"]["text"] for c in mock_post.call_args_list} == {"Hallo zusammen"}
+
+    def test_falha_do_servico_nao_interrompe_job(self, job):
+        """Testa que falhas individuais são contabilizadas sem abortar o job."""
+        import httpx
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_client.return_value.__aenter__.return_value.post = AsyncMock(
+                side_effect=httpx.ConnectError("Connection refused")
+            )
+            resumo = job.executar(paralelismo=2)
+
+        assert resumo["falhas"] == 7 * 3
+        assert resumo["renderizados"] == 0
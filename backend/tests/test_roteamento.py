@@ -0,0 +1,154 @@
+"""
+Testes para o roteamento das consultas entre o modelo principal e o reserva.
+"""
+import asyncio
+import pytest
+from roteamento import OrcamentoEsgotado, RoteadorModelos, registrar_admissao
+
+
+def consulta(latencias, falhas=(), chamadas=None, canceladas=None):
+    """Cria uma consulta simulada com a latência (s) de cada modelo."""
+    async def chamada(modelo):
+        if chamadas is not None:
+            chamadas.append(modelo)
+        try:
+            await asyncio.sleep(latencias[modelo])
+        except asyncio.CancelledError:
+            if canceladas is not None:
+                canceladas.append(modelo)
+            raise
+        if modelo in falhas:
+            raise RuntimeError(f"{modelo} falhou")
+        return modelo
+    return chamada
+
+
+class TestRoteadorModelos:
+    """Testes para a classe RoteadorModelos."""
+
+    def test_principal_responde(self):
+        """Testa que o reserva não é consultado quando o principal responde no orçamento."""
+        roteador = RoteadorModelos()
+        chamadas = []
+        resultado = asyncio.run(roteador.executar(
+            "numeros", consulta({"mini": 0.0, "grande": 0.0}, chamadas=chamadas),
+            "mini", modelo_reserva="grande", orcamento_ms=500
+        ))
+
+        assert resultado == "mini"
+        assert chamadas == ["mini"]
+        assert roteador.estatisticas()["numeros"]["principal"] == 1
+
+    def test_falha_do_principal_usa_reserva(self):
+        """Testa que o reserva responde quando o principal falha."""
+        roteador = RoteadorModelos()
+        resultado = asyncio.run(roteador.executar(
+            "numeros", consulta({"mini": 0.0, "grande": 0.0}, falhas={"mini"}),
+            "mini", modelo_reserva="grande"
+        ))
+
+        assert resultado == "grande"
+        metricas = roteador.estatisticas()["numeros"]
+        assert metricas["falhas_principal"] == 1
+        assert metricas["reserva"] == 1
+
+    def test_orcamento_esgotado_cancela_principal(self):
+        """Testa que o principal é cancelado ao estourar o orçamento e o reserva assume."""
+        roteador = RoteadorModelos()
+        canceladas = []
+        resultado = asyncio.run(roteador.executar(
+            "numeros", consulta({"mini": 1.0, "grande": 0.0}, canceladas=canceladas),
+            "mini", modelo_reserva="grande", orcamento_ms=20
+        ))
+
+        assert resultado == "grande"
+        assert canceladas == ["mini"]
+        assert roteador.estatisticas()["numeros"]["orcamentos_esgotados"] == 1
+
+    def test_orcamento_esgotado_sem_reserva(self):
+        """Testa OrcamentoEsgotado quando não há modelo reserva."""
+        roteador = RoteadorModelos()
+        with pytest.raises(OrcamentoEsgotado):
+            asyncio.run(roteador.executar("numeros", consulta({"mini": 1.0}), "mini", orcamento_ms=20))
+
+    def test_todas_falham(self):
+        """Testa que a exceção do reserva é propagada quando os dois modelos falham."""
+        roteador = RoteadorModelos()
+        with pytest.raises(RuntimeError, match="grande falhou"):
+            asyncio.run(roteador.executar(
+                "numeros", consulta({"mini": 0.0, "grande": 0.0}, falhas={"mini", "grande"}),
+                "mini", modelo_reserva="grande"
+            ))
+
+    def test_redundancia_apos_p95(self):
+        """Testa que a cópia ao reserva é enviada quando o principal passa do p95 e vence."""
+        roteador = RoteadorModelos(amostras_minimas=3)
+        latencias = {"mini": 0.01, "grande": 0.0}
+
+        async def cenario():
+            for _ in range(3):
+                await roteador.executar("numeros", consulta(latencias), "mini", "grande", redundancia=True)
+            latencias["mini"] = 1.0
+            canceladas = []
+            resultado = await roteador.executar(
+                "numeros", consulta(latencias, canceladas=canceladas), "mini", "grande",
+                orcamento_ms=2000, redundancia=True
+            )
+            return resultado, canceladas
+
+        resultado, canceladas = asyncio.run(cenario())
+
+        assert resultado == "grande"
+        assert canceladas == ["mini"]
+        metricas = roteador.estatisticas()["numeros"]
+        assert metricas["redundancias"] == 1
+        assert metricas["principal"] == 3
+        assert metricas["reserva"] == 1
+
+    def test_sem_redundancia_antes_das_amostras_minimas(self):
+        """Testa que sem amostras suficientes o p95 não é usado e só o principal é consultado."""
+        roteador = RoteadorModelos(amostras_minimas=20)
+        chamadas = []
+        asyncio.run(roteador.executar(
+            "numeros", consulta({"mini": 0.02, "grande": 0.0}, chamadas=chamadas),
+            "mini", "grande", redundancia=True
+        ))
+
+        assert chamadas == ["mini"]
+        assert roteador.p95_ms("numeros") is None
+
+    def test_redundancia_recusada_sem_vagas_paralelas(self):
+        """Testa que a redundância é ignorada quando o upstream não atende duas consultas ao mesmo tempo."""
+        roteador = RoteadorModelos(amostras_minimas=1, redundancia_permitida=False)
+        roteador._registrar_latencia("numeros", 1.0)
+        chamadas = []
+        resultado = asyncio.run(roteador.executar(
+            "numeros", consulta({"mini": 0.05, "grande": 0.0}, chamadas=chamadas),
+            "mini", "grande", redundancia=True
+        ))
+
+        assert resultado == "mini"
+        assert chamadas == ["mini"]
+        assert roteador.estatisticas()["numeros"]["redundancias"] == 0
+
+    def test_latencia_contada_a_partir_da_admissao(self):
+        """Testa que a espera na fila de admissão não entra na latência do principal."""
+        roteador = RoteadorModelos(amostras_minimas=1)
+
+        async def chamada(modelo):
+            await asyncio.sleep(0.2)  # Espera na fila de admissão
+            registrar_admissao()
+            await asyncio.sleep(0.01)
+            return modelo
+
+        asyncio.run(roteador.executar("numeros", chamada, "mini"))
+
+        assert roteador.p95_ms("numeros") < 150
+
+    def test_p95(self):
+        """Testa o cálculo do p95 sobre a janela de latências recentes."""
+        roteador = RoteadorModelos(janela=100, amostras_minimas=1)
+        for latencia in range(1, 101):
+            roteador._registrar_latencia("numeros", float(latencia))
+
+        assert roteador.p95_ms("numeros") == 95.0
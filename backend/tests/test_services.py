@@ -2,7 +2,10 @@
 Testes para os endpoints de integração com serviços externos (TTS, STT, Ollama).
 """
 import pytest
+import asyncio
 import base64
+import json
+import time
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock, AsyncMock
 import httpx
@@ -15,6 +18,37 @@ def client():
     return TestClient(app)
 
 
+def ollama_em_streaming(mock_client, *respostas):
+    """
+    Simula o /api/chat do Ollama em streaming (client.send), usado nas respostas estruturadas.
+
+    Cada resposta é um conteúdo (vira duas linhas NDJSON: o conteúdo e a
+    linha final) ou um status HTTP de erro; uma resposta por chamada, em ordem.
+
+    Returns:
+        Cliente HTTP simulado (payloads enviados em build_request.call_args_list)
+    """
+    def upstream(resposta):
+        simulado = MagicMock()
+        simulado.aclose = AsyncMock()
+        simulado.aread = AsyncMock(return_value=b"erro")
+        if isinstance(resposta, int):
+            simulado.status_code = resposta
+            return simulado
+
+        async def aiter_lines():
+            yield json.dumps({"message": {"role": "assistant", "content": resposta}, "done": False})
+            yield json.dumps({"message": {"role": "assistant", "content": ""}, "done": True})
+        simulado.status_code = 200
+        simulado.aiter_lines = aiter_lines
+        return simulado
+
+    instancia = mock_client.return_value.__aenter__.return_value
+    instancia.build_request = MagicMock()
+    instancia.send = AsyncMock(side_effect=[upstream(resposta) for resposta in respostas])
+    return instancia
+
+
 class TestGenerateAudioEndpoint:
     """Testes para o endpoint POST /api/generate-audio (TTS)."""
 
@@ -134,6 +168,94 @@ class TestGenerateAudioEndpoint:
             assert response.status_code == 504
             assert "timeout" in response.json()["detail"].lower()
 
+    def test_generate_audio_cache_evita_servico_tts(self, client):
+        """Testa que a segunda requisição idêntica é servida do cache."""
+        mock_audio_data = {
+            "audio": base64.b64encode(b"fake_audio_data").decode("utf-8"),
+            "mimeType": "audio/wav",
+            "metadata": {"speed": 0.75, "length_scale": 1.33}
+        }
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_response = MagicMock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = mock_audio_data
+
+            mock_post = AsyncMock(return_value=mock_response)
+            mock_client.return_value.__aenter__.return_value.post = mock_post
+
+            payload = {"text": "Guten Tag", "voice": "Kore", "speed": 0.75}
+            primeira = client.post("/api/generate-audio", json=payload)
+            segunda = client.post("/api/generate-audio", json=payload)
+
+            assert primeira.status_code == 200
+            assert segunda.status_code == 200
+            assert segunda.json() == mock_audio_data
+            assert mock_post.call_count == 1
+
+        metricas = client.get("/api/metricas").json()["cache_audio"]
+        assert metricas["hits_memoria"] == 1
+        assert metricas["misses"] == 1
+
+    def test_generate_audio_modo_binario(self, client):
+        """Testa que Accept: audio/wav devolve o áudio bruto com metadata no cabeçalho."""
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_response = MagicMock()
+            mock_response.status_code = 200
+            mock_response.headers = httpx.Headers({
+                "content-type": "audio/wav",
+                "x-audio-metadata": '{"speed": 1.0, "length_scale": 1.0}'
+            })
+            mock_response.content = b"RIFF_fake_wav"
+
+            mock_post = AsyncMock(return_value=mock_response)
+            mock_client.return_value.__aenter__.return_value.post = mock_post
+
+            response = client.post(
+                "/api/generate-audio",
+                json={"text": "Guten Tag"},
+                headers={"Accept": "audio/wav"}
+            )
+
+            assert response.status_code == 200
+            assert response.content == b"RIFF_fake_wav"
+            assert response.headers["content-type"] == "audio/wav"
+            assert response.headers["x-audio-metadata"] == '{"speed": 1.0, "length_scale": 1.0}'
+            assert response.headers["x-cache"] == "MISS"
+            mock_response.json.assert_not_called()
+
+            # Cliente JSON recebe o mesmo áudio do cache, em base64
+            response_json = client.post("/api/generate-audio", json={"text": "Guten Tag"})
+            assert response_json.status_code == 200
+            assert base64.b64decode(response_json.json()["audio"]) == b"RIFF_fake_wav"
+            assert response_json.json()["metadata"]["speed"] == 1.0
+            assert mock_post.call_count == 1
+
+    def test_generate_audio_binario_com_servico_json(self, client):
+        """Testa que o modo binário funciona mesmo se o serviço TTS responder JSON."""
+        mock_audio_data = {
+            "audio": base64.b64encode(b"fake_audio_data").decode("utf-8"),
+            "mimeType": "audio/wav",
+            "metadata": {"speed": 1.0}
+        }
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_response = MagicMock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = mock_audio_data
+
+            mock_post = AsyncMock(return_value=mock_response)
+            mock_client.return_value.__aenter__.return_value.post = mock_post
+
+            response = client.post(
+                "/api/generate-audio",
+                json={"text": "Hallo"},
+                headers={"Accept": "audio/wav"}
+            )
+
+            assert response.status_code == 200
+            assert response.content == b"fake_audio_data"
+
     def test_generate_audio_texto_vazio(self, client):
         """Testa que texto vazio é aceito pelo endpoint."""
         # O Pydantic não rejeita string vazia por padrão
@@ -225,6 +347,94 @@ class TestTranscreverAudioEndpoint:
             assert data["language"] == "de"
             assert len(data["segments"]) == 1
 
+    def test_transcrever_audio_envio_em_streaming(self, client):
+        """Testa que o áudio é repassado em blocos e o SHA-256 é devolvido no cabeçalho."""
+        import hashlib
+
+        fake_audio_bytes = b"RIFF" + b"\x00" * 200_000
+        blocos = []
+
+        async def post(url, files):
+            # Simula o httpx lendo o arquivo em blocos ao montar o multipart
+            leitor = files["file"][1]
+            while True:
+                bloco = leitor.read(65536)
+                if not bloco:
+                    break
+                blocos.append(bloco)
+            mock_response = MagicMock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = {"text": "Hallo", "language": "de", "segments": []}
+            return mock_response
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_client.return_value.__aenter__.return_value.post = AsyncMock(side_effect=post)
+            response = client.post(
+                "/api/transcrever-audio",
+                files={"file": ("audio.wav", fake_audio_bytes, "audio/wav")}
+            )
+
+        assert response.status_code == 200
+        assert len(blocos) > 1
+        assert b"".join(blocos) == fake_audio_bytes
+        assert response.headers["x-audio-sha256"] == hashlib.sha256(fake_audio_bytes).hexdigest()
+
+    def test_transcrever_audio_normalizado(self, client):
+        """Testa que, com normalizar=true, o STT recebe WAV 16 kHz mono e os tempos são reportados."""
+        import io
+        import wave
+        from tests.test_normalizacao_audio import gerar_wav
+
+        enviado = {}
+
+        async def post(url, files):
+            enviado["arquivo"] = files["file"]
+            mock_response = MagicMock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = {"text": "Hallo", "language": "de", "segments": []}
+            return mock_response
+
+        with patch('normalizacao_audio.FFMPEG', None), patch('httpx.AsyncClient') as mock_client:
+            mock_client.return_value.__aenter__.return_value.post = AsyncMock(side_effect=post)
+            response = client.post(
+                "/api/transcrever-audio?normalizar=true",
+                files={"file": ("gravacao.wav", gerar_wav(), "audio/wav")}
+            )
+
+        assert response.status_code == 200
+        nome, conteudo, tipo = enviado["arquivo"]
+        assert (nome, tipo) == ("gravacao.wav", "audio/wav")
+        with wave.open(io.BytesIO(conteudo), "rb") as wav:
+            assert (wav.getnchannels(), wav.getframerate()) == (1, 16000)
+        assert "normalizacao;dur=" in response.headers["server-timing"]
+        assert "stt;dur=" in response.headers["server-timing"]
+        metricas = client.get("/api/metricas").json()["transcricao"]
+        assert metricas["normalizadas"] == 1
+        assert metricas["bytes_enviados"] < metricas["bytes_recebidos"]
+
+    def test_transcrever_audio_normalizacao_impossivel_envia_original(self, client):
+        """Testa que formatos não normalizáveis seguem para o STT sem alteração."""
+        recebido = []
+
+        async def post(url, files):
+            leitor = files["file"][1]
+            recebido.append(b"".join(iter(lambda: leitor.read(65536), b"")))
+            mock_response = MagicMock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = {"text": "Hallo", "language": "de", "segments": []}
+            return mock_response
+
+        with patch('normalizacao_audio.FFMPEG', None), patch('httpx.AsyncClient') as mock_client:
+            mock_client.return_value.__aenter__.return_value.post = AsyncMock(side_effect=post)
+            response = client.post(
+                "/api/transcrever-audio?normalizar=true",
+                files={"file": ("gravacao.webm", b"\x1aE\xdf\xa3webm", "audio/webm")}
+            )
+
+        assert response.status_code == 200
+        assert recebido == [b"\x1aE\xdf\xa3webm"]
+        assert client.get("/api/metricas").json()["transcricao"]["normalizacoes_ignoradas"] == 1
+
     def test_transcrever_audio_formato_mp3(self, client):
         """Testa transcrição de áudio em formato MP3."""
         mock_transcription_data = {
@@ -374,6 +584,28 @@ class TestChatOllamaEndpoint:
             data = response.json()
             assert data["message"]["content"] == "Olá! Como posso ajudar você hoje?"
 
+    def test_chat_ollama_keep_alive_e_tempo_de_carga(self, client):
+        """Testa o envio do keep_alive e o registro do load_duration nas métricas."""
+        import main
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_response = MagicMock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = {
+                "message": {"role": "assistant", "content": "Hallo"},
+                "done": True,
+                "load_duration": 4_000_000_000
+            }
+            mock_post = AsyncMock(return_value=mock_response)
+            mock_client.return_value.__aenter__.return_value.post = mock_post
+
+            client.post("/api/chat", json={"messages": [{"role": "user", "content": "Olá"}]})
+
+        assert mock_post.call_args.kwargs["json"]["keep_alive"] == main.OLLAMA_KEEP_ALIVE
+        metricas = client.get("/api/metricas").json()["modelo_ollama"]
+        assert metricas["cargas_frias"] == 1
+        assert metricas["carga_ms_ultima"] == 4000.0
+
     def test_chat_ollama_multiplas_mensagens(self, client):
         """Testa chat com histórico de múltiplas mensagens."""
         mock_chat_response = {
@@ -548,6 +780,1207 @@ class TestChatOllamaEndpoint:
             assert "erro ao consultar ollama" in response.json()["detail"].lower()
 
 
+class TestChatOllamaStreaming:
+    """Testes para o streaming do endpoint POST /api/chat."""
+
+    @staticmethod
+    def _mock_upstream(mock_client, linhas, status_code=200, corpo=b""):
+        async def aiter_lines():
+            for linha in linhas:
+                yield linha
+
+        upstream = MagicMock()
+        upstream.status_code = status_code
+        upstream.aiter_lines = aiter_lines
+        upstream.aread = AsyncMock(return_value=corpo)
+        upstream.aclose = AsyncMock()
+
+        instancia = mock_client.return_value
+        instancia.build_request = MagicMock()
+        instancia.send = AsyncMock(return_value=upstream)
+        instancia.aclose = AsyncMock()
+        return upstream
+
+    def test_stream_ndjson(self, client):
+        """Testa que as linhas NDJSON do Ollama são repassadas na ordem."""
+        linhas = [
+            '{"message":{"role":"assistant","content":"Hal"},"done":false}',
+            '{"message":{"role":"assistant","content":"lo"},"done":false}',
+            '{"done":true}'
+        ]
+
+        with patch('httpx.AsyncClient') as mock_client:
+            upstream = self._mock_upstream(mock_client, linhas)
+
+            response = client.post(
+                "/api/chat",
+                json={"messages": [{"role": "user", "content": "Oi"}], "stream": True}
+            )
+
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("application/x-ndjson")
+            assert response.text.splitlines() == linhas
+            upstream.aclose.assert_awaited()
+            assert mock_client.return_value.send.call_args.kwargs["stream"] is True
+
+    def test_stream_sse(self, client):
+        """Testa o formato SSE quando o cliente pede text/event-stream."""
+        with patch('httpx.AsyncClient') as mock_client:
+            self._mock_upstream(mock_client, ['{"done":false}', '', '{"done":true}'])
+
+            response = client.post(
+                "/api/chat",
+                json={"messages": [{"role": "user", "content": "Oi"}], "stream": True},
+                headers={"Accept": "text/event-stream"}
+            )
+
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+            assert response.text == 'data: {"done":false}\n\ndata: {"done":true}\n\n'
+
+    def test_stream_modelo_nao_encontrado(self, client):
+        """Testa que erro do Ollama antes do streaming vira HTTPException."""
+        with patch('httpx.AsyncClient') as mock_client:
+            upstream = self._mock_upstream(mock_client, [], status_code=404, corpo=b"model not found")
+
+            response = client.post(
+                "/api/chat",
+                json={"model": "inexistente", "messages": [{"role": "user", "content": "Oi"}], "stream": True}
+            )
+
+            assert response.status_code == 404
+            upstream.aclose.assert_awaited()
+
+    def test_stream_conexao_recusada(self, client):
+        """Testa erro 503 quando o Ollama não está rodando."""
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_client.return_value.build_request = MagicMock()
+            mock_client.return_value.send = AsyncMock(side_effect=httpx.ConnectError("Connection refused"))
+            mock_client.return_value.aclose = AsyncMock()
+
+            response = client.post(
+                "/api/chat",
+                json={"messages": [{"role": "user", "content": "Oi"}], "stream": True}
+            )
+
+            assert response.status_code == 503
+
+    def test_desconexao_fecha_upstream(self):
+        """Testa que encerrar o gerador (cliente desconectado) fecha a conexão com o Ollama."""
+        from main import transmitir_chat_ollama
+
+        async def cenario(upstream, mock_client):
+            http_request = MagicMock()
+            http_request.headers = {}
+
+            resposta = await transmitir_chat_ollama({"model": "m", "messages": [], "stream": True}, http_request)
+            iterador = resposta.body_iterator
+            await iterador.__anext__()
+            await iterador.aclose()
+
+        with patch('httpx.AsyncClient') as mock_client:
+            upstream = self._mock_upstream(mock_client, ['{"done":false}'] * 10)
+            asyncio.run(cenario(upstream, mock_client))
+
+            upstream.aclose.assert_awaited()
+            mock_client.return_value.aclose.assert_awaited()
+
+    def test_erro_de_transporte_libera_vaga(self, client):
+        """Testa que um erro de transporte que não é de conexão devolve a vaga e fecha o cliente."""
+        import main
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_client.return_value.build_request = MagicMock()
+            mock_client.return_value.send = AsyncMock(side_effect=httpx.RemoteProtocolError("Server disconnected"))
+            mock_client.return_value.aclose = AsyncMock()
+
+            with pytest.raises(httpx.RemoteProtocolError):
+                client.post(
+                    "/api/chat",
+                    json={"messages": [{"role": "user", "content": "Oi"}], "stream": True}
+                )
+
+            mock_client.return_value.aclose.assert_awaited()
+        assert main.admissao_ollama.estatisticas()["ativas"] == 0
+
+    def test_gerador_nao_iniciado_libera_vaga(self):
+        """Testa que a vaga é devolvida pela tarefa de fundo se o streaming nunca começar."""
+        import main
+
+        async def cenario():
+            http_request = MagicMock()
+            http_request.headers = {}
+
+            resposta = await main.transmitir_chat_ollama({"model": "m", "messages": [], "stream": True}, http_request)
+            assert main.admissao_ollama.estatisticas()["ativas"] == 1
+            await resposta.background()
+
+        with patch('httpx.AsyncClient') as mock_client:
+            upstream = self._mock_upstream(mock_client, ['{"done":true}'])
+            asyncio.run(cenario())
+
+            upstream.aclose.assert_awaited_once()
+            mock_client.return_value.aclose.assert_awaited_once()
+        assert main.admissao_ollama.estatisticas()["ativas"] == 0
+
+
+class TestChatOllamaCache:
+    """Testes para o cache de respostas do endpoint POST /api/chat."""
+
+    @staticmethod
+    def _mock_ollama(mock_client, conteudo='{"equivalente": true}'):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "message": {"role": "assistant", "content": conteudo},
+            "done": True
+        }
+        mock_post = AsyncMock(return_value=mock_response)
+        mock_client.return_value.__aenter__.return_value.post = mock_post
+        return mock_post
+
+    def test_cache_por_prompt_id(self, client):
+        """Testa que prompts listados em CACHE_LLM_PROMPTS são servidos do cache."""
+        payload = {
+            "messages": [{"role": "user", "content": "78 = achtundsiebzig?"}],
+            "prompt_id": "numeros_verificar_texto"
+        }
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_post = self._mock_ollama(mock_client)
+            primeira = client.post("/api/chat", json=payload)
+            segunda = client.post("/api/chat", json=payload)
+
+        assert primeira.json() == segunda.json()
+        assert mock_post.call_count == 1
+        assert client.get("/api/metricas").json()["cache_llm"]["hits_memoria"] == 1
+
+    def test_sem_cache_por_padrao(self, client):
+        """Testa que requisições sem opt-in sempre consultam o Ollama."""
+        payload = {"messages": [{"role": "user", "content": "Olá"}]}
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_post = self._mock_ollama(mock_client)
+            client.post("/api/chat", json=payload)
+            client.post("/api/chat", json=payload)
+
+        assert mock_post.call_count == 2
+
+    def test_cache_por_requisicao(self, client):
+        """Testa o opt-in e o opt-out explícitos por requisição."""
+        payload = {"messages": [{"role": "user", "content": "Olá"}], "cache": True}
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_post = self._mock_ollama(mock_client)
+            client.post("/api/chat", json=payload)
+            client.post("/api/chat", json=payload)
+            client.post("/api/chat", json={**payload, "cache": False, "prompt_id": "numeros_verificar_texto"})
+
+        assert mock_post.call_count == 2
+
+    def test_chave_inclui_opcoes(self, client):
+        """Testa que opções de geração diferentes não compartilham a resposta."""
+        payload = {"messages": [{"role": "user", "content": "Olá"}], "cache": True}
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_post = self._mock_ollama(mock_client)
+            client.post("/api/chat", json={**payload, "options": {"temperature": 0}})
+            client.post("/api/chat", json={**payload, "options": {"temperature": 1}})
+
+        assert mock_post.call_count == 2
+        assert mock_post.call_args.kwargs["json"]["options"] == {"temperature": 1}
+
+    def test_erro_nao_e_armazenado(self, client):
+        """Testa que respostas de erro do Ollama não entram no cache."""
+        payload = {"messages": [{"role": "user", "content": "Olá"}], "cache": True}
+
+        with patch('main.httpx.AsyncClient') as mock_client_class:
+            mock_response = MagicMock()
+            mock_response.status_code = 401
+            mock_response.text = "Unauthorized"
+            mock_instance = MagicMock()
+            mock_instance.post = AsyncMock(return_value=mock_response)
+            mock_client_class.return_value.__aenter__ = AsyncMock(return_value=mock_instance)
+            mock_client_class.return_value.__aexit__ = AsyncMock(return_value=None)
+
+            client.post("/api/chat", json=payload)
+
+        assert client.get("/api/metricas").json()["cache_llm"]["escritas"] == 0
+
+
+class TestCoalescenciaUpstream:
+    """Testes para o compartilhamento de chamadas idênticas ao TTS e ao Ollama."""
+
+    @staticmethod
+    def _post_lento(resposta):
+        async def post(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return resposta
+        return AsyncMock(side_effect=post)
+
+    def test_sinteses_identicas_simultaneas(self, client):
+        """Testa que sínteses simultâneas do mesmo texto geram uma chamada ao TTS."""
+        import main
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.headers = {"content-type": "audio/wav"}
+        mock_response.content = b"RIFF-audio"
+
+        async def cenario():
+            return await asyncio.gather(
+                *(main.obter_audio_tts("Hallo", "Kore", 1.0) for _ in range(3))
+            )
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_post = self._post_lento(mock_response)
+            mock_client.return_value.__aenter__.return_value.post = mock_post
+            resultados = asyncio.run(cenario())
+
+        assert mock_post.call_count == 1
+        assert all(r[0] == b"RIFF-audio" for r in resultados)
+        metricas = client.get("/api/metricas").json()["coalescencia_tts"]
+        assert metricas["chamadas_upstream"] == 1
+        assert metricas["chamadas_economizadas"] == 2
+
+    def test_chats_identicos_simultaneos(self, client):
+        """Testa que consultas simultâneas idênticas geram uma chamada ao Ollama."""
+        import main
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"message": {"role": "assistant", "content": "ok"}, "done": True}
+        payload = {"model": "gemma3:1b", "messages": [{"role": "user", "content": "Olá"}], "stream": False}
+
+        async def cenario():
+            return await asyncio.gather(
+                main.consultar_ollama(payload), main.consultar_ollama(payload)
+            )
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_post = self._post_lento(mock_response)
+            mock_client.return_value.__aenter__.return_value.post = mock_post
+            primeira, segunda = asyncio.run(cenario())
+
+        assert mock_post.call_count == 1
+        assert primeira == segunda
+        assert client.get("/api/metricas").json()["coalescencia_llm"]["chamadas_economizadas"] == 1
+
+
+class TestAdmissaoUpstream:
+    """Testes para o controle de admissão nos endpoints de proxy."""
+
+    def test_fila_cheia_retorna_429_com_retry_after(self, client):
+        """Testa a rejeição rápida quando não há vaga nem lugar na fila do Ollama."""
+        import main
+        from admissao import ControleAdmissao
+
+        controle = ControleAdmissao("Ollama", limite_concorrencia=1, limite_fila=0)
+        controle._ativas = 1  # Vaga ocupada por outra requisição
+
+        with patch.object(main, "admissao_ollama", controle), patch('httpx.AsyncClient') as mock_client:
+            mock_post = AsyncMock()
+            mock_client.return_value.__aenter__.return_value.post = mock_post
+            response = client.post("/api/chat", json={"messages": [{"role": "user", "content": "Olá"}]})
+
+        assert response.status_code == 429
+        assert int(response.headers["retry-after"]) >= 1
+        mock_post.assert_not_called()
+
+    def test_prioridade_pelo_cabecalho(self, client):
+        """Testa a leitura do cabeçalho X-Prioridade."""
+        import main
+        from admissao import PRIORIDADE_INTERATIVA, PRIORIDADE_LOTE
+
+        requisicao = MagicMock()
+        requisicao.headers = {"x-prioridade": "lote"}
+        assert main.prioridade_da_requisicao(requisicao) == PRIORIDADE_LOTE
+        requisicao.headers = {}
+        assert main.prioridade_da_requisicao(requisicao) == PRIORIDADE_INTERATIVA
+
+    def test_metricas_de_fila(self, client):
+        """Testa que as métricas de admissão são expostas por serviço."""
+        metricas = client.get("/api/metricas").json()
+
+        for servico in ("admissao_tts", "admissao_ollama"):
+            assert {"fila", "ativas", "espera_media_ms", "rejeitadas_fila_cheia"} <= metricas[servico].keys()
+
+
+class TestDisjuntorUpstream:
+    """Testes para os disjuntores nos endpoints de proxy e em /api/saude."""
+
+    def test_disjuntor_aberto_falha_sem_conectar(self, client):
+        """Testa que, após falhas consecutivas, o TTS deixa de ser contatado."""
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_post = AsyncMock(side_effect=httpx.ConnectError("Connection refused"))
+            mock_client.return_value.__aenter__.return_value.post = mock_post
+
+            for _ in range(3):
+                client.post("/api/generate-audio", json={"text": "Hallo"})
+            response = client.post("/api/generate-audio", json={"text": "Hallo"})
+
+        assert response.status_code == 503
+        assert "disjuntor" in response.json()["detail"]
+        assert "retry-after" in response.headers
+        assert mock_post.call_count == 3
+
+    def test_saude_reflete_estado(self, client):
+        """Testa que /api/saude expõe o estado dos disjuntores."""
+        import main
+
+        response = client.get("/api/saude")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ok"
+
+        for _ in range(main.disjuntor_ollama.limite_falhas):
+            main.disjuntor_ollama.registrar_falha()
+
+        dados = client.get("/api/saude").json()
+        assert dados["status"] == "degradado"
+        assert dados["servicos"]["ollama"]["estado"] == "aberto"
+        assert dados["servicos"]["tts"]["estado"] == "fechado"
+
+
+class TestExecutarPromptEndpoint:
+    """Testes para o endpoint POST /api/prompts/{prompt_id}/executar."""
+
+    @pytest.fixture(autouse=True)
+    def validador_temporario(self, temp_json_files, monkeypatch):
+        """Aponta o validador do backend para os arquivos temporários."""
+        from validator import ValidadorJSON
+        monkeypatch.setattr("main.validador", ValidadorJSON(base_path=str(temp_json_files)))
+
+    def test_executar_prompt_sucesso(self, client):
+        """Testa que o template é renderizado no servidor e enviado ao Ollama."""
+        with patch('httpx.AsyncClient') as mock_client:
+            instancia = ollama_em_streaming(mock_client, '{"traducao": "Olá"}')
+
+            response = client.post(
+                "/api/prompts/traducao_001/executar",
+                json={"parametros": {"palavra": "Hallo"}}
+            )
+
+            assert response.status_code == 200
+            assert response.json()["message"]["content"] == '{"traducao": "Olá"}'
+            enviado = instancia.build_request.call_args.kwargs["json"]
+            assert enviado["messages"] == [
+                {"role": "user", "content": "Traduza a seguinte palavra: Hallo"}
+            ]
+
+    @staticmethod
+    def _respostas(*conteudos):
+        respostas = []
+        for conteudo in conteudos:
+            mock_response = MagicMock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = {
+                "message": {"role": "assistant", "content": conteudo},
+                "done": True
+            }
+            respostas.append(mock_response)
+        return AsyncMock(side_effect=respostas)
+
+    def test_executar_prompt_estruturado(self, client):
+        """Testa que estrutura_esperada vai como format e a resposta volta decodificada em dados."""
+        with patch('httpx.AsyncClient') as mock_client:
+            instancia = ollama_em_streaming(mock_client, '{"traducao": "Olá"}')
+
+            response = client.post(
+                "/api/prompts/traducao_001/executar",
+                json={"parametros": {"palavra": "Hallo"}}
+            )
+
+        assert response.status_code == 200
+        assert response.json()["dados"] == {"traducao": "Olá"}
+        enviado = instancia.build_request.call_args.kwargs["json"]
+        assert enviado["stream"] is True
+        assert enviado["format"] == {
+            "type": "object",
+            "properties": {"traducao": {"type": "string"}},
+            "required": ["traducao"]
+        }
+
+    def test_executar_prompt_estruturado_repete_resposta_invalida(self, client):
+        """Testa que uma resposta fora da estrutura é descartada e a consulta repetida."""
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_send = ollama_em_streaming(mock_client, '{"outra": 1}', '{"traducao": "Olá"}').send
+
+            response = client.post(
+                "/api/prompts/traducao_001/executar",
+                json={"parametros": {"palavra": "Hallo"}, "cache": True}
+            )
+
+        assert response.status_code == 200
+        assert response.json()["dados"] == {"traducao": "Olá"}
+        assert mock_send.call_count == 2
+
+    def test_executar_prompt_estruturado_invalido(self, client, monkeypatch):
+        """Testa erro 502 quando nenhuma tentativa produz a estrutura esperada."""
+        monkeypatch.setattr("main.RESPOSTA_ESTRUTURADA_TENTATIVAS", 2)
+        with patch('httpx.AsyncClient') as mock_client:
+            ollama_em_streaming(mock_client, "não é JSON", '{"traducao": 42}')
+
+            response = client.post(
+                "/api/prompts/traducao_001/executar",
+                json={"parametros": {"palavra": "Hallo"}}
+            )
+
+        assert response.status_code == 502
+        assert "$.traducao" in response.json()["detail"]
+
+    def test_executar_prompt_sem_modo_estruturado(self, client):
+        """Testa que estruturada=False envia o prompt sem format."""
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_post = self._respostas("Olá")
+            mock_client.return_value.__aenter__.return_value.post = mock_post
+
+            response = client.post(
+                "/api/prompts/traducao_001/executar",
+                json={"parametros": {"palavra": "Hallo"}, "estruturada": False}
+            )
+
+        assert response.status_code == 200
+        assert "dados" not in response.json()
+        assert "format" not in mock_post.call_args.kwargs["json"]
+
+    def test_executar_prompt_roteado_para_reserva(self, client, monkeypatch, prompt_valido):
+        """Testa que o modelo reserva do roteamento responde quando o principal falha."""
+        from models import PromptItem
+        from templates import TemplateCompilado
+
+        prompt = PromptItem(**{**prompt_valido, "roteamento": {
+            "modelo_principal": "mini", "modelo_reserva": "grande", "orcamento_latencia_ms": 5000
+        }})
+        validador = MagicMock()
+        validador.obter_template.return_value = TemplateCompilado(prompt, "{{param}}")
+        monkeypatch.setattr("main.validador", validador)
+
+        with patch('httpx.AsyncClient') as mock_client:
+            instancia = ollama_em_streaming(mock_client, 404, '{"traducao": "Olá"}')
+
+            response = client.post(
+                "/api/prompts/traducao_001/executar",
+                json={"parametros": {"palavra": "Hallo"}}
+            )
+
+        assert response.status_code == 200
+        assert response.json()["dados"] == {"traducao": "Olá"}
+        assert [c.kwargs["json"]["model"] for c in instancia.build_request.call_args_list] == ["mini", "grande"]
+        metricas = client.get("/api/metricas").json()["roteamento_llm"]["traducao_001"]
+        assert metricas["falhas_principal"] == 1
+        assert metricas["reserva"] == 1
+
+    def test_executar_prompt_modelo_explicito_ignora_roteamento(self, client, monkeypatch, prompt_valido):
+        """Testa que o modelo pedido na requisição dispensa a regra de roteamento."""
+        from models import PromptItem
+        from templates import TemplateCompilado
+
+        prompt = PromptItem(**{**prompt_valido, "roteamento": {"modelo_principal": "mini"}})
+        validador = MagicMock()
+        validador.obter_template.return_value = TemplateCompilado(prompt, "{{param}}")
+        monkeypatch.setattr("main.validador", validador)
+
+        with patch('httpx.AsyncClient') as mock_client:
+            instancia = ollama_em_streaming(mock_client, '{"traducao": "Olá"}')
+
+            client.post(
+                "/api/prompts/traducao_001/executar",
+                json={"parametros": {"palavra": "Hallo"}, "model": "llama3"}
+            )
+
+        assert instancia.build_request.call_args.kwargs["json"]["model"] == "llama3"
+        assert client.get("/api/metricas").json()["roteamento_llm"] == {}
+
+    def test_executar_prompt_estruturado_interrompe_no_json(self, client):
+        """Testa que o streaming do Ollama é encerrado assim que o objeto JSON fecha."""
+        lidas = []
+
+        async def aiter_lines():
+            for trecho in ['{"traducao":', ' "Olá"}', "\n", "\n", "\n"]:
+                lidas.append(trecho)
+                yield json.dumps({"message": {"role": "assistant", "content": trecho}, "done": False})
+            yield json.dumps({"message": {"role": "assistant", "content": ""}, "done": True})
+
+        upstream = MagicMock()
+        upstream.status_code = 200
+        upstream.aiter_lines = aiter_lines
+        upstream.aclose = AsyncMock()
+        with patch('httpx.AsyncClient') as mock_client:
+            instancia = mock_client.return_value.__aenter__.return_value
+            instancia.build_request = MagicMock()
+            instancia.send = AsyncMock(return_value=upstream)
+
+            response = client.post(
+                "/api/prompts/traducao_001/executar",
+                json={"parametros": {"palavra": "Hallo"}}
+            )
+
+        dados = response.json()
+        assert dados["dados"] == {"traducao": "Olá"}
+        assert dados["message"]["content"] == '{"traducao": "Olá"}'
+        assert dados["done_reason"] == "json_completo"
+        assert len(lidas) == 2
+        upstream.aclose.assert_awaited()
+        assert instancia.send.call_args.kwargs["stream"] is True
+
+    def test_executar_prompt_opcoes_geracao(self, client, monkeypatch, prompt_valido):
+        """Testa que as opções de geração do prompt são enviadas e as do item as sobrepõem."""
+        from models import PromptItem
+        from templates import TemplateCompilado
+
+        prompt = PromptItem(**{**prompt_valido, "resposta_estruturada": False, "opcoes_geracao": {
+            "num_predict": 16, "temperature": 0, "stop": ["\n\n"]
+        }})
+        validador = MagicMock()
+        validador.obter_template.return_value = TemplateCompilado(prompt, "{{param}}")
+        monkeypatch.setattr("main.validador", validador)
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_post = self._respostas("Olá", "Oi")
+            mock_client.return_value.__aenter__.return_value.post = mock_post
+
+            client.post("/api/prompts/traducao_001/executar", json={"parametros": {"palavra": "Hallo"}})
+            client.post("/api/chat/lote", json={"itens": [
+                {"prompt_id": "traducao_001", "parametros": {"palavra": "Hi"}, "options": {"temperature": 0.7}}
+            ]})
+
+        primeira, segunda = (c.kwargs["json"]["options"] for c in mock_post.call_args_list)
+        assert primeira == {"num_predict": 16, "temperature": 0, "stop": ["\n\n"]}
+        assert segunda == {"num_predict": 16, "temperature": 0.7, "stop": ["\n\n"]}
+
+    def test_executar_prompt_inexistente(self, client):
+        """Testa erro 404 para prompt_id desconhecido."""
+        response = client.post("/api/prompts/nao_existe/executar", json={"parametros": {}})
+        assert response.status_code == 404
+
+    def test_executar_prompt_parametro_ausente(self, client):
+        """Testa erro 422 quando falta parâmetro do template."""
+        response = client.post("/api/prompts/traducao_001/executar", json={"parametros": {}})
+        assert response.status_code == 422
+        assert "palavra" in response.json()["detail"]
+
+
+class TestConversasEndpoint:
+    """Testes para as conversas mantidas no servidor (/api/chat/conversas)."""
+
+    @staticmethod
+    def resposta_generate(texto, contexto):
+        resposta = MagicMock()
+        resposta.status_code = 200
+        resposta.json.return_value = {
+            "model": "gemma3:1b", "response": texto, "context": contexto, "done": True,
+            "prompt_eval_count": 4, "eval_count": 2
+        }
+        return resposta
+
+    def test_turnos_enviam_so_a_nova_mensagem(self, client):
+        """Testa que o segundo turno reenvia o contexto do Ollama em vez do histórico."""
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_post = AsyncMock(side_effect=[
+                self.resposta_generate("Hallo!", [1, 2, 3]),
+                self.resposta_generate("Ich heiße Lia.", [1, 2, 3, 4, 5]),
+            ])
+            mock_client.return_value.__aenter__.return_value.post = mock_post
+
+            criada = client.post("/api/chat/conversas", json={
+                "model": "gemma3:1b", "system": "Responda em alemão", "options": {"temperature": 0.2}
+            })
+            assert criada.status_code == 201
+            conversa_id = criada.json()["conversa_id"]
+
+            primeira = client.post(f"/api/chat/conversas/{conversa_id}", json={"content": "Hallo"})
+            segunda = client.post(f"/api/chat/conversas/{conversa_id}", json={"content": "Wie heißt du?"})
+
+        assert primeira.status_code == 200
+        assert segunda.json()["message"] == {"role": "assistant", "content": "Ich heiße Lia."}
+        assert segunda.json()["turno"] == 2
+        assert "context" not in segunda.json()
+
+        url, = mock_post.call_args_list[0].args
+        assert url.endswith("/api/generate")
+        payload = mock_post.call_args_list[0].kwargs["json"]
+        assert payload["system"] == "Responda em alemão"
+        assert "context" not in payload
+        payload = mock_post.call_args_list[1].kwargs["json"]
+        assert payload["prompt"] == "Wie heißt du?"
+        assert payload["context"] == [1, 2, 3]
+        assert payload["options"] == {"temperature": 0.2}
+        assert "system" not in payload
+
+        metricas = client.get("/api/metricas").json()["conversas_llm"]
+        assert metricas["turnos"] == 2
+        assert metricas["tokens_reaproveitados"] == 3
+
+    def test_conversa_inexistente(self, client):
+        """Testa erro 404 para conversa inexistente ou expirada."""
+        response = client.post("/api/chat/conversas/inexistente", json={"content": "Hallo"})
+        assert response.status_code == 404
+
+    def test_ollama_indisponivel(self, client):
+        """Testa erro 503 quando o Ollama não está disponível, sem perder a conversa."""
+        conversa_id = client.post("/api/chat/conversas", json={}).json()["conversa_id"]
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_client.return_value.__aenter__.return_value.post = AsyncMock(
+                side_effect=httpx.ConnectError("Connection refused")
+            )
+            response = client.post(f"/api/chat/conversas/{conversa_id}", json={"content": "Hallo"})
+
+        assert response.status_code == 503
+        assert client.get("/api/metricas").json()["conversas_llm"]["ativas"] == 1
+
+
+class TestChatLoteEndpoint:
+    """Testes para o endpoint POST /api/chat/lote."""
+
+    @pytest.fixture(autouse=True)
+    def validador_temporario(self, temp_json_files, monkeypatch):
+        """Aponta o validador do backend para os arquivos temporários."""
+        from validator import ValidadorJSON
+        monkeypatch.setattr("main.validador", ValidadorJSON(base_path=str(temp_json_files)))
+
+    @staticmethod
+    def _responder_com_conteudo():
+        async def post(url, json):
+            await asyncio.sleep(0.001)
+            mock_response = MagicMock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = {
+                "message": {"role": "assistant", "content": json["messages"][-1]["content"].upper()},
+                "done": True
+            }
+            return mock_response
+        return AsyncMock(side_effect=post)
+
+    def test_resultados_na_ordem_dos_itens(self, client):
+        """Testa que os resultados voltam na ordem dos itens enviados."""
+        itens = [
+            {"prompt_id": "traducao_001", "parametros": {"palavra": p}, "estruturada": False}
+            for p in ["eins", "zwei", "drei"]
+        ]
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_post = self._responder_com_conteudo()
+            mock_client.return_value.__aenter__.return_value.post = mock_post
+            response = client.post("/api/chat/lote", json={"itens": itens})
+
+        assert response.status_code == 200
+        dados = response.json()
+        assert dados["sucessos"] == 3 and dados["falhas"] == 0
+        assert [r["indice"] for r in dados["resultados"]] == [0, 1, 2]
+        assert [r["resposta"]["message"]["content"] for r in dados["resultados"]] == [
+            "TRADUZA A SEGUINTE PALAVRA: EINS",
+            "TRADUZA A SEGUINTE PALAVRA: ZWEI",
+            "TRADUZA A SEGUINTE PALAVRA: DREI",
+        ]
+        assert mock_post.call_count == 3
+
+    def test_falhas_parciais_por_item(self, client):
+        """Testa que a falha de um item é reportada sem afetar os demais."""
+        itens = [
+            {"prompt_id": "traducao_001", "parametros": {"palavra": "eins"}, "estruturada": False},
+            {"prompt_id": "nao_existe"},
+            {"prompt_id": "traducao_001", "parametros": {}},
+            {"messages": [{"role": "user", "content": "Olá"}]},
+        ]
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_client.return_value.__aenter__.return_value.post = self._responder_com_conteudo()
+            dados = client.post("/api/chat/lote", json={"itens": itens}).json()
+
+        assert [r["sucesso"] for r in dados["resultados"]] == [True, False, False, True]
+        assert dados["resultados"][1]["erro"]["status"] == 404
+        assert dados["resultados"][2]["erro"]["status"] == 422
+        assert dados["falhas"] == 2
+
+    def test_item_estruturado(self, client):
+        """Testa que itens de prompts com resposta estruturada voltam com dados validados."""
+        with patch('httpx.AsyncClient') as mock_client:
+            instancia = ollama_em_streaming(mock_client, '{"traducao": "um"}')
+            dados = client.post(
+                "/api/chat/lote",
+                json={"itens": [{"prompt_id": "traducao_001", "parametros": {"palavra": "eins"}}]}
+            ).json()
+
+        assert dados["resultados"][0]["resposta"]["dados"] == {"traducao": "um"}
+        assert "format" in instancia.build_request.call_args.kwargs["json"]
+
+    def test_concorrencia_limitada(self, client, monkeypatch):
+        """Testa que no máximo CHAT_LOTE_CONCORRENCIA itens são consultados ao mesmo tempo."""
+        import main
+        from admissao import ControleAdmissao
+
+        monkeypatch.setattr(main, "CHAT_LOTE_CONCORRENCIA", 2)
+        monkeypatch.setattr(main, "admissao_ollama", ControleAdmissao("Ollama", limite_concorrencia=10))
+        simultaneas = {"atual": 0, "maximo": 0}
+
+        async def post(url, json):
+            simultaneas["atual"] += 1
+            simultaneas["maximo"] = max(simultaneas["maximo"], simultaneas["atual"])
+            await asyncio.sleep(0.005)
+            simultaneas["atual"] -= 1
+            mock_response = MagicMock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = {"message": {"role": "assistant", "content": "ok"}, "done": True}
+            return mock_response
+
+        itens = [{"messages": [{"role": "user", "content": f"Frage {i}"}]} for i in range(6)]
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_client.return_value.__aenter__.return_value.post = AsyncMock(side_effect=post)
+            dados = client.post("/api/chat/lote", json={"itens": itens}).json()
+
+        assert dados["sucessos"] == 6
+        assert simultaneas["maximo"] == 2
+
+    def test_item_sem_prompt_nem_mensagens(self, client):
+        """Testa erro 422 para item sem prompt_id e sem messages."""
+        response = client.post("/api/chat/lote", json={"itens": [{"parametros": {"a": 1}}]})
+        assert response.status_code == 422
+
+    def test_lote_vazio(self, client):
+        """Testa erro 422 para lote sem itens."""
+        response = client.post("/api/chat/lote", json={"itens": []})
+        assert response.status_code == 422
+
+
+class TestAvaliarNumeroEndpoint:
+    """Testes para o endpoint POST /api/pratica/numeros/avaliar."""
+
+    def test_avalia_texto_e_transcricao_sem_llm(self, client):
+        """Testa a correção local do texto e da transcrição, sem chamar o Ollama."""
+        with patch('httpx.AsyncClient') as mock_client:
+            response = client.post("/api/pratica/numeros/avaliar", json={
+                "numero_referencia": "78",
+                "texto_usuario": "Acht und siebzig",
+                "audio_transcricao": "87."
+            })
+
+        assert response.status_code == 200
+        dados = response.json()
+        assert dados["forma_esperada"] == "achtundsiebzig"
+        assert dados["texto_correto"] is True
+        assert dados["audio_correto"] is False
+        assert "achtundsiebzig" in dados["audio_comentario"]
+        mock_client.assert_not_called()
+
+    def test_sem_resposta(self, client):
+        """Testa erro 422 quando nenhuma resposta é enviada."""
+        response = client.post("/api/pratica/numeros/avaliar", json={"numero_referencia": "78"})
+        assert response.status_code == 422
+
+    def test_referencia_invalida(self, client):
+        """Testa erro 422 quando numero_referencia não é um número."""
+        response = client.post("/api/pratica/numeros/avaliar", json={
+            "numero_referencia": "abc", "texto_usuario": "eins"
+        })
+        assert response.status_code == 422
+
+    def test_comentario_do_llm(self, client, monkeypatch):
+        """Testa que, com comentar_com_llm, apenas as respostas incorretas são comentadas pelo LLM."""
+        from datetime import datetime
+        from models import PromptItem
+        from templates import TemplateCompilado
+
+        prompt = PromptItem(
+            prompt_id="numeros_comentar_erro",
+            descricao="Comentário",
+            template="Explique por que {{resposta}} não é {{forma_esperada}}",
+            parametros=["resposta", "forma_esperada"],
+            resposta_estruturada=False,
+            ultima_edicao=datetime.now()
+        )
+        validador = MagicMock()
+        validador.obter_template.return_value = TemplateCompilado(prompt, "{{param}}")
+        monkeypatch.setattr("main.validador", validador)
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_response = MagicMock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = {
+                "message": {"role": "assistant", "content": "Dezenas e unidades estão trocadas."},
+                "done": True
+            }
+            mock_post = AsyncMock(return_value=mock_response)
+            mock_client.return_value.__aenter__.return_value.post = mock_post
+
+            dados = client.post("/api/pratica/numeros/avaliar", json={
+                "numero_referencia": "78",
+                "texto_usuario": "siebenundachtzig",
+                "audio_transcricao": "achtundsiebzig",
+                "comentar_com_llm": True
+            }).json()
+
+        assert dados["texto_comentario"] == "Dezenas e unidades estão trocadas."
+        assert dados["audio_comentario"] == "Correto!"
+        assert mock_post.call_count == 1
+        assert mock_post.call_args.kwargs["json"]["messages"][0]["content"] == \
+            "Explique por que siebenundachtzig não é achtundsiebzig"
+
+    def test_comentario_do_llm_indisponivel(self, client):
+        """Testa que sem o prompt de comentário o comentário local é mantido."""
+        dados = client.post("/api/pratica/numeros/avaliar", json={
+            "numero_referencia": "78",
+            "texto_usuario": "siebenundachtzig",
+            "comentar_com_llm": True
+        }).json()
+
+        assert dados["texto_correto"] is False
+        assert "achtundsiebzig" in dados["texto_comentario"]
+
+
+class TestPraticarPronunciaEndpoint:
+    """Testes para o endpoint POST /api/pratica/pronuncia (transcrição, avaliação e registro)."""
+
+    @pytest.fixture
+    def conhecimentos(self, conhecimento_lista_valida):
+        from models import ConhecimentoIdioma
+        return [ConhecimentoIdioma(**c) for c in conhecimento_lista_valida]
+
+    def test_transcreve_avalia_e_registra(self, client, conhecimentos):
+        """Testa o fluxo completo com um único envio do cliente."""
+        with patch('httpx.AsyncClient') as mock_client, \
+             patch('main.validador.validar_conhecimento_idiomas', return_value=conhecimentos), \
+             patch('main.validador.adicionar_exercicio') as mock_adicionar:
+            mock_response = MagicMock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = {"text": " Hallo! ", "language": "de"}
+            mock_client.return_value.__aenter__.return_value.post = AsyncMock(return_value=mock_response)
+
+            response = client.post(
+                "/api/pratica/pronuncia",
+                files={"file": ("audio.wav", b"fake_audio", "audio/wav")},
+                data={"conhecimento_id": str(conhecimentos[0].conhecimento_id)}
+            )
+
+        assert response.status_code == 201
+        dados = response.json()
+        assert dados["correto"] == "Sim"
+        assert dados["transcricao_stt"] == "Hallo!"
+        assert "stt;dur=" in response.headers["Server-Timing"]
+
+        exercicio = mock_adicionar.call_args.args[0]
+        assert str(exercicio.exercicio_id) == dados["exercicio_id"]
+        assert exercicio.tipo_pratica == "pronuncia"
+        assert exercicio.resultado_exercicio["correto"] == "Sim"
+        assert exercicio.resultado_exercicio["texto_original"] == "Hallo"
+
+    def test_conhecimento_inexistente_nao_registra(self, client, conhecimentos):
+        """Testa erro 404 sem registrar exercício quando o registro não existe."""
+        with patch('httpx.AsyncClient') as mock_client, \
+             patch('main.validador.validar_conhecimento_idiomas', return_value=conhecimentos), \
+             patch('main.validador.adicionar_exercicio') as mock_adicionar:
+            mock_client.return_value.__aenter__.return_value.post = AsyncMock()
+
+            response = client.post(
+                "/api/pratica/pronuncia",
+                files={"file": ("audio.wav", b"fake_audio", "audio/wav")},
+                data={"conhecimento_id": "inexistente"}
+            )
+
+        assert response.status_code == 404
+        mock_adicionar.assert_not_called()
+
+    def test_erro_stt_nao_registra(self, client, conhecimentos):
+        """Testa que uma falha do STT é repassada e nada é registrado."""
+        with patch('httpx.AsyncClient') as mock_client, \
+             patch('main.validador.validar_conhecimento_idiomas', return_value=conhecimentos), \
+             patch('main.validador.adicionar_exercicio') as mock_adicionar:
+            mock_client.return_value.__aenter__.return_value.post = AsyncMock(
+                side_effect=httpx.ConnectError("Connection refused")
+            )
+
+            response = client.post(
+                "/api/pratica/pronuncia",
+                files={"file": ("audio.wav", b"fake_audio", "audio/wav")},
+                data={"conhecimento_id": str(conhecimentos[0].conhecimento_id)}
+            )
+
+        assert response.status_code == 503
+        mock_adicionar.assert_not_called()
+
+
+class TestPraticarNumeroEndpoint:
+    """Testes para o endpoint POST /api/pratica/numeros (transcrição e verificações simultâneas)."""
+
+    @pytest.fixture
+    def validador(self, monkeypatch):
+        from datetime import datetime
+        from models import PromptItem
+        from templates import TemplateCompilado
+
+        prompt = PromptItem(
+            prompt_id="numeros_verificar_texto",
+            descricao="Verificação",
+            template="{{texto_usuario}} equivale a {{numero}} em {{idioma}}?",
+            parametros=["numero", "texto_usuario", "idioma"],
+            resposta_estruturada=False,
+            ultima_edicao=datetime.now()
+        )
+        validador = MagicMock()
+        validador.obter_template.return_value = TemplateCompilado(prompt, "{{param}}")
+        monkeypatch.setattr("main.validador", validador)
+        return validador
+
+    @staticmethod
+    def resposta_http(dados):
+        resposta = MagicMock()
+        resposta.status_code = 200
+        resposta.json.return_value = dados
+        return resposta
+
+    def test_alemao_corrige_localmente(self, client):
+        """Testa a correção local do texto e da transcrição do áudio em uma única resposta."""
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_post = AsyncMock(return_value=self.resposta_http({"text": " 87. ", "language": "de"}))
+            mock_client.return_value.__aenter__.return_value.post = mock_post
+
+            response = client.post(
+                "/api/pratica/numeros",
+                files={"file": ("audio.wav", b"fake_audio", "audio/wav")},
+                data={"numero_referencia": "78", "texto_usuario": "achtundsiebzig"}
+            )
+
+        assert response.status_code == 200
+        dados = response.json()
+        assert dados["forma_esperada"] == "achtundsiebzig"
+        assert dados["texto_correto"] is True
+        assert dados["audio_transcricao"] == "87."
+        assert dados["audio_correto"] is False
+        assert mock_post.call_count == 1
+        assert "stt;dur=" in response.headers["Server-Timing"]
+        assert "verificacao_audio;dur=" in response.headers["Server-Timing"]
+
+    def test_outro_idioma_verifica_texto_durante_stt(self, client, validador):
+        """Testa que o texto é verificado pelo LLM enquanto o áudio ainda é transcrito."""
+        eventos = []
+
+        async def post(url, **kwargs):
+            if "transcribe-audio" in url:
+                eventos.append("stt_inicio")
+                await asyncio.sleep(0.05)
+                eventos.append("stt_fim")
+                return self.resposta_http({"text": "seventy-eight", "language": "en"})
+            conteudo = kwargs["json"]["messages"][0]["content"]
+            eventos.append(conteudo)
+            equivalente = "seventy-eight" in conteudo
+            return self.resposta_http({
+                "message": {"role": "assistant", "content": f'```json\n{{"equivalente": {json.dumps(equivalente)}}}\n```'},
+                "done": True
+            })
+
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_client.return_value.__aenter__.return_value.post = AsyncMock(side_effect=post)
+
+            response = client.post(
+                "/api/pratica/numeros",
+                files={"file": ("audio.wav", b"fake_audio", "audio/wav")},
+                data={"numero_referencia": "78", "idioma": "ingles", "texto_usuario": "eighty-seven"}
+            )
+
+        assert response.status_code == 200
+        dados = response.json()
+        assert "forma_esperada" not in dados
+        assert dados["texto_correto"] is False
+        assert dados["texto_comentario"] == "Incorreto. Revise como escrever este número."
+        assert dados["audio_correto"] is True
+        assert dados["audio_comentario"] == "Correto! Sua pronúncia está correta."
+        assert eventos.index("eighty-seven equivale a 78 em Inglês?") < eventos.index("stt_fim")
+        assert eventos[-1] == "seventy-eight equivale a 78 em Inglês?"
+
+    def test_resposta_sem_equivalente(self, client, validador):
+        """Testa erro 502 quando o LLM não responde com o campo equivalente."""
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_client.return_value.__aenter__.return_value.post = AsyncMock(return_value=self.resposta_http({
+                "message": {"role": "assistant", "content": "Sim, equivale."}, "done": True
+            }))
+
+            response = client.post("/api/pratica/numeros", data={
+                "numero_referencia": "78", "idioma": "ingles", "texto_usuario": "seventy-eight"
+            })
+
+        assert response.status_code == 502
+
+    def test_sem_texto_nem_audio(self, client):
+        """Testa erro 422 quando nem o texto nem o áudio são enviados."""
+        response = client.post("/api/pratica/numeros", data={"numero_referencia": "78", "texto_usuario": " "})
+        assert response.status_code == 422
+
+    def test_referencia_invalida_nao_transcreve(self, client):
+        """Testa erro 422 para referência inválida em alemão antes de chamar o STT."""
+        with patch('httpx.AsyncClient') as mock_client:
+            response = client.post(
+                "/api/pratica/numeros",
+                files={"file": ("audio.wav", b"fake_audio", "audio/wav")},
+                data={"numero_referencia": "abc"}
+            )
+
+        assert response.status_code == 422
+        mock_client.assert_not_called()
+
+
+class TestSessaoDialogoWebSocket:
+    """Testes para a sessão de diálogo em /ws/dialogo."""
+
+    @pytest.fixture
+    def validador(self, monkeypatch):
+        from datetime import datetime
+        from models import BaseFrasesDialogo, PromptItem
+        from templates import TemplateCompilado
+
+        prompt = PromptItem(
+            prompt_id="dialogo_dados_interlocutor",
+            descricao="Dados do interlocutor",
+            template="Extraia os dados em {{idioma}}: {{dialogo}}",
+            parametros=["idioma", "dialogo"],
+            resposta_estruturada=True,
+            estrutura_esperada={"nome": "string", "idade": "string", "altura": "string", "peso": "string"},
+            ultima_edicao=datetime.now()
+        )
+        validador = MagicMock()
+        validador.validar_frases_dialogo.return_value = BaseFrasesDialogo(
+            saudacao="Hallo", despedida="Tschüss", intermediarias=["Wie heißen Sie?", "Wie alt sind Sie?"]
+        )
+        validador.obter_template.return_value = TemplateCompilado(prompt, "{{param}}")
+        monkeypatch.setattr("main.validador", validador)
+        return validador
+
+    @staticmethod
+    def responder_servicos(url, **kwargs):
+        """Simula o serviço TTS/STT conforme a URL chamada."""
+        resposta = MagicMock()
+        resposta.status_code = 200
+        if url.endswith("/api/generate-audio"):
+            resposta.json.return_value = {
+                "audio": base64.b64encode(kwargs["json"]["text"].encode()).decode(),
+                "mimeType": "audio/wav"
+            }
+        else:
+            resposta.json.return_value = {"text": " Ich heiße Ana "}
+        return resposta
+
+    @staticmethod
+    def simular_servicos(mock_client):
+        """Simula o serviço TTS/STT (post) e a extração do Ollama (send, em streaming)."""
+        instancia = ollama_em_streaming(
+            mock_client, json.dumps({"nome": "Ana", "idade": "30", "altura": "1,70 m", "peso": ""})
+        )
+        instancia.post = AsyncMock(side_effect=TestSessaoDialogoWebSocket.responder_servicos)
+        return instancia
+
+    def test_dialogo_completo(self, client, validador):
+        """Testa o diálogo inteiro: frases com áudio, transcrições, resultado e registro."""
+        import main
+
+        with patch('httpx.AsyncClient') as mock_client:
+            instancia = self.simular_servicos(mock_client)
+
+            with client.websocket_connect("/ws/dialogo") as websocket:
+                websocket.send_json({"tipo": "iniciar", "idioma": "alemao"})
+                primeira = websocket.receive_json()
+                for _ in range(4):
+                    websocket.send_bytes(b"fake_audio")
+                mensagens = []
+                while not mensagens or mensagens[-1]["tipo"] != "resultado":
+                    mensagens.append(websocket.receive_json())
+
+        assert primeira["tipo"] == "frase"
+        assert primeira["indice"] == 0 and primeira["etapa"] == "saudacao"
+        assert base64.b64decode(primeira["audio"]) == b"Hallo"
+
+        frases = [m for m in mensagens if m["tipo"] == "frase"]
+        assert [m["indice"] for m in frases] == [1, 2, 3]
+        assert frases[-1]["etapa"] == "despedida"
+        transcricoes = [m for m in mensagens if m["tipo"] == "transcricao"]
+        assert sorted(m["indice"] for m in transcricoes) == [0, 1, 2, 3]
+        assert transcricoes[0]["texto"] == "Ich heiße Ana"
+
+        resultado = mensagens[-1]
+        assert resultado["correto"] == "Parcial"
+        assert resultado["interlocutor"]["nome"] == "Ana"
+        exercicio = validador.adicionar_exercicio.call_args.args[0]
+        assert str(exercicio.exercicio_id) == resultado["exercicio_id"]
+        assert exercicio.tipo_pratica == "dialogo"
+
+        chamada_llm, = instancia.build_request.call_args_list
+        assert chamada_llm.args[1].endswith("/api/chat")
+        prompt_llm = chamada_llm.kwargs["json"]["messages"][0]["content"]
+        assert prompt_llm.startswith("Extraia os dados em Alemão: App: Hallo\nUsuário: Ich heiße Ana")
+        assert "Tschüss" not in prompt_llm
+
+        # Cada frase é sintetizada uma única vez; as seguintes à saudação, por antecipação
+        sinteses = [c for c in instancia.post.call_args_list if c.args[0].endswith("/api/generate-audio")]
+        assert len(sinteses) == 4
+        assert main.antecipador_tts.estatisticas()["agendadas"] == 3
+
+    def test_extracao_antes_da_despedida(self, client, validador):
+        """Testa que o LLM é consultado antes de a resposta à despedida ser enviada."""
+        with patch('httpx.AsyncClient') as mock_client:
+            instancia = self.simular_servicos(mock_client)
+
+            with client.websocket_connect("/ws/dialogo") as websocket:
+                websocket.send_json({"tipo": "iniciar"})
+                websocket.receive_json()
+                for _ in range(3):
+                    websocket.send_bytes(b"fake_audio")
+                recebidas = []
+                while len(recebidas) < 6:  # frases 1 a 3 e transcrições 0 a 2
+                    recebidas.append(websocket.receive_json())
+
+                for _ in range(100):
+                    if instancia.send.called:
+                        break
+                    time.sleep(0.01)
+                consultou_antes = instancia.send.called
+
+                websocket.send_bytes(b"fake_audio")
+                while recebidas[-1]["tipo"] != "resultado":
+                    recebidas.append(websocket.receive_json())
+
+        assert consultou_antes
+        assert recebidas[-1]["interlocutor"]["nome"] == "Ana"
+
+    def test_falha_ao_enviar_frase_encerra_sessao(self, client, validador, monkeypatch):
+        """Testa que uma falha inesperada no envio da frase é reportada e fecha a sessão com 1011."""
+        from starlette.websockets import WebSocketDisconnect
+
+        async def falhar(*args, **kwargs):
+            raise RuntimeError("falha inesperada")
+
+        monkeypatch.setattr("main.obter_audio_tts", falhar)
+        with client.websocket_connect("/ws/dialogo") as websocket:
+            websocket.send_json({"tipo": "iniciar", "idioma": "alemao"})
+            erro = websocket.receive_json()
+            with pytest.raises(WebSocketDisconnect) as fechamento:
+                websocket.receive_json()
+
+        assert erro == {"tipo": "erro", "detalhe": "Erro ao enviar a frase: falha inesperada"}
+        assert fechamento.value.code == 1011
+
+    def test_frase_sem_audio_quando_tts_falha(self, client, validador):
+        """Testa que a frase é enviada sem áudio, com um erro, se o TTS estiver fora."""
+        with patch('httpx.AsyncClient') as mock_client:
+            mock_client.return_value.__aenter__.return_value.post = AsyncMock(
+                side_effect=httpx.ConnectError("Connection refused")
+            )
+
+            with client.websocket_connect("/ws/dialogo") as websocket:
+                websocket.send_json({"tipo": "iniciar"})
+                erro = websocket.receive_json()
+                frase = websocket.receive_json()
+
+        assert erro["tipo"] == "erro" and erro["indice"] == 0
+        assert frase["tipo"] == "frase" and frase["texto"] == "Hallo"
+        assert frase["audio"] is None
+
+    def test_inicio_invalido(self, client, validador):
+        """Testa que a sessão é recusada sem a mensagem 'iniciar' válida."""
+        with client.websocket_connect("/ws/dialogo") as websocket:
+            websocket.send_json({"tipo": "iniciar", "idioma": "frances"})
+            erro = websocket.receive_json()
+
+        assert erro["tipo"] == "erro"
+        validador.validar_frases_dialogo.assert_not_called()
+
+
 class TestServicesIntegration:
     """Testes de integração entre múltiplos serviços."""
 
@@ -0,0 +1,118 @@
+"""
+Testes para a compilação e renderização de templates de prompts.
+"""
+import pytest
+from datetime import datetime
+from models import PromptItem
+from templates import ErroTemplate, TemplateCompilado, compilar_templates, dividir_marcador
+
+
+def criar_prompt(template, parametros, prompt_id="teste"):
+    """Cria um PromptItem mínimo para os testes."""
+    return PromptItem(
+        prompt_id=prompt_id,
+        descricao="Prompt de teste",
+        template=template,
+        parametros=parametros,
+        resposta_estruturada=False,
+        ultima_edicao=datetime.now()
+    )
+
+
+class TestDividirMarcador:
+    """Testes para a divisão do marcador de parâmetros."""
+
+    def test_marcador_com_param(self):
+        """Testa marcador com a palavra param."""
+        assert dividir_marcador("{{param}}") == ("{{", "}}")
+        assert dividir_marcador("<param>") == ("<", ">")
+
+    def test_marcador_sem_param(self):
+        """Testa marcador dividido ao meio."""
+        assert dividir_marcador("{{}}") == ("{{", "}}")
+
+    def test_marcador_invalido(self):
+        """Testa marcador sem prefixo ou sufixo."""
+        with pytest.raises(ErroTemplate):
+            dividir_marcador("param")
+
+
+class TestTemplateCompilado:
+    """Testes para a classe TemplateCompilado."""
+
+    def test_renderizar(self):
+        """Testa substituição de múltiplos parâmetros, inclusive repetidos."""
+        prompt = criar_prompt("O número {{numero}} é '{{texto_usuario}}'? ({{numero}})", ["numero", "texto_usuario"])
+        template = TemplateCompilado(prompt, "{{param}}")
+
+        assert template.renderizar({"numero": 78, "texto_usuario": "achtundsiebzig"}) == \
+            "O número 78 é 'achtundsiebzig'? (78)"
+
+    def test_parametro_nao_declarado(self):
+        """Testa erro quando o template usa parâmetro fora de parametros."""
+        with pytest.raises(ErroTemplate, match="idioma"):
+            TemplateCompilado(criar_prompt("{{texto}} em {{idioma}}", ["texto"]), "{{param}}")
+
+    def test_parametro_declarado_nao_usado(self):
+        """Testa que parâmetros declarados e não usados não são obrigatórios."""
+        template = TemplateCompilado(criar_prompt("Resuma: {{texto}}", ["texto", "paragrafos"]), "{{param}}")
+        assert template.renderizar({"texto": "abc"}) == "Resuma: abc"
+
+    def test_parametro_ausente_na_renderizacao(self):
+        """Testa erro quando falta um parâmetro usado pelo template."""
+        template = TemplateCompilado(criar_prompt("{{texto}}", ["texto"]), "{{param}}")
+        with pytest.raises(ErroTemplate, match="texto"):
+            template.renderizar({})
+
+    def test_valor_com_marcador_nao_e_reprocessado(self):
+        """Testa que valores contendo marcadores são inseridos literalmente."""
+        template = TemplateCompilado(criar_prompt("{{a}}-{{b}}", ["a", "b"]), "{{param}}")
+        assert template.renderizar({"a": "{{b}}", "b": "x"}) == "{{b}}-x"
+
+
+class TestEsquemaResposta:
+    """Testes para a validação das respostas estruturadas do template."""
+
+    def test_esquema_compilado_quando_estruturada(self):
+        """Testa que estrutura_esperada é convertida em esquema e valida respostas."""
+        prompt = criar_prompt("{{a}}", ["a"]).model_copy(
+            update={"resposta_estruturada": True, "estrutura_esperada": {"traducao": "string"}}
+        )
+        template = TemplateCompilado(prompt, "{{param}}")
+
+        assert template.esquema["required"] == ["traducao"]
+        assert template.validar_resposta({"traducao": "Olá"}) == []
+        assert template.validar_resposta({"traducao": 1}) == ["$.traducao: esperado string, recebido int"]
+
+    def test_sem_esquema_quando_nao_estruturada(self):
+        """Testa que prompts sem resposta estruturada não têm esquema."""
+        prompt = criar_prompt("{{a}}", ["a"]).model_copy(update={"estrutura_esperada": {"x": "string"}})
+        template = TemplateCompilado(prompt, "{{param}}")
+
+        assert template.esquema is None
+        assert template.validar_resposta("qualquer coisa") == []
+
+    def test_esquema_invalido(self):
+        """Testa erro quando estrutura_esperada usa tipo desconhecido."""
+        prompt = criar_prompt("{{a}}", ["a"]).model_copy(
+            update={"resposta_estruturada": True, "estrutura_esperada": {"x": "texto"}}
+        )
+        with pytest.raises(ErroTemplate, match="estrutura_esperada"):
+            TemplateCompilado(prompt, "{{param}}")
+
+
+class TestCompilarTemplates:
+    """Testes para a função compilar_templates."""
+
+    def test_indexa_por_prompt_id(self):
+        """Testa o índice por prompt_id."""
+        compilados = compilar_templates(
+            [criar_prompt("{{a}}", ["a"], "p1"), criar_prompt("{{b}}", ["b"], "p2")],
+            "{{param}}"
+        )
+        assert set(compilados) == {"p1", "p2"}
+
+    def test_prompt_id_repetido(self):
+        """Testa erro com prompt_id duplicado."""
+        with pytest.raises(ErroTemplate, match="repetido"):
+            compilar_templates([criar_prompt("a", [], "p1"), criar_prompt("b", [], "p1")], "{{param}}")
@@ -0,0 +1,93 @@
+"""
+Testes para o limite de tamanho e a leitura em streaming dos uploads.
+"""
+import hashlib
+import io
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from upload import LeitorComHash, LimiteTamanhoCorpo
+
+
+@pytest.fixture
+def client_limitado():
+    """Fixture com uma aplicação mínima protegida pelo limite de 1 KB."""
+    app = FastAPI()
+    app.add_middleware(LimiteTamanhoCorpo, limite_bytes=1024, caminhos=["/upload"])
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"tamanho": len(await file.read())}
+
+    @app.post("/livre")
+    async def livre(file: UploadFile = File(...)):
+        return {"tamanho": len(await file.read())}
+
+    return TestClient(app)
+
+
+class TestLimiteTamanhoCorpo:
+    """Testes para o middleware LimiteTamanhoCorpo."""
+
+    def test_dentro_do_limite(self, client_limitado):
+        """Testa que uploads pequenos passam normalmente."""
+        response = client_limitado.post("/upload", files={"file": ("a.wav", b"x" * 100, "audio/wav")})
+        assert response.status_code == 200
+        assert response.json() == {"tamanho": 100}
+
+    def test_content_length_acima_do_limite(self, client_limitado):
+        """Testa a rejeição antecipada pelo Content-Length."""
+        response = client_limitado.post("/upload", files={"file": ("a.wav", b"x" * 4096, "audio/wav")})
+        assert response.status_code == 413
+        assert "muito grande" in response.json()["detail"]
+
+    def test_envio_em_chunks_acima_do_limite(self, client_limitado):
+        """Testa a rejeição durante a leitura quando não há Content-Length."""
+        corpo = (
+            b"--limite\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.wav\"\r\n"
+            b"Content-Type: audio/wav\r\n\r\n" + b"x" * 4096 + b"\r\n--limite--\r\n"
+        )
+
+        def chunks():
+            for inicio in range(0, len(corpo), 512):
+                yield corpo[inicio:inicio + 512]
+
+        response = client_limitado.post(
+            "/upload",
+            content=chunks(),
+            headers={"Content-Type": "multipart/form-data; boundary=limite"}
+        )
+        assert response.status_code == 413
+
+    def test_outros_caminhos_sem_limite(self, client_limitado):
+        """Testa que o limite vale apenas para os caminhos configurados."""
+        response = client_limitado.post("/livre", files={"file": ("a.wav", b"x" * 4096, "audio/wav")})
+        assert response.status_code == 200
+
+
+class TestLeitorComHash:
+    """Testes para a classe LeitorComHash."""
+
+    def test_hash_apos_leitura_completa(self):
+        """Testa que o hash corresponde ao conteúdo lido em blocos."""
+        conteudo = b"RIFF" + bytes(range(256)) * 10
+        leitor = LeitorComHash(io.BytesIO(conteudo))
+
+        assert leitor.sha256 is None
+        blocos = []
+        while True:
+            bloco = leitor.read(100)
+            if not bloco:
+                break
+            blocos.append(bloco)
+
+        assert b"".join(blocos) == conteudo
+        assert leitor.bytes_lidos == len(conteudo)
+        assert leitor.sha256 == hashlib.sha256(conteudo).hexdigest()
+
+    def test_hash_desativado(self):
+        """Testa que, sem hash, o leitor apenas repassa o conteúdo."""
+        leitor = LeitorComHash(io.BytesIO(b"abc"), calcular_hash=False)
+        assert leitor.read() == b"abc"
+        assert leitor.read() == b""
+        assert leitor.sha256 is None
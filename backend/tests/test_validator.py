@@ -105,3 +105,49 @@ class TestValidadorJSON:
 
         assert resultados["conhecimento_idiomas"]["status"] == "[ERRO] Invalido"
         assert "erro" in resultados["conhecimento_idiomas"]
+
+    def test_salvar_prompts_compila_templates(self, temp_json_files, base_prompts_valida):
+        """Testa que salvar os prompts deixa os templates pré-compilados."""
+        from models import BasePrompts
+
+        validador = ValidadorJSON(base_path=str(temp_json_files))
+        validador.salvar_prompts(BasePrompts(**base_prompts_valida))
+
+        template = validador.obter_template("traducao_001")
+        assert template.renderizar({"palavra": "Hallo"}) == "Traduza a seguinte palavra: Hallo"
+
+    def test_salvar_prompts_parametro_nao_declarado(self, temp_json_files, base_prompts_valida):
+        """Testa que template com parâmetro não declarado não é salvo."""
+        from models import BasePrompts
+        from templates import ErroTemplate
+
+        base_prompts_valida["prompts"][0]["template"] = "Traduza {{palavra}} para {{idioma}}"
+        arquivo = temp_json_files / "[BASE] Prompts.json"
+        conteudo_original = arquivo.read_text(encoding="utf-8")
+
+        validador = ValidadorJSON(base_path=str(temp_json_files))
+        with pytest.raises(ErroTemplate):
+            validador.salvar_prompts(BasePrompts(**base_prompts_valida))
+
+        assert arquivo.read_text(encoding="utf-8") == conteudo_original
+
+    def test_obter_template_recarrega_arquivo_alterado(self, temp_json_files, base_prompts_valida):
+        """Testa que alterações externas no arquivo de prompts são recompiladas."""
+        import os
+
+        validador = ValidadorJSON(base_path=str(temp_json_files))
+        assert validador.obter_template("traducao_001").renderizar({"palavra": "x"}).startswith("Traduza")
+
+        base_prompts_valida["prompts"][0]["template"] = "Übersetze {{palavra}}"
+        arquivo = temp_json_files / "[BASE] Prompts.json"
+        arquivo.write_text(json.dumps(base_prompts_valida, ensure_ascii=False), encoding="utf-8")
+        estado = arquivo.stat()
+        os.utime(arquivo, (estado.st_atime, estado.st_mtime + 10))
+
+        assert validador.obter_template("traducao_001").renderizar({"palavra": "x"}) == "Übersetze x"
+
+    def test_obter_template_inexistente(self, temp_json_files):
+        """Testa KeyError para prompt inexistente."""
+        validador = ValidadorJSON(base_path=str(temp_json_files))
+        with pytest.raises(KeyError):
+            validador.obter_template("nao_existe")
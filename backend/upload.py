@@ -0,0 +1,134 @@
+"""
+Limite de tamanho e leitura em streaming dos uploads de áudio.
+"""
+import hashlib
+import json
+from typing import Any, BinaryIO, Iterable, Optional
+
+
+class CorpoMuitoGrande(Exception):
+    """Corpo da requisição maior que o limite configurado."""
+    pass
+
+
+class LimiteTamanhoCorpo:
+    """
+    Middleware ASGI que rejeita com 413 corpos maiores que o limite.
+
+    Quando o cliente informa Content-Length, a rejeição acontece antes de ler
+    qualquer byte do corpo. Sem Content-Length (envio em chunks), os bytes são
+    contados à medida que chegam e a leitura é interrompida assim que o
+    limite é ultrapassado.
+    """
+
+    def __init__(self, app, limite_bytes: int, caminhos: Iterable[str]):
+        """
+        Inicializa o middleware.
+
+        Args:
+            app: Aplicação ASGI envolvida
+            limite_bytes: Tamanho máximo do corpo em bytes
+            caminhos: Caminhos (path) aos quais o limite se aplica
+        """
+        self.app = app
+        self.limite_bytes = limite_bytes
+        self.caminhos = set(caminhos)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.caminhos:
+            await self.app(scope, receive, send)
+            return
+
+        cabecalhos = dict(scope.get("headers") or [])
+        try:
+            tamanho_declarado = int(cabecalhos.get(b"content-length", b"0"))
+        except ValueError:
+            tamanho_declarado = 0
+        if tamanho_declarado > self.limite_bytes:
+            await self._rejeitar(send)
+            return
+
+        estado = {"recebidos": 0, "excedido": False, "resposta_iniciada": False}
+
+        async def receber():
+            mensagem = await receive()
+            if mensagem["type"] == "http.request":
+                estado["recebidos"] += len(mensagem.get("body", b""))
+                if estado["recebidos"] > self.limite_bytes:
+                    estado["excedido"] = True
+                    raise CorpoMuitoGrande(f"Corpo maior que {self.limite_bytes} bytes")
+            return mensagem
+
+        async def enviar(mensagem):
+            if estado["excedido"]:
+                # A aplicação pode ter convertido a interrupção em outro erro: responder 413
+                if mensagem["type"] == "http.response.start" and not estado["resposta_iniciada"]:
+                    estado["resposta_iniciada"] = True
+                    await self._rejeitar(send)
+                return
+            if mensagem["type"] == "http.response.start":
+                estado["resposta_iniciada"] = True
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receber, enviar)
+        except CorpoMuitoGrande:
+            if estado["resposta_iniciada"]:
+                raise
+            await self._rejeitar(send)
+
+    async def _rejeitar(self, send) -> None:
+        corpo = json.dumps({
+            "detail": f"Arquivo muito grande. Tamanho máximo: {self.limite_bytes // (1024 * 1024)} MB."
+        }).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(corpo)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": corpo})
+
+
+class LeitorComHash:
+    """
+    Envolve um arquivo para envio em streaming calculando o SHA-256 em trânsito.
+
+    O httpx lê o arquivo em blocos ao montar o multipart, então o conteúdo
+    nunca é carregado inteiro na memória. O hash só fica disponível depois
+    que o arquivo foi lido até o fim.
+    """
+
+    def __init__(self, arquivo: BinaryIO, calcular_hash: bool = True):
+        """
+        Inicializa o leitor.
+
+        Args:
+            arquivo: Arquivo aberto para leitura binária (ex.: UploadFile.file)
+            calcular_hash: Se False, apenas repassa os blocos
+        """
+        self.arquivo = arquivo
+        self.bytes_lidos = 0
+        self._hash: Optional[Any] = hashlib.sha256() if calcular_hash else None
+        self._concluido = False
+
+    def read(self, tamanho: int = -1) -> bytes:
+        """Lê o próximo bloco do arquivo, atualizando o hash."""
+        bloco = self.arquivo.read(tamanho)
+        if not bloco:
+            self._concluido = True
+            return b""
+        self.bytes_lidos += len(bloco)
+        if self._hash is not None:
+            self._hash.update(bloco)
+        return bloco
+
+    @property
+    def sha256(self) -> Optional[str]:
+        """SHA-256 do conteúdo, ou None se o hash estiver desativado ou a leitura incompleta."""
+        if self._hash is None or not self._concluido:
+            return None
+        return self._hash.hexdigest()
@@ -3,7 +3,7 @@ Validador de arquivos JSON contra modelos Pydantic 2.
 """
 import json
 from pathlib import Path
-from typing import Union, List
+from typing import Union, List, Dict, Optional
 from pydantic import ValidationError
 from models import (
     BaseConhecimentoIdiomas,
@@ -13,6 +13,7 @@ from models import (
     ConhecimentoIdioma,
     Exercicio
 )
+from templates import TemplateCompilado, compilar_templates
 
 
 class ValidadorJSON:
@@ -26,6 +27,8 @@ class ValidadorJSON:
             base_path: Caminho para a pasta contendo os arquivos JSON
         """
         self.base_path = Path(base_path)
+        self._templates: Dict[str, TemplateCompilado] = {}
+        self._mtime_templates: Optional[float] = None
 
     def _carregar_json(self, nome_arquivo: str) -> Union[dict, list]:
         """
@@ -136,17 +139,53 @@ class ValidadorJSON:
 
         Raises:
             ValidationError: Se a validação falhar
+            ErroTemplate: Se algum template usar parâmetros não declarados
             IOError: Se houver erro ao salvar o arquivo
         """
         # Validar o objeto antes de salvar
         prompts_validados = BasePrompts(**prompts.model_dump(mode='json'))
 
+        # Pré-compilar os templates (valida marcadores e parâmetros antes de gravar)
+        templates = compilar_templates(prompts_validados.prompts, prompts_validados.marcador_de_paramentros)
+
         # Salvar prompts atualizados
         dados = prompts_validados.model_dump(mode='json')
         self._salvar_json("[BASE] Prompts.json", dados)
 
+        self._templates = templates
+        self._mtime_templates = (self.base_path / "[BASE] Prompts.json").stat().st_mtime
+
         return prompts_validados
 
+    def obter_template(self, prompt_id: str) -> TemplateCompilado:
+        """
+        Retorna o template pré-compilado de um prompt.
+
+        Os templates são compilados ao salvar os prompts e recompilados apenas
+        quando o arquivo de prompts é alterado por fora do backend.
+
+        Args:
+            prompt_id: Identificador do prompt
+
+        Returns:
+            TemplateCompilado do prompt
+
+        Raises:
+            KeyError: Se o prompt não existir
+            FileNotFoundError: Se o arquivo de prompts não existir
+            ValidationError: Se a validação da base de prompts falhar
+            ErroTemplate: Se algum template for inválido
+        """
+        caminho = self.base_path / "[BASE] Prompts.json"
+        mtime = caminho.stat().st_mtime if caminho.exists() else None
+
+        if mtime is None or mtime != self._mtime_templates:
+            prompts = self.validar_prompts()
+            self._templates = compilar_templates(prompts.prompts, prompts.marcador_de_paramentros)
+            self._mtime_templates = mtime
+
+        return self._templates[prompt_id]
+
     def adicionar_exercicio(self, exercicio: Exercicio) -> BaseHistoricoPratica:
         """
         Adiciona um novo exercício ao histórico de prática.
@@ -1,7 +1,7 @@
 import { useState, useEffect, useMemo, useRef } from 'react'
 import { Link, useNavigate } from 'react-router-dom'
 import { useData } from '../../contexts/DataContext'
-import { postExercicio, generateAudio } from '../../services/api'
+import { postExercicio, generateAudio, avaliarAudicao } from '../../services/api'
 import {
   VelocidadeEnum
 } from '../../types/api'
@@ -25,7 +25,7 @@ interface AudioData {
 }
 
 interface CompatibilidadeResult {
-  compatibilidade: 'Sim' | 'Não'
+  compatibilidade: 'Sim' | 'Parcial' | 'Não'
   comentario: string
 }
 
@@ -240,12 +240,6 @@ export default function PraticaAudicao() {
     return mapping[idioma] || idioma
   }
 
-  // Remove punctuation from text
-  const removePunctuation = (text: string): string => {
-    // Remove sinais de pontuação: ! , : ? .
-    return text.replace(/[!,:?.]/g, '').trim()
-  }
-
   // Insert character at cursor position
   const insertCharacterAtCursor = (character: string) => {
     const textarea = transcricaoRef.current
@@ -278,21 +272,15 @@ export default function PraticaAudicao() {
     setVerifying(true)
 
     try {
-      // Compare texts directly (case sensitive, without punctuation)
-      const originalClean = removePunctuation(currentExercise.texto_original)
-      const transcricaoClean = removePunctuation(transcricaoUsuario.trim())
-
-      console.log('📝 Texto original (limpo):', originalClean)
-      console.log('📝 Transcrição usuário (limpo):', transcricaoClean)
-      console.log('🔍 Comparação case-sensitive:', originalClean === transcricaoClean)
-
-      const isCorrect = originalClean === transcricaoClean
+      // Graded on the server (ignores case, punctuation, umlauts and ß)
+      const avaliacao = await avaliarAudicao(currentExercise.texto_original, transcricaoUsuario.trim())
+      console.log('🔍 Avaliação:', avaliacao)
 
       const resultJson: CompatibilidadeResult = {
-        compatibilidade: isCorrect ? 'Sim' : 'Não',
-        comentario: isCorrect
+        compatibilidade: avaliacao.classificacao,
+        comentario: avaliacao.correto
           ? 'Perfeito! Sua transcrição está correta.'
-          : `Sua transcrição: "${transcricaoUsuario.trim()}". Esperado: "${currentExercise.texto_original}".`
+          : `${avaliacao.classificacao === 'Parcial' ? 'Quase! ' : ''}Sua transcrição: "${transcricaoUsuario.trim()}". Esperado: "${currentExercise.texto_original}".`
       }
 
       console.log('✅ Resultado:', resultJson)
@@ -315,7 +303,7 @@ export default function PraticaAudicao() {
           resultado_exercicio: {
             texto_original: currentExercise.texto_original,
             transcricao_usuario: transcricaoUsuario.trim(),
-            correto: resultJson.compatibilidade === 'Sim',
+            correto: avaliacao.correto,
             velocidade_utilizada: VelocidadeEnum.Normal
           } as ResultadoAudicao
         }
@@ -476,7 +464,7 @@ export default function PraticaAudicao() {
                 )}
               </div>
               <p className="text-2xl font-bold mb-2">
-                {isCorrect ? 'Correto!' : 'Incorreto'}
+                {isCorrect ? 'Correto!' : compatibilidadeResult.compatibilidade === 'Parcial' ? 'Quase correto' : 'Incorreto'}
               </p>
               <p className="text-lg text-gray-700">{compatibilidadeResult.comentario}</p>
             </div>
@@ -1,12 +1,9 @@
 import { useState, useEffect, useRef } from 'react'
 import { Link, useNavigate } from 'react-router-dom'
 import { useData } from '../../contexts/DataContext'
-import { postExercicio, generateAudio, transcribeAudio, chatWithOllama } from '../../services/api'
-import type {
-  ResultadoDialogo,
-  Exercicio
-} from '../../types/api'
-import { IdiomaConhecimentoEnum, CorretoEnum } from '../../types/api'
+import { abrirSessaoDialogo } from '../../services/api'
+import type { MensagemDialogo } from '../../services/api'
+import { IdiomaConhecimentoEnum } from '../../types/api'
 
 type DialogueStage = 'greeting' | 'intermediate' | 'farewell' | 'final'
 type RecordingState = 'idle' | 'recording' | 'recorded'
@@ -16,15 +13,12 @@ interface AudioData {
     audioBase64: string
     mimeType: string
   }
-  lento?: {
-    audioBase64: string
-    mimeType: string
-  }
 }
 
 interface DialogueTurn {
   speaker: 'app' | 'user'
   text: string
+  indice: number  // Frase do roteiro (a resposta do usuário usa o índice da frase respondida)
   transcription?: string
   coherent?: boolean
   audioBase64?: string
@@ -38,16 +32,27 @@ interface InterlocutorData {
   peso: string
 }
 
+const STAGES: Record<'saudacao' | 'intermediaria' | 'despedida', DialogueStage> = {
+  saudacao: 'greeting',
+  intermediaria: 'intermediate',
+  despedida: 'farewell'
+}
+
+// Each phrase of the script and its answer take two consecutive slots in the history
+const historyPosition = (indice: number, speaker: 'app' | 'user') => 2 * indice + (speaker === 'user' ? 1 : 0)
+
 export default function PraticaDialogo() {
   const navigate = useNavigate()
-  const { frasesDialogo, prompts, loading, errors } = useData()
+  const { frasesDialogo, loading, errors } = useData()
 
-  // Dialogue state
+  // Dialogue state (the script itself lives in the backend session)
   const [selectedIdioma, setSelectedIdioma] = useState<IdiomaConhecimentoEnum>(IdiomaConhecimentoEnum.Alemao)
   const [dialogueStage, setDialogueStage] = useState<DialogueStage>('greeting')
   const [dialogueHistory, setDialogueHistory] = useState<DialogueTurn[]>([])
   const [currentPhrase, setCurrentPhrase] = useState<string>('')
-  const [intermediatePhrasesUsed, setIntermediatePhrasesUsed] = useState<Set<number>>(new Set())
+  const [currentIndice, setCurrentIndice] = useState(0)
+  const [sessionKey, setSessionKey] = useState(0)
+  const socketRef = useRef<WebSocket | null>(null)
 
   // Audio state
   const [audioData, setAudioData] = useState<AudioData | null>(null)
@@ -62,61 +67,13 @@ export default function PraticaDialogo() {
   const audioChunksRef = useRef<Blob[]>([])
   const messagesEndRef = useRef<HTMLDivElement>(null)
 
-  // Audio durations state
+  // Audio durations state (keyed by history position)
   const [audioDurations, setAudioDurations] = useState<Map<number, number>>(new Map())
 
-  // Verification state
-  const [verifying, setVerifying] = useState(false)
-  const [currentTranscription, setCurrentTranscription] = useState<string>('')
-
   // Final result
   const [interlocutorData, setInterlocutorData] = useState<InterlocutorData | null>(null)
   const [analyzingDialogue, setAnalyzingDialogue] = useState(false)
 
-  // Map idioma enum to display name
-  const getIdiomaDisplayName = (idioma: IdiomaConhecimentoEnum): string => {
-    const mapping: Record<IdiomaConhecimentoEnum, string> = {
-      'alemao': 'Alemão',
-      'ingles': 'Inglês'
-    }
-    return mapping[idioma] || idioma
-  }
-
-  // Generate audio for phrase
-  const generatePhraseAudio = async (text: string, includeSlowAudio: boolean = true): Promise<AudioData> => {
-    setGeneratingAudio(true)
-
-    try {
-      const normalAudio = await generateAudio({
-        text,
-        speed: 1.0
-      })
-
-      const result: AudioData = {
-        normal: {
-          audioBase64: normalAudio.audio,
-          mimeType: normalAudio.mimeType
-        }
-      }
-
-      if (includeSlowAudio) {
-        const slowAudio = await generateAudio({
-          text,
-          speed: 0.5
-        })
-
-        result.lento = {
-          audioBase64: slowAudio.audio,
-          mimeType: slowAudio.mimeType
-        }
-      }
-
-      return result
-    } finally {
-      setGeneratingAudio(false)
-    }
-  }
-
   // Get audio duration from base64
   const getAudioDuration = (audioBase64: string, mimeType: string): Promise<number> => {
     return new Promise((resolve) => {
@@ -228,7 +185,6 @@ export default function PraticaDialogo() {
     setAudioBlob(null)
     setRecordingState('idle')
     audioChunksRef.current = []
-    setCurrentTranscription('')
     setRecordingTime(0)
 
     // Clear timer if running
@@ -248,41 +204,10 @@ export default function PraticaDialogo() {
     audio.onended = () => URL.revokeObjectURL(url)
   }
 
-  // Clean JSON response from LLM
-  const cleanJsonResponse = (text: string): string => {
-    let cleaned = text.replace(/```json\s*/g, '').replace(/```\s*/g, '')
-    cleaned = cleaned.trim()
-
-    // Fix common LLM JSON mistakes
-    // 1. Add quotes around unquoted property names
-    cleaned = cleaned.replace(/(\{|\,)\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*:/g, '$1"$2":')
-    // 2. Replace True/False with true/false
-    cleaned = cleaned.replace(/:\s*True\b/g, ': true')
-    cleaned = cleaned.replace(/:\s*False\b/g, ': false')
-
-    return cleaned
-  }
-
-  // Get prompt template
-  const getPromptTemplate = (promptId: string): string | null => {
-    if (!prompts) return null
-    const prompt = prompts.prompts.find(p => p.prompt_id === promptId)
-    return prompt?.template || null
-  }
-
-  // Replace prompt parameters
-  const replacePromptParams = (template: string, params: Record<string, string>): string => {
-    let result = template
-    for (const [key, value] of Object.entries(params)) {
-      result = result.replace(new RegExp(`{{${key}}}`, 'g'), value)
-    }
-    return result
-  }
-
   // Auto-scroll to bottom when messages change
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' })
-  }, [dialogueHistory, currentTranscription])
+  }, [dialogueHistory])
 
   // Cleanup timer on unmount
   useEffect(() => {
@@ -293,266 +218,119 @@ export default function PraticaDialogo() {
     }
   }, [])
 
-  // Start dialogue - greeting phase
-  useEffect(() => {
-    if (frasesDialogo && dialogueStage === 'greeting' && !currentPhrase) {
-      const startGreeting = async () => {
-        setCurrentPhrase(frasesDialogo.saudacao)
-        const audio = await generatePhraseAudio(frasesDialogo.saudacao, true)
-        setAudioData(audio)
-
-        // Get duration for this audio
-        const duration = await getAudioDuration(audio.normal.audioBase64, audio.normal.mimeType)
-        setAudioDurations(new Map([[0, duration]]))
-
-        setDialogueHistory([{
+  // Handle messages pushed by the dialogue session, in whatever order they are ready
+  const handleSessionMessage = (mensagem: MensagemDialogo) => {
+    switch (mensagem.tipo) {
+      case 'frase': {
+        setGeneratingAudio(false)
+        setCurrentIndice(mensagem.indice)
+        setCurrentPhrase(mensagem.texto)
+        setDialogueStage(STAGES[mensagem.etapa])
+        setAudioData(mensagem.audio && mensagem.mimeType
+          ? { normal: { audioBase64: mensagem.audio, mimeType: mensagem.mimeType } }
+          : null)
+        setDialogueHistory(prev => [...prev, {
           speaker: 'app',
-          text: frasesDialogo.saudacao,
-          audioBase64: audio.normal.audioBase64,
-          mimeType: audio.normal.mimeType
+          text: mensagem.texto,
+          indice: mensagem.indice,
+          audioBase64: mensagem.audio ?? undefined,
+          mimeType: mensagem.mimeType ?? undefined
         }])
-      }
-      startGreeting()
-    }
-    // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [frasesDialogo, dialogueStage, currentPhrase])
 
-  // Handle confirm for greeting
-  const handleConfirmGreeting = async () => {
-    if (!frasesDialogo) return
-
-    try {
-      // Don't process greeting audio, just move to intermediate phase
-      setGeneratingAudio(true)
-
-      // Add user's greeting response to history (dummy entry for display)
-      setDialogueHistory(prev => [...prev, { speaker: 'user', text: '[Saudação gravada]' }])
-
-      setDialogueStage('intermediate')
-      clearRecording()
-
-      // Load first intermediate phrase
-      const randomIndex = Math.floor(Math.random() * frasesDialogo.intermediarias.length)
-      const selectedPhrase = frasesDialogo.intermediarias[randomIndex]
-      setIntermediatePhrasesUsed(new Set([randomIndex]))
-
-      setCurrentPhrase(selectedPhrase)
-      const audio = await generatePhraseAudio(selectedPhrase, true)
-      setAudioData(audio)
-
-      // Get duration for this audio
-      const duration = await getAudioDuration(audio.normal.audioBase64, audio.normal.mimeType)
-      setAudioDurations(prev => new Map(prev).set(dialogueHistory.length + 1, duration))
-
-      setDialogueHistory(prev => [...prev, {
-        speaker: 'app',
-        text: selectedPhrase,
-        audioBase64: audio.normal.audioBase64,
-        mimeType: audio.normal.mimeType
-      }])
-    } catch (error) {
-      console.error('Erro ao carregar frase intermediária:', error)
-      alert('Erro ao carregar a próxima frase. Verifique se o serviço TTS está rodando.')
-    } finally {
-      setGeneratingAudio(false)
-    }
-  }
-
-  // Handle confirm for intermediate
-  const handleConfirmIntermediate = async () => {
-    if (!audioBlob || !currentPhrase) return
-
-    setVerifying(true)
-
-    try {
-      // Convert audio blob to base64 for storage
-      const reader = new FileReader()
-      const audioBase64Promise = new Promise<string>((resolve) => {
-        reader.onloadend = () => {
-          const base64 = (reader.result as string).split(',')[1]
-          resolve(base64)
-        }
-        reader.readAsDataURL(audioBlob)
-      })
-
-      // Transcribe audio
-      console.log('🎤 Transcrevendo áudio...')
-      const transcriptionResult = await transcribeAudio(audioBlob)
-      const transcription = transcriptionResult.text
-      setCurrentTranscription(transcription)
-
-      console.log('📝 Transcrição:', transcription)
-
-      // Wait for audio conversion
-      const userAudioBase64 = await audioBase64Promise
-
-      // Save duration for user audio
-      setAudioDurations(prev => new Map(prev).set(dialogueHistory.length, recordingTime))
-
-      // Add to dialogue history with audio data (no coherence check)
-      setDialogueHistory(prev => [
-        ...prev,
-        {
-          speaker: 'user',
-          text: transcription,
-          transcription: transcription,
-          audioBase64: userAudioBase64,
-          mimeType: audioBlob.type
+        if (mensagem.audio && mensagem.mimeType) {
+          getAudioDuration(mensagem.audio, mensagem.mimeType).then(duration => {
+            setAudioDurations(prev => new Map(prev).set(historyPosition(mensagem.indice, 'app'), duration))
+          })
         }
-      ])
-
-      // Clear current transcription immediately to avoid duplication
-      setCurrentTranscription('')
-      clearRecording()
-
-      // Wait a bit to show transcription, then load next phrase
-      setTimeout(() => {
-        handleNextIntermediate()
-      }, 2000) // 2 second delay to show transcription
-    } catch (error) {
-      console.error('Erro ao transcrever áudio:', error)
-      alert('Erro ao transcrever áudio. Verifique se o serviço STT está rodando.')
-    } finally {
-      setVerifying(false)
+        break
+      }
+      case 'transcricao':
+        console.log('📝 Transcrição:', mensagem.texto)
+        setDialogueHistory(prev => prev.map(turn =>
+          turn.speaker === 'user' && turn.indice === mensagem.indice
+            ? { ...turn, text: mensagem.texto, transcription: mensagem.texto }
+            : turn
+        ))
+        break
+      case 'resultado':
+        console.log('✅ Dados do interlocutor:', mensagem.interlocutor)
+        setInterlocutorData({
+          nome: '',
+          idade: '',
+          altura: '',
+          peso: '',
+          ...(mensagem.interlocutor ?? {})
+        })
+        setAnalyzingDialogue(false)
+        break
+      case 'erro':
+        console.error('Erro na sessão de diálogo:', mensagem.detalhe)
+        setGeneratingAudio(false)
+        setAnalyzingDialogue(false)
+        alert(mensagem.detalhe)
+        break
     }
   }
 
-  // Handle next intermediate phrase
-  const handleNextIntermediate = async () => {
+  // Open a dialogue session (once per dialogue; restarting opens a new one)
+  useEffect(() => {
     if (!frasesDialogo) return
 
-    const availablePhrases = frasesDialogo.intermediarias.filter(
-      (_, index) => !intermediatePhrasesUsed.has(index)
-    )
-
-    if (availablePhrases.length === 0) {
-      // No more intermediate phrases, move to farewell
-      setDialogueStage('farewell')
-      clearRecording()
-      setAudioData(null)
-      setCurrentPhrase('')
-      setCurrentTranscription('')
-      return
+    setGeneratingAudio(true)
+    const socket = abrirSessaoDialogo(selectedIdioma, handleSessionMessage)
+    socket.onerror = () => {
+      setGeneratingAudio(false)
+      alert('Erro ao conectar à sessão de diálogo. Verifique se o backend está rodando.')
     }
+    socketRef.current = socket
 
-    // Select random phrase
-    const randomIndex = Math.floor(Math.random() * frasesDialogo.intermediarias.length)
-
-    // Make sure it hasn't been used
-    if (intermediatePhrasesUsed.has(randomIndex)) {
-      handleNextIntermediate()
-      return
+    return () => {
+      socket.close()
+      socketRef.current = null
     }
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [frasesDialogo, selectedIdioma, sessionKey])
+
+  // Send the recorded answer to the current phrase
+  const handleConfirm = async () => {
+    const socket = socketRef.current
+    if (!audioBlob || !socket || socket.readyState !== WebSocket.OPEN) return
+
+    // Convert audio blob to base64 for playback in the history
+    const reader = new FileReader()
+    const audioBase64Promise = new Promise<string>((resolve) => {
+      reader.onloadend = () => {
+        const base64 = (reader.result as string).split(',')[1]
+        resolve(base64)
+      }
+      reader.readAsDataURL(audioBlob)
+    })
 
-    const selectedPhrase = frasesDialogo.intermediarias[randomIndex]
-    setIntermediatePhrasesUsed(prev => new Set([...prev, randomIndex]))
-    setCurrentPhrase(selectedPhrase)
-
-    // Generate normal audio only (slow audio generated on demand)
-    const audio = await generatePhraseAudio(selectedPhrase, false)
-    setAudioData(audio)
-
-    // Get duration for this audio
-    const duration = await getAudioDuration(audio.normal.audioBase64, audio.normal.mimeType)
-    setAudioDurations(prev => new Map(prev).set(dialogueHistory.length, duration))
+    // Read everything before sending: the next phrase (possibly prefetched) or the
+    // result can arrive as soon as the audio goes out, and must find the user turn
+    // and the waiting state already in place
+    const [audioBuffer, userAudioBase64] = await Promise.all([audioBlob.arrayBuffer(), audioBase64Promise])
+    if (socket.readyState !== WebSocket.OPEN) return
 
-    // Add to dialogue history
+    setAudioDurations(prev => new Map(prev).set(historyPosition(currentIndice, 'user'), recordingTime))
     setDialogueHistory(prev => [...prev, {
-      speaker: 'app',
-      text: selectedPhrase,
-      audioBase64: audio.normal.audioBase64,
-      mimeType: audio.normal.mimeType
+      speaker: 'user',
+      text: 'Transcrevendo...',
+      indice: currentIndice,
+      audioBase64: userAudioBase64,
+      mimeType: audioBlob.type
     }])
-
-    // Clear recording only - keep transcription visible in history
     clearRecording()
-  }
-
-  // Start farewell phase
-  useEffect(() => {
-    if (frasesDialogo && dialogueStage === 'farewell' && !currentPhrase) {
-      const startFarewell = async () => {
-        setCurrentPhrase(frasesDialogo.despedida)
-        const audio = await generatePhraseAudio(frasesDialogo.despedida, true)
-        setAudioData(audio)
 
-        // Get duration for this audio
-        const duration = await getAudioDuration(audio.normal.audioBase64, audio.normal.mimeType)
-        setAudioDurations(prev => new Map(prev).set(dialogueHistory.length, duration))
-
-        setDialogueHistory(prev => [...prev, {
-          speaker: 'app',
-          text: frasesDialogo.despedida,
-          audioBase64: audio.normal.audioBase64,
-          mimeType: audio.normal.mimeType
-        }])
-      }
-      startFarewell()
+    if (dialogueStage === 'farewell') {
+      // The session transcribes the last answer, analyzes the dialogue and saves the exercise
+      setDialogueStage('final')
+      setAnalyzingDialogue(true)
+    } else {
+      setGeneratingAudio(true)
     }
-    // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [frasesDialogo, dialogueStage, currentPhrase])
-
-  // Handle confirm for farewell
-  const handleConfirmFarewell = async () => {
-    // Don't process farewell audio, analyze complete dialogue
-    setDialogueStage('final')
-    setAnalyzingDialogue(true)
-
-    try {
-      // Build complete dialogue text
-      const dialogueText = dialogueHistory
-        .map(turn => `${turn.speaker === 'app' ? 'App' : 'Usuário'}: ${turn.text}`)
-        .join('\n')
-
-      console.log('📝 Diálogo completo:', dialogueText)
-
-      // Query LLM to extract interlocutor data
-      const promptTemplate = getPromptTemplate('dialogo_dados_interlocutor')
-      if (promptTemplate) {
-        const prompt = replacePromptParams(promptTemplate, {
-          idioma: getIdiomaDisplayName(selectedIdioma),
-          dialogo: dialogueText
-        })
-
-        console.log('🤖 Consultando LLM para extrair dados do interlocutor...')
-        const response = await chatWithOllama({
-          messages: [
-            { role: 'user', content: prompt }
-          ]
-        })
 
-        const cleanedResponse = cleanJsonResponse(response.message.content)
-        console.log('🤖 Resposta LLM:', cleanedResponse)
-
-        const resultJson = JSON.parse(cleanedResponse)
-        setInterlocutorData(resultJson)
-
-        console.log('✅ Dados do interlocutor:', resultJson)
-
-        // Save exercise
-        try {
-          const exercicio: Exercicio = {
-            data_hora: new Date().toISOString(),
-            exercicio_id: crypto.randomUUID(),
-            conhecimento_id: 'dialogo_practice',
-            idioma: selectedIdioma as any,
-            tipo_pratica: 'dialogo' as any,
-            resultado_exercicio: {
-              correto: CorretoEnum.Sim // Simplified - could be more complex
-            } as ResultadoDialogo
-          }
-
-          await postExercicio(exercicio)
-        } catch (error) {
-          console.error('Erro ao salvar exercício:', error)
-        }
-      }
-    } catch (error) {
-      console.error('Erro ao analisar diálogo:', error)
-      alert('Erro ao analisar diálogo. Verifique se o serviço Ollama está rodando.')
-    } finally {
-      setAnalyzingDialogue(false)
-    }
+    socket.send(audioBuffer)
   }
 
   // Handle exit
@@ -568,11 +346,12 @@ export default function PraticaDialogo() {
     setDialogueStage('greeting')
     setDialogueHistory([])
     setCurrentPhrase('')
-    setIntermediatePhrasesUsed(new Set())
+    setCurrentIndice(0)
     setAudioData(null)
+    setAudioDurations(new Map())
     clearRecording()
-    setCurrentTranscription('')
     setInterlocutorData(null)
+    setSessionKey(prev => prev + 1)
   }
 
   // Loading state
@@ -718,15 +497,18 @@ export default function PraticaDialogo() {
             </h1>
           </div>
 
-          {/* Language selector (only at start) */}
-          {dialogueStage === 'greeting' && dialogueHistory.length === 0 && (
+          {/* Language selector (only before the first answer) */}
+          {dialogueStage === 'greeting' && !dialogueHistory.some(turn => turn.speaker === 'user') && (
             <div className="mb-6">
               <label className="block text-sm font-medium text-gray-700 mb-2">
                 Idioma
               </label>
               <select
                 value={selectedIdioma}
-                onChange={(e) => setSelectedIdioma(e.target.value as IdiomaConhecimentoEnum)}
+                onChange={(e) => {
+                  handleRestart()
+                  setSelectedIdioma(e.target.value as IdiomaConhecimentoEnum)
+                }}
                 className="w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-indigo-500 focus:border-indigo-500"
               >
                 <option value="alemao">Alemão</option>
@@ -740,7 +522,7 @@ export default function PraticaDialogo() {
               <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-indigo-600 mx-auto mb-3"></div>
               <p className="text-gray-600 text-sm">Gerando áudios...</p>
             </div>
-          ) : currentPhrase && audioData ? (
+          ) : currentPhrase ? (
             <>
               {/* Audio Bubbles - Scrollable Vertical List */}
               <div className="max-h-[65vh] bg-gray-50 rounded-lg p-4 mb-4 space-y-3 overflow-y-auto">
@@ -779,47 +561,33 @@ export default function PraticaDialogo() {
                             </svg>
                             <span className="text-sm font-medium">{formatDuration(audioDurations.get(idx) || 0)}</span>
                           </button>
-                          {msg.transcription && (
-                            <div className="bg-green-100 text-gray-800 text-sm p-2 rounded-lg w-full">
-                              {msg.transcription}
-                            </div>
-                          )}
+                          <div className="bg-green-100 text-gray-800 text-sm p-2 rounded-lg w-full">
+                            {msg.transcription ?? msg.text}
+                          </div>
                         </div>
                       </div>
                     )
                   }
                 })}
 
-                {/* Current App Audio Bubble - Active/Clickable */}
-                <div className="flex justify-start">
-                  <button
-                    onClick={() => playAudio(audioData.normal.audioBase64, audioData.normal.mimeType)}
-                    className="flex items-center gap-2 px-4 py-3 bg-blue-500 text-white rounded-full shadow-md hover:bg-blue-600 transition-colors"
-                  >
-                    <svg className="h-5 w-5" fill="currentColor" viewBox="0 0 24 24">
-                      <path d="M8 5v14l11-7z"/>
-                    </svg>
-                    <span className="text-sm font-medium">{formatDuration(audioDurations.get(dialogueHistory.length) || 0)}</span>
-                  </button>
-                </div>
-
-                {/* User's response bubble with transcription (if sent and transcribed) */}
-                {currentTranscription && (
-                  <div className="flex justify-end">
-                    <div className="max-w-[75%] flex flex-col items-end">
+                {/* Current App Audio Bubble - Active/Clickable (text only if the TTS failed) */}
+                {dialogueHistory[dialogueHistory.length - 1]?.speaker === 'app' && (
+                  <div className="flex justify-start">
+                    {audioData ? (
                       <button
-                        onClick={playRecording}
-                        className="flex items-center gap-2 px-4 py-3 bg-green-500 text-white rounded-full shadow-md hover:bg-green-600 transition-colors mb-2"
+                        onClick={() => playAudio(audioData.normal.audioBase64, audioData.normal.mimeType)}
+                        className="flex items-center gap-2 px-4 py-3 bg-blue-500 text-white rounded-full shadow-md hover:bg-blue-600 transition-colors"
                       >
                         <svg className="h-5 w-5" fill="currentColor" viewBox="0 0 24 24">
                           <path d="M8 5v14l11-7z"/>
                         </svg>
-                        <span className="text-sm font-medium">{formatDuration(recordingTime)}</span>
+                        <span className="text-sm font-medium">{formatDuration(audioDurations.get(historyPosition(currentIndice, 'app')) || 0)}</span>
                       </button>
-                      <div className="bg-green-100 text-gray-800 text-sm p-2 rounded-lg w-full">
-                        {currentTranscription}
+                    ) : (
+                      <div className="px-4 py-3 bg-blue-500 text-white rounded-2xl shadow-md">
+                        {currentPhrase}
                       </div>
-                    </div>
+                    )}
                   </div>
                 )}
 
@@ -874,12 +642,8 @@ export default function PraticaDialogo() {
                       Ouvir
                     </button>
                     <button
-                      onClick={
-                        dialogueStage === 'greeting' ? handleConfirmGreeting :
-                        dialogueStage === 'intermediate' ? handleConfirmIntermediate :
-                        handleConfirmFarewell
-                      }
-                      disabled={verifying || analyzingDialogue}
+                      onClick={handleConfirm}
+                      disabled={analyzingDialogue}
                       className="p-3 bg-green-500 text-white rounded-full shadow-lg hover:bg-green-600 transition-colors disabled:bg-gray-400"
                     >
                       <svg className="h-6 w-6" fill="currentColor" viewBox="0 0 24 24">
@@ -1,7 +1,6 @@
 import { useState, useRef } from 'react'
 import { Link, useNavigate } from 'react-router-dom'
-import { useData } from '../../contexts/DataContext'
-import { postExercicio, transcribeAudio, chatWithOllama } from '../../services/api'
+import { postExercicio, praticarNumero } from '../../services/api'
 import type {
   IdiomaConhecimentoEnum,
   ResultadoPronunciaNumeros,
@@ -21,7 +20,6 @@ interface VerificationResult {
 
 export default function PraticaNumeros() {
   const navigate = useNavigate()
-  const { prompts } = useData()
 
   // Screen state
   const [screenState, setScreenState] = useState<ScreenState>('setup')
@@ -139,33 +137,6 @@ export default function PraticaNumeros() {
     audio.onended = () => URL.revokeObjectURL(url)
   }
 
-  // Clean JSON response from LLM
-  const cleanJsonResponse = (text: string): string => {
-    // Remove markdown code blocks
-    let cleaned = text.replace(/```json\s*/g, '').replace(/```\s*/g, '')
-
-    // Trim whitespace
-    cleaned = cleaned.trim()
-
-    return cleaned
-  }
-
-  // Get prompt template
-  const getPromptTemplate = (promptId: string): string | null => {
-    if (!prompts) return null
-    const prompt = prompts.prompts.find(p => p.prompt_id === promptId)
-    return prompt?.template || null
-  }
-
-  // Replace prompt parameters
-  const replacePromptParams = (template: string, params: Record<string, string>): string => {
-    let result = template
-    for (const [key, value] of Object.entries(params)) {
-      result = result.replace(new RegExp(`{{${key}}}`, 'g'), value)
-    }
-    return result
-  }
-
   // Handle verify button
   const handleVerify = async () => {
     if (!currentNumber) return
@@ -178,71 +149,20 @@ export default function PraticaNumeros() {
     setVerifying(true)
 
     try {
-      const result: VerificationResult = {}
-
-      // Verify text if provided
-      if (textoUsuario.trim()) {
-        const promptTemplate = getPromptTemplate('numeros_verificar_texto')
-        if (promptTemplate) {
-          const prompt = replacePromptParams(promptTemplate, {
-            numero: currentNumber.toString(),
-            texto_usuario: textoUsuario.trim(),
-            idioma: getIdiomaDisplayName(selectedIdioma)
-          })
-
-          console.log('📝 Verificando texto com LLM...')
-          const response = await chatWithOllama({
-            messages: [
-              { role: 'user', content: prompt }
-            ]
-          })
-
-          const cleanedResponse = cleanJsonResponse(response.message.content)
-          console.log('🤖 Resposta LLM (texto):', cleanedResponse)
-
-          const resultJson = JSON.parse(cleanedResponse)
-          result.texto_correto = resultJson.equivalente
-          result.texto_comentario = resultJson.equivalente
-            ? 'Correto! Você escreveu o número corretamente.'
-            : 'Incorreto. Revise como escrever este número.'
-        }
-      }
-
-      // Verify audio if provided
-      if (audioBlob) {
-        // First, transcribe the audio
-        console.log('🎤 Transcrevendo áudio...')
-        const transcriptionResult = await transcribeAudio(audioBlob)
-        const transcricao = transcriptionResult.text
-        result.audio_transcricao = transcricao
-
-        console.log('📝 Transcrição:', transcricao)
-
-        // Then verify with LLM using the same prompt as text
-        const promptTemplate = getPromptTemplate('numeros_verificar_texto')
-        if (promptTemplate) {
-          const prompt = replacePromptParams(promptTemplate, {
-            numero: currentNumber.toString(),
-            texto_usuario: transcricao,
-            idioma: getIdiomaDisplayName(selectedIdioma)
-          })
-
-          console.log('📝 Verificando áudio com LLM...')
-          const response = await chatWithOllama({
-            messages: [
-              { role: 'user', content: prompt }
-            ]
-          })
-
-          const cleanedResponse = cleanJsonResponse(response.message.content)
-          console.log('🤖 Resposta LLM (áudio):', cleanedResponse)
-
-          const resultJson = JSON.parse(cleanedResponse)
-          result.audio_correto = resultJson.equivalente
-          result.audio_comentario = resultJson.equivalente
-            ? 'Correto! Sua pronúncia está correta.'
-            : 'Incorreto. Revise a pronúncia deste número.'
-        }
+      // Transcription and both verifications run concurrently on the backend
+      console.log('🔢 Verificando resposta...')
+      const avaliacao = await praticarNumero({
+        numero_referencia: currentNumber.toString(),
+        idioma: selectedIdioma,
+        texto_usuario: textoUsuario.trim() || undefined,
+        audio: audioBlob ?? undefined
+      })
+      const result: VerificationResult = {
+        texto_correto: avaliacao.texto_correto,
+        texto_comentario: avaliacao.texto_comentario,
+        audio_correto: avaliacao.audio_correto,
+        audio_comentario: avaliacao.audio_comentario,
+        audio_transcricao: avaliacao.audio_transcricao
       }
 
       console.log('✅ Resultado final:', result)
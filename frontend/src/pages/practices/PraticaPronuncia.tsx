@@ -1,16 +1,14 @@
 import { useState, useEffect, useMemo, useRef } from 'react'
 import { Link, useNavigate } from 'react-router-dom'
 import { useData } from '../../contexts/DataContext'
-import { postExercicio, transcribeAudio } from '../../services/api'
+import { praticarPronuncia } from '../../services/api'
 import {
   CorretoEnum
 } from '../../types/api'
 import type {
   ConhecimentoIdioma,
   IdiomaConhecimentoEnum,
-  TipoConhecimentoEnum,
-  ResultadoPronuncia,
-  Exercicio
+  TipoConhecimentoEnum
 } from '../../types/api'
 
 type RecordingState = 'idle' | 'recording' | 'recorded'
@@ -43,7 +41,6 @@ export default function PraticaPronuncia() {
   const [showResult, setShowResult] = useState(false)
   const [verificationResult, setVerificationResult] = useState<VerificationResult | null>(null)
   const [verifying, setVerifying] = useState(false)
-  const [saving, setSaving] = useState(false)
 
   // Completion state
   const [allPracticed, setAllPracticed] = useState(false)
@@ -149,12 +146,6 @@ export default function PraticaPronuncia() {
     return mapping[idioma] || idioma
   }
 
-  // Remove punctuation from text
-  const removePunctuation = (text: string): string => {
-    // Remove sinais de pontuação: ! , : ? .
-    return text.replace(/[!,:?.]/g, '').trim()
-  }
-
   // Start recording
   const startRecording = async () => {
     try {
@@ -220,29 +211,16 @@ export default function PraticaPronuncia() {
     setVerifying(true)
 
     try {
-      // Transcribe audio using STT service
-      const transcriptionResult = await transcribeAudio(audioBlob)
-      const transcricao_stt = transcriptionResult.text
+      // Transcribe, score and save the exercise in a single backend call
+      const avaliacao = await praticarPronuncia(audioBlob, currentExercise.conhecimento_id)
 
       console.log('📝 Texto original:', currentExercise.texto_original)
-      console.log('🎤 Transcrição STT:', transcricao_stt)
-
-      // Compare texts directly (case sensitive, without punctuation)
-      const originalClean = removePunctuation(currentExercise.texto_original)
-      const transcricaoClean = removePunctuation(transcricao_stt)
-
-      console.log('📝 Texto original (limpo):', originalClean)
-      console.log('📝 Transcrição STT (limpo):', transcricaoClean)
-      console.log('🔍 Comparação case-sensitive:', originalClean === transcricaoClean)
-
-      const isCorrect = originalClean === transcricaoClean
+      console.log('🎤 Transcrição STT:', avaliacao.transcricao_stt)
 
       const result: VerificationResult = {
-        correto: isCorrect ? CorretoEnum.Sim : CorretoEnum.Nao,
-        comentario: isCorrect
-          ? 'Perfeito! Sua pronúncia está correta.'
-          : `Transcrição da sua pronúncia: "${transcricao_stt}". Esperado: "${currentExercise.texto_original}".`,
-        transcricao_stt
+        correto: avaliacao.correto,
+        comentario: avaliacao.comentario,
+        transcricao_stt: avaliacao.transcricao_stt
       }
 
       console.log('✅ Resultado:', result)
@@ -252,30 +230,6 @@ export default function PraticaPronuncia() {
 
       // Mark record as practiced
       setPracticedRecords(prev => new Set([...prev, currentExercise.conhecimento_id]))
-
-      // Save exercise to backend
-      setSaving(true)
-      try {
-        const exercicio: Exercicio = {
-          data_hora: new Date().toISOString(),
-          exercicio_id: crypto.randomUUID(),
-          conhecimento_id: currentExercise.conhecimento_id,
-          idioma: currentExercise.idioma as any,
-          tipo_pratica: 'pronuncia' as any,
-          resultado_exercicio: {
-            texto_original: currentExercise.texto_original,
-            transcricao_stt: transcricao_stt,
-            correto: result.correto,
-            comentario: result.comentario
-          } as ResultadoPronuncia
-        }
-
-        await postExercicio(exercicio)
-      } catch (error) {
-        console.error('Erro ao salvar exercício:', error)
-      } finally {
-        setSaving(false)
-      }
     } catch (error) {
       console.error('Erro ao verificar pronúncia:', error)
       alert('Erro ao transcrever áudio. Verifique se o serviço STT está rodando.')
@@ -394,6 +348,7 @@ export default function PraticaPronuncia() {
   // Result screen
   if (showResult && currentExercise && verificationResult) {
     const isCorrect = verificationResult.correto === CorretoEnum.Sim
+    const isPartial = verificationResult.correto === CorretoEnum.Parcial
 
     return (
       <div className="min-h-screen bg-gradient-to-br from-blue-50 via-indigo-50 to-purple-50 p-8">
@@ -411,7 +366,11 @@ export default function PraticaPronuncia() {
 
             {/* Result status */}
             <div className={`mb-8 p-6 rounded-lg text-center ${
-              isCorrect ? 'bg-green-50 border-2 border-green-300' : 'bg-red-50 border-2 border-red-300'
+              isCorrect
+                ? 'bg-green-50 border-2 border-green-300'
+                : isPartial
+                  ? 'bg-yellow-50 border-2 border-yellow-300'
+                  : 'bg-red-50 border-2 border-red-300'
             }`}>
               <div className="flex items-center justify-center mb-2">
                 {isCorrect ? (
@@ -425,7 +384,7 @@ export default function PraticaPronuncia() {
                 )}
               </div>
               <p className="text-2xl font-bold mb-2">
-                {isCorrect ? 'Correto!' : 'Incorreto'}
+                {isCorrect ? 'Correto!' : isPartial ? 'Quase correto' : 'Incorreto'}
               </p>
               <p className="text-lg text-gray-700">{verificationResult.comentario}</p>
             </div>
@@ -468,7 +427,6 @@ export default function PraticaPronuncia() {
               </button>
               <button
                 onClick={handleNext}
-                disabled={saving}
                 className="flex-1 px-6 py-3 bg-indigo-600 text-white font-medium rounded-lg hover:bg-indigo-700 transition-colors disabled:bg-gray-400"
               >
                 {unpracticedRecords.length > 0 ? 'Próximo Exercício' : 'Ver Conclusão'}
@@ -683,10 +641,10 @@ export default function PraticaPronuncia() {
                 <button
                   type="button"
                   onClick={handleVerify}
-                  disabled={verifying || saving || recordingState !== 'recorded' || !audioBlob}
+                  disabled={verifying || recordingState !== 'recorded' || !audioBlob}
                   className="flex-1 px-6 py-3 bg-indigo-600 text-white font-medium rounded-lg hover:bg-indigo-700 transition-colors disabled:bg-gray-400"
                 >
-                  {verifying ? 'Verificando...' : saving ? 'Salvando...' : 'Verificar'}
+                  {verifying ? 'Verificando...' : 'Verificar'}
                 </button>
               </div>
             </>
@@ -1,4 +1,4 @@
-import type { BaseHistoricoPratica, BasePrompts, ConhecimentoIdioma, FrasesDialogo, Exercicio } from '../types/api'
+import type { BaseHistoricoPratica, BasePrompts, ConhecimentoIdioma, CorretoEnum, FrasesDialogo, Exercicio, ResultadoPronunciaNumeros } from '../types/api'
 
 const API_BASE_URL = `http://localhost:${import.meta.env.VITE_BACKEND_PORT || 3010}`
 
@@ -163,6 +163,9 @@ export interface OllamaChatRequest {
   model?: string
   messages: OllamaMessage[]
   stream?: boolean
+  options?: Record<string, unknown>
+  prompt_id?: string  // Habilita o cache de respostas no backend para prompts configurados
+  cache?: boolean
 }
 
 export interface OllamaChatResponse {
@@ -173,6 +176,7 @@ export interface OllamaChatResponse {
     content: string
   }
   done: boolean
+  dados?: unknown  // Resposta já decodificada e validada (prompts com resposta estruturada)
 }
 
 export async function chatWithOllama(request: OllamaChatRequest): Promise<OllamaChatResponse> {
@@ -186,6 +190,9 @@ export async function chatWithOllama(request: OllamaChatRequest): Promise<Ollama
         model: request.model,  // Se undefined, backend usa MODELO_OLLAMA do .env
         messages: request.messages,
         stream: request.stream || false,
+        options: request.options,
+        prompt_id: request.prompt_id,
+        cache: request.cache,
       }),
     })
 
@@ -246,3 +253,175 @@ export async function transcribeAudio(audioFile: Blob): Promise<TranscribeAudioR
     )
   }
 }
+
+export interface AvaliarNumeroResponse extends ResultadoPronunciaNumeros {
+  forma_esperada?: string  // Só no alemão
+}
+
+export interface PraticaNumeroRequest {
+  numero_referencia: string
+  idioma: string
+  texto_usuario?: string
+  audio?: Blob
+  comentar_com_llm?: boolean  // Comentários do LLM para respostas incorretas (alemão)
+}
+
+// Transcreve o áudio e verifica texto e pronúncia em paralelo no servidor
+export async function praticarNumero(request: PraticaNumeroRequest): Promise<AvaliarNumeroResponse> {
+  try {
+    const formData = new FormData()
+    formData.append('numero_referencia', request.numero_referencia)
+    formData.append('idioma', request.idioma)
+    if (request.texto_usuario) {
+      formData.append('texto_usuario', request.texto_usuario)
+    }
+    if (request.audio) {
+      formData.append('file', request.audio, 'audio.wav')
+    }
+    if (request.comentar_com_llm) {
+      formData.append('comentar_com_llm', 'true')
+    }
+
+    const response = await fetch(`${API_BASE_URL}/api/pratica/numeros`, {
+      method: 'POST',
+      body: formData,
+    })
+
+    if (!response.ok) {
+      throw new ApiError(
+        `Erro ao praticar número: ${response.statusText}`,
+        response.status,
+        response.statusText
+      )
+    }
+
+    return await response.json()
+  } catch (error) {
+    if (error instanceof ApiError) {
+      throw error
+    }
+    throw new ApiError(
+      error instanceof Error ? error.message : 'Erro desconhecido ao praticar número'
+    )
+  }
+}
+
+export interface PalavraAlinhada {
+  operacao: 'igual' | 'substituicao' | 'omissao' | 'insercao'
+  esperado: string | null
+  obtido: string | null
+  similaridade?: number
+}
+
+export interface AvaliacaoAudicao {
+  correto: boolean
+  classificacao: 'Sim' | 'Parcial' | 'Não'
+  nota: number  // Similaridade de caracteres (0 a 1)
+  distancia_caracteres: number
+  distancia_palavras: number
+  taxa_erro_palavras: number
+  alinhamento: PalavraAlinhada[]
+}
+
+export async function avaliarAudicao(textoOriginal: string, transcricaoUsuario: string): Promise<AvaliacaoAudicao> {
+  try {
+    const response = await fetch(`${API_BASE_URL}/api/pratica/audicao/avaliar`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({
+        texto_original: textoOriginal,
+        transcricao_usuario: transcricaoUsuario,
+      }),
+    })
+
+    if (!response.ok) {
+      throw new ApiError(
+        `Erro ao avaliar transcrição: ${response.statusText}`,
+        response.status,
+        response.statusText
+      )
+    }
+
+    return await response.json()
+  } catch (error) {
+    if (error instanceof ApiError) {
+      throw error
+    }
+    throw new ApiError(
+      error instanceof Error ? error.message : 'Erro desconhecido ao avaliar transcrição'
+    )
+  }
+}
+
+export interface FonemaDivergente {
+  operacao: 'substituicao' | 'omissao' | 'insercao'
+  esperado: string | null
+  reconhecido: string | null
+}
+
+export interface AvaliacaoPronuncia {
+  texto_original: string
+  transcricao_stt: string
+  correto: CorretoEnum
+  nota: number  // Similaridade de fonemas (0 a 1)
+  comentario: string
+  referencia: 'ipa' | 'texto'  // Origem dos fonemas esperados
+  fonemas_esperados: string[]
+  fonemas_reconhecidos: string[]
+  divergencias: FonemaDivergente[]
+}
+
+export interface PraticaPronunciaResponse extends AvaliacaoPronuncia {
+  exercicio_id: string  // Exercício já registrado no histórico
+}
+
+export async function praticarPronuncia(audioFile: Blob, conhecimentoId: string): Promise<PraticaPronunciaResponse> {
+  try {
+    const formData = new FormData()
+    formData.append('file', audioFile, 'audio.wav')
+    formData.append('conhecimento_id', conhecimentoId)
+
+    const response = await fetch(`${API_BASE_URL}/api/pratica/pronuncia`, {
+      method: 'POST',
+      body: formData,
+    })
+
+    if (!response.ok) {
+      throw new ApiError(
+        `Erro ao praticar pronúncia: ${response.statusText}`,
+        response.status,
+        response.statusText
+      )
+    }
+
+    return await response.json()
+  } catch (error) {
+    if (error instanceof ApiError) {
+      throw error
+    }
+    throw new ApiError(
+      error instanceof Error ? error.message : 'Erro desconhecido ao praticar pronúncia'
+    )
+  }
+}
+
+export type EtapaDialogo = 'saudacao' | 'intermediaria' | 'despedida'
+
+export type MensagemDialogo =
+  | { tipo: 'frase'; indice: number; etapa: EtapaDialogo; texto: string; audio: string | null; mimeType: string | null }
+  | { tipo: 'transcricao'; indice: number; texto: string }
+  | { tipo: 'resultado'; correto: CorretoEnum; interlocutor: Record<string, string> | null; exercicio_id: string }
+  | { tipo: 'erro'; detalhe: string; indice?: number }
+
+// Abre a sessão de diálogo; o áudio de cada resposta deve ser enviado com socket.send(arrayBuffer)
+export function abrirSessaoDialogo(
+  idioma: string,
+  onMensagem: (mensagem: MensagemDialogo) => void
+): WebSocket {
+  const socket = new WebSocket(`${API_BASE_URL.replace(/^http/, 'ws')}/ws/dialogo`)
+  socket.onopen = () => socket.send(JSON.stringify({ tipo: 'iniciar', idioma }))
+  socket.onmessage = (event) => onMensagem(JSON.parse(event.data))
+  return socket
+}
@@ -91,6 +91,20 @@ export interface BaseHistoricoPratica {
 
 // Prompts Types
 
+export interface RoteamentoModelo {
+  modelo_principal?: string | null  // Se ausente, usa MODELO_OLLAMA
+  modelo_reserva?: string | null  // Consultado se o principal falhar ou estourar o orçamento
+  orcamento_latencia_ms?: number | null
+  redundancia?: boolean  // Cópia ao reserva quando o principal passa do p95
+}
+
+export interface OpcoesGeracao {
+  num_predict?: number | null  // Máximo de tokens gerados
+  temperature?: number | null
+  stop?: string[] | null
+  num_ctx?: number | null  // Janela de contexto, em tokens
+}
+
 export interface PromptItem {
   prompt_id: string
   descricao: string
@@ -99,6 +113,8 @@ export interface PromptItem {
   resposta_estruturada: boolean
   estrutura_esperada?: Record<string, any>
   ultima_edicao: string
+  roteamento?: RoteamentoModelo | null
+  opcoes_geracao?: OpcoesGeracao | null
 }
 
 export interface BasePrompts {
@@ -5,14 +5,15 @@ Usando Piper-TTS para Python 3.13+
 COM CONTROLE DE VELOCIDADE DA FALA
 """
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 import whisper
 import torch
 from typing import List, Dict, Optional
 import tempfile
+import asyncio
 import os
 import base64
 import subprocess
@@ -39,6 +40,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Audio-Metadata"],
 )
 
 # ============================================
@@ -185,12 +187,16 @@ async def health_check():
     }
 
 @app.post("/api/generate-audio")
-async def generate_audio(request: GenerateAudioRequest):
+async def generate_audio(request: GenerateAudioRequest, http_request: Request):
     """
     Gerar áudio a partir de texto (TTS)
     Equivalente ao generateAudio() do Gemini
     Usando Piper-TTS com controle de velocidade
     
+    Com "Accept: audio/wav" o WAV é devolvido bruto no corpo da resposta e a
+    metadata vai no cabeçalho X-Audio-Metadata; caso contrário, mantém o JSON
+    com áudio em base64.
+    
     Args:
         text: Texto para sintetizar
         voice: Voz (compatibilidade, não utilizado)
@@ -229,8 +235,9 @@ async def generate_audio(request: GenerateAudioRequest):
             "--length_scale", str(length_scale)  # Controle de velocidade
         ]
         
-        # Executar comando
-        result = subprocess.run(
+        # Executar comando fora do event loop para permitir sínteses simultâneas
+        result = await asyncio.to_thread(
+            subprocess.run,
             cmd,
             input=request.text.encode('utf-8'),
             capture_output=True,
@@ -241,22 +248,32 @@ async def generate_audio(request: GenerateAudioRequest):
         if not Path(output_path).exists():
             raise Exception("Arquivo de áudio não foi gerado")
         
-        # Ler e codificar em base64
+        # Ler áudio gerado
         with open(output_path, "rb") as audio_file:
             audio_bytes = audio_file.read()
-            base64_audio = base64.b64encode(audio_bytes).decode("utf-8")
         
         # Limpar arquivos temporários
         os.unlink(output_path)
         os.unlink(text_path)
         
+        metadata = {
+            "speed": request.speed,
+            "length_scale": length_scale
+        }
+        
+        # Modo binário negociado: WAV bruto, sem base64
+        aceita = http_request.headers.get("accept", "").lower()
+        if "audio/wav" in aceita or "audio/*" in aceita:
+            return Response(
+                content=audio_bytes,
+                media_type="audio/wav",
+                headers={"X-Audio-Metadata": json.dumps(metadata)}
+            )
+        
         return JSONResponse({
-            "audio": base64_audio,
+            "audio": base64.b64encode(audio_bytes).decode("utf-8"),
             "mimeType": "audio/wav",
-            "metadata": {
-                "speed": request.speed,
-                "length_scale": length_scale
-            }
+            "metadata": metadata
         })
     
     except subprocess.CalledProcessError as e: